@@ -37,6 +37,7 @@ def tick():
     if not active_sessions:
         return
 
+    stock_due = []
     for ts in active_sessions:
         gs = db.session.get(GameSession, ts.game_session_id)
         if not gs or gs.speed_multiplier <= 0:
@@ -72,11 +73,10 @@ def tick():
             from .news_engine import generate_random_news
             generate_random_news(gs.id, gs.game_time_ticks)
 
-        # --- Stock market fluctuation (every ~100 ticks) ---
+        # --- Stock market fluctuation (every ~100 ticks, batched below) ---
         from .constants import STOCK_TICK_INTERVAL
         if gs.game_time_ticks % STOCK_TICK_INTERVAL < gs.speed_multiplier:
-            from .stock_engine import tick_stocks
-            tick_stocks(gs)
+            stock_due.append(gs)
 
         # --- NPC agent missions (every ~400 ticks) ---
         if gs.game_time_ticks % NPC_MISSION_INTERVAL < gs.speed_multiplier:
@@ -152,6 +152,11 @@ def tick():
         # Push WebSocket warnings at thresholds
         _check_trace_warnings(ts, conn, computer, gs)
 
+    # --- Stock markets of all due sessions in one step ---
+    if stock_due:
+        from .stock_engine import tick_stock_markets
+        tick_stock_markets(stock_due)
+
     db.session.commit()
 
 
@@ -2,6 +2,11 @@
 
 import random
 
+try:
+    import numpy as np
+except ImportError:  # optional: fall back to the per-session tick
+    np = None
+
 from ..extensions import db
 from ..models import GameSession, StockHolding
 
@@ -62,6 +67,58 @@ def tick_stocks(gs):
     gs.plot_data = plot_data
 
 
+def tick_stock_markets(sessions):
+    """Fluctuate the markets of several sessions in one vectorized step.
+
+    Same random walk as tick_stocks, but every company of every session in
+    *sessions* is moved at once on flat price/sentiment arrays.  Falls back
+    to calling tick_stocks per session when NumPy is not installed.
+    """
+    if np is None:
+        for gs in sessions:
+            tick_stocks(gs)
+        return
+
+    from .constants import STOCK_VOLATILITY, STOCK_SENTIMENT_DECAY
+
+    books = []
+    prices = []
+    sentiments = []
+    for gs in sessions:
+        plot_data = gs.plot_data
+        market = plot_data.get("stock_market")
+        if not market:
+            continue
+        books.append((gs, plot_data, market))
+        for data in market.values():
+            prices.append(data["price"])
+            sentiments.append(data.get("sentiment", 0.0))
+    if not prices:
+        return
+
+    price = np.array(prices, dtype=np.int64)
+    sentiment = np.array(sentiments, dtype=np.float64)
+
+    # Random walk biased by sentiment, truncated like int() and floored at 5c
+    change_pct = np.random.uniform(-STOCK_VOLATILITY, STOCK_VOLATILITY, len(price)) + sentiment * 0.01
+    new_price = np.maximum(5, np.trunc(price * (1 + change_pct)).astype(np.int64))
+
+    new_sentiment = sentiment * STOCK_SENTIMENT_DECAY
+    new_sentiment[np.abs(new_sentiment) < 0.1] = 0.0
+
+    new_price = new_price.tolist()
+    new_sentiment = new_sentiment.tolist()
+    i = 0
+    for gs, plot_data, market in books:
+        for data in market.values():
+            data["prev_price"] = prices[i]
+            data["price"] = new_price[i]
+            data["sentiment"] = new_sentiment[i]
+            i += 1
+        plot_data["stock_market"] = market
+        gs.plot_data = plot_data
+
+
 def add_sentiment(gs, company_name, amount):
     """Add sentiment to a company's stock (positive=bullish, negative=bearish)."""
     plot_data = gs.plot_data
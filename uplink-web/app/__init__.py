@@ -12,6 +12,8 @@ def create_app():
     app.config.from_object('app.config.Config')
 
     # Initialize extensions
+    from .cooperative import configure as configure_cooperative_db
+    configure_cooperative_db(app)
     db.init_app(app)
     migrate.init_app(app, db)
     socketio.init_app(app, cors_allowed_origins="*", async_mode="eventlet")
@@ -34,7 +36,7 @@ def create_app():
         user_account, game_session, player, gateway, computer,
         vlocation, company, person, mission, connection,
         data_file, access_log, security, message, running_task,
-        scheduled_event, bank_account, stock_market, news,
+        scheduled_event, bank_account, stock_market, news, lan_state,
     )
 
     # Create tables if not using migrations
@@ -13,3 +13,18 @@ class Config:
         "pool_pre_ping": True,
         "pool_recycle": 300,
     }
+
+    # LAN hacking state store (app/game/lan_store.py).  Backend is "db"
+    # (write-through to the lan_states table), "file" (one file per LAN
+    # under LAN_STATE_DIR, relative to the instance folder) or "memory"
+    # (evicted LANs are regenerated).
+    LAN_STATE_BACKEND = os.environ.get("LAN_STATE_BACKEND", "db")
+    LAN_STATE_DIR = os.environ.get("LAN_STATE_DIR", "lan_states")
+    # Memory budget (serialized bytes) and idle TTL (seconds) of the LRU tier
+    LAN_STATE_MAX_BYTES = int(os.environ.get("LAN_STATE_MAX_BYTES", 32 * 1024 * 1024))
+    LAN_STATE_TTL = int(os.environ.get("LAN_STATE_TTL", 3600))
+
+    # Database access under eventlet (app/cooperative.py): "green"
+    # (psycogreen PostgreSQL), "tpool" (SQLite on native threads), "off",
+    # or "auto" to pick from what run.py was able to patch.
+    DB_COOPERATIVE = os.environ.get("DB_COOPERATIVE", "auto")
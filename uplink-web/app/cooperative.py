@@ -0,0 +1,182 @@
+"""Cooperative database access under eventlet.
+
+Flask-SocketIO runs on eventlet: one OS thread multiplexing greenlets.  A
+database call that blocks in C (psycopg2, sqlite3) stalls every greenlet,
+so each game-loop query and each handler query would also stall all socket
+I/O.  ``run.py`` monkey-patches eventlet before anything is imported and,
+for PostgreSQL, makes psycopg2 green with psycogreen.  ``configure`` then
+picks one of these modes (``DB_COOPERATIVE``, "auto" by default):
+
+    green  PostgreSQL through a psycogreen-patched psycopg2: queries yield
+           to the hub while they wait on the server
+    tpool  file-backed SQLite in WAL mode: every DB-API connection is
+           wrapped so writes, commits and rollbacks (the calls that wait on
+           locks and the disk) run on eventlet's native thread pool while
+           the hub keeps serving sockets; reads and the ORM stay inline
+    off    not monkey-patched (tests, benchmarks) or nothing cooperative
+           available: the driver blocks, as before
+
+The resolved mode is stored back into ``app.config["DB_COOPERATIVE"]``;
+the game loop yields between the steps of its database phase whenever it
+is not "off".
+"""
+import logging
+import os
+import sqlite3
+
+from sqlalchemy.engine import make_url
+
+log = logging.getLogger(__name__)
+
+MODES = ("auto", "green", "tpool", "off")
+
+
+def _eventlet_patched():
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return False
+    return patcher.is_monkey_patched("socket")
+
+
+def _psycopg_green():
+    try:
+        import psycopg2.extensions
+    except ImportError:
+        return False
+    return psycopg2.extensions.get_wait_callback() is not None
+
+
+def _sqlite_file(url):
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def resolve_mode(uri, requested="auto"):
+    """The cooperative mode for database *uri* given the *requested* one."""
+    if requested not in MODES:
+        raise ValueError(f"DB_COOPERATIVE must be one of {', '.join(MODES)}, not '{requested}'")
+    if requested != "auto":
+        return requested
+    if not _eventlet_patched():
+        return "off"
+    url = make_url(uri)
+    if url.get_backend_name() == "postgresql":
+        if _psycopg_green():
+            return "green"
+        log.warning("psycopg2 is not patched by psycogreen; database calls will block the event loop")
+        return "off"
+    if _sqlite_file(url):
+        return "tpool"
+    return "off"
+
+
+def _is_read(statement):
+    return statement.lstrip()[:6].upper() == "SELECT"
+
+
+class TpoolCursor:
+    """sqlite3 cursor whose writes run on eventlet's native thread pool.
+
+    Writes can wait up to the busy timeout for another writer's lock, and
+    commits for the disk; those go through ``tpool``.  In WAL mode reads
+    never wait on a lock, so SELECTs run inline: a thread round trip costs
+    more than a typical point read.
+    """
+
+    __slots__ = ("_cursor",)
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, statement, *args):
+        if _is_read(statement):
+            self._cursor.execute(statement, *args)
+        else:
+            from eventlet import tpool
+            tpool.execute(self._cursor.execute, statement, *args)
+        return self
+
+    def executemany(self, *args):
+        from eventlet import tpool
+        tpool.execute(self._cursor.executemany, *args)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class TpoolConnection:
+    """sqlite3 connection offloading writes and transaction ends to tpool."""
+
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn):
+        object.__setattr__(self, "_conn", conn)
+
+    def cursor(self, *args):
+        return TpoolCursor(self._conn.cursor(*args))
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def commit(self):
+        from eventlet import tpool
+        tpool.execute(self._conn.commit)
+
+    def rollback(self):
+        from eventlet import tpool
+        tpool.execute(self._conn.rollback)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+
+def sqlite_database(app, url):
+    """The file Flask-SQLAlchemy opens for SQLite *url*, and whether it is a URI.
+
+    Flask-SQLAlchemy resolves relative paths against ``app.instance_path``
+    (``sqlite:///uplink.db`` is ``instance/uplink.db``); a creator bypasses
+    that, so it has to open the same file itself.
+    """
+    is_uri = bool(url.query.get("uri", False))
+    path = url.database[5:] if is_uri else url.database
+    if not os.path.isabs(path):
+        os.makedirs(app.instance_path, exist_ok=True)
+        path = os.path.join(app.instance_path, path)
+    return (f"file:{path}" if is_uri else path), is_uri
+
+
+def tpool_sqlite_creator(database, uri=False):
+    """A connection factory running sqlite3 statements on eventlet's thread pool."""
+
+    def connect():
+        # Used from tpool threads: same-thread checks would reject that, and
+        # WAL lets socket handlers read while the game loop writes.
+        conn = sqlite3.connect(database, check_same_thread=False, uri=uri)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return TpoolConnection(conn)
+
+    return connect
+
+
+def configure(app):
+    """Resolve ``DB_COOPERATIVE`` and adjust the engine options to match.
+
+    Must run before ``db.init_app``.
+    """
+    uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    mode = resolve_mode(uri, app.config.get("DB_COOPERATIVE", "auto"))
+    if mode == "tpool":
+        options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+        database, is_uri = sqlite_database(app, make_url(uri))
+        options["creator"] = tpool_sqlite_creator(database, uri=is_uri)
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+    app.config["DB_COOPERATIVE"] = mode
+    log.info("Cooperative database mode: %s", mode)
+    return mode
@@ -1,6 +1,5 @@
 """Finance engine -- banking, stock market, and loan systems."""
 import logging
-import random
 
 from app.extensions import db
 from app.models.bank_account import BankAccount, LoanRecord
@@ -336,49 +335,103 @@ def accrue_interest(session_id, current_tick):
     Called periodically by the game loop (every FREQUENCY_ADDINTERESTONLOANS
     game-minutes).  Each unpaid loan's amount is increased by its interest
     rate, and the owning bank account's loan_amount is updated to match.
+    The game loop accrues all due sessions at once with
+    ``accrue_all_interest``; this is the single-session form.
 
     Returns:
         dict with ``"loans_updated"`` count and ``"total_interest"`` accrued.
     """
-    # Find all player bank accounts for this session
-    accounts = BankAccount.query.filter_by(
-        game_session_id=session_id,
-        is_player=True,
+    result = accrue_all_interest([session_id]).get(session_id)
+    if result is None:
+        return {"loans_updated": 0, "total_interest": 0}
+    log.debug("Interest accrued for session %s at tick %d", session_id, current_tick)
+    return result
+
+
+def _loan_interest():
+    """SQL expression for one accrual on a loan row: int(amount * rate), at least 1."""
+    product = LoanRecord.amount * LoanRecord.interest_rate
+    if db.session.get_bind().dialect.name == "sqlite":
+        # SQLite's CAST truncates, and floor() only exists in builds with
+        # the math functions
+        interest = db.cast(product, db.Integer)
+    else:
+        # PostgreSQL's CAST rounds; amount and rate are never negative, so
+        # floor() is int() truncation
+        interest = db.cast(db.func.floor(product), db.Integer)
+    return db.case(
+        (db.and_(interest < 1, LoanRecord.amount > 0), 1),
+        else_=interest,
+    )
+
+
+def accrue_all_interest(session_ids):
+    """Accrue interest on the unpaid loans of every player account in *session_ids*.
+
+    Three statements regardless of how many sessions, accounts or loans are
+    due: an aggregate SELECT of the interest about to be charged, an UPDATE
+    rolling it into ``BankAccount.loan_amount`` and an UPDATE of the loans.
+    Both UPDATEs bypass the ORM, so already loaded ``BankAccount`` and
+    ``LoanRecord`` objects are stale until the caller commits.
+
+    Returns:
+        dict mapping session id to ``{"loans_updated", "total_interest"}``
+        for each session that had outstanding loans.
+    """
+    session_ids = list(session_ids)
+    if not session_ids:
+        return {}
+
+    db.session.flush()
+    interest = _loan_interest()
+    player_accounts = (
+        db.select(BankAccount.id)
+        .where(BankAccount.game_session_id.in_(session_ids), BankAccount.is_player == True)
+    )
+    due = db.and_(LoanRecord.is_paid == False, LoanRecord.bank_account_id.in_(player_accounts))
+
+    rows = db.session.execute(
+        db.select(BankAccount.game_session_id, db.func.count(LoanRecord.id),
+                  db.func.sum(interest))
+        .join(BankAccount, BankAccount.id == LoanRecord.bank_account_id)
+        .where(due)
+        .group_by(BankAccount.game_session_id)
     ).all()
+    if not rows:
+        return {}
 
-    total_interest = 0
-    loans_updated = 0
-
-    for acct in accounts:
-        loans = LoanRecord.query.filter_by(
-            bank_account_id=acct.id,
-            is_paid=False,
-        ).all()
-
-        acct_interest = 0
-        for loan in loans:
-            interest = int(loan.amount * loan.interest_rate)
-            if interest < 1 and loan.amount > 0:
-                interest = 1  # Minimum 1 credit interest
-            loan.amount += interest
-            acct_interest += interest
-            loans_updated += 1
-
-        if acct_interest > 0:
-            acct.loan_amount += acct_interest
-            total_interest += acct_interest
-
-    if loans_updated > 0:
-        db.session.flush()
-        log.info(
-            "Interest accrued: %d credits across %d loans (session %s, tick %d)",
-            total_interest, loans_updated, session_id, current_tick,
+    account_interest = (
+        db.select(db.func.coalesce(db.func.sum(interest), 0))
+        .where(LoanRecord.bank_account_id == BankAccount.id, LoanRecord.is_paid == False)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        db.update(BankAccount)
+        .where(
+            BankAccount.game_session_id.in_(session_ids),
+            BankAccount.is_player == True,
+            BankAccount.id.in_(db.select(LoanRecord.bank_account_id).where(LoanRecord.is_paid == False)),
         )
+        .values(loan_amount=db.func.coalesce(BankAccount.loan_amount, 0) + account_interest)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        db.update(LoanRecord)
+        .where(due)
+        .values(amount=LoanRecord.amount + interest)
+        .execution_options(synchronize_session=False)
+    )
 
-    return {
-        "loans_updated": loans_updated,
-        "total_interest": total_interest,
+    results = {
+        sid: {"loans_updated": count, "total_interest": int(total or 0)}
+        for sid, count, total in rows
     }
+    log.info(
+        "Interest accrued: %d credits across %d loans in %d sessions",
+        sum(r["total_interest"] for r in results.values()),
+        sum(r["loans_updated"] for r in results.values()), len(results),
+    )
+    return results
 
 
 # ===================================================================
@@ -567,40 +620,25 @@ def sell_stock(session_id, player_id, company_name, shares):
 def tick_stock_market(session_id):
     """Randomly fluctuate stock prices for a session.
 
-    Called by the game loop each tick (or at a reduced frequency).
     Each stock entry's price moves by a random percentage bounded by
-    its volatility.
+    its volatility.  The game loop ticks all due sessions at once with
+    ``tick_stock_markets``; this is the single-session form.
 
     Returns:
         list[dict]: Updated stock prices.
     """
-    entries = StockEntry.query.filter_by(
-        game_session_id=session_id,
-    ).all()
-
-    updates = []
-    for entry in entries:
-        vol = entry.volatility if entry.volatility > 0 else 0.1
-        change_pct = random.uniform(
-            STOCK_TICK_MIN_CHANGE * vol / 0.1,
-            STOCK_TICK_MAX_CHANGE * vol / 0.1,
-        )
-        delta = int(entry.current_price * change_pct)
+    book = tick_stock_markets([session_id])
+    return book.session_updates(session_id) if len(book) else []
 
-        entry.previous_price = entry.current_price
-        entry.current_price = max(STOCK_PRICE_FLOOR, entry.current_price + delta)
 
-        updates.append({
-            "company_name": entry.company_name,
-            "current_price": entry.current_price,
-            "previous_price": entry.previous_price,
-            "change": entry.current_price - entry.previous_price,
-        })
+def tick_stock_markets(session_ids):
+    """Fluctuate the stock prices of many sessions in one vectorized step.
 
-    if updates:
-        db.session.flush()
-
-    return updates
+    Returns:
+        MarketBook: the new prices (see ``market_engine``).
+    """
+    from app.game import market_engine
+    return market_engine.tick_markets(session_ids)
 
 
 def crash_stock(session_id, company_name, amount):
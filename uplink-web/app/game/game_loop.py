@@ -1,6 +1,34 @@
-"""Game loop -- ticks all active sessions at 5 Hz using Flask-SocketIO background task."""
+"""Game loop -- ticks all active sessions at 5 Hz using Flask-SocketIO background task.
+
+Periodic per-session subsystems (NPCs, stock market, loans, news, plot) run
+once per interval, but not all on the same tick: each session gets a stable
+phase offset per subsystem, derived from its id, so the work of N sessions
+is spread over the interval instead of landing on one tick every interval.
+
+Each tick has a database phase (advance and commit every session) and a
+broadcast phase (emit the results).  When the database is cooperative
+(see app/cooperative.py) the phase commits each of its steps before
+yielding to the socket handlers, and otherwise yields only while it waits
+on the driver.  So handlers interleave with it in these ways:
+
+- between steps no loop transaction is open: handler writes commit
+  without waiting and the next step reads them;
+- during a step's writes and commit the loop holds the SQLite write lock
+  (row locks on PostgreSQL): a handler write waits for that one step to
+  commit, not for the whole phase;
+- a handler committing between a step's read of a row and its write is
+  overwritten only in the columns the loop advances.  Game time, prices
+  and loan amounts are written by the loop alone (the last two as SQL
+  expressions); handlers only stop tasks, which the loop never restarts;
+  and they reset trace progress only when ending a trace, which the next
+  trace resets again.
+
+Off the cooperative modes the whole phase is one transaction.
+"""
+import bisect
 import logging
 import time
+import zlib
 
 from app.extensions import db, socketio
 
@@ -16,6 +44,43 @@ PLOT_TICK_INTERVAL = 50       # Check plot advancement every ~10 seconds
 LOAN_TICK_INTERVAL = 1000     # Interest accrual every ~200 seconds
 
 
+def session_phase(session_id, subsystem, interval):
+    """Stable tick offset in [0, interval) of *subsystem* for a session."""
+    return zlib.crc32(f"{subsystem}:{session_id}".encode()) % interval
+
+
+class TickHistogram:
+    """Distribution of tick durations in fixed millisecond buckets."""
+
+    BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.over_budget = 0
+
+    def observe(self, seconds):
+        ms = seconds * 1000.0
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if seconds > TICK_INTERVAL:
+            self.over_budget += 1
+
+    def snapshot(self):
+        labels = [f"<={b}ms" for b in self.BOUNDS_MS] + [f">{self.BOUNDS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "over_budget": self.over_budget,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
 class GameLoop:
     """Singleton game loop that drives hacking tool progress."""
 
@@ -23,6 +88,9 @@ class GameLoop:
         self._running = False
         self.speed_multiplier = {}
         self._tick_count = 0
+        self._cooperative = False
+        self.tick_durations = TickHistogram()
+        self.periodic_durations = TickHistogram()
 
     def start(self, app):
         """Start the background tick loop."""
@@ -30,8 +98,10 @@ class GameLoop:
             return
         self._running = True
         self._app = app
+        self._cooperative = app.config.get("DB_COOPERATIVE", "off") != "off"
         socketio.start_background_task(self._loop)
-        log.info("Game loop started (%.0f Hz)", TICK_RATE)
+        log.info("Game loop started (%.0f Hz, %s database)", TICK_RATE,
+                 app.config.get("DB_COOPERATIVE", "off"))
 
     def stop(self):
         self._running = False
@@ -40,13 +110,42 @@ class GameLoop:
     def _loop(self):
         while self._running:
             socketio.sleep(TICK_INTERVAL)
+            start = time.perf_counter()
             try:
                 with self._app.app_context():
-                    self._tick()
+                    result = self._tick_db()
+                self._broadcast(result)
             except Exception:
                 log.exception("Error in game loop tick")
+            self.tick_durations.observe(time.perf_counter() - start)
+
+    def _checkpoint(self):
+        """Commit the database phase's current step, then let socket handlers run."""
+        if self._cooperative:
+            db.session.commit()
+            socketio.sleep(0)
+
+    def _phase(self, session_id, subsystem, interval):
+        return session_phase(session_id, subsystem, interval)
+
+    def _due(self, session_id, subsystem, interval):
+        """Whether *subsystem* runs for *session_id* on the current tick."""
+        return (self._tick_count + self._phase(session_id, subsystem, interval)) % interval == 0
+
+    def metrics(self):
+        """Tick-duration histograms: whole ticks and their periodic phase."""
+        return {
+            "ticks": self._tick_count,
+            "tick": self.tick_durations.snapshot(),
+            "periodic": self.periodic_durations.snapshot(),
+        }
 
     def _tick(self):
+        """One whole tick in the current app context."""
+        self._broadcast(self._tick_db())
+
+    def _tick_db(self):
+        """Advance every session and commit; returns what ``_broadcast`` emits."""
         from app.game import task_engine, trace_engine, security_engine, event_scheduler
         from app.models.running_task import RunningTask
         from app.models.connection import Connection
@@ -76,6 +175,8 @@ class GameLoop:
             else:
                 task_updates.append(result)
 
+        self._checkpoint()
+
         # 2. Tick traces
         active_session_ids = set(
             c.game_session_id for c in
@@ -111,61 +212,57 @@ class GameLoop:
             current_tick = session.game_time_ticks if session else 0
             event_scheduler.schedule_trace_consequences(sid, computer_name, current_tick=current_tick, hack_difficulty=hack_diff)
 
+        self._checkpoint()
+
         # 3. Security checks
         if self._tick_count % SECURITY_CHECK_INTERVAL == 0:
             for sid in active_session_ids:
                 events = security_engine.check_security_breaches(sid)
                 security_events.extend(events)
 
-        # 3b. Advance game time and process events
+        # 3b. Advance game time and process events; the ticks are kept for
+        # step 4 and the broadcast, since each commit expires the sessions
         ws_session_ids = set(session_rooms.keys())
+        game_times = {}
+        ticking = {}
         for sid in ws_session_ids:
-            speed = self.speed_multiplier.get(sid, 1)
-            if speed <= 0:
-                continue
             session = db.session.get(GameSession, sid)
-            if session is None or not session.is_active:
+            if session is None:
                 continue
-            session.game_time_ticks += speed
-            msgs = event_scheduler.process_events(sid, session.game_time_ticks)
-            event_messages.extend(msgs)
-
-        # 4. Periodic subsystems (graceful import — skip if engine not ready)
-        for sid in ws_session_ids:
             speed = self.speed_multiplier.get(sid, 1)
-            if speed <= 0:
-                continue
-            session = db.session.get(GameSession, sid)
-            if session is None or not session.is_active:
-                continue
-            current_tick = session.game_time_ticks
-
+            if speed > 0 and session.is_active:
+                session.game_time_ticks += speed
+                ticking[sid] = session.game_time_ticks
+                msgs = event_scheduler.process_events(sid, session.game_time_ticks)
+                event_messages.extend(msgs)
+            game_times[sid] = session.game_time_ticks
+
+        self._checkpoint()
+
+        # 4. Periodic subsystems (graceful import — skip if engine not ready),
+        # each session on its own phase of every interval
+        periodic_start = time.perf_counter()
+        stock_sessions = []
+        loan_sessions = []
+        for sid, current_tick in ticking.items():
             # NPC agent actions
-            if self._tick_count % NPC_TICK_INTERVAL == 0:
+            if self._due(sid, "npc", NPC_TICK_INTERVAL):
                 try:
                     from app.game import npc_engine
                     npc_engine.tick_npcs(sid, current_tick)
                 except (ImportError, Exception):
                     pass
 
-            # Stock market fluctuations
-            if self._tick_count % STOCK_TICK_INTERVAL == 0:
-                try:
-                    from app.game import finance_engine
-                    finance_engine.tick_stock_market(sid)
-                except (ImportError, Exception):
-                    pass
+            # Stock market fluctuations (all due sessions move together below)
+            if self._due(sid, "stock", STOCK_TICK_INTERVAL):
+                stock_sessions.append(sid)
 
-            # Loan interest accrual
-            if self._tick_count % LOAN_TICK_INTERVAL == 0:
-                try:
-                    from app.game import finance_engine
-                    finance_engine.accrue_interest(sid, current_tick)
-                except (ImportError, Exception):
-                    pass
+            # Loan interest accrual (all due sessions accrue together below)
+            if self._due(sid, "loan", LOAN_TICK_INTERVAL):
+                loan_sessions.append(sid)
 
             # Random news generation
-            if self._tick_count % NEWS_TICK_INTERVAL == 0:
+            if self._due(sid, "news", NEWS_TICK_INTERVAL):
                 try:
                     from app.game import news_engine
                     news_engine.tick_news(sid, current_tick)
@@ -173,56 +270,87 @@ class GameLoop:
                     pass
 
             # Plot advancement
-            if self._tick_count % PLOT_TICK_INTERVAL == 0:
+            if self._due(sid, "plot", PLOT_TICK_INTERVAL):
                 try:
                     from app.game import plot_engine
                     plot_engine.tick_plot(sid, current_tick)
                 except (ImportError, Exception):
                     pass
 
+        self._checkpoint()
+
+        # 4b. One vectorized market step for every due session
+        if stock_sessions:
+            try:
+                from app.game import finance_engine
+                finance_engine.tick_stock_markets(stock_sessions)
+            except (ImportError, Exception):
+                log.exception("Stock market tick failed")
+
+        self._checkpoint()
+
+        # 4c. Set-based interest accrual for every due session
+        if loan_sessions:
+            try:
+                from app.game import finance_engine
+                finance_engine.accrue_all_interest(loan_sessions)
+            except (ImportError, Exception):
+                log.exception("Loan interest accrual failed")
+
+        self.periodic_durations.observe(time.perf_counter() - periodic_start)
+
         # 5. Commit
         db.session.commit()
 
-        # 6. Broadcast via SocketIO
+        return {
+            "task_completed": task_completed,
+            "task_updates": task_updates,
+            "trace_updates": trace_updates,
+            "trace_completions": trace_completions,
+            "security_events": security_events,
+            "event_messages": event_messages,
+            "game_times": game_times,
+        }
+
+    def _broadcast(self, result):
+        """6. Broadcast the results of a database phase via SocketIO."""
         session_task_updates = {}
-        for upd in task_updates:
+        for upd in result["task_updates"]:
             sid = upd["session_id"]
             session_task_updates.setdefault(sid, []).append(upd["data"])
 
         for sid, task_list in session_task_updates.items():
             socketio.emit("task_update", {"tasks": task_list}, room=sid)
 
-        for comp in task_completed:
+        for comp in result["task_completed"]:
             socketio.emit("task_complete", {"task": comp["data"]}, room=comp["session_id"])
 
-        for upd in trace_updates:
+        for upd in result["trace_updates"]:
             socketio.emit("trace_update", {
                 "progress": upd["progress"],
                 "active": upd["active"],
                 "traced_nodes": upd["traced_nodes"],
             }, room=upd["session_id"])
 
-        for comp in trace_completions:
+        for comp in result["trace_completions"]:
             socketio.emit("trace_complete", {}, room=comp["session_id"])
             socketio.emit("game_over", {"reason": "traced"}, room=comp["session_id"])
 
-        for evt in security_events:
+        for evt in result["security_events"]:
             socketio.emit("trace_started", {
                 "target_ip": evt.get("target_ip"),
                 "computer_name": evt.get("computer_name"),
             }, room=evt["session_id"])
 
-        for msg in event_messages:
+        for msg in result["event_messages"]:
             sid = msg.get("session_id")
             if sid:
                 socketio.emit(msg.get("type", "event"), msg, room=sid)
 
         # Broadcast game time to all sessions
-        for sid in ws_session_ids:
+        for sid, ticks in result["game_times"].items():
             speed = self.speed_multiplier.get(sid, 1)
-            session = db.session.get(GameSession, sid)
-            if session:
-                socketio.emit("game_time", {"ticks": session.game_time_ticks, "speed": speed}, room=sid)
+            socketio.emit("game_time", {"ticks": ticks, "speed": speed}, room=sid)
 
 
 game_loop = GameLoop()
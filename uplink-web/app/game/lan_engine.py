@@ -4,15 +4,30 @@ Faithfully ported from the C++ LanComputer / LanMonitor / LanGenerator system.
 Instead of remote Internet access, players navigate a tree-structured network
 topology: Router -> Switches/Hubs -> Servers/Terminals.
 
-Topology and per-session LAN state are stored in-memory, keyed by
-(session_id, computer_id).  Topology is generated on first access.
+Topologies are generated deterministically from a seed derived from
+(session_id, computer_id, security level), so they never need storing.
+What the player changes -- visibility, compromised nodes, lock states --
+is appended to a compact delta log, and only that log plus the player's
+position and the sys-admin state is kept in the LAN state store
+(``lan_store``), keyed by (session_id, computer_id).  A cold LAN is rebuilt
+from its seed and replayed delta on demand; the few LANs in active use stay
+materialized in a small hot cache.  A hot state remembers the store version
+it was built from and is rebuilt when the store has a newer one (another
+worker changed the LAN).  That check runs once per app context (a socket
+event or a game-loop tick): after it, or after saving, the state is trusted
+for the rest of the event.
 """
+import hashlib
 import logging
 import random
+from collections import OrderedDict
+
+from flask import g, has_app_context
 
 from app.extensions import db
 from app.models.computer import Computer
 from app.game import constants as C
+from app.game.lan_store import get_store
 
 log = logging.getLogger(__name__)
 
@@ -76,71 +91,135 @@ SYSADMIN_CURIOUS = 1
 SYSADMIN_SEARCHING = 2
 SYSADMIN_FOUNDYOU = 3
 
-# Tool names required for each LAN action
+# Tool names required for each LAN action (the motion sensor is gateway
+# hardware, the others are software on the gateway)
 REQUIRED_TOOLS = {
     "scan": "LAN_Scan",
     "probe": "LAN_Probe",
     "spoof": "LAN_Spoof",
     "force": "LAN_Force",
-    "deploy_sensor": "Motionsensor",
+    "deploy_sensor": "Gateway Motion Sensor",
 }
 
+# Delta log opcodes.  The log is a flat list of (op, index, value) triples.
+DELTA_SYSTEM_VISIBLE = 0
+DELTA_LINK_VISIBLE = 1
+DELTA_COMPROMISED = 2
+DELTA_LOCK = 3
+
+# Materialized states kept for LANs in active use
+HOT_STATES = 64
+
 # ---------------------------------------------------------------------------
-# In-memory state: keyed by (session_id, computer_id)
+# Hot cache of materialized states: keyed by (session_id, computer_id)
 # ---------------------------------------------------------------------------
-_lan_states = {}
-
+_hot = OrderedDict()
 
 # ===================================================================
 # Data structures
 # ===================================================================
 
-def _make_system(system_type, x, y, security=2, screen_index=-1,
+class LanSystem:
+    """A LAN system (node)."""
+
+    __slots__ = (
+        "type", "x", "y", "visible", "subnet", "security", "screen_index",
+        "data_screen_index", "data1", "data2", "data3", "valid_subnets",
+        "is_compromised",
+    )
+
+    def __init__(self, system_type, x, y, subnet, security=2, screen_index=-1,
                  data_screen_index=-1):
-    """Create a LAN system (node) dict."""
-    subnet = random.randint(0, C.LAN_SUBNETRANGE - 1)
-    return {
-        "type": system_type,
-        "type_name": LANSYSTEM_NAMES.get(system_type, "unknown"),
-        "x": x,
-        "y": y,
-        "visible": VISIBLE_TYPE if system_type == LANSYSTEM_ROUTER else VISIBLE_NONE,
-        "subnet": subnet,
-        "security": security,
-        "screen_index": screen_index,
-        "data_screen_index": data_screen_index,
-        "data1": -1,
-        "data2": -1,
-        "data3": -1,
-        "valid_subnets": [],
-        "is_compromised": False,
-    }
+        self.type = system_type
+        self.x = x
+        self.y = y
+        self.visible = VISIBLE_TYPE if system_type == LANSYSTEM_ROUTER else VISIBLE_NONE
+        self.subnet = subnet
+        self.security = security
+        self.screen_index = screen_index
+        self.data_screen_index = data_screen_index
+        self.data1 = -1
+        self.data2 = -1
+        self.data3 = -1
+        self.valid_subnets = ()
+        self.is_compromised = False
+
+    @property
+    def type_name(self):
+        return LANSYSTEM_NAMES.get(self.type, "unknown")
+
+
+class LanLink:
+    """A LAN link (edge) between two systems."""
+
+    __slots__ = (
+        "from_idx", "to_idx", "from_x", "from_y", "to_x", "to_y", "port",
+        "security", "visible",
+    )
+
+    def __init__(self, from_idx, from_x, from_y, to_idx, to_x, to_y, port,
+                 security=1):
+        self.from_idx = from_idx
+        self.to_idx = to_idx
+        self.from_x = from_x
+        self.from_y = from_y
+        self.to_x = to_x
+        self.to_y = to_y
+        self.port = port
+        self.security = security
+        self.visible = LINKVISIBLE_NONE
+
+
+class LanTopology:
+    """A generated LAN: systems and links indexed by position, plus the
+    adjacency and lock-dependency maps built by ``_index_topology``."""
+
+    __slots__ = ("computer_id", "difficulty", "systems", "links", "adjacency",
+                 "gates", "gated")
+
+    def __init__(self, computer_id, difficulty, systems, links):
+        self.computer_id = computer_id
+        self.difficulty = difficulty
+        self.systems = systems
+        self.links = links
+
+
+def _make_system(rng, system_type, x, y, security=2, screen_index=-1,
+                 data_screen_index=-1):
+    """Create a LAN system (node)."""
+    subnet = rng.randint(0, C.LAN_SUBNETRANGE - 1)
+    return LanSystem(system_type, x, y, subnet, security, screen_index,
+                     data_screen_index)
 
 
-def _make_link(from_idx, from_x, from_y, to_idx, to_x, to_y, security=1):
-    """Create a LAN link (edge) dict."""
-    return {
-        "from": from_idx,
-        "to": to_idx,
-        "from_x": from_x,
-        "from_y": from_y,
-        "to_x": to_x,
-        "to_y": to_y,
-        "port": random.randint(0, C.LAN_LINKPORTRANGE - 1),
-        "security": security,
-        "visible": LINKVISIBLE_NONE,
-    }
+def _make_link(rng, from_idx, from_x, from_y, to_idx, to_x, to_y, security=1):
+    """Create a LAN link (edge)."""
+    port = rng.randint(0, C.LAN_LINKPORTRANGE - 1)
+    return LanLink(from_idx, from_x, from_y, to_idx, to_x, to_y, port, security)
 
 
 def _make_state(topology):
     """Create a fresh per-session LAN state wrapping a topology."""
     # Find the router as the entry point
     current_system = -1
-    for idx, sys in enumerate(topology["systems"]):
-        if sys["type"] == LANSYSTEM_ROUTER:
+    for idx, sys in enumerate(topology.systems):
+        if sys.type == LANSYSTEM_ROUTER:
             current_system = idx
             break
 
+    # Accessibility counters, kept current by _set_link_visible/_set_lock:
+    # known links touching each node, and locked locks gating each node.
+    systems = topology.systems
+    known_links = [0] * len(systems)
+    for lnk in topology.links:
+        if lnk.visible >= LINKVISIBLE_FROMAWARE:
+            known_links[lnk.from_idx] += 1
+            known_links[lnk.to_idx] += 1
+    locked_gates = [
+        sum(1 for lock in gates if systems[lock].data1 == 1)
+        for gates in topology.gates
+    ]
+
     return {
         "topology": topology,
         "current_system": current_system,
@@ -152,6 +231,19 @@ def _make_state(topology):
         "sysadmin_timer": 0,
         "sysadmin_ticks_remaining": 0,
         "deployed_sensors": [],
+        "delta": [],
+        "known_links": known_links,
+        "locked_gates": locked_gates,
+        "saved": None,
+        # Store version this state was loaded from or last saved as
+        "version": None,
+        # Bumped by every change the client can see; the cached client view
+        # (see _client_view) is refreshed when the epoch moves on, for the
+        # systems and links marked stale since.
+        "epoch": 0,
+        "view": None,
+        "stale_systems": set(),
+        "stale_links": set(),
     }
 
 
@@ -159,9 +251,19 @@ def _make_state(topology):
 # Topology generation
 # ===================================================================
 
-def generate_lan_topology(computer_id, security_level=3):
+def lan_seed(session_id, computer_id, security_level):
+    """Stable 64-bit seed for one session's LAN on one computer."""
+    digest = hashlib.blake2b(
+        f"{session_id}:{computer_id}:{security_level}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big")
+
+
+def generate_lan_topology(computer_id, security_level=3, seed=None):
     """Generate a LAN topology for a computer.  Returns topology dict.
 
+    The same *seed* always yields the same topology; None draws a fresh one.
+
     Difficulty drives the complexity of the generated network:
         0 - Simple: router + hub + a few terminals
         1 - Basic:  adds an auth/lock pair
@@ -170,50 +272,82 @@ def generate_lan_topology(computer_id, security_level=3):
         4 - Expert: full multi-cluster with radio links
     """
     difficulty = max(0, min(4, security_level))
+    rng = random.Random(seed)
 
     systems = []
     links = []
 
     def add_system(system_type, x, y, security=2, **kwargs):
-        sys = _make_system(system_type, x, y, security)
+        sys = _make_system(rng, system_type, x, y, security)
         for k, v in kwargs.items():
-            if k in sys:
-                sys[k] = v
+            if k in LanSystem.__slots__:
+                setattr(sys, k, v)
         idx = len(systems)
         systems.append(sys)
         return idx
 
     def add_link(from_idx, from_x, from_y, to_idx, to_x, to_y, security=1):
-        lnk = _make_link(from_idx, from_x, from_y, to_idx, to_x, to_y, security)
+        lnk = _make_link(rng, from_idx, from_x, from_y, to_idx, to_x, to_y, security)
         links.append(lnk)
 
     if difficulty == 0:
-        _gen_level0(add_system, add_link)
+        _gen_level0(add_system, add_link, rng)
     elif difficulty == 1:
-        _gen_level1(add_system, add_link)
+        _gen_level1(add_system, add_link, rng)
     elif difficulty == 2:
-        _gen_level2(add_system, add_link)
+        _gen_level2(add_system, add_link, rng)
     elif difficulty == 3:
-        _gen_level3(add_system, add_link)
+        _gen_level3(add_system, add_link, rng)
     else:
-        _gen_level4(add_system, add_link)
+        _gen_level4(add_system, add_link, rng)
 
-    topology = {
-        "computer_id": computer_id,
-        "difficulty": difficulty,
-        "systems": systems,
-        "links": links,
-    }
+    topology = LanTopology(computer_id, difficulty, systems, links)
+    _index_topology(topology)
     return topology
 
 
-def _gen_level0(add_sys, add_link):
+def _index_topology(topo):
+    """Attach adjacency lists and lock-dependency maps to a topology.
+
+    ``adjacency[n]`` lists (neighbour, link index) pairs in link order,
+    ``gates[n]`` the locks that must be open to enter node n (main servers
+    and isolation bridges reference them in data1..3) and ``gated[lock]``
+    the inverse.  Built once; the topology's shape never changes.
+    """
+    systems = topo.systems
+    adjacency = [[] for _ in systems]
+    for link_id, lnk in enumerate(topo.links):
+        adjacency[lnk.from_idx].append((lnk.to_idx, link_id))
+        adjacency[lnk.to_idx].append((lnk.from_idx, link_id))
+
+    gates = [[] for _ in systems]
+    gated = [[] for _ in systems]
+    for idx, sys in enumerate(systems):
+        if sys.type == LANSYSTEM_MAINSERVER:
+            data_keys = ("data1", "data2", "data3")
+        elif sys.type == LANSYSTEM_ISOLATIONBRIDGE:
+            data_keys = ("data1", "data2")
+        else:
+            continue
+        for data_key in data_keys:
+            lock_idx = getattr(sys, data_key)
+            if 0 <= lock_idx < len(systems) and systems[lock_idx].type == LANSYSTEM_LOCK:
+                gates[idx].append(lock_idx)
+                gated[lock_idx].append(idx)
+
+    # Frozen: the shape never changes, and empty tuples are shared
+    topo.adjacency = tuple(tuple(pairs) for pairs in adjacency)
+    topo.gates = tuple(tuple(locks) for locks in gates)
+    topo.gated = tuple(tuple(nodes) for nodes in gated)
+
+
+def _gen_level0(add_sys, add_link, rng):
     """Simple LAN: router -> hub -> 2-4 terminals."""
     router = add_sys(LANSYSTEM_ROUTER, 200, 40, 1)
     hub = add_sys(LANSYSTEM_HUB, 200, 140, 1)
     add_link(router, 0.5, 1.0, hub, 0.5, 0.0, 1)
 
-    num_terminals = random.randint(2, 4)
+    num_terminals = rng.randint(2, 4)
     spacing = 120
     start_x = 200 - (num_terminals - 1) * spacing // 2
     for i in range(num_terminals):
@@ -226,7 +360,7 @@ def _gen_level0(add_sys, add_link):
     add_link(hub, 0.5, 1.0, fs, 0.5, 0.0, 1)
 
 
-def _gen_level1(add_sys, add_link):
+def _gen_level1(add_sys, add_link, rng):
     """Basic LAN with auth/lock pair: router -> hub -> auth + lock -> server."""
     router = add_sys(LANSYSTEM_ROUTER, 200, 30, 1)
     hub = add_sys(LANSYSTEM_HUB, 200, 130, 1)
@@ -249,7 +383,7 @@ def _gen_level1(add_sys, add_link):
     add_link(lock, 0.5, 1.0, server, 0.5, 0.0, 1)
 
 
-def _gen_level2(add_sys, add_link):
+def _gen_level2(add_sys, add_link, rng):
     """Medium LAN with two sub-clusters, a log server, and auth chains."""
     router = add_sys(LANSYSTEM_ROUTER, 250, 20, 1)
 
@@ -281,7 +415,7 @@ def _gen_level2(add_sys, add_link):
     add_link(file_srv, 0.5, 1.0, main_srv, 0.5, 0.0, 1)
 
 
-def _gen_level3(add_sys, add_link):
+def _gen_level3(add_sys, add_link, rng):
     """Hard LAN with isolation bridge, multiple auth chains, and modem."""
     router = add_sys(LANSYSTEM_ROUTER, 300, 20, 1)
     hub1 = add_sys(LANSYSTEM_HUB, 150, 120, 2)
@@ -324,7 +458,7 @@ def _gen_level3(add_sys, add_link):
     add_link(log_srv, 0.5, 1.0, modem, 0.5, 0.0, 1)
 
 
-def _gen_level4(add_sys, add_link):
+def _gen_level4(add_sys, add_link, rng):
     """Expert LAN: three clusters with session key server and radio links."""
     router = add_sys(LANSYSTEM_ROUTER, 350, 20, 1)
 
@@ -378,12 +512,10 @@ def _gen_level4(add_sys, add_link):
     add_link(iso_bridge, 0.5, 1.0, main_srv, 0.5, 0.0, 1)
 
     # Radio link between clusters A and C
-    radio_tx = add_sys(LANSYSTEM_RADIOTRANSMITTER, 210, 420, 3)
-    radio_rx = add_sys(LANSYSTEM_RADIORECEIVER, 500, 420, 3)
-    freq = random.randint(C.RADIOTRANSMITTER_MINRANGE, C.RADIOTRANSMITTER_MAXRANGE)
-    radio_tx["data1"] = freq
+    freq = rng.randint(C.RADIOTRANSMITTER_MINRANGE, C.RADIOTRANSMITTER_MAXRANGE)
+    radio_tx = add_sys(LANSYSTEM_RADIOTRANSMITTER, 210, 420, 3, data1=freq)
     # Receivers store freq in data1/data2 (ghz/mhz) -- we simplify
-    radio_rx["data1"] = freq
+    add_sys(LANSYSTEM_RADIORECEIVER, 500, 420, 3, data1=freq)
     add_link(log_srv, 0.5, 1.0, radio_tx, 0.5, 0.0, 1)
     # Radio links are not wired -- player must discover the frequency
 
@@ -400,83 +532,303 @@ def _state_key(session_id, computer_id):
     return (str(session_id), int(computer_id))
 
 
+def _to_record(state):
+    """Compact, JSON-able form of a state: everything but the topology."""
+    return [
+        state["topology"].difficulty,
+        state["delta"],
+        state["connection"],
+        state["deployed_sensors"],
+        state["current_selected"],
+        state["current_spoof"],
+        state["sysadmin_state"],
+        state["sysadmin_current_system"],
+        state["sysadmin_timer"],
+        state["sysadmin_ticks_remaining"],
+    ]
+
+
+def _from_record(key, record):
+    """Rebuild a materialized state from its seed and a stored record."""
+    (difficulty, delta, connection, sensors, selected, spoof,
+     sa_state, sa_system, sa_timer, sa_ticks) = record
+    topo = generate_lan_topology(
+        key[1], difficulty, seed=lan_seed(key[0], key[1], difficulty)
+    )
+    _apply_delta(topo, delta)
+    state = _make_state(topo)
+    if connection:
+        state["current_system"] = connection[-1]
+    state.update({
+        "current_selected": selected,
+        "current_spoof": spoof,
+        "connection": connection,
+        "sysadmin_state": sa_state,
+        "sysadmin_current_system": sa_system,
+        "sysadmin_timer": sa_timer,
+        "sysadmin_ticks_remaining": sa_ticks,
+        "deployed_sensors": sensors,
+        "delta": delta,
+    })
+    state["saved"] = _fingerprint(state)
+    return state
+
+
+def _apply_delta(topo, delta):
+    systems = topo.systems
+    links = topo.links
+    for i in range(0, len(delta), 3):
+        op, index, value = delta[i], delta[i + 1], delta[i + 2]
+        if op == DELTA_SYSTEM_VISIBLE:
+            systems[index].visible = value
+        elif op == DELTA_LINK_VISIBLE:
+            links[index].visible = value
+        elif op == DELTA_COMPROMISED:
+            systems[index].is_compromised = bool(value)
+        elif op == DELTA_LOCK:
+            systems[index].data1 = value
+
+
+def _hold(key, state):
+    _hot[key] = state
+    _hot.move_to_end(key)
+    while len(_hot) > HOT_STATES:
+        _hot.popitem(last=False)
+
+
+def _checked():
+    """Store versions of LANs checked or saved in this app context, by key."""
+    if not has_app_context():
+        return {}
+    if "lan_versions" not in g:
+        g.lan_versions = {}
+    return g.lan_versions
+
+
+def _load_state(key):
+    """Materialized state for *key* from the hot cache or the store, else None."""
+    store = get_store()
+    state = _hot.get(key)
+    if state is not None and store.backend is None:
+        # Process-local store: the hot state is the only copy
+        _hot.move_to_end(key)
+        return state
+    checked = _checked()
+    if state is not None and key in checked and checked[key] == state["version"]:
+        _hot.move_to_end(key)
+        return state
+    record = store.get(key)
+    if record is None:
+        _hot.pop(key, None)
+        checked.pop(key, None)
+        return None
+    version = store.version(key)
+    checked[key] = version
+    if state is not None and state["version"] == version:
+        _hot.move_to_end(key)
+        return state
+    state = _from_record(key, record)
+    state["version"] = version
+    _hold(key, state)
+    return state
+
+
 def _ensure_state(session_id, computer_id):
-    """Return the LAN state for this session+computer, generating if needed."""
+    """Return the LAN state for this session+computer, generating if needed.
+
+    A LAN that is no longer hot is rebuilt from its seed and stored delta.
+    """
     key = _state_key(session_id, computer_id)
-    if key not in _lan_states:
+    state = _load_state(key)
+    if state is None:
         computer = Computer.query.get(computer_id)
         if computer is None:
             raise ValueError(f"Computer {computer_id} not found")
         sec = int(computer.hack_difficulty / 100) if computer.hack_difficulty else 3
         sec = max(0, min(4, sec))
-        topo = generate_lan_topology(computer_id, security_level=sec)
-        _lan_states[key] = _make_state(topo)
-    return _lan_states[key]
+        topo = generate_lan_topology(
+            computer_id, security_level=sec, seed=lan_seed(key[0], key[1], sec)
+        )
+        state = _make_state(topo)
+        _hold(key, state)
+        _save_state(session_id, computer_id, state)
+    return state
+
+
+def _fingerprint(state):
+    # The delta log, connection and sensors only ever change at their tail,
+    # so lengths and tails plus the scalars identify a saved record.
+    connection = state["connection"]
+    return (
+        len(state["delta"]), len(connection), connection[-1] if connection else -1,
+        len(state["deployed_sensors"]), state["current_selected"],
+        state["current_spoof"], state["sysadmin_state"],
+        state["sysadmin_current_system"], state["sysadmin_timer"],
+        state["sysadmin_ticks_remaining"],
+    )
+
+
+def _save_state(session_id, computer_id, state):
+    """Write a changed state's record back to the store (no-op if unchanged)."""
+    fingerprint = _fingerprint(state)
+    if fingerprint == state["saved"]:
+        return
+    key = _state_key(session_id, computer_id)
+    store = get_store()
+    store.put(key, _to_record(state))
+    state["saved"] = fingerprint
+    state["version"] = _checked()[key] = store.version(key)
+
+
+# ---------------------------------------------------------------------------
+# Player-caused changes (recorded in the delta log)
+# ---------------------------------------------------------------------------
+
+def _set_visible(state, node_id, visible):
+    sys = state["topology"].systems[node_id]
+    if sys.visible != visible:
+        sys.visible = visible
+        state["delta"].extend((DELTA_SYSTEM_VISIBLE, node_id, visible))
+        state["epoch"] += 1
+        state["stale_systems"].add(node_id)
+
+
+def _set_link_visible(state, link_id, visible):
+    lnk = state["topology"].links[link_id]
+    old = lnk.visible
+    if old != visible:
+        lnk.visible = visible
+        state["delta"].extend((DELTA_LINK_VISIBLE, link_id, visible))
+        state["epoch"] += 1
+        state["stale_links"].add(link_id)
+        known = (visible >= LINKVISIBLE_FROMAWARE) - (old >= LINKVISIBLE_FROMAWARE)
+        if known:
+            state["known_links"][lnk.from_idx] += known
+            state["known_links"][lnk.to_idx] += known
+
+
+def _compromise(state, node_id):
+    sys = state["topology"].systems[node_id]
+    if not sys.is_compromised:
+        sys.is_compromised = True
+        state["delta"].extend((DELTA_COMPROMISED, node_id, 1))
+        state["epoch"] += 1
+        state["stale_systems"].add(node_id)
+
+
+def _set_lock(state, node_id, locked):
+    sys = state["topology"].systems[node_id]
+    old = sys.data1
+    if old != locked:
+        sys.data1 = locked
+        state["delta"].extend((DELTA_LOCK, node_id, locked))
+        state["epoch"] += 1
+        state["stale_systems"].add(node_id)
+        change = (locked == 1) - (old == 1)
+        for gated in state["topology"].gated[node_id]:
+            state["locked_gates"][gated] += change
+
+
+def _system_entry(idx, sys):
+    """Client-visible entry for one system, masked by its visibility."""
+    entry = {"id": idx}
+    if sys.visible >= VISIBLE_AWARE:
+        entry["visible"] = sys.visible
+        entry["x"] = sys.x
+        entry["y"] = sys.y
+        entry["is_compromised"] = sys.is_compromised
+    if sys.visible >= VISIBLE_TYPE:
+        entry["type"] = sys.type
+        entry["type_name"] = sys.type_name
+        entry["security"] = sys.security
+    if sys.visible >= VISIBLE_FULL:
+        entry["subnet"] = sys.subnet
+        entry["data1"] = sys.data1
+        entry["data2"] = sys.data2
+        entry["data3"] = sys.data3
+    if sys.visible < VISIBLE_AWARE:
+        entry["visible"] = VISIBLE_NONE
+    return entry
+
+
+def _link_entry(link_id, lnk):
+    """Client-visible entry for one link, or None while it is unknown."""
+    if lnk.visible >= LINKVISIBLE_AWARE:
+        return {
+            "id": link_id,
+            "from": lnk.from_idx,
+            "to": lnk.to_idx,
+            "from_x": lnk.from_x,
+            "from_y": lnk.from_y,
+            "to_x": lnk.to_x,
+            "to_y": lnk.to_y,
+            "security": lnk.security,
+            "visible": lnk.visible,
+        }
+    elif lnk.visible == LINKVISIBLE_FROMAWARE:
+        return {
+            "id": link_id,
+            "from": lnk.from_idx,
+            "to": -1,
+            "visible": lnk.visible,
+        }
+    elif lnk.visible == LINKVISIBLE_TOAWARE:
+        return {
+            "id": link_id,
+            "from": -1,
+            "to": lnk.to_idx,
+            "visible": lnk.visible,
+        }
+    return None
+
+
+def _client_view(state):
+    """Cached client view, rebuilt when the visibility epoch has moved on.
+
+    Returns (epoch, systems, links, link entries by link index).  Only the
+    entries of systems and links changed since the last build are rebuilt;
+    the others are reused, so an unchanged entry keeps its identity.
+    """
+    view = state["view"]
+    if view is not None and view[0] == state["epoch"]:
+        return view
+
+    topo = state["topology"]
+    if view is None:
+        systems = [_system_entry(idx, sys) for idx, sys in enumerate(topo.systems)]
+        link_entries = [_link_entry(idx, lnk) for idx, lnk in enumerate(topo.links)]
+    else:
+        systems = list(view[1])
+        for idx in state["stale_systems"]:
+            systems[idx] = _system_entry(idx, topo.systems[idx])
+        link_entries = list(view[3])
+        for idx in state["stale_links"]:
+            link_entries[idx] = _link_entry(idx, topo.links[idx])
+    state["stale_systems"].clear()
+    state["stale_links"].clear()
+
+    links = [entry for entry in link_entries if entry is not None]
+    view = (state["epoch"], systems, links, link_entries)
+    state["view"] = view
+    return view
 
 
 def get_lan_state(session_id, computer_id):
     """Get current LAN state for a connected computer.
 
     Returns a sanitised view suitable for sending to the client -- nodes the
-    player cannot yet see are masked.
+    player cannot yet see are masked.  The system and link lists are cached
+    until the state's visibility epoch changes, so treat them as read-only.
     """
     state = _ensure_state(session_id, computer_id)
     topo = state["topology"]
-
-    # Build client-visible system list
-    visible_systems = []
-    for idx, sys in enumerate(topo["systems"]):
-        entry = {"id": idx}
-        if sys["visible"] >= VISIBLE_AWARE:
-            entry["visible"] = sys["visible"]
-            entry["x"] = sys["x"]
-            entry["y"] = sys["y"]
-            entry["is_compromised"] = sys["is_compromised"]
-        if sys["visible"] >= VISIBLE_TYPE:
-            entry["type"] = sys["type"]
-            entry["type_name"] = sys["type_name"]
-            entry["security"] = sys["security"]
-        if sys["visible"] >= VISIBLE_FULL:
-            entry["subnet"] = sys["subnet"]
-            entry["data1"] = sys["data1"]
-            entry["data2"] = sys["data2"]
-            entry["data3"] = sys["data3"]
-        if sys["visible"] < VISIBLE_AWARE:
-            entry["visible"] = VISIBLE_NONE
-        visible_systems.append(entry)
-
-    # Build client-visible link list
-    visible_links = []
-    for lnk in topo["links"]:
-        if lnk["visible"] >= LINKVISIBLE_AWARE:
-            visible_links.append({
-                "from": lnk["from"],
-                "to": lnk["to"],
-                "from_x": lnk["from_x"],
-                "from_y": lnk["from_y"],
-                "to_x": lnk["to_x"],
-                "to_y": lnk["to_y"],
-                "security": lnk["security"],
-                "visible": lnk["visible"],
-            })
-        elif lnk["visible"] == LINKVISIBLE_FROMAWARE:
-            visible_links.append({
-                "from": lnk["from"],
-                "to": -1,
-                "visible": lnk["visible"],
-            })
-        elif lnk["visible"] == LINKVISIBLE_TOAWARE:
-            visible_links.append({
-                "from": -1,
-                "to": lnk["to"],
-                "visible": lnk["visible"],
-            })
+    view = _client_view(state)
 
     return {
-        "computer_id": topo["computer_id"],
-        "difficulty": topo["difficulty"],
-        "systems": visible_systems,
-        "links": visible_links,
+        "computer_id": topo.computer_id,
+        "difficulty": topo.difficulty,
+        "systems": view[1],
+        "links": view[2],
         "current_system": state["current_system"],
         "current_selected": state["current_selected"],
         "current_spoof": state["current_spoof"],
@@ -486,16 +838,93 @@ def get_lan_state(session_id, computer_id):
     }
 
 
+# Scalar fields of the client view, sent in a patch only when they change
+VIEW_SCALARS = ("current_system", "current_selected", "current_spoof",
+                "connection", "sysadmin_state", "deployed_sensors")
+
+
+def lan_view_snapshot(session_id, computer_id):
+    """What a client has been sent, for diffing with ``diff_lan_views``.
+
+    Holds the cached view entries (shared, never mutated) and copies of the
+    scalar fields.
+    """
+    state = _ensure_state(session_id, computer_id)
+    view = _client_view(state)
+    snapshot = {key: state[key] for key in VIEW_SCALARS}
+    snapshot["connection"] = list(state["connection"])
+    snapshot["deployed_sensors"] = list(state["deployed_sensors"])
+    snapshot["computer_id"] = state["topology"].computer_id
+    snapshot["systems"] = view[1]
+    snapshot["link_entries"] = view[3]
+    return snapshot
+
+
+def diff_lan_views(old, new):
+    """Patch turning the client view *old* into *new* (both snapshots).
+
+    Only systems and links whose entries changed are included (links by
+    their ``id``; a link that disappeared is sent as ``{"id": n}``), plus
+    the scalar fields that changed.  Returns None when nothing changed.
+    """
+    systems = [
+        entry for before, entry in zip(old["systems"], new["systems"])
+        if before is not entry and before != entry
+    ]
+    links = []
+    for link_id, (before, entry) in enumerate(zip(old["link_entries"], new["link_entries"])):
+        if before is not entry and before != entry:
+            links.append(entry if entry is not None else {"id": link_id})
+    patch = {key: new[key] for key in VIEW_SCALARS if new[key] != old[key]}
+    if not systems and not links and not patch:
+        return None
+    if systems:
+        patch["systems"] = systems
+    if links:
+        patch["links"] = links
+    patch["computer_id"] = new["computer_id"]
+    return patch
+
+
 def reset_lan_state(session_id, computer_id):
     """Clear the LAN state when a player disconnects from the computer."""
     key = _state_key(session_id, computer_id)
-    _lan_states.pop(key, None)
+    _hot.pop(key, None)
+    get_store().discard(key)
+
+
+def store_metrics():
+    """Hit/miss/eviction counters and memory use of the LAN state store."""
+    metrics = get_store().metrics()
+    metrics["hot"] = len(_hot)
+    return metrics
 
 
 # ===================================================================
 # Actions
 # ===================================================================
 
+def installed_tool_version(session_id, player_id, action):
+    """Version of the player's tool for LAN *action*, looked up server-side.
+
+    Returns None when the action needs no tool, and 0 when the required
+    tool is not installed.
+    """
+    tool = REQUIRED_TOOLS.get(action)
+    if tool is None:
+        return None
+    from app.game import store_engine
+    if action == "deploy_sensor":
+        _, gateway = store_engine._get_player_and_gateway(session_id, player_id)
+        return 1 if gateway.has_motion_sensor else 0
+    versions = [
+        store_engine._parse_version_from_filename(sw["filename"])
+        for sw in store_engine.get_player_software(session_id, player_id)
+        if sw["filename"].rsplit(" v", 1)[0] == tool
+    ]
+    return max(versions, default=0)
+
+
 def lan_action(session_id, player_id, computer_id, action, node_id=None,
                tool_version=1, **kwargs):
     """Handle LAN actions: scan, probe, spoof, force, move, deploy_sensor.
@@ -513,7 +942,8 @@ def lan_action(session_id, player_id, computer_id, action, node_id=None,
     node_id : int or None
         Target node index for the action (required for most actions).
     tool_version : int
-        Version of the tool being used (affects effectiveness).
+        Version of the player's installed tool (affects effectiveness);
+        callers get it from ``installed_tool_version``, never the client.
     **kwargs
         Additional action-specific parameters.
 
@@ -526,20 +956,24 @@ def lan_action(session_id, player_id, computer_id, action, node_id=None,
     topo = state["topology"]
 
     if action == "scan":
-        return _action_scan(state, topo, node_id, tool_version)
+        result = _action_scan(state, topo, node_id, tool_version)
     elif action == "probe":
-        return _action_probe(state, topo, node_id, tool_version)
+        result = _action_probe(state, topo, node_id, tool_version)
     elif action == "spoof":
-        return _action_spoof(state, topo, node_id, tool_version)
+        result = _action_spoof(state, topo, node_id, tool_version)
     elif action == "force":
-        return _action_force(state, topo, node_id, tool_version)
+        result = _action_force(state, topo, node_id, tool_version)
     elif action == "move":
-        return _action_move(state, topo, node_id)
+        result = _action_move(state, topo, node_id)
     elif action == "deploy_sensor":
-        return _action_deploy_sensor(state, topo, node_id)
+        result = _action_deploy_sensor(state, topo, node_id)
     else:
         return {"success": False, "error": f"Unknown LAN action: {action}"}
 
+    # Failed spoof/force attempts still wake the sys-admin, so always save.
+    _save_state(session_id, computer_id, state)
+    return result
+
 
 def _action_scan(state, topo, node_id, tool_version):
     """Discover adjacent nodes and links from the current position.
@@ -555,27 +989,20 @@ def _action_scan(state, topo, node_id, tool_version):
     discovered_nodes = []
     discovered_links = []
 
-    for lnk in topo["links"]:
-        adjacent = -1
-        if lnk["from"] == current:
-            adjacent = lnk["to"]
-        elif lnk["to"] == current:
-            adjacent = lnk["from"]
-
-        if adjacent < 0:
-            continue
+    for adjacent, link_id in topo.adjacency[current]:
+        lnk = topo.links[link_id]
 
         # Reveal the link
-        if lnk["visible"] < LINKVISIBLE_AWARE:
-            lnk["visible"] = LINKVISIBLE_AWARE
+        if lnk.visible < LINKVISIBLE_AWARE:
+            _set_link_visible(state, link_id, LINKVISIBLE_AWARE)
             discovered_links.append({
-                "from": lnk["from"],
-                "to": lnk["to"],
+                "from": lnk.from_idx,
+                "to": lnk.to_idx,
             })
 
         # Reveal the adjacent system
-        adj_sys = topo["systems"][adjacent]
-        old_vis = adj_sys["visible"]
+        adj_sys = topo.systems[adjacent]
+        old_vis = adj_sys.visible
 
         if tool_version >= 3:
             target_vis = VISIBLE_FULL
@@ -584,10 +1011,10 @@ def _action_scan(state, topo, node_id, tool_version):
         else:
             target_vis = VISIBLE_AWARE
 
-        if target_vis > adj_sys["visible"]:
-            adj_sys["visible"] = target_vis
+        if target_vis > adj_sys.visible:
+            _set_visible(state, adjacent, target_vis)
 
-        if old_vis < adj_sys["visible"]:
+        if old_vis < adj_sys.visible:
             discovered_nodes.append(adjacent)
 
     return {
@@ -608,32 +1035,32 @@ def _action_probe(state, topo, node_id, tool_version):
     if node_id is None:
         return {"success": False, "error": "probe requires a node_id"}
 
-    if node_id < 0 or node_id >= len(topo["systems"]):
+    if node_id < 0 or node_id >= len(topo.systems):
         return {"success": False, "error": f"Invalid node_id: {node_id}"}
 
-    sys = topo["systems"][node_id]
-    if sys["visible"] < VISIBLE_AWARE:
+    sys = topo.systems[node_id]
+    if sys.visible < VISIBLE_AWARE:
         return {"success": False, "error": "Node not yet discovered -- scan first"}
 
     # Increase visibility based on tool version
     if tool_version >= 2:
-        sys["visible"] = VISIBLE_FULL
+        _set_visible(state, node_id, VISIBLE_FULL)
     else:
-        if sys["visible"] < VISIBLE_TYPE:
-            sys["visible"] = VISIBLE_TYPE
+        if sys.visible < VISIBLE_TYPE:
+            _set_visible(state, node_id, VISIBLE_TYPE)
 
     return {
         "success": True,
         "action": "probe",
         "node_id": node_id,
-        "type": sys["type"],
-        "type_name": sys["type_name"],
-        "security": sys["security"],
-        "subnet": sys["subnet"],
-        "visible": sys["visible"],
-        "data1": sys["data1"],
-        "data2": sys["data2"],
-        "data3": sys["data3"],
+        "type": sys.type,
+        "type_name": sys.type_name,
+        "security": sys.security,
+        "subnet": sys.subnet,
+        "visible": sys.visible,
+        "data1": sys.data1,
+        "data2": sys.data2,
+        "data3": sys.data3,
     }
 
 
@@ -646,43 +1073,43 @@ def _action_spoof(state, topo, node_id, tool_version):
     if node_id is None:
         return {"success": False, "error": "spoof requires a node_id"}
 
-    if node_id < 0 or node_id >= len(topo["systems"]):
+    if node_id < 0 or node_id >= len(topo.systems):
         return {"success": False, "error": f"Invalid node_id: {node_id}"}
 
-    sys = topo["systems"][node_id]
-    if sys["type"] != LANSYSTEM_AUTHENTICATION:
+    sys = topo.systems[node_id]
+    if sys.type != LANSYSTEM_AUTHENTICATION:
         return {"success": False, "error": "Can only spoof authentication servers"}
 
-    if sys["visible"] < VISIBLE_TYPE:
+    if sys.visible < VISIBLE_TYPE:
         return {"success": False, "error": "Node not sufficiently scanned"}
 
     # Check difficulty vs tool version
-    difficulty_roll = sys["security"] - tool_version
+    difficulty_roll = sys.security - tool_version
     if difficulty_roll > 0 and random.random() < 0.15 * difficulty_roll:
         # Spoofing failed -- alert sys-admin
         _alert_sysadmin(state)
         return {"success": False, "error": "Spoof failed -- sys-admin alerted"}
 
-    sys["is_compromised"] = True
+    _compromise(state, node_id)
 
     # Set our spoof address to this auth server's subnet
-    state["current_spoof"] = sys["subnet"]
+    state["current_spoof"] = sys.subnet
 
     # Unlock any locks controlled by this auth server
     unlocked = []
-    lock_idx = sys.get("data1", -1)
-    if lock_idx >= 0 and lock_idx < len(topo["systems"]):
-        lock_sys = topo["systems"][lock_idx]
-        if lock_sys["type"] == LANSYSTEM_LOCK:
-            lock_sys["data1"] = 0  # unlocked
-            lock_sys["is_compromised"] = True
+    lock_idx = sys.data1
+    if lock_idx >= 0 and lock_idx < len(topo.systems):
+        lock_sys = topo.systems[lock_idx]
+        if lock_sys.type == LANSYSTEM_LOCK:
+            _set_lock(state, lock_idx, 0)  # unlocked
+            _compromise(state, lock_idx)
             unlocked.append(lock_idx)
 
     return {
         "success": True,
         "action": "spoof",
         "node_id": node_id,
-        "spoofed_subnet": sys["subnet"],
+        "spoofed_subnet": sys.subnet,
         "unlocked_locks": unlocked,
     }
 
@@ -696,28 +1123,28 @@ def _action_force(state, topo, node_id, tool_version):
     if node_id is None:
         return {"success": False, "error": "force requires a node_id"}
 
-    if node_id < 0 or node_id >= len(topo["systems"]):
+    if node_id < 0 or node_id >= len(topo.systems):
         return {"success": False, "error": f"Invalid node_id: {node_id}"}
 
-    sys = topo["systems"][node_id]
-    if sys["type"] != LANSYSTEM_LOCK:
+    sys = topo.systems[node_id]
+    if sys.type != LANSYSTEM_LOCK:
         return {"success": False, "error": "Can only force lock nodes"}
 
-    if sys["visible"] < VISIBLE_TYPE:
+    if sys.visible < VISIBLE_TYPE:
         return {"success": False, "error": "Node not sufficiently scanned"}
 
-    if sys["data1"] == 0:
+    if sys.data1 == 0:
         return {"success": True, "action": "force", "node_id": node_id,
                 "already_unlocked": True}
 
     # Check difficulty vs tool version
-    difficulty_roll = sys["security"] - tool_version
+    difficulty_roll = sys.security - tool_version
     if difficulty_roll > 0 and random.random() < 0.2 * difficulty_roll:
         _alert_sysadmin(state)
         return {"success": False, "error": "Force failed -- sys-admin alerted"}
 
-    sys["data1"] = 0  # unlocked
-    sys["is_compromised"] = True
+    _set_lock(state, node_id, 0)  # unlocked
+    _compromise(state, node_id)
 
     # Forcing always wakes the sys-admin (noisy operation)
     _alert_sysadmin(state)
@@ -740,7 +1167,7 @@ def _action_move(state, topo, node_id):
     if node_id is None:
         return {"success": False, "error": "move requires a node_id"}
 
-    if node_id < 0 or node_id >= len(topo["systems"]):
+    if node_id < 0 or node_id >= len(topo.systems):
         return {"success": False, "error": f"Invalid node_id: {node_id}"}
 
     accessible, reason = _is_accessible(state, topo, node_id)
@@ -753,14 +1180,11 @@ def _action_move(state, topo, node_id):
         return {"success": False, "error": "No active connection in LAN"}
 
     link_head = connection[-1]
-    has_link = False
-    for lnk in topo["links"]:
-        if lnk["visible"] < LINKVISIBLE_AWARE:
-            continue
-        if ((lnk["from"] == link_head and lnk["to"] == node_id) or
-                (lnk["to"] == link_head and lnk["from"] == node_id)):
-            has_link = True
-            break
+    links = topo.links
+    has_link = any(
+        adjacent == node_id and links[link_id].visible >= LINKVISIBLE_AWARE
+        for adjacent, link_id in topo.adjacency[link_head]
+    )
 
     if not has_link:
         return {"success": False, "error": "No visible link to that node from current position"}
@@ -771,12 +1195,12 @@ def _action_move(state, topo, node_id):
     state["current_selected"] = node_id
 
     # Ensure the target is at least TYPE visible now
-    target = topo["systems"][node_id]
-    if target["visible"] < VISIBLE_TYPE:
-        target["visible"] = VISIBLE_TYPE
+    target = topo.systems[node_id]
+    if target.visible < VISIBLE_TYPE:
+        _set_visible(state, node_id, VISIBLE_TYPE)
 
     # Arriving at sensitive systems can wake the sys-admin
-    if target["type"] in (LANSYSTEM_MAINSERVER, LANSYSTEM_FILESERVER,
+    if target.type in (LANSYSTEM_MAINSERVER, LANSYSTEM_FILESERVER,
                           LANSYSTEM_LOGSERVER):
         _alert_sysadmin(state)
 
@@ -797,14 +1221,14 @@ def _action_deploy_sensor(state, topo, node_id):
     if node_id is None:
         node_id = state["current_system"]
 
-    if node_id < 0 or node_id >= len(topo["systems"]):
+    if node_id < 0 or node_id >= len(topo.systems):
         return {"success": False, "error": f"Invalid node_id: {node_id}"}
 
     if node_id in state["deployed_sensors"]:
         return {"success": False, "error": "Sensor already deployed on this node"}
 
-    sys = topo["systems"][node_id]
-    if sys["visible"] < VISIBLE_TYPE:
+    sys = topo.systems[node_id]
+    if sys.visible < VISIBLE_TYPE:
         return {"success": False, "error": "Node not sufficiently visible"}
 
     state["deployed_sensors"].append(node_id)
@@ -826,54 +1250,35 @@ def _is_accessible(state, topo, node_id):
 
     Returns (bool, reason_string).
     """
-    sys = topo["systems"][node_id]
+    sys = topo.systems[node_id]
 
     # Must be visible at TYPE level or higher
-    if sys["visible"] < VISIBLE_TYPE:
+    if sys.visible < VISIBLE_TYPE:
         return False, "Node not visible enough (scan or probe it first)"
 
     # Must have at least one known link to it (unless it is current)
-    if node_id != state["current_system"]:
-        has_known_link = False
-        for lnk in topo["links"]:
-            if lnk["visible"] < LINKVISIBLE_FROMAWARE:
-                continue
-            if lnk["to"] == node_id or lnk["from"] == node_id:
-                has_known_link = True
-                break
-        if not has_known_link:
-            return False, "No known links to this node"
+    if node_id != state["current_system"] and not state["known_links"][node_id]:
+        return False, "No known links to this node"
 
     # Locked locks block passage
-    if sys["type"] == LANSYSTEM_LOCK and sys["data1"] == 1:
+    if sys.type == LANSYSTEM_LOCK and sys.data1 == 1:
         return False, "Lock is still locked -- force or spoof to open it"
 
-    # Main servers require all referenced locks to be unlocked
-    if sys["type"] == LANSYSTEM_MAINSERVER:
-        for data_key in ("data1", "data2", "data3"):
-            lock_idx = sys.get(data_key, -1)
-            if lock_idx < 0 or lock_idx >= len(topo["systems"]):
-                continue
-            ref_sys = topo["systems"][lock_idx]
-            if ref_sys["type"] == LANSYSTEM_LOCK and ref_sys["data1"] == 1:
-                return False, f"Lock {lock_idx} must be opened first"
-
-    # Isolation bridges require both gateway and critical locks open
-    if sys["type"] == LANSYSTEM_ISOLATIONBRIDGE:
-        for data_key in ("data1", "data2"):
-            lock_idx = sys.get(data_key, -1)
-            if lock_idx < 0 or lock_idx >= len(topo["systems"]):
-                continue
-            ref_sys = topo["systems"][lock_idx]
-            if ref_sys["type"] == LANSYSTEM_LOCK and ref_sys["data1"] == 1:
-                return False, f"Lock {lock_idx} must be opened for the isolation bridge"
+    # Main servers require all referenced locks to be unlocked, isolation
+    # bridges both their gateway and critical locks
+    if state["locked_gates"][node_id]:
+        lock_idx = next(lock for lock in topo.gates[node_id]
+                        if topo.systems[lock].data1 == 1)
+        if sys.type == LANSYSTEM_ISOLATIONBRIDGE:
+            return False, f"Lock {lock_idx} must be opened for the isolation bridge"
+        return False, f"Lock {lock_idx} must be opened first"
 
     # Subnet restrictions (requires spoofed address)
-    if sys.get("valid_subnets"):
+    if sys.valid_subnets:
         spoof = state["current_spoof"]
         if spoof < 0:
             return False, "This node requires a spoofed subnet address"
-        if spoof not in sys["valid_subnets"]:
+        if spoof not in sys.valid_subnets:
             return False, "Current spoof address not accepted by this node"
 
     return True, ""
@@ -910,12 +1315,18 @@ def check_lan_security(session_id, computer_id):
         warning (bool): True if the sys-admin is actively searching.
         sensor_alert (bool): True if a deployed sensor detected movement.
     """
-    key = _state_key(session_id, computer_id)
-    if key not in _lan_states:
+    state = _load_state(_state_key(session_id, computer_id))
+    if state is None:
         return {"detected": False, "sysadmin_state": SYSADMIN_ASLEEP,
                 "warning": False, "sensor_alert": False}
 
-    state = _lan_states[key]
+    result = _advance_sysadmin(state)
+    _save_state(session_id, computer_id, state)
+    return result
+
+
+def _advance_sysadmin(state):
+    """One security step of ``check_lan_security`` on a loaded state."""
     topo = state["topology"]
     sensor_alert = False
 
@@ -923,8 +1334,8 @@ def check_lan_security(session_id, computer_id):
         # Check if the player is on a sensitive node
         current = state["current_system"]
         if current >= 0:
-            sys = topo["systems"][current]
-            if sys["type"] in (LANSYSTEM_MAINSERVER, LANSYSTEM_FILESERVER,
+            sys = topo.systems[current]
+            if sys.type in (LANSYSTEM_MAINSERVER, LANSYSTEM_FILESERVER,
                                LANSYSTEM_LOGSERVER):
                 _alert_sysadmin(state)
 
@@ -973,11 +1384,7 @@ def check_lan_security(session_id, computer_id):
             sa_node = state["sysadmin_current_system"]
             connection = state["connection"]
 
-            node_index = -1
-            for i, n in enumerate(connection):
-                if n == sa_node:
-                    node_index = i
-                    break
+            node_index = connection.index(sa_node) if sa_node in connection else -1
 
             if node_index < 0 or node_index + 1 >= len(connection):
                 # Lost trail -- go back to curious
@@ -1027,6 +1434,7 @@ def retract_connection(session_id, computer_id):
         connection.pop()
         state["current_system"] = connection[-1]
         state["current_selected"] = connection[-1]
+        _save_state(session_id, computer_id, state)
     return {
         "connection": list(connection),
         "current_system": state["current_system"],
@@ -1036,9 +1444,10 @@ def retract_connection(session_id, computer_id):
 def set_selected(session_id, computer_id, node_id):
     """Set the currently selected (highlighted) node without moving."""
     state = _ensure_state(session_id, computer_id)
-    if node_id < 0 or node_id >= len(state["topology"]["systems"]):
+    if node_id < 0 or node_id >= len(state["topology"].systems):
         return {"success": False, "error": f"Invalid node_id: {node_id}"}
     state["current_selected"] = node_id
+    _save_state(session_id, computer_id, state)
     return {"success": True, "current_selected": node_id}
 
 
@@ -1047,7 +1456,8 @@ def set_selected(session_id, computer_id, node_id):
 # ===================================================================
 
 def cleanup_session(session_id):
-    """Remove all LAN states for a given session (e.g. on disconnect)."""
-    keys_to_remove = [k for k in _lan_states if k[0] == str(session_id)]
-    for k in keys_to_remove:
-        del _lan_states[k]
+    """Remove all LAN states for a given session (when it is deleted)."""
+    session_id = str(session_id)
+    for key in [k for k in _hot if k[0] == session_id]:
+        del _hot[key]
+    get_store().discard_session(session_id)
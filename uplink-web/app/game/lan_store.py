@@ -0,0 +1,335 @@
+"""LAN state store -- bounded, evictable storage for per-session LAN state.
+
+``lan_engine`` keeps one compact record per (session_id, computer_id): the
+delta log of player-caused changes to the seeded topology plus the player's
+position, sys-admin progress and sensors.  ``LanStateStore`` holds these in
+an in-memory LRU tier bounded by a byte budget and an idle TTL, in front of
+an optional serialized backend:
+
+    memory  LRU/TTL only; an evicted LAN is regenerated fresh on next access
+    db      write-through to the ``lan_states`` table (shared by all workers
+            and survives restarts)
+    file    write-through to one compressed file per LAN under a directory
+
+A miss in the memory tier falls through to the backend and rehydrates the
+entry, so callers only ever see ``get`` / ``put``.  Sizes are accounted from
+the serialized form, which the backends need anyway.
+
+The db and file backends are shared by every worker, so a memory-tier hit
+is only trusted after checking the backend's version of the record (the
+row's ``updated_at``, a random token in the file's header): another
+worker's write replaces the cached entry instead of being served stale and
+then overwritten.
+
+Configured from the Flask config (``LAN_STATE_*``) on first use.
+"""
+import json
+import logging
+import os
+import tempfile
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+
+log = logging.getLogger(__name__)
+
+
+def encode_state(state):
+    """Serialize a JSON-able LAN state record to compressed bytes."""
+    raw = json.dumps(state, separators=(",", ":")).encode()
+    return zlib.compress(raw, 6)
+
+
+def decode_state(blob):
+    """Inverse of ``encode_state``."""
+    return json.loads(zlib.decompress(blob))
+
+
+# ===================================================================
+# Backends
+# ===================================================================
+
+class DatabaseBackend:
+    """Serialized LAN states in the ``lan_states`` table.
+
+    Writes join the caller's ``db.session`` transaction; the socket handlers
+    and the game loop commit after each LAN operation.
+    """
+
+    def load(self, key):
+        """Return ``(blob, version)``, or None."""
+        from app.extensions import db
+        from app.models.lan_state import LanStateRecord
+        record = db.session.get(LanStateRecord, key, populate_existing=True)
+        return (record.data, record.updated_at) if record is not None else None
+
+    def version(self, key):
+        from app.extensions import db
+        from app.models.lan_state import LanStateRecord
+        return db.session.execute(
+            db.select(LanStateRecord.updated_at).filter_by(
+                game_session_id=key[0], computer_id=key[1])
+        ).scalar()
+
+    def save(self, key, blob):
+        """Write *blob* and return its new version."""
+        from app.extensions import db
+        from app.models.lan_state import LanStateRecord
+        stamp = datetime.utcnow()
+        # UPDATE first: the row usually exists, and loading it would read the blob
+        updated = db.session.execute(
+            db.update(LanStateRecord)
+            .filter_by(game_session_id=key[0], computer_id=key[1])
+            .values(data=blob, updated_at=stamp)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not updated:
+            db.session.add(LanStateRecord(
+                game_session_id=key[0], computer_id=key[1], data=blob,
+                updated_at=stamp))
+        return stamp
+
+    def delete(self, key):
+        from app.models.lan_state import LanStateRecord
+        LanStateRecord.query.filter_by(
+            game_session_id=key[0], computer_id=key[1]).delete()
+
+    def delete_session(self, session_id):
+        from app.models.lan_state import LanStateRecord
+        LanStateRecord.query.filter_by(game_session_id=session_id).delete()
+
+
+class FileBackend:
+    """One ``<session>/<computer>.lan`` file per LAN under *directory*.
+
+    Each file starts with ``MAGIC`` and a random token written with it,
+    which is the record's version: mtimes come from a coarse clock, so two
+    saves within one clock tick would share theirs.
+    """
+
+    MAGIC = b"LAN1"
+    TOKEN_BYTES = 16
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[0], f"{key[1]}.lan")
+
+    def _split(self, data, fh):
+        """``(blob, version)`` of file contents *data* read from *fh*."""
+        if data[:len(self.MAGIC)] != self.MAGIC:
+            # Written before files had a header
+            return data, os.fstat(fh.fileno()).st_mtime_ns
+        start = len(self.MAGIC) + self.TOKEN_BYTES
+        return data[start:], data[len(self.MAGIC):start].hex()
+
+    def load(self, key):
+        try:
+            with open(self._path(key), "rb") as fh:
+                return self._split(fh.read(), fh)
+        except FileNotFoundError:
+            return None
+
+    def version(self, key):
+        try:
+            with open(self._path(key), "rb") as fh:
+                return self._split(fh.read(len(self.MAGIC) + self.TOKEN_BYTES), fh)[1]
+        except FileNotFoundError:
+            return None
+
+    def save(self, key, blob):
+        path = self._path(key)
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        # A temp file of our own: other workers may be saving the same LAN
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        token = os.urandom(self.TOKEN_BYTES)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(self.MAGIC + token + blob)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return token.hex()
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def delete_session(self, session_id):
+        folder = os.path.join(self.directory, session_id)
+        if not os.path.isdir(folder):
+            return
+        for name in os.listdir(folder):
+            os.remove(os.path.join(folder, name))
+        os.rmdir(folder)
+
+
+# ===================================================================
+# Store
+# ===================================================================
+
+class LanStateStore:
+    """In-memory LRU/TTL tier over an optional serialized backend."""
+
+    def __init__(self, backend=None, max_bytes=32 * 1024 * 1024, ttl=3600):
+        self.backend = backend
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # key -> [state, size, last_access, version]; oldest access first
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.rehydrations = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_config(cls, config, instance_path=""):
+        """A store configured from ``LAN_STATE_*``; a relative ``LAN_STATE_DIR``
+        is resolved against *instance_path*, like Flask-SQLAlchemy's SQLite paths.
+        """
+        kind = config.get("LAN_STATE_BACKEND", "memory")
+        if kind == "db":
+            backend = DatabaseBackend()
+        elif kind == "file":
+            backend = FileBackend(os.path.join(
+                instance_path, config.get("LAN_STATE_DIR", "lan_states")))
+        elif kind == "memory":
+            backend = None
+        else:
+            raise ValueError(f"Unknown LAN_STATE_BACKEND: {kind}")
+        return cls(
+            backend=backend,
+            max_bytes=int(config.get("LAN_STATE_MAX_BYTES", 32 * 1024 * 1024)),
+            ttl=int(config.get("LAN_STATE_TTL", 3600)),
+        )
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the state for *key*, rehydrating from the backend; None if absent."""
+        now = time.monotonic()
+        self._expire(now)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if self.backend is None or self.backend.version(key) == entry[3]:
+                self.hits += 1
+                entry[2] = now
+                self._entries.move_to_end(key)
+                return entry[0]
+            # Changed (or deleted) by another worker since we cached it
+            self.stale += 1
+            self._bytes -= self._entries.pop(key)[1]
+
+        self.misses += 1
+        if self.backend is None:
+            return None
+        loaded = self.backend.load(key)
+        if loaded is None:
+            return None
+        blob, version = loaded
+        state = decode_state(blob)
+        self.rehydrations += 1
+        self._insert(key, state, len(blob), now, version)
+        return state
+
+    def version(self, key):
+        """Backend version of the state last returned by ``get`` or ``put``.
+
+        Always None for the memory backend.
+        """
+        entry = self._entries.get(key)
+        return entry[3] if entry is not None else None
+
+    def put(self, key, state):
+        """Record *state* for *key* after it was created or changed."""
+        blob = encode_state(state)
+        version = None
+        if self.backend is not None:
+            version = self.backend.save(key, blob)
+        now = time.monotonic()
+        self._expire(now)
+        self._insert(key, state, len(blob), now, version)
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+        if self.backend is not None:
+            self.backend.delete(key)
+
+    def discard_session(self, session_id):
+        for key in [k for k in self._entries if k[0] == session_id]:
+            self._bytes -= self._entries.pop(key)[1]
+        if self.backend is not None:
+            self.backend.delete_session(session_id)
+
+    def clear(self):
+        """Drop the memory tier (the backend is left alone)."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def _insert(self, key, state, size, now, version=None):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = [state, size, now, version]
+        self._bytes += size
+        # Evict least recently used entries, but never the one just touched.
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted[1]
+            self.evictions += 1
+
+    def _expire(self, now):
+        if not self.ttl:
+            return
+        cutoff = now - self.ttl
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry[2] >= cutoff:
+                break
+            del self._entries[key]
+            self._bytes -= entry[1]
+            self.expirations += 1
+
+    def metrics(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else "memory",
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stale": self.stale,
+            "rehydrations": self.rehydrations,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+_store = None
+
+
+def get_store():
+    """Return the process-wide store, configuring it from the app on first use."""
+    global _store
+    if _store is None:
+        from flask import current_app
+        _store = LanStateStore.from_config(current_app.config, current_app.instance_path)
+        log.info("LAN state store: %s", _store.metrics()["backend"])
+    return _store
@@ -0,0 +1,139 @@
+"""Market engine -- vectorized stock price ticks across all sessions.
+
+Instead of loading each session's ``StockEntry`` rows as ORM objects and
+moving them one at a time, ``tick_markets`` reads every due session's
+entries in one column query into contiguous NumPy arrays (id, session,
+price, previous price, volatility), advances them all in a single
+vectorized step and writes the rows whose prices changed back with one
+executemany UPDATE.  The new prices are then appended to each session's
+price history (``stock_history``).
+
+The arrays are rebuilt from the database on each tick rather than kept
+resident, so prices changed elsewhere (``crash_stock``, other workers) are
+always picked up.
+"""
+import logging
+
+import numpy as np
+from sqlalchemy import bindparam, update
+
+from app.extensions import db
+from app.models.stock_market import StockEntry
+from app.game.finance_engine import (
+    STOCK_PRICE_FLOOR, STOCK_TICK_MAX_CHANGE, STOCK_TICK_MIN_CHANGE,
+)
+
+log = logging.getLogger(__name__)
+
+# The tick bounds are for a stock of this volatility and scale linearly
+DEFAULT_VOLATILITY = 0.1
+
+_rng = np.random.default_rng()
+
+
+class MarketBook:
+    """Stock entries of a set of sessions as parallel arrays."""
+
+    __slots__ = ("session_ids", "ids", "session_index", "names", "price",
+                 "previous", "volatility")
+
+    def __init__(self, session_ids, rows):
+        self.session_ids = list(session_ids)
+        index = {sid: i for i, sid in enumerate(self.session_ids)}
+        n = len(rows)
+        self.ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=n)
+        self.session_index = np.fromiter((index[r[1]] for r in rows), dtype=np.int32, count=n)
+        self.names = [r[2] for r in rows]
+        self.price = np.fromiter((r[3] for r in rows), dtype=np.int64, count=n)
+        self.previous = np.fromiter((r[4] for r in rows), dtype=np.int64, count=n)
+        self.volatility = np.fromiter(
+            (r[5] if r[5] is not None else DEFAULT_VOLATILITY for r in rows),
+            dtype=np.float64, count=n,
+        )
+
+    @classmethod
+    def load(cls, session_ids):
+        """Read the entries of *session_ids* with one query."""
+        session_ids = list(session_ids)
+        if not session_ids:
+            return cls([], [])
+        rows = db.session.execute(
+            db.select(
+                StockEntry.id, StockEntry.game_session_id, StockEntry.company_name,
+                StockEntry.current_price, StockEntry.previous_price,
+                StockEntry.volatility,
+            )
+            .where(StockEntry.game_session_id.in_(session_ids))
+            .order_by(StockEntry.id)
+        ).all()
+        return cls(session_ids, rows)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def step(self, rng=None):
+        """Advance every price once.  Returns a mask of rows that changed."""
+        rng = rng or _rng
+        vol = np.where(self.volatility > 0, self.volatility, DEFAULT_VOLATILITY)
+        scale = vol / DEFAULT_VOLATILITY
+        change_pct = rng.uniform(STOCK_TICK_MIN_CHANGE * scale, STOCK_TICK_MAX_CHANGE * scale)
+        # int() semantics: truncate toward zero
+        delta = np.trunc(self.price * change_pct).astype(np.int64)
+        new_price = np.maximum(STOCK_PRICE_FLOOR, self.price + delta)
+
+        changed = (new_price != self.price) | (self.previous != self.price)
+        self.previous = self.price
+        self.price = new_price
+        return changed
+
+    def persist(self, mask):
+        """Write the rows selected by *mask* back with one executemany UPDATE."""
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return 0
+        params = [
+            {"b_id": i, "b_price": p, "b_previous": q}
+            for i, p, q in zip(
+                self.ids[rows].tolist(), self.price[rows].tolist(),
+                self.previous[rows].tolist(),
+            )
+        ]
+        stmt = (
+            update(StockEntry.__table__)
+            .where(StockEntry.__table__.c.id == bindparam("b_id"))
+            .values(current_price=bindparam("b_price"),
+                    previous_price=bindparam("b_previous"))
+        )
+        db.session.execute(stmt, params)
+        return len(params)
+
+    def session_updates(self, session_id):
+        """Per-company update dicts for one session, in entry order."""
+        i = self.session_ids.index(session_id)
+        rows = np.flatnonzero(self.session_index == i)
+        return [
+            {
+                "company_name": self.names[r],
+                "current_price": int(self.price[r]),
+                "previous_price": int(self.previous[r]),
+                "change": int(self.price[r] - self.previous[r]),
+            }
+            for r in rows.tolist()
+        ]
+
+
+def tick_markets(session_ids, rng=None):
+    """Advance the stock markets of all *session_ids* in one step.
+
+    Returns the ``MarketBook`` holding the new prices.
+    """
+    book = MarketBook.load(session_ids)
+    if not len(book):
+        return book
+    written = book.persist(book.step(rng))
+
+    from app.game import stock_history
+    stock_history.record_book(book)
+    log.debug("Market tick: %d sessions, %d entries, %d written",
+              len(book.session_ids), len(book), written)
+    return book
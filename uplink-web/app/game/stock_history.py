@@ -0,0 +1,419 @@
+"""Stock history -- fixed-size price history rings for the stock market chart.
+
+``StockEntry`` only carries the current and previous price.  Every market
+tick appends the new prices of a session to a ``MarketHistory``: one set of
+ring buffers per resolution tier (game minute, hour and day), each a fixed
+number of buckets of (time, close, low, high) shared by all of the
+session's companies as rows of 2-D arrays.  A sample falling into the
+bucket already at the head of a tier updates it in place; otherwise it
+takes the next slot, overwriting the oldest bucket once the ring is full.
+Rings grow by doubling up to their capacity, so a young session costs
+little and memory per session is bounded no matter how long the game runs.
+
+Histories of ticking sessions stay resident in a small LRU and are written
+to the ``stock_histories`` table as one compact binary blob per session
+every ``FLUSH_INTERVAL`` market ticks; only histories written since their
+last change are evicted.  Chart queries binary-search the requested tier,
+so they cost O(log n + points returned).
+"""
+import bisect
+import logging
+import struct
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+from sqlalchemy import bindparam, insert, update
+
+from app.extensions import db
+from app.game.event_scheduler import TICKS_PER_GAME_MINUTE
+
+log = logging.getLogger(__name__)
+
+# (name, bucket width in game ticks, buckets kept).  Samples arrive once per
+# market tick (STOCK_TICK_INTERVAL loop ticks, 20 game minutes at speed 1),
+# so a "minute" bucket holds a single sample and the spans below are those
+# at speed 1; faster speeds space samples further apart and cover more.
+TIERS = (
+    ("minute", TICKS_PER_GAME_MINUTE, 360),              # 360 samples, ~5 game days
+    ("hour", 60 * TICKS_PER_GAME_MINUTE, 336),           # 14 game days
+    ("day", 24 * 60 * TICKS_PER_GAME_MINUTE, 365),       # a game year
+)
+RESOLUTIONS = tuple(name for name, _, _ in TIERS)
+
+# Resident histories; the rest are decoded from their blob on demand
+HOT_HISTORIES = 1024
+
+# Buckets allocated for a new ring before it starts doubling
+INITIAL_BUCKETS = 16
+
+# Market ticks between writes of a dirty history
+FLUSH_INTERVAL = 3
+
+# Low of a bucket no sample of the row has reached yet
+_NO_LOW = np.iinfo(np.int32).max
+
+_BLOB_VERSION = 1
+_HEADER = struct.Struct("<HHI")   # version, companies, names length
+_COUNT = struct.Struct("<I")
+
+# ---------------------------------------------------------------------------
+# Resident histories keyed by session id, and those changed since the last
+# flush
+# ---------------------------------------------------------------------------
+_hot = OrderedDict()
+_dirty = set()
+_ticks_since_flush = 0
+
+
+class PriceRing:
+    """One resolution tier: a ring of buckets for every company row."""
+
+    __slots__ = ("width", "capacity", "times", "close", "low", "high",
+                 "head", "count")
+
+    def __init__(self, width, capacity, companies, size=INITIAL_BUCKETS):
+        size = max(1, min(size, capacity))
+        self.width = width
+        self.capacity = capacity
+        self.times = np.zeros(size, dtype=np.int64)
+        self.close = np.zeros((companies, size), dtype=np.int32)
+        self.low = np.zeros((companies, size), dtype=np.int32)
+        self.high = np.zeros((companies, size), dtype=np.int32)
+        self.head = 0       # next slot to write
+        self.count = 0
+
+    def _grow(self):
+        """Double the allocation (only ever needed before the ring wraps)."""
+        extra = min(len(self.times), self.capacity - len(self.times))
+        self.times = np.concatenate((self.times, np.zeros(extra, dtype=np.int64)))
+        pad = np.zeros((self.close.shape[0], extra), dtype=np.int32)
+        self.close = np.hstack((self.close, pad))
+        self.low = np.hstack((self.low, pad))
+        self.high = np.hstack((self.high, pad))
+
+    def _slots(self, start, stop):
+        """Ring slots of logical positions [start, stop), oldest first."""
+        first = self.head - self.count
+        return (np.arange(start, stop) + first) % self.capacity
+
+    def _time_at(self, i):
+        return int(self.times[(self.head - self.count + i) % self.capacity])
+
+    def add(self, tick, prices):
+        """Fold one sample (a price per company row) into its bucket."""
+        bucket = tick - tick % self.width
+        last = (self.head - 1) % self.capacity
+        if self.count and bucket <= self.times[last]:
+            self.close[:, last] = prices
+            np.minimum(self.low[:, last], prices, out=self.low[:, last])
+            np.maximum(self.high[:, last], prices, out=self.high[:, last])
+            return
+        slot = self.head
+        if slot == len(self.times):
+            self._grow()
+        self.times[slot] = bucket
+        self.close[:, slot] = prices
+        self.low[:, slot] = prices
+        self.high[:, slot] = prices
+        self.head = (slot + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def oldest(self):
+        return self._time_at(0) if self.count else None
+
+    def points(self, row, start=None, end=None):
+        """``[time, close, low, high]`` buckets of *row* within [start, end]."""
+        positions = range(self.count)
+        lo = 0 if start is None else bisect.bisect_left(positions, start, key=self._time_at)
+        hi = self.count if end is None else bisect.bisect_right(positions, end, key=self._time_at)
+        if lo >= hi:
+            return []
+        slots = self._slots(lo, hi)
+        close = self.close[row, slots]
+        # 0 is below the price floor: the company was not listed yet
+        keep = close > 0
+        return np.column_stack((
+            self.times[slots][keep], close[keep],
+            self.low[row, slots][keep], self.high[row, slots][keep],
+        )).tolist()
+
+    def ordered(self):
+        """Buckets oldest first, as (times, close, low, high) arrays."""
+        slots = self._slots(0, self.count)
+        return (self.times[slots], self.close[:, slots],
+                self.low[:, slots], self.high[:, slots])
+
+    def restore(self, times, close, low, high):
+        n = len(times)
+        self.times[:n] = times
+        self.close[:, :n] = close
+        self.low[:, :n] = low
+        self.high[:, :n] = high
+        self.head = n % self.capacity
+        self.count = n
+
+    def add_rows(self, n):
+        pad = np.zeros((n, len(self.times)), dtype=np.int32)
+        self.close = np.vstack((self.close, pad))
+        # A row first sampled into the head bucket takes its low from there
+        self.low = np.vstack((self.low, np.full_like(pad, _NO_LOW)))
+        self.high = np.vstack((self.high, pad))
+
+
+class MarketHistory:
+    """Price history of every company of one session."""
+
+    __slots__ = ("names", "rows", "tiers")
+
+    def __init__(self, names=()):
+        self.names = list(names)
+        self.rows = {name: i for i, name in enumerate(self.names)}
+        self.tiers = {
+            name: PriceRing(width, capacity, len(self.names))
+            for name, width, capacity in TIERS
+        }
+
+    def _row_order(self, names):
+        """Row of each of *names*, adding rows for companies not seen before."""
+        new = [name for name in names if name not in self.rows]
+        if new:
+            for name in new:
+                self.rows[name] = len(self.names)
+                self.names.append(name)
+            for ring in self.tiers.values():
+                ring.add_rows(len(new))
+        return np.fromiter((self.rows[name] for name in names), dtype=np.intp,
+                           count=len(names))
+
+    def record(self, tick, names, prices):
+        """Add one market sample taken at game tick *tick*."""
+        order = self._row_order(names)
+        row_prices = np.zeros(len(self.names), dtype=np.int32)
+        minute = self.tiers["minute"]
+        if len(order) < len(self.names) and minute.count:
+            # Companies missing from this sample keep their last close
+            row_prices[:] = minute.close[:, (minute.head - 1) % minute.capacity]
+        row_prices[order] = prices
+        for ring in self.tiers.values():
+            ring.add(tick, row_prices)
+
+    def resolve(self, start=None, resolution=None):
+        """The tier to answer from: *resolution*, else the finest reaching *start*."""
+        if resolution is not None:
+            return resolution
+        for name in RESOLUTIONS:
+            ring = self.tiers[name]
+            # A ring that never wrapped still holds everything since tick 0
+            if start is None or ring.count < ring.capacity or ring.oldest() <= start:
+                return name
+        return RESOLUTIONS[-1]
+
+    def points(self, company, start=None, end=None, resolution=None):
+        row = self.rows.get(company)
+        if row is None:
+            return []
+        return self.tiers[self.resolve(start, resolution)].points(row, start, end)
+
+
+# ===================================================================
+# Serialization
+# ===================================================================
+
+def encode_history(history):
+    """Serialize a ``MarketHistory`` to a compressed binary blob.
+
+    Layout: header, NUL-separated company names, then per tier (in
+    ``TIERS`` order) the bucket count followed by the int64 times and the
+    int32 close, low and high matrices of the filled buckets, oldest first.
+    """
+    names = "\0".join(history.names).encode()
+    parts = [_HEADER.pack(_BLOB_VERSION, len(history.names), len(names)), names]
+    for name, _, _ in TIERS:
+        times, close, low, high = history.tiers[name].ordered()
+        parts.append(_COUNT.pack(len(times)))
+        parts.append(times.astype("<i8").tobytes())
+        for matrix in (close, low, high):
+            parts.append(np.ascontiguousarray(matrix, dtype="<i4").tobytes())
+    return zlib.compress(b"".join(parts), 6)
+
+
+def decode_history(blob):
+    """Inverse of ``encode_history``."""
+    raw = zlib.decompress(blob)
+    version, companies, names_len = _HEADER.unpack_from(raw)
+    if version != _BLOB_VERSION:
+        raise ValueError(f"Unsupported stock history blob version {version}")
+    offset = _HEADER.size
+    names = raw[offset:offset + names_len].decode()
+    offset += names_len
+    history = MarketHistory(names.split("\0") if companies else [])
+    for name, width, capacity in TIERS:
+        (count,) = _COUNT.unpack_from(raw, offset)
+        offset += _COUNT.size
+        times = np.frombuffer(raw, dtype="<i8", count=count, offset=offset)
+        offset += 8 * count
+        matrices = []
+        for _ in range(3):
+            matrices.append(np.frombuffer(raw, dtype="<i4", count=companies * count,
+                                          offset=offset).reshape(companies, count))
+            offset += 4 * companies * count
+        ring = history.tiers[name] = PriceRing(width, capacity, companies, size=count)
+        ring.restore(times, *matrices)
+    return history
+
+
+# ===================================================================
+# Resident cache and persistence
+# ===================================================================
+
+def _evict(keep=()):
+    """Drop least recently used clean histories beyond ``HOT_HISTORIES``.
+
+    Dirty histories stay resident until ``flush`` writes them: eviction also
+    runs from chart requests, whose db session is never committed, so it
+    must not write.  Histories in *keep* are about to be used by the caller.
+    """
+    excess = len(_hot) - HOT_HISTORIES
+    if excess <= 0:
+        return
+    keep = set(keep)
+    for session_id in [sid for sid in _hot if sid not in _dirty and sid not in keep][:excess]:
+        del _hot[session_id]
+
+
+def _write(histories):
+    """Persist *histories* ({session_id: MarketHistory}) into the db session."""
+    from app.models.stock_market import StockHistory
+
+    if not histories:
+        return
+    table = StockHistory.__table__
+    existing = set(db.session.scalars(
+        db.select(table.c.game_session_id)
+        .where(table.c.game_session_id.in_(list(histories)))
+    ))
+    updates, inserts = [], []
+    for session_id, history in histories.items():
+        row = {"b_session": session_id, "b_data": encode_history(history)}
+        (updates if session_id in existing else inserts).append(row)
+        _dirty.discard(session_id)
+    if updates:
+        db.session.execute(
+            update(table)
+            .where(table.c.game_session_id == bindparam("b_session"))
+            .values(data=bindparam("b_data")),
+            updates,
+        )
+    if inserts:
+        db.session.execute(insert(table), [
+            {"game_session_id": r["b_session"], "data": r["b_data"]} for r in inserts
+        ])
+
+
+def _load(session_ids):
+    """Histories of *session_ids*, decoding non-resident ones with one query."""
+    from app.models.stock_market import StockHistory
+
+    found = {}
+    missing = []
+    for session_id in session_ids:
+        history = _hot.get(session_id)
+        if history is None:
+            missing.append(session_id)
+        else:
+            _hot.move_to_end(session_id)
+            found[session_id] = history
+    if missing:
+        rows = db.session.execute(
+            db.select(StockHistory.game_session_id, StockHistory.data)
+            .where(StockHistory.game_session_id.in_(missing))
+        ).all()
+        blobs = dict(rows)
+        for session_id in missing:
+            blob = blobs.get(session_id)
+            history = MarketHistory()
+            if blob is not None:
+                try:
+                    history = decode_history(blob)
+                except (ValueError, zlib.error, struct.error):
+                    log.warning("Discarding unreadable stock history of session %s", session_id)
+            found[session_id] = history
+            _hot[session_id] = history
+        _evict(session_ids)
+    return found
+
+
+def flush():
+    """Write every history changed since the last flush."""
+    global _ticks_since_flush
+    _ticks_since_flush = 0
+    _write({sid: _hot[sid] for sid in list(_dirty) if sid in _hot})
+    _dirty.clear()
+    _evict()
+
+
+def discard_session(session_id):
+    """Forget the history of a deleted session."""
+    from app.models.stock_market import StockHistory
+
+    _hot.pop(session_id, None)
+    _dirty.discard(session_id)
+    StockHistory.query.filter_by(game_session_id=session_id).delete()
+
+
+# ===================================================================
+# Public API
+# ===================================================================
+
+def record_book(book):
+    """Append the prices of a ticked ``MarketBook`` to each session's history."""
+    global _ticks_since_flush
+    from app.models.game_session import GameSession
+
+    if not len(book):
+        return
+    ticks = dict(db.session.execute(
+        db.select(GameSession.id, GameSession.game_time_ticks)
+        .where(GameSession.id.in_(book.session_ids))
+    ).all())
+    histories = _load(book.session_ids)
+
+    # Group the book's rows by session once instead of masking per session
+    order = np.argsort(book.session_index, kind="stable")
+    bounds = np.searchsorted(book.session_index[order], np.arange(len(book.session_ids) + 1))
+    prices = book.price[order]
+    for i, session_id in enumerate(book.session_ids):
+        lo, hi = bounds[i], bounds[i + 1]
+        if lo == hi:
+            continue
+        rows = order[lo:hi]
+        histories[session_id].record(
+            ticks.get(session_id) or 0,
+            [book.names[r] for r in rows.tolist()],
+            prices[lo:hi],
+        )
+        _dirty.add(session_id)
+
+    _ticks_since_flush += 1
+    if _ticks_since_flush >= FLUSH_INTERVAL:
+        flush()
+
+
+def get_history(session_id, companies=None, start=None, end=None, resolution=None):
+    """Chart points per company for [start, end] (game ticks, inclusive).
+
+    *resolution* is one of ``RESOLUTIONS``; by default the finest tier that
+    still reaches back to *start* is used.
+
+    Returns:
+        (resolution, {company_name: [[time, close, low, high], ...]})
+    """
+    if resolution is not None and resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown resolution '{resolution}'")
+    history = _load([session_id])[session_id]
+    resolution = history.resolve(start, resolution)
+    names = history.names if companies is None else companies
+    return resolution, {
+        name: history.points(name, start, end, resolution) for name in names
+    }
@@ -0,0 +1,13 @@
+"""Serialized LAN hacking state (see app/game/lan_store.py)."""
+from datetime import datetime
+from app.extensions import db
+
+
+class LanStateRecord(db.Model):
+    __tablename__ = "lan_states"
+
+    game_session_id = db.Column(db.String(36), db.ForeignKey("game_sessions.id"),
+                                primary_key=True)
+    computer_id = db.Column(db.Integer, primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
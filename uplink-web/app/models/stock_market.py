@@ -1,4 +1,5 @@
 """Stock market model."""
+from datetime import datetime
 from app.extensions import db
 
 
@@ -22,3 +23,13 @@ class StockHolding(db.Model):
     company_name = db.Column(db.String(128), nullable=False)
     shares = db.Column(db.Integer, default=0)
     purchase_price = db.Column(db.Integer, default=0)
+
+
+class StockHistory(db.Model):
+    """Serialized price history rings of one session (see app/game/stock_history.py)."""
+    __tablename__ = "stock_histories"
+
+    game_session_id = db.Column(db.String(36), db.ForeignKey("game_sessions.id"),
+                                primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
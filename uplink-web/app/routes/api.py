@@ -14,7 +14,7 @@ from app.models.vlocation import VLocation
 from app.models.data_file import DataFile
 from app.models.news import NewsArticle
 from app.models.stock_market import StockEntry
-from app.game import mission_engine
+from app.game import mission_engine, stock_history
 
 api_bp = Blueprint("api", __name__)
 
@@ -262,8 +262,21 @@ def session_news(session_id):
 @api_bp.route("/session/<session_id>/stocks")
 @login_required
 def session_stocks(session_id):
+    """Current prices, plus chart history when a range or resolution is given.
+
+    Query args: ``start`` / ``end`` (game ticks, inclusive), ``resolution``
+    (``minute``, ``hour`` or ``day``; default: the finest tier covering
+    ``start``) and ``company`` to limit the history to one company.
+    """
     _verify_session(session_id)
 
+    start = request.args.get("start", type=int)
+    end = request.args.get("end", type=int)
+    resolution = request.args.get("resolution")
+    company = request.args.get("company")
+    if resolution is not None and resolution not in stock_history.RESOLUTIONS:
+        abort(400, description=f"resolution must be one of {', '.join(stock_history.RESOLUTIONS)}")
+
     stocks = StockEntry.query.filter_by(game_session_id=session_id).all()
     player = Player.query.filter_by(game_session_id=session_id).first()
 
@@ -275,7 +288,7 @@ def session_stocks(session_id):
         ).all():
             holdings[h.company_name] = {"shares": h.shares, "purchase_price": h.purchase_price}
 
-    return jsonify({
+    result = {
         "stocks": [
             {
                 "company_name": s.company_name,
@@ -286,7 +299,19 @@ def session_stocks(session_id):
             }
             for s in stocks
         ]
-    })
+    }
+
+    if start is not None or end is not None or resolution or company:
+        resolution, history = stock_history.get_history(
+            session_id, companies=[company] if company else None,
+            start=start, end=end, resolution=resolution,
+        )
+        result["resolution"] = resolution
+        for s in result["stocks"]:
+            if s["company_name"] in history:
+                s["history"] = history[s["company_name"]]
+
+    return jsonify(result)
 
 
 @api_bp.route("/session/<session_id>/rankings")
@@ -339,3 +364,15 @@ def save_game(session_id):
     game_session.last_saved_at = game_session.game_time_ticks
     db.session.commit()
     return jsonify({"success": True, "saved_at": game_session.last_saved_at})
+
+
+@api_bp.route("/metrics")
+@login_required
+def metrics():
+    """Server-side counters for operators."""
+    from app.game import lan_engine
+    from app.game.game_loop import game_loop
+    return jsonify({
+        "lan_store": lan_engine.store_metrics(),
+        "game_loop": game_loop.metrics(),
+    })
@@ -18,7 +18,7 @@ from app.models.access_log import AccessLog
 from app.models.security import SecuritySystem
 from app.models.company import Company
 from app.models.person import Person
-from app.game import world_generator
+from app.game import world_generator, stock_history, lan_engine
 
 game_bp = Blueprint("game", __name__)
 
@@ -124,6 +124,8 @@ def delete_game(session_id):
     Computer.query.filter_by(game_session_id=session_id).delete()
     Company.query.filter_by(game_session_id=session_id).delete()
     Person.query.filter_by(game_session_id=session_id).delete()
+    stock_history.discard_session(session_id)
+    lan_engine.cleanup_session(session_id)
 
     db.session.delete(game_session)
     db.session.commit()
@@ -48,6 +48,39 @@ sessions = {}
 # Mapping game_session_id -> set of request.sid values (used by game_loop).
 session_rooms = {}
 
+# Mapping request.sid -> (seq, snapshot) of the LAN view last sent to it.
+lan_views = {}
+
+
+def _emit_lan_view(state, result=None, full=False):
+    """Send this socket its LAN view as a patch against the last one sent.
+
+    The full view goes out on the first send after join, when the player is
+    on a different computer, or when *full* is set (client resync).  Every
+    message carries ``seq``; a patch also carries the ``base`` it applies to
+    so a client that missed one can ask for a resync.
+    """
+    from app.game import lan_engine
+    sid, computer_id = state.game_session_id, state.computer_id
+    snapshot = lan_engine.lan_view_snapshot(sid, computer_id)
+    last = lan_views.get(request.sid)
+    seq = last[0] + 1 if last is not None else 1
+
+    if full or last is None or last[1]["computer_id"] != snapshot["computer_id"]:
+        lan_views[request.sid] = (seq, snapshot)
+        payload = {"lan": lan_engine.get_lan_state(sid, computer_id), "seq": seq}
+    else:
+        patch = lan_engine.diff_lan_views(last[1], snapshot)
+        if patch is None:
+            payload = {"seq": last[0]}
+        else:
+            lan_views[request.sid] = (seq, snapshot)
+            payload = {"patch": patch, "base": last[0], "seq": seq}
+
+    if result is not None:
+        payload["result"] = result
+    emit(MSG.MSG_LAN_UPDATE, payload)
+
 
 @socketio.on("join")
 def handle_join(data):
@@ -81,6 +114,8 @@ def handle_join(data):
         )
         sessions[request.sid] = state
         session_rooms.setdefault(game_session_id, set()).add(request.sid)
+        # The next LAN view this socket gets is a full resync
+        lan_views.pop(request.sid, None)
 
         join_room(game_session_id)
 
@@ -247,6 +282,10 @@ def handle_disconnect_from(data):
         connection_manager.disconnect(
             state.game_session_id, state.player_id
         )
+        if state.computer_id is not None:
+            # Leaving a LAN resets it, as in the original game
+            from app.game import lan_engine
+            lan_engine.reset_lan_state(state.game_session_id, state.computer_id)
         db.session.commit()
 
         state.computer_id = None
@@ -699,25 +738,41 @@ def handle_lan_action(data):
         return
     try:
         action = data.get("action")
-        action_data = data.get("data", {})
+        action_data = data.get("data") or {}
         if not action:
             emit(MSG.MSG_ERROR, {"message": "action is required"})
             return
+        node_id = action_data.get("node_id") if isinstance(action_data, dict) else None
+        if node_id is not None and type(node_id) is not int:
+            emit(MSG.MSG_ERROR, {"message": "node_id must be an integer"})
+            return
+
+        if state.computer_id is None:
+            emit(MSG.MSG_ERROR, {"message": "Not connected to a computer"})
+            return
 
         from app.game import lan_engine
+        # The tool and its version come from the player's gateway, not the client
+        tool_version = lan_engine.installed_tool_version(
+            state.game_session_id, state.player_id, action
+        )
+        if tool_version == 0:
+            emit(MSG.MSG_ERROR, {
+                "message": f"{lan_engine.REQUIRED_TOOLS[action]} is required"
+            })
+            return
+
         result = lan_engine.lan_action(
-            state.game_session_id, state.player_id, action, action_data
+            state.game_session_id, state.player_id, state.computer_id, action,
+            node_id=node_id, tool_version=tool_version or 1,
         )
         db.session.commit()
 
         if result.get("error"):
             emit(MSG.MSG_ERROR, {"message": result["error"]})
         else:
-            # Send updated LAN state
-            lan_state = lan_engine.get_lan_state(
-                state.game_session_id, state.player_id
-            )
-            emit(MSG.MSG_LAN_UPDATE, {"lan": lan_state, "result": result})
+            # Send what changed in the LAN view
+            _emit_lan_view(state, result)
 
     except Exception as exc:
         db.session.rollback()
@@ -725,6 +780,25 @@ def handle_lan_action(data):
         emit(MSG.MSG_ERROR, {"message": str(exc)})
 
 
+@socketio.on(MSG.MSG_LAN_RESYNC)
+def handle_lan_resync(data):
+    """Send the full LAN view (client lost track of the patch sequence)."""
+    state = sessions.get(request.sid)
+    if state is None:
+        emit(MSG.MSG_ERROR, {"message": "Not joined to a session"})
+        return
+    if state.computer_id is None:
+        emit(MSG.MSG_ERROR, {"message": "Not connected to a computer"})
+        return
+    try:
+        _emit_lan_view(state, full=True)
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        log.exception("Error in lan_resync handler")
+        emit(MSG.MSG_ERROR, {"message": str(exc)})
+
+
 @socketio.on(MSG.MSG_CHOOSE_SIDE)
 def handle_choose_side(data):
     """Choose Arunmor or ARC in the plot."""
@@ -896,6 +970,7 @@ def handle_cheat(data):
 def handle_disconnect():
     """Clean up session state when a client disconnects."""
     state = sessions.pop(request.sid, None)
+    lan_views.pop(request.sid, None)
     if state is not None:
         # Auto-save: record the last saved tick on disconnect
         try:
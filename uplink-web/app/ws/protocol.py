@@ -21,6 +21,7 @@ MSG_TAKE_LOAN = "take_loan"
 MSG_REPAY_LOAN = "repay_loan"
 MSG_TRANSFER_FUNDS = "transfer_funds"
 MSG_LAN_ACTION = "lan_action"
+MSG_LAN_RESYNC = "lan_resync"
 MSG_CHOOSE_SIDE = "choose_side"
 MSG_COMPLETE_SPECIAL_MISSION = "complete_special_mission"
 MSG_MARK_READ = "mark_read"
@@ -0,0 +1,166 @@
+"""Benchmark: lan_action throughput on level-4 (expert) LANs.
+
+Plays a fixed, seeded click stream against many level-4 LANs: scans, probes
+every node, tries to move to every node (most attempts are rejected by the
+accessibility check, as real mis-clicks are), forces locks, spoofs
+authentication servers and retracts.  The LAN store runs in memory only so
+no database is touched; every LAN stays hot, so the numbers isolate
+the engine itself.  Also reports the resident memory of one materialized
+LAN and the latency of ``get_lan_state`` with an unchanged view (the
+common case: a re-render between actions) and right after a node is
+revealed.
+
+Finally replays the clicks as socket events against the default ``db``
+store on a SQLite database file: each event in its own app context runs
+the action, commits, and takes the view snapshot the handler diffs, and
+the SQL statements issued per event are counted.
+
+Run from ``uplink-web``::
+
+    python -m benchmarks.bench_lan
+"""
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from app.game import lan_engine as L
+from app.game import lan_store
+
+LANS = 200
+ROUNDS = 5
+SOCKET_LANS = 20
+
+
+def _clicks(n_systems):
+    """One round of clicks over a LAN with *n_systems* nodes."""
+    clicks = [("scan", None)]
+    for node in range(n_systems):
+        clicks.append(("probe", node))
+        clicks.append(("move", node))
+        clicks.append(("scan", None))
+        clicks.append(("force", node))
+        clicks.append(("spoof", node))
+    return clicks
+
+
+def _socket_events():
+    """Seconds and SQL statements per LAN action event on the ``db`` store."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_lan.db')}"
+    os.environ["LAN_STATE_BACKEND"] = "db"
+
+    from sqlalchemy import event
+
+    from app import create_app
+    from app.extensions import db
+    from app.models.computer import Computer
+    from app.models.game_session import GameSession
+    from app.models.user_account import UserAccount
+
+    app = create_app()
+    lan_store._store = None
+    L._hot.clear()
+    with app.app_context():
+        user = UserAccount(username="bench", password_hash="x")
+        db.session.add(user)
+        db.session.flush()
+        session = GameSession(user_id=user.id, name="bench")
+        db.session.add(session)
+        db.session.flush()
+        computers = [
+            Computer(game_session_id=session.id, name=f"LAN {i}", company_name="Bench",
+                     ip=f"10.1.0.{i}", computer_type=1, trace_speed=-1, hack_difficulty=400)
+            for i in range(SOCKET_LANS)
+        ]
+        db.session.add_all(computers)
+        db.session.commit()
+        session_id = session.id
+        computer_ids = [c.id for c in computers]
+        clicks = _clicks(len(L._ensure_state(session_id, computer_ids[0])["topology"].systems))
+        db.session.commit()
+        statements = []
+        event.listen(db.engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+    events = 0
+    start = time.perf_counter()
+    for computer_id in computer_ids:
+        for action, node in clicks:
+            with app.app_context():
+                L.lan_action(session_id, 0, computer_id, action, node_id=node, tool_version=5)
+                db.session.commit()
+                L.lan_view_snapshot(session_id, computer_id)
+            events += 1
+    elapsed = time.perf_counter() - start
+    return elapsed / events, len(statements) / events
+
+
+def main():
+    random.seed(1)
+    lan_store._store = lan_store.LanStateStore(max_bytes=1 << 30)
+    L.HOT_STATES = 2 * LANS
+
+    keys = []
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(LANS):
+        key = L._state_key("bench", i)
+        state = L._make_state(L.generate_lan_topology(i, 4, seed=L.lan_seed(*key, 4)))
+        L._hold(key, state)
+        keys.append(key)
+    per_lan = (tracemalloc.get_traced_memory()[0] - before) / LANS
+    tracemalloc.stop()
+    clicks = _clicks(len(L._hot[keys[0]]["topology"].systems))
+
+    actions = 0
+    security_checks = 0
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for session_id, computer_id in keys:
+            for action, node in clicks:
+                L.lan_action(session_id, 0, computer_id, action, node_id=node,
+                             tool_version=5)
+                actions += 1
+            L.retract_connection(session_id, computer_id)
+            L.check_lan_security(session_id, computer_id)
+            security_checks += 1
+    elapsed = time.perf_counter() - start
+
+    # Views: once warm with nothing changed, and right after a visibility
+    # change (each timed call follows revealing one more node).
+    for session_id, computer_id in keys:
+        L.get_lan_state(session_id, computer_id)
+    views = 0
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for session_id, computer_id in keys:
+            L.get_lan_state(session_id, computer_id)
+            views += 1
+    unchanged = (time.perf_counter() - start) / views
+
+    views = 0
+    changed = 0.0
+    for i, (session_id, computer_id) in enumerate(keys):
+        key = L._state_key(f"fresh-{session_id}", computer_id)
+        state = L._make_state(L.generate_lan_topology(computer_id, 4, seed=L.lan_seed(*key, 4)))
+        L._hold(key, state)
+        for node in range(len(state["topology"].systems)):
+            L._set_visible(state, node, L.VISIBLE_FULL)
+            start = time.perf_counter()
+            L.get_lan_state(*key)
+            changed += time.perf_counter() - start
+            views += 1
+    changed /= views
+
+    print(f"{LANS} level-4 LANs, {actions} actions, {security_checks} security checks")
+    print(f"lan_action: {actions / elapsed:>10.0f} actions/s  {elapsed / actions * 1e6:6.1f} us/action")
+    print(f"get_lan_state: {unchanged * 1e6:.1f} us unchanged, {changed * 1e6:.1f} us after a change")
+    print(f"memory: {per_lan / 1024:.1f} KiB per materialized LAN")
+
+    per_event, queries = _socket_events()
+    print(f"socket event (db store): {per_event * 1e6:6.1f} us/event, "
+          f"{queries:.2f} SQL statements/event")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark: one loan interest accrual across 1,000 sessions.
+
+Compares the previous per-session accrual (load the player's accounts,
+then query and update each account's loans row by row) with
+``finance_engine.accrue_all_interest`` (one aggregate SELECT and two
+set-based UPDATEs for every due session) on a SQLite database file.
+
+Run from ``uplink-web``::
+
+    python -m benchmarks.bench_loans
+"""
+import os
+import random
+import tempfile
+import time
+import uuid
+
+SESSIONS = 1_000
+ACCOUNTS = 2
+LOANS = 3
+
+
+def _legacy_accrue(session_id):
+    """The per-session ORM accrual this benchmark compares against."""
+    from app.extensions import db
+    from app.models.bank_account import BankAccount, LoanRecord
+
+    accounts = BankAccount.query.filter_by(game_session_id=session_id, is_player=True).all()
+    for acct in accounts:
+        acct_interest = 0
+        for loan in LoanRecord.query.filter_by(bank_account_id=acct.id, is_paid=False).all():
+            interest = int(loan.amount * loan.interest_rate)
+            if interest < 1 and loan.amount > 0:
+                interest = 1
+            loan.amount += interest
+            acct_interest += interest
+        if acct_interest > 0:
+            acct.loan_amount += acct_interest
+    db.session.flush()
+
+
+def _populate():
+    from app.extensions import db
+    from app.models.bank_account import BankAccount, LoanRecord
+    from app.models.game_session import GameSession
+    from app.models.user_account import UserAccount
+
+    user = UserAccount(username="bench", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    session_ids = [str(uuid.uuid4()) for _ in range(SESSIONS)]
+    db.session.execute(db.insert(GameSession), [
+        {"id": sid, "user_id": user.id, "name": "bench"} for sid in session_ids
+    ])
+    db.session.execute(db.insert(BankAccount), [
+        {"game_session_id": sid, "owner_name": "bench", "bank_ip": "0.0.0.0",
+         "balance": 0, "loan_amount": 0, "is_player": True}
+        for sid in session_ids for _ in range(ACCOUNTS)
+    ])
+    rng = random.Random(1)
+    account_ids = db.session.scalars(db.select(BankAccount.id)).all()
+    db.session.execute(db.insert(LoanRecord), [
+        {"bank_account_id": acct_id, "amount": rng.randint(1, 5000),
+         "interest_rate": rng.choice((0.05, 0.10, 0.20)), "is_paid": False}
+        for acct_id in account_ids for _ in range(LOANS)
+    ])
+    db.session.commit()
+    return session_ids
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "bench_loans.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from app import create_app
+    from app.extensions import db
+    from app.game import finance_engine
+
+    app = create_app()
+    with app.app_context():
+        session_ids = _populate()
+        print(f"{SESSIONS} sessions x {ACCOUNTS} accounts x {LOANS} loans")
+
+        for label, accrue in (
+            ("per-session ORM", lambda: [_legacy_accrue(sid) for sid in session_ids]),
+            ("set-based", lambda: finance_engine.accrue_all_interest(session_ids)),
+        ):
+            times = []
+            for _ in range(3):
+                start = time.perf_counter()
+                accrue()
+                db.session.commit()
+                times.append(time.perf_counter() - start)
+                db.session.expire_all()
+            print(f"{label:>16}: {min(times) * 1000:8.1f} ms per accrual (best of 3)")
+
+
+if __name__ == "__main__":
+    main()
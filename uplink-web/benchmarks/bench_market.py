@@ -0,0 +1,97 @@
+"""Benchmark: one stock market tick across 1,000 sessions x 30 companies.
+
+Compares the previous per-session ORM tick (load each session's
+``StockEntry`` objects, move them one by one, flush) with
+``finance_engine.tick_stock_markets`` (one column query, one vectorized
+step, one executemany UPDATE, then the append to the resident price
+history rings) on a SQLite database file.
+
+Run from ``uplink-web``::
+
+    python -m benchmarks.bench_market
+"""
+import os
+import random
+import tempfile
+import time
+import uuid
+
+SESSIONS = 1_000
+COMPANIES = 30
+
+
+def _legacy_tick(session_id):
+    """The per-session ORM tick this benchmark compares against."""
+    from app.extensions import db
+    from app.game.finance_engine import (
+        STOCK_PRICE_FLOOR, STOCK_TICK_MAX_CHANGE, STOCK_TICK_MIN_CHANGE,
+    )
+    from app.models.stock_market import StockEntry
+
+    for entry in StockEntry.query.filter_by(game_session_id=session_id).all():
+        vol = entry.volatility if entry.volatility > 0 else 0.1
+        change_pct = random.uniform(STOCK_TICK_MIN_CHANGE * vol / 0.1,
+                                    STOCK_TICK_MAX_CHANGE * vol / 0.1)
+        delta = int(entry.current_price * change_pct)
+        entry.previous_price = entry.current_price
+        entry.current_price = max(STOCK_PRICE_FLOOR, entry.current_price + delta)
+    db.session.flush()
+
+
+def _populate():
+    from app.extensions import db
+    from app.models.game_session import GameSession
+    from app.models.stock_market import StockEntry
+    from app.models.user_account import UserAccount
+
+    user = UserAccount(username="bench", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    session_ids = [str(uuid.uuid4()) for _ in range(SESSIONS)]
+    db.session.execute(db.insert(GameSession), [
+        {"id": sid, "user_id": user.id, "name": "bench"} for sid in session_ids
+    ])
+    rng = random.Random(1)
+    db.session.execute(db.insert(StockEntry), [
+        {
+            "game_session_id": sid,
+            "company_name": f"Company {c}",
+            "current_price": rng.randint(50, 500),
+            "previous_price": 0,
+            "volatility": round(rng.uniform(0.02, 0.15), 3),
+        }
+        for sid in session_ids for c in range(COMPANIES)
+    ])
+    db.session.commit()
+    return session_ids
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "bench_market.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from app import create_app
+    from app.extensions import db
+    from app.game import finance_engine
+
+    app = create_app()
+    with app.app_context():
+        session_ids = _populate()
+        print(f"{SESSIONS} sessions x {COMPANIES} companies = {SESSIONS * COMPANIES} entries")
+
+        for label, tick in (
+            ("per-session ORM", lambda: [_legacy_tick(sid) for sid in session_ids]),
+            ("vectorized", lambda: finance_engine.tick_stock_markets(session_ids)),
+        ):
+            times = []
+            for _ in range(3):
+                start = time.perf_counter()
+                tick()
+                db.session.commit()
+                times.append(time.perf_counter() - start)
+                db.session.expire_all()
+            print(f"{label:>16}: {min(times) * 1000:8.1f} ms per market tick (best of 3)")
+
+
+if __name__ == "__main__":
+    main()
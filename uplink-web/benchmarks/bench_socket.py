@@ -0,0 +1,131 @@
+"""Benchmark: socket event latency while the game loop ticks.
+
+Runs the real eventlet Socket.IO server on a SQLite database file holding
+the sessions of ``bench_tick`` with the game loop ticking them, and times
+heartbeat round trips from a Socket.IO client in a separate process.  Each
+database mode runs in its own server process:
+
+    off    the driver blocks the hub for every query of the tick
+    tpool  sqlite3 calls run on eventlet's native thread pool and the
+           tick yields between its steps (app/cooperative.py)
+
+Needs the Socket.IO client extras (``pip install "python-socketio[client]"``).
+
+Run from ``uplink-web``::
+
+    python -m benchmarks.bench_socket
+"""
+import sys
+
+if "--server" in sys.argv:
+    import eventlet
+    eventlet.monkey_patch()
+
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+
+PORT = 5077
+WARMUP = 2.0         # seconds before sampling starts
+DURATION = 15.0      # seconds of heartbeats per mode
+INTERVAL = 0.02      # seconds between heartbeats
+MODES = ("off", "tpool")
+
+
+def _client(url):
+    """Send heartbeats to *url* and print round-trip statistics as JSON."""
+    import socketio
+
+    client = socketio.Client()
+    pending = {}
+    rtts = []
+
+    @client.on("heartbeat_ack")
+    def on_ack(data):
+        sent = pending.pop(data.get("server_time"), None)
+        if sent is not None:
+            rtts.append(time.perf_counter() - sent)
+
+    client.connect(url, transports=["websocket"])
+    time.sleep(WARMUP)
+    end = time.perf_counter() + DURATION
+    n = 0
+    while time.perf_counter() < end:
+        n += 1
+        pending[n] = time.perf_counter()
+        client.emit("heartbeat", {"client_time": n})
+        time.sleep(INTERVAL)
+    time.sleep(1.0)
+    client.disconnect()
+
+    rtts.sort()
+    ms = [r * 1000 for r in rtts]
+    print(json.dumps({
+        "sent": n,
+        "answered": len(ms),
+        "p50_ms": round(statistics.median(ms), 2),
+        "p99_ms": round(ms[int(len(ms) * 0.99) - 1], 2),
+        "max_ms": round(ms[-1], 2),
+        "over_50ms": sum(1 for m in ms if m > 50),
+    }))
+
+
+def _server(mode):
+    """Serve the app in *mode*, run one client against it and relay its result."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_socket.db')}"
+    os.environ["DB_COOPERATIVE"] = mode
+
+    from app import create_app
+    from app.extensions import socketio
+    from app.game.game_loop import GameLoop
+    from app.ws.handlers import session_rooms
+    from benchmarks.bench_tick import _populate
+
+    app = create_app()
+    with app.app_context():
+        session_ids = _populate()
+    for sid in session_ids:
+        session_rooms[sid] = {f"bench-{sid}"}
+
+    loop = GameLoop()
+    eventlet.spawn(socketio.run, app, host="127.0.0.1", port=PORT, log_output=False)
+    eventlet.sleep(0.5)
+    loop.start(app)
+
+    client = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_socket", "--client", f"http://127.0.0.1:{PORT}"],
+        capture_output=True, text=True,
+    )
+    loop.stop()
+    result = json.loads(client.stdout.strip().splitlines()[-1])
+    result["mode"] = app.config["DB_COOPERATIVE"]
+    result["tick_mean_ms"] = loop.metrics()["tick"]["mean_ms"]
+    print(json.dumps(result))
+
+
+def main():
+    from benchmarks.bench_tick import COMPANIES, SESSIONS
+
+    print(f"{SESSIONS} sessions x {COMPANIES} companies, heartbeats every "
+          f"{INTERVAL * 1000:.0f} ms for {DURATION:.0f} s")
+    for mode in MODES:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_socket", "--server", mode],
+            capture_output=True, text=True,
+        )
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{r['mode']:>6}: heartbeat p50 {r['p50_ms']:7.2f} ms  p99 {r['p99_ms']:7.2f} ms  "
+              f"max {r['max_ms']:7.2f} ms  >50ms {r['over_50ms']:4d}/{r['answered']}  "
+              f"(tick mean {r['tick_mean_ms']:.1f} ms)")
+
+
+if __name__ == "__main__":
+    if "--client" in sys.argv:
+        _client(sys.argv[sys.argv.index("--client") + 1])
+    elif "--server" in sys.argv:
+        _server(sys.argv[sys.argv.index("--server") + 1])
+    else:
+        main()
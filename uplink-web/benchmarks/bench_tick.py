@@ -0,0 +1,100 @@
+"""Benchmark: game loop tick durations with aligned vs staggered subsystems.
+
+Runs ``GameLoop._tick`` for a number of connected sessions, each with a
+stock market and loans, twice: once with every session's periodic work on
+the same tick (phase 0, the previous ``tick_count % INTERVAL`` gating) and
+once with the per-session phase offsets.  Prints the loop's histograms of
+whole ticks and of their periodic phase (step 4, where the staggered
+subsystems run); the staggered run should show the same total work
+without the spikes.
+
+Run from ``uplink-web``::
+
+    python -m benchmarks.bench_tick
+"""
+import os
+import random
+import tempfile
+import time
+import uuid
+
+SESSIONS = 100
+COMPANIES = 30
+TICKS = 200
+
+
+def _populate():
+    from app.extensions import db
+    from app.models.bank_account import BankAccount, LoanRecord
+    from app.models.game_session import GameSession
+    from app.models.stock_market import StockEntry
+    from app.models.user_account import UserAccount
+
+    user = UserAccount(username="bench", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    session_ids = [str(uuid.uuid4()) for _ in range(SESSIONS)]
+    db.session.execute(db.insert(GameSession), [
+        {"id": sid, "user_id": user.id, "name": "bench", "is_active": True}
+        for sid in session_ids
+    ])
+    rng = random.Random(1)
+    db.session.execute(db.insert(StockEntry), [
+        {"game_session_id": sid, "company_name": f"Company {c}",
+         "current_price": rng.randint(50, 500), "previous_price": 0, "volatility": 0.1}
+        for sid in session_ids for c in range(COMPANIES)
+    ])
+    db.session.execute(db.insert(BankAccount), [
+        {"game_session_id": sid, "owner_name": "bench", "bank_ip": "0.0.0.0",
+         "balance": 0, "loan_amount": 0, "is_player": True}
+        for sid in session_ids
+    ])
+    db.session.execute(db.insert(LoanRecord), [
+        {"bank_account_id": acct_id, "amount": rng.randint(1, 5000),
+         "interest_rate": 0.1, "is_paid": False}
+        for acct_id in db.session.scalars(db.select(BankAccount.id)).all()
+    ])
+    db.session.commit()
+    return session_ids
+
+
+def _print(label, snap):
+    print(f"  {label:>8}: mean {snap['mean_ms']:7.2f} ms  max {snap['max_ms']:7.1f} ms  "
+          + "  ".join(f"{k}:{v}" for k, v in snap["buckets"].items() if v))
+
+
+def _run(loop, label):
+    for _ in range(TICKS):
+        start = time.perf_counter()
+        loop._tick()
+        loop.tick_durations.observe(time.perf_counter() - start)
+    metrics = loop.metrics()
+    print(f"{label} ({metrics['tick']['over_budget']} ticks over budget)")
+    _print("tick", metrics["tick"])
+    _print("periodic", metrics["periodic"])
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "bench_tick.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from app import create_app
+    from app.game.game_loop import GameLoop
+    from app.ws.handlers import session_rooms
+
+    class AlignedLoop(GameLoop):
+        def _phase(self, session_id, subsystem, interval):
+            return 0
+
+    app = create_app()
+    with app.app_context():
+        session_ids = _populate()
+        for sid in session_ids:
+            session_rooms[sid] = {f"bench-{sid}"}
+        print(f"{SESSIONS} sessions x {COMPANIES} companies, {TICKS} ticks")
+        _run(GameLoop(), "staggered")
+        _run(AlignedLoop(), "aligned")
+
+
+if __name__ == "__main__":
+    main()
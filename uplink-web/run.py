@@ -4,6 +4,20 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Green the standard library, and psycopg2 for PostgreSQL, before anything
+# else is imported so database calls cooperate with the eventlet hub (see
+# app/cooperative.py).
+if os.environ.get("DB_COOPERATIVE", "auto") != "off":
+    import eventlet
+    eventlet.monkey_patch()
+    if os.environ.get("DATABASE_URL", "").startswith("postgres"):
+        try:
+            from psycogreen.eventlet import patch_psycopg
+        except ImportError:
+            pass
+        else:
+            patch_psycopg()
+
 from app import create_app
 from app.extensions import socketio
 from app.game.game_loop import game_loop
@@ -21,6 +21,12 @@ const GameSocket = {
     /** @type {number} */
     _lastHeartbeat: 0,
 
+    /** Client copy of the LAN view, kept current from server patches. */
+    _lanView: null,
+
+    /** @type {number} */
+    _lanSeq: 0,
+
     // ================================================================
     // Initialization
     // ================================================================
@@ -208,7 +214,11 @@ const GameSocket = {
         // -- LAN updates --
 
         s.on('lan_update', (data) => {
-            GameState.emit('lan_update', data);
+            if (!this._applyLanUpdate(data)) {
+                this.lanResync();
+                return;
+            }
+            GameState.emit('lan_update', { lan: this._lanView, result: data.result });
         });
 
         // -- Plot updates --
@@ -398,6 +408,60 @@ const GameSocket = {
         this.socket.emit('lan_action', { session_id: this.sessionId, action: action, data: data || {} });
     },
 
+    /**
+     * Ask the server for the full LAN view (after a missed patch).
+     */
+    lanResync() {
+        this._lanView = null;
+        this.socket.emit('lan_resync', { session_id: this.sessionId });
+    },
+
+    /**
+     * Fold a lan_update message into the client LAN view.  The server sends
+     * the full view ({lan, seq}) or a patch against an earlier seq ({patch,
+     * base, seq}) holding only changed systems, links (by id) and scalars.
+     * @returns {boolean} false when the patch does not apply to our copy.
+     */
+    _applyLanUpdate(data) {
+        if (data.lan) {
+            this._lanView = data.lan;
+            this._lanSeq = data.seq;
+            return true;
+        }
+        if (!data.patch) {
+            // Nothing changed
+            return this._lanView !== null && data.seq === this._lanSeq;
+        }
+        const view = this._lanView;
+        const patch = data.patch;
+        if (view === null || data.base !== this._lanSeq ||
+                patch.computer_id !== view.computer_id) {
+            return false;
+        }
+
+        (patch.systems || []).forEach(entry => {
+            view.systems[entry.id] = entry;
+        });
+        if (patch.links) {
+            const links = new Map(view.links.map(l => [l.id, l]));
+            patch.links.forEach(entry => {
+                if (entry.visible === undefined) {
+                    links.delete(entry.id);
+                } else {
+                    links.set(entry.id, entry);
+                }
+            });
+            view.links = Array.from(links.values()).sort((a, b) => a.id - b.id);
+        }
+        Object.keys(patch).forEach(key => {
+            if (key !== 'systems' && key !== 'links') {
+                view[key] = patch[key];
+            }
+        });
+        this._lanSeq = data.seq;
+        return true;
+    },
+
     /**
      * Choose a side in the plot (arunmor or arc).
      */
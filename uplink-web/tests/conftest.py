@@ -0,0 +1,104 @@
+"""Shared fixtures: the app on an in-memory SQLite database."""
+import os
+import random
+
+# Read by app.config at import time
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["DB_COOPERATIVE"] = "off"
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.game import lan_engine, lan_store
+from app.game.lan_store import DatabaseBackend, FileBackend, LanStateStore
+from app.models.computer import Computer
+from app.models.game_session import GameSession
+from app.models.user_account import UserAccount
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+    lan_store._store = None
+    lan_engine._hot.clear()
+
+
+@pytest.fixture(params=["memory", "db", "file"])
+def store(request, app, tmp_path):
+    """The LAN state store, once per backend."""
+    backend = {
+        "memory": lambda: None,
+        "db": DatabaseBackend,
+        "file": lambda: FileBackend(str(tmp_path / "lan_states")),
+    }[request.param]()
+    lan_store._store = LanStateStore(backend=backend)
+    return lan_store._store
+
+
+@pytest.fixture
+def session_id(app):
+    user = UserAccount(username="tester", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    session = GameSession(user_id=user.id, name="Test Game")
+    db.session.add(session)
+    db.session.commit()
+    return session.id
+
+
+@pytest.fixture
+def lan_computers(session_id):
+    """One LAN computer per security level (0-4), keyed by level."""
+    computers = {}
+    for level in range(5):
+        computer = Computer(
+            game_session_id=session_id, name=f"LAN {level}", company_name="Test",
+            ip=f"10.0.0.{level}", computer_type=1, trace_speed=-1,
+            hack_difficulty=level * 100,
+        )
+        db.session.add(computer)
+        computers[level] = computer
+    db.session.commit()
+    return {level: c.id for level, c in computers.items()}
+
+
+# Player actions ``play`` picks from; the last three are not lan_action calls
+LAN_OPS = ("scan", "probe", "spoof", "force", "move", "deploy_sensor",
+           "retract", "select", "security")
+
+
+def _play(session_id, computer_id, steps, seed):
+    rng = random.Random(seed)
+    random.seed(seed)  # spoof/force rolls and the sys-admin use the module RNG
+    for _ in range(steps):
+        state = lan_engine._ensure_state(session_id, computer_id)
+        systems = state["topology"].systems
+        known = [i for i, s in enumerate(systems) if s.visible >= lan_engine.VISIBLE_AWARE]
+        if known and rng.random() < 0.9:
+            node_id = rng.choice(known)
+        else:
+            node_id = rng.randrange(len(systems))
+        op = rng.choice(LAN_OPS)
+        if op == "retract":
+            lan_engine.retract_connection(session_id, computer_id)
+        elif op == "select":
+            lan_engine.set_selected(session_id, computer_id, node_id)
+        elif op == "security":
+            lan_engine.check_lan_security(session_id, computer_id)
+        else:
+            lan_engine.lan_action(session_id, 1, computer_id, op, node_id=node_id,
+                                  tool_version=rng.randint(1, 3))
+        db.session.commit()
+        yield op
+
+
+@pytest.fixture
+def play():
+    """``play(session_id, computer_id, steps, seed)`` drives a LAN through
+    pseudo-random player actions, yielding after each one."""
+    return _play
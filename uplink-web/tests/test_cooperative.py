@@ -0,0 +1,90 @@
+"""Tests for cooperative database mode selection and the tpool wrapper."""
+import sqlite3
+
+import pytest
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app import cooperative
+
+
+@pytest.mark.parametrize("uri, patched, green, mode", [
+    ("sqlite:///game.db", False, False, "off"),
+    ("sqlite:///game.db", True, False, "tpool"),
+    ("sqlite://", True, False, "off"),
+    ("sqlite:///:memory:", True, False, "off"),
+    ("postgresql://u@h/db", False, True, "off"),
+    ("postgresql://u@h/db", True, True, "green"),
+    ("postgresql://u@h/db", True, False, "off"),
+    ("mysql://u@h/db", True, False, "off"),
+])
+def test_auto_mode(monkeypatch, uri, patched, green, mode):
+    monkeypatch.setattr(cooperative, "_eventlet_patched", lambda: patched)
+    monkeypatch.setattr(cooperative, "_psycopg_green", lambda: green)
+    assert cooperative.resolve_mode(uri) == mode
+
+
+def test_explicit_mode_wins(monkeypatch):
+    monkeypatch.setattr(cooperative, "_eventlet_patched", lambda: True)
+    assert cooperative.resolve_mode("sqlite:///game.db", "off") == "off"
+    assert cooperative.resolve_mode("sqlite://", "tpool") == "tpool"
+    with pytest.raises(ValueError):
+        cooperative.resolve_mode("sqlite://", "threads")
+
+
+@pytest.mark.parametrize("uri, database, is_uri", [
+    ("sqlite:///game.db", "{instance}/game.db", False),
+    ("sqlite:///saves/game.db", "{instance}/saves/game.db", False),
+    ("sqlite:////srv/uplink/game.db", "/srv/uplink/game.db", False),
+    ("sqlite:///file:game.db?uri=true", "file:{instance}/game.db", True),
+    ("sqlite:///file:/srv/game.db?uri=true", "file:/srv/game.db", True),
+])
+def test_sqlite_database_matches_flask_sqlalchemy(tmp_path, uri, database, is_uri):
+    instance = str(tmp_path / "instance")
+    app = Flask(__name__, instance_path=instance)
+    assert cooperative.sqlite_database(app, make_url(uri)) == (
+        database.format(instance=instance), is_uri,
+    )
+
+
+def test_tpool_engine_opens_the_instance_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    app = Flask(__name__, instance_path=str(tmp_path / "instance"))
+    app.config.update(SQLALCHEMY_DATABASE_URI="sqlite:///game.db", DB_COOPERATIVE="tpool")
+    assert cooperative.configure(app) == "tpool"
+    db = SQLAlchemy()
+    db.init_app(app)
+    with app.app_context():
+        db.session.execute(text("CREATE TABLE t (n INTEGER)"))
+        db.session.commit()
+        path = db.engine.url.database
+        db.engine.dispose()
+
+    assert path == str(tmp_path / "instance" / "game.db")
+    assert not (tmp_path / "game.db").exists()
+    check = sqlite3.connect(path)
+    assert check.execute("SELECT name FROM sqlite_master").fetchall() == [("t",)]
+    check.close()
+
+
+def test_tpool_commit_and_rollback(tmp_path):
+    path = str(tmp_path / "game.db")
+    conn = cooperative.tpool_sqlite_creator(path)()
+    assert isinstance(conn, cooperative.TpoolConnection)
+    assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE t (n INTEGER)")
+    cursor.execute("INSERT INTO t VALUES (?)", (1,))
+    cursor.executemany("INSERT INTO t VALUES (?)", [(2,), (3,)])
+    conn.commit()
+    cursor.execute("INSERT INTO t VALUES (?)", (4,))
+    conn.rollback()
+    assert [row for row in conn.execute("SELECT n FROM t ORDER BY n")] == [(1,), (2,), (3,)]
+    conn.close()
+
+    check = sqlite3.connect(path)
+    assert check.execute("SELECT COUNT(*) FROM t").fetchone() == (3,)
+    check.close()
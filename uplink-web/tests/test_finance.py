@@ -0,0 +1,115 @@
+"""Tests for set-based loan interest accrual."""
+import random
+
+import pytest
+
+from app.extensions import db
+from app.game import finance_engine
+from app.models.bank_account import BankAccount, LoanRecord
+from app.models.game_session import GameSession
+
+
+def _legacy_accrue(session_id):
+    """The per-session, row-by-row accrual ``accrue_all_interest`` replaced."""
+    loans_updated = total_interest = 0
+    accounts = BankAccount.query.filter_by(game_session_id=session_id, is_player=True).all()
+    for acct in accounts:
+        acct_interest = 0
+        for loan in LoanRecord.query.filter_by(bank_account_id=acct.id, is_paid=False).all():
+            interest = int(loan.amount * loan.interest_rate)
+            if interest < 1 and loan.amount > 0:
+                interest = 1
+            loan.amount += interest
+            acct_interest += interest
+            loans_updated += 1
+        if acct_interest > 0:
+            acct.loan_amount += acct_interest
+            total_interest += acct_interest
+    db.session.flush()
+    return {"loans_updated": loans_updated, "total_interest": total_interest}
+
+
+def _balances():
+    db.session.expire_all()
+    return (
+        sorted((loan.id, loan.amount) for loan in LoanRecord.query),
+        sorted((acct.id, acct.loan_amount) for acct in BankAccount.query),
+    )
+
+
+def _account(session_id, loans, is_player=True, loan_amount=0):
+    """A bank account with *loans*, given as (amount, rate, is_paid)."""
+    acct = BankAccount(game_session_id=session_id, owner_name="x", bank_ip="1.2.3.4",
+                       balance=0, loan_amount=loan_amount, is_player=is_player)
+    db.session.add(acct)
+    db.session.flush()
+    for amount, rate, is_paid in loans:
+        db.session.add(LoanRecord(bank_account_id=acct.id, amount=amount,
+                                  interest_rate=rate, is_paid=is_paid))
+    return acct
+
+
+def _sessions(session_id, n):
+    ids = [session_id]
+    user_id = db.session.get(GameSession, session_id).user_id
+    for i in range(n - 1):
+        session = GameSession(user_id=user_id, name=f"Game {i}")
+        db.session.add(session)
+        db.session.flush()
+        ids.append(session.id)
+    return ids
+
+
+def _compare(session_ids):
+    before = _balances()
+    expected = {}
+    for sid in session_ids:
+        result = _legacy_accrue(sid)
+        if result["loans_updated"]:
+            expected[sid] = result
+    legacy = _balances()
+    db.session.rollback()
+    assert _balances() == before
+
+    assert finance_engine.accrue_all_interest(session_ids) == expected
+    db.session.commit()
+    assert _balances() == legacy
+    return expected
+
+
+def test_accrual_edge_cases(app, session_id):
+    other, idle = _sessions(session_id, 3)[1:]
+    _account(session_id, [
+        (1000, 0.1, False),     # 100
+        (5, 0.1, False),        # 0.5 rounds up to the 1 credit minimum
+        (0, 0.2, False),        # nothing owed, no interest
+        (19, 0.1, False),       # 1.9 truncates to 1
+        (800, 0.2, True),       # paid off
+    ], loan_amount=1024)
+    _account(session_id, [(100, 0.2, False)])
+    _account(session_id, [(5000, 0.2, False)], is_player=False)
+    _account(other, [(0, 0.1, False)], loan_amount=0)
+    _account(idle, [(300, 0.1, True)])
+    db.session.commit()
+
+    assert _compare([session_id, other, idle]) == {
+        session_id: {"loans_updated": 5, "total_interest": 122},
+        other: {"loans_updated": 1, "total_interest": 0},
+    }
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_accrual_matches_legacy(app, session_id, seed):
+    rng = random.Random(seed)
+    session_ids = _sessions(session_id, 12)
+    for sid in session_ids:
+        for _ in range(rng.randint(0, 3)):
+            _account(sid, [
+                (rng.choice((0, 1, 3, 9, 150, 2999, 12345)), rng.choice((0.05, 0.1, 0.2)),
+                 rng.random() < 0.2)
+                for _ in range(rng.randint(0, 4))
+            ], is_player=rng.random() < 0.7, loan_amount=rng.randint(0, 5000))
+    db.session.commit()
+
+    # Only some sessions are due; the others must not change
+    _compare(session_ids[::2])
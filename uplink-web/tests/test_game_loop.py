@@ -0,0 +1,65 @@
+"""Tests for the game loop's staggered subsystem schedule and tick metrics."""
+import uuid
+from collections import Counter
+
+import pytest
+
+from app.game import game_loop
+from app.game.game_loop import GameLoop, TickHistogram, session_phase
+
+SUBSYSTEMS = {
+    "npc": game_loop.NPC_TICK_INTERVAL,
+    "stock": game_loop.STOCK_TICK_INTERVAL,
+    "news": game_loop.NEWS_TICK_INTERVAL,
+    "plot": game_loop.PLOT_TICK_INTERVAL,
+    "loan": game_loop.LOAN_TICK_INTERVAL,
+}
+SESSIONS = [str(uuid.uuid5(uuid.NAMESPACE_URL, f"session-{i}")) for i in range(500)]
+
+
+@pytest.mark.parametrize("subsystem, interval", SUBSYSTEMS.items())
+def test_each_session_runs_once_per_interval(subsystem, interval):
+    loop = GameLoop()
+    runs = Counter()
+    for tick in range(1, 2 * interval + 1):
+        loop._tick_count = tick
+        runs.update(sid for sid in SESSIONS if loop._due(sid, subsystem, interval))
+    assert runs == Counter({sid: 2 for sid in SESSIONS})
+
+
+@pytest.mark.parametrize("subsystem, interval", SUBSYSTEMS.items())
+def test_phases_spread_across_interval(subsystem, interval):
+    phases = Counter(session_phase(sid, subsystem, interval) for sid in SESSIONS)
+    assert all(0 <= phase < interval for phase in phases)
+    # Aligned, all 500 sessions would land on one tick
+    mean = len(SESSIONS) / interval
+    assert max(phases.values()) <= max(4, 3 * mean)
+    assert len(phases) >= min(interval, len(SESSIONS)) // 2
+
+
+def test_subsystems_get_independent_phases():
+    sid = SESSIONS[0]
+    phases = {name: session_phase(sid, name, 1000) for name in SUBSYSTEMS}
+    assert len(set(phases.values())) > 1
+
+
+def test_histogram_buckets():
+    hist = TickHistogram()
+    for seconds in (0.0005, 0.001, 0.0015, 0.15, 0.25, 2.0):
+        hist.observe(seconds)
+
+    snap = hist.snapshot()
+    assert snap["count"] == 6
+    assert snap["max_ms"] == 2000.0
+    assert snap["mean_ms"] == round((0.5 + 1 + 1.5 + 150 + 250 + 2000) / 6, 3)
+    assert snap["over_budget"] == 2
+    assert {k: v for k, v in snap["buckets"].items() if v} == {
+        "<=1ms": 2, "<=2ms": 1, "<=200ms": 1, "<=500ms": 1, ">1000ms": 1,
+    }
+    assert sum(snap["buckets"].values()) == 6
+
+
+def test_empty_histogram():
+    snap = TickHistogram().snapshot()
+    assert snap["count"] == 0 and snap["mean_ms"] == 0.0
+    assert not any(snap["buckets"].values())
@@ -0,0 +1,131 @@
+"""Tests for LAN state storage: rehydrated states must match live ones."""
+import os
+
+import pytest
+
+from sqlalchemy import event
+
+from app.extensions import db
+from app.game import lan_engine, lan_store
+from app.game.lan_store import (
+    DatabaseBackend, FileBackend, LanStateStore, decode_state, encode_state,
+)
+
+
+def _materialized(state):
+    """What a materialized state holds beyond its record, as plain values."""
+    topo = state["topology"]
+    return {
+        "record": lan_engine._to_record(state),
+        "systems": [(s.visible, s.is_compromised, s.data1) for s in topo.systems],
+        "links": [lnk.visible for lnk in topo.links],
+        "current_system": state["current_system"],
+        "known_links": state["known_links"],
+        "locked_gates": state["locked_gates"],
+    }
+
+
+@pytest.mark.parametrize("level", range(5))
+def test_rehydrated_state_equals_live(store, session_id, lan_computers, play, level):
+    computer_id = lan_computers[level]
+    key = lan_engine._state_key(session_id, computer_id)
+
+    for step, _ in enumerate(play(session_id, computer_id, 150, seed=level)):
+        live = lan_engine._hot[key]
+        record = decode_state(encode_state(lan_engine._to_record(live)))
+        assert _materialized(lan_engine._from_record(key, record)) == _materialized(live)
+
+        if store.backend is not None and step % 10 == 9:
+            # Drop every in-memory copy and reload from the backend
+            expected = _materialized(live)
+            view = lan_engine.get_lan_state(session_id, computer_id)
+            lan_engine._hot.clear()
+            store.clear()
+            assert _materialized(lan_engine._load_state(key)) == expected
+            assert lan_engine.get_lan_state(session_id, computer_id) == view
+
+
+@pytest.mark.parametrize("store", ["db", "file"], indirect=True)
+def test_hot_state_follows_other_workers(app, store, session_id, lan_computers, play):
+    computer_id = lan_computers[3]
+    key = lan_engine._state_key(session_id, computer_id)
+    for _ in play(session_id, computer_id, 20, seed=7):
+        pass
+    mine = lan_engine._load_state(key)
+
+    # Another worker, with its own memory tier, changes the LAN
+    other = LanStateStore(backend=store.backend)
+    record = other.get(key)
+    record[1] = record[1] + [lan_engine.DELTA_COMPROMISED, 0, 1]
+    other.put(key, record)
+    db.session.commit()
+
+    # The rest of this event trusts the state it already checked
+    assert lan_engine._load_state(key) is mine
+
+    with app.app_context():  # the next socket event
+        state = lan_engine._load_state(key)
+        assert state is not mine
+        assert state["topology"].systems[0].is_compromised
+        assert store.metrics()["stale"] == 1
+        assert lan_engine._load_state(key) is state
+
+
+def test_event_checks_store_version_once(app, session_id, lan_computers):
+    lan_store._store = LanStateStore(backend=DatabaseBackend())
+    computer_id = lan_computers[2]
+    with app.app_context():
+        lan_engine._ensure_state(session_id, computer_id)
+        db.session.commit()
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        with app.app_context():  # a socket LAN action
+            lan_engine.lan_action(session_id, 1, computer_id, "scan")
+            db.session.commit()
+            lan_engine.lan_view_snapshot(session_id, computer_id)
+            lan_engine.get_lan_state(session_id, computer_id)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    reads = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert len(reads) == 1, statements
+
+
+@pytest.mark.parametrize("store", ["db", "file"], indirect=True)
+def test_back_to_back_writes_by_another_worker(store, session_id):
+    key = (session_id, 1)
+    store.put(key, {"n": 0})
+    db.session.commit()
+    other = LanStateStore(backend=store.backend)
+    assert other.get(key) == {"n": 0}
+
+    on_disk = isinstance(store.backend, FileBackend)
+    if on_disk:
+        path = store.backend._path(key)
+        mtime = os.stat(path).st_mtime_ns
+    store.put(key, {"n": 1})
+    store.put(key, {"n": 2})
+    db.session.commit()
+    if on_disk:
+        # All saves within one tick of the filesystem's coarse clock
+        os.utime(path, ns=(mtime, mtime))
+
+    assert other.get(key) == {"n": 2}
+    assert other.metrics()["stale"] == 1
+
+
+def test_file_store_lives_under_instance_path(app, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(app.config, "LAN_STATE_BACKEND", "file")
+    monkeypatch.setattr(app, "instance_path", str(tmp_path / "instance"))
+    lan_store._store = None
+    assert lan_store.get_store().backend.directory == str(tmp_path / "instance" / "lan_states")
+
+    absolute = str(tmp_path / "elsewhere")
+    monkeypatch.setitem(app.config, "LAN_STATE_DIR", absolute)
+    assert LanStateStore.from_config(app.config, app.instance_path).backend.directory == absolute
@@ -0,0 +1,128 @@
+"""Tests for the cached LAN client view and the patches sent to clients."""
+import json
+
+import pytest
+
+from app.extensions import db, socketio
+from app.game import lan_engine
+from app.models.computer import Computer
+from app.models.data_file import DataFile
+from app.models.game_session import GameSession
+from app.models.gateway import Gateway
+from app.models.player import Player
+from app.models.vlocation import VLocation
+from app.ws import handlers
+from app.ws import protocol as MSG
+
+
+def _full_view(state):
+    """The client view built from scratch, ignoring the cached one."""
+    fresh = dict(state, view=None, stale_systems=set(), stale_links=set())
+    return lan_engine._client_view(fresh)
+
+
+@pytest.mark.parametrize("level", range(5))
+def test_incremental_view_equals_full_rebuild(app, session_id, lan_computers, play, level):
+    computer_id = lan_computers[level]
+    key = lan_engine._state_key(session_id, computer_id)
+
+    for _ in play(session_id, computer_id, 150, seed=100 + level):
+        state = lan_engine._hot[key]
+        epoch, systems, links, link_entries = lan_engine._client_view(state)
+        assert epoch == state["epoch"]
+        _, full_systems, full_links, full_entries = _full_view(state)
+        assert systems == full_systems
+        assert links == full_links
+        assert link_entries == full_entries
+
+
+def _apply_patch(view, patch):
+    """Fold *patch* into a client *view* the way static/js/socket.js does."""
+    assert patch["computer_id"] == view["computer_id"]
+    for entry in patch.get("systems", []):
+        view["systems"][entry["id"]] = entry
+    if "links" in patch:
+        links = {link["id"]: link for link in view["links"]}
+        for entry in patch["links"]:
+            if "visible" in entry:
+                links[entry["id"]] = entry
+            else:
+                links.pop(entry["id"], None)
+        view["links"] = [links[link_id] for link_id in sorted(links)]
+    for key, value in patch.items():
+        if key not in ("systems", "links"):
+            view[key] = value
+
+
+def _wire(value):
+    """*value* as a client receives it."""
+    return json.loads(json.dumps(value))
+
+
+@pytest.mark.parametrize("level", range(5))
+def test_patch_turns_old_view_into_new(app, session_id, lan_computers, play, level):
+    computer_id = lan_computers[level]
+    client_view = _wire(lan_engine.get_lan_state(session_id, computer_id))
+    before = lan_engine.lan_view_snapshot(session_id, computer_id)
+    patches = 0
+
+    for _ in play(session_id, computer_id, 150, seed=200 + level):
+        after = lan_engine.lan_view_snapshot(session_id, computer_id)
+        patch = lan_engine.diff_lan_views(before, after)
+        if patch is not None:
+            _apply_patch(client_view, _wire(patch))
+            patches += 1
+        assert client_view == _wire(lan_engine.get_lan_state(session_id, computer_id))
+        before = after
+    assert patches
+
+
+def test_socket_updates_track_server_view(app, session_id, lan_computers):
+    gateway = Gateway(game_session_id=session_id)
+    db.session.add(gateway)
+    db.session.flush()
+    player = Player(game_session_id=session_id, name="Tester", handle="tester",
+                    localhost_ip="127.0.0.1", gateway_id=gateway.id)
+    localhost = Computer(game_session_id=session_id, name="Gateway", company_name="Player",
+                         ip="127.0.0.1", computer_type=4, trace_speed=-1, hack_difficulty=0)
+    db.session.add_all([player, localhost])
+    db.session.flush()
+    db.session.add(VLocation(game_session_id=session_id, ip="127.0.0.1", x=0, y=0,
+                             computer_id=localhost.id))
+    db.session.commit()
+    user_id = db.session.get(GameSession, session_id).user_id
+    computer_id = lan_computers[2]
+
+    client = socketio.test_client(app)
+    client.emit("join", {"session_id": session_id, "user_id": user_id})
+    client.get_received()
+    joined, = [s for s in handlers.sessions.values() if s.game_session_id == session_id]
+    joined.computer_id = computer_id
+
+    def send(action, node_id=None):
+        client.emit(MSG.MSG_LAN_ACTION, {"action": action, "data": {"node_id": node_id}})
+        return [(m["name"], m["args"][0]) for m in client.get_received()]
+
+    # Tools are looked up on the gateway, not taken from the client
+    assert send("scan") == [(MSG.MSG_ERROR, {"message": "LAN_Scan is required"})]
+    assert send("move", "1") == [(MSG.MSG_ERROR, {"message": "node_id must be an integer"})]
+    for name in ("LAN_Scan v3", "LAN_Probe v2"):
+        db.session.add(DataFile(computer_id=localhost.id, filename=name, size=2,
+                                file_type=1, softwaretype=6))
+    db.session.commit()
+
+    view, seq = None, None
+    for action, node_id in [("scan", None), ("probe", 1), ("move", 1), ("scan", None),
+                            ("probe", 2), ("move", 2), ("scan", None), ("move", 0)]:
+        for name, data in send(action, node_id):
+            if name != MSG.MSG_LAN_UPDATE:
+                continue
+            if "lan" in data:
+                view = data["lan"]
+            elif "patch" in data:
+                assert data["base"] == seq
+                _apply_patch(view, data["patch"])
+            seq = data["seq"]
+            assert view == _wire(lan_engine.get_lan_state(session_id, computer_id))
+    assert seq > 1
+    client.disconnect()
@@ -0,0 +1,39 @@
+"""Tests for the stock price history rings."""
+import pytest
+
+from app.game import stock_history
+from app.game.event_scheduler import TICKS_PER_GAME_MINUTE
+from app.game.stock_history import MarketHistory, decode_history, encode_history
+
+HOUR = 60 * TICKS_PER_GAME_MINUTE
+
+
+@pytest.mark.parametrize("resolution", stock_history.RESOLUTIONS)
+def test_company_listed_mid_bucket_keeps_its_low(resolution):
+    history = MarketHistory()
+    history.record(0, ["Old"], [50])
+    # Same hour and day bucket, next minute bucket
+    history.record(TICKS_PER_GAME_MINUTE, ["Old", "New"], [52, 7])
+    history.record(TICKS_PER_GAME_MINUTE, ["Old", "New"], [51, 9])
+
+    assert history.points("New", resolution=resolution) == [
+        [TICKS_PER_GAME_MINUTE if resolution == "minute" else 0, 9, 7, 9],
+    ]
+    assert history.points("Old", resolution=resolution)[-1][2] == (
+        51 if resolution == "minute" else 50
+    )
+    restored = decode_history(encode_history(history))
+    assert restored.points("New", resolution=resolution) == history.points(
+        "New", resolution=resolution
+    )
+
+
+def test_buckets_fold_samples():
+    history = MarketHistory()
+    for i, price in enumerate((10, 30, 20, 25)):
+        history.record(i * 15 * TICKS_PER_GAME_MINUTE, ["Co"], [price])
+    history.record(HOUR, ["Co"], [40])
+
+    assert history.points("Co", resolution="hour") == [[0, 25, 10, 30], [HOUR, 40, 40, 40]]
+    assert history.points("Co", resolution="day") == [[0, 40, 10, 40]]
+    assert len(history.points("Co", resolution="minute")) == 5
@@ -0,0 +1,146 @@
+"""Typed working-state columns for running_tasks
+
+Moves tool working state (Password_Breaker progress, File_Copier /
+File_Deleter file ids, Log_Deleter log ids) out of the ``target_data`` JSON
+blob into typed columns and converts in-flight tasks.
+
+Safe to run against databases created by ``init_db`` after this change:
+columns that already exist are left alone.
+
+Revision ID: 0001_task_state
+Revises:
+Create Date: 2026-10-19
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_task_state'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _new_columns() -> list[sa.Column]:
+    return [
+        sa.Column("total_ticks", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("password", sa.String(64), nullable=True),
+        sa.Column("char_index", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("ticks_per_char", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("ticks_into_char", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("file_id", sa.Integer(), nullable=True),
+        sa.Column("log_id", sa.String(16), nullable=True),
+    ]
+
+
+_tasks = sa.table(
+    "running_tasks",
+    sa.column("id", sa.Integer),
+    sa.column("tool_name", sa.String),
+    sa.column("target_data", sa.String),
+    sa.column("progress", sa.Float),
+    sa.column("ticks_remaining", sa.Float),
+    sa.column("is_active", sa.Boolean),
+    sa.column("total_ticks", sa.Float),
+    sa.column("password", sa.String),
+    sa.column("char_index", sa.Integer),
+    sa.column("ticks_per_char", sa.Float),
+    sa.column("ticks_into_char", sa.Float),
+    sa.column("file_id", sa.Integer),
+    sa.column("log_id", sa.String),
+)
+
+
+def _total_ticks(tool_name: str, td: dict, progress: float, remaining: float) -> float:
+    if tool_name == "Password_Breaker":
+        return td.get("ticks_per_char", 1) * len(td.get("password", ""))
+    if 0.0 < progress < 1.0:
+        return remaining / (1.0 - progress)
+    return max(0.0, remaining)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "running_tasks" not in inspector.get_table_names():
+        return  # fresh database; init_db creates the full table
+
+    existing = {c["name"] for c in inspector.get_columns("running_tasks")}
+    missing = [c for c in _new_columns() if c.name not in existing]
+    if missing:
+        with op.batch_alter_table("running_tasks") as batch:
+            for col in missing:
+                batch.add_column(col)
+
+    # Convert in-flight tasks from the JSON blob to typed columns.
+    rows = bind.execute(
+        sa.select(
+            _tasks.c.id, _tasks.c.tool_name, _tasks.c.target_data,
+            _tasks.c.progress, _tasks.c.ticks_remaining,
+        ).where(_tasks.c.is_active == sa.true())
+    ).all()
+    for row in rows:
+        try:
+            td = json.loads(row.target_data or "{}")
+        except ValueError:
+            td = {}
+        values: dict = {
+            "total_ticks": _total_ticks(
+                row.tool_name, td, row.progress or 0.0, row.ticks_remaining or 0.0
+            ),
+        }
+        if row.tool_name == "Password_Breaker":
+            values.update(
+                password=td.get("password", ""),
+                char_index=int(td.get("char_index", 0)),
+                ticks_per_char=float(td.get("ticks_per_char", 1)),
+                ticks_into_char=float(td.get("ticks_into_char", 0.0)),
+            )
+        elif row.tool_name in ("File_Copier", "File_Deleter"):
+            if td.get("file_id") is not None:
+                values["file_id"] = int(td["file_id"])
+        elif row.tool_name == "Log_Deleter":
+            if td.get("log_id") is not None:
+                values["log_id"] = str(td["log_id"])
+        bind.execute(_tasks.update().where(_tasks.c.id == row.id).values(**values))
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    # Write in-flight state back into target_data before dropping columns.
+    rows = bind.execute(
+        sa.select(
+            _tasks.c.id, _tasks.c.tool_name, _tasks.c.password,
+            _tasks.c.char_index, _tasks.c.ticks_per_char,
+            _tasks.c.ticks_into_char, _tasks.c.file_id, _tasks.c.log_id,
+        ).where(_tasks.c.is_active == sa.true())
+    ).all()
+    for row in rows:
+        td: dict = {}
+        if row.tool_name == "Password_Breaker":
+            password = row.password or ""
+            td = {
+                "password": password,
+                "revealed": password[: row.char_index or 0],
+                "char_index": row.char_index or 0,
+                "ticks_per_char": row.ticks_per_char or 1,
+                "ticks_into_char": row.ticks_into_char or 0.0,
+            }
+        elif row.tool_name in ("File_Copier", "File_Deleter"):
+            td = {"file_id": row.file_id}
+        elif row.tool_name == "Log_Deleter":
+            log_id = row.log_id
+            td = {"log_id": int(log_id) if log_id and log_id.isdigit() else log_id}
+        bind.execute(
+            _tasks.update().where(_tasks.c.id == row.id).values(target_data=json.dumps(td))
+        )
+
+    with op.batch_alter_table("running_tasks") as batch:
+        for col in reversed(_new_columns()):
+            batch.drop_column(col.name)
@@ -0,0 +1,47 @@
+"""World version counters for the map endpoint
+
+Adds ``game_sessions.world_version`` and ``vlocations.world_version`` so the
+world map can be served with ETags and "links added since version N"
+deltas.  Existing locations are treated as part of version 0.
+
+Revision ID: 0002_world_version
+Revises: 0001_task_state
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_world_version'
+down_revision: Union[str, None] = '0001_task_state'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_TABLES = ("game_sessions", "vlocations")
+
+
+def _column() -> sa.Column:
+    return sa.Column("world_version", sa.Integer(), nullable=False, server_default="0")
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+    for table in _TABLES:
+        if table not in tables:
+            continue  # fresh database; init_db creates the full table
+        existing = {c["name"] for c in inspector.get_columns(table)}
+        if "world_version" not in existing:
+            with op.batch_alter_table(table) as batch:
+                batch.add_column(_column())
+
+
+def downgrade() -> None:
+    for table in reversed(_TABLES):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("world_version")
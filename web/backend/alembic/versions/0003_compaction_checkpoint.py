@@ -0,0 +1,47 @@
+"""Compaction checkpoint columns on game_sessions
+
+Adds ``purge_table``, ``purge_last_id`` and ``rows_purged`` so the
+background compaction job can resume purging a deleted session where it
+left off.
+
+Revision ID: 0003_compaction
+Revises: 0002_world_version
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_compaction'
+down_revision: Union[str, None] = '0002_world_version'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column("purge_table", sa.String(64), nullable=True),
+        sa.Column("purge_last_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rows_purged", sa.Integer(), nullable=False, server_default="0"),
+    ]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "game_sessions" not in inspector.get_table_names():
+        return  # fresh database; init_db creates the full table
+    existing = {c["name"] for c in inspector.get_columns("game_sessions")}
+    with op.batch_alter_table("game_sessions") as batch:
+        for column in _columns():
+            if column.name not in existing:
+                batch.add_column(column)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("game_sessions") as batch:
+        for column in reversed(_columns()):
+            batch.drop_column(column.name)
@@ -1,13 +1,26 @@
+import os
+import tempfile
 import uuid
-from fastapi import APIRouter, Depends, HTTPException
+from pathlib import Path
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
+from app.config import settings
 from app.database import get_db
+from app.json_codec import FastJSONResponse
+from app.session_store import drop_session_storage, get_session_db, session_db
 from app.auth.deps import get_current_user
 from app.models.user_account import UserAccount
 from app.models.game_session import GameSession
 from app.models.player import Player
+from app.game import connection_manager as cm
+from app.game import mission_board
+from app.game import mission_engine
+from app.game import route_planner
+from app.game import snapshot
+from app.game import world_map
 
 router = APIRouter(prefix="/api/game", tags=["game"])
 
@@ -24,6 +37,13 @@ class GameSessionResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class RouteRequest(BaseModel):
+    target_ip: str
+    hops: int = route_planner.DEFAULT_HOPS
+    avoid_high_trace: bool = True
+    min_spread: float = 0.0
+    apply: bool = False
+
 class NewGameResponse(BaseModel):
     session: GameSessionResponse
     player_id: int
@@ -45,8 +65,15 @@ async def new_game(
     db.add(session)
     await db.flush()
 
-    player = await generate_world(db, session_id, req.player_name, req.handle)
-    await db.commit()
+    try:
+        async with session_db(session_id, db, create=True) as world_db:
+            player = await generate_world(world_db, session_id, req.player_name, req.handle)
+            await world_db.commit()
+        await db.commit()
+    except Exception:
+        # The catalogue row never landed; don't leave its world file behind.
+        await drop_session_storage(session_id)
+        raise
 
     return NewGameResponse(
         session=GameSessionResponse.model_validate(session),
@@ -66,8 +93,9 @@ async def list_games(
 @router.get("/{session_id}/world")
 async def get_world_data(
     session_id: str,
+    if_none_match: str | None = Header(None),
     user: UserAccount = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_session_db),
 ):
     from app.models.vlocation import VLocation
     from app.models.company import Company
@@ -76,6 +104,10 @@ async def get_world_data(
     if not session or session.user_id != user.id:
         raise HTTPException(status_code=404, detail="Game not found")
 
+    etag = world_map.make_etag(session_id, session.world_version or 0, "world")
+    if world_map.etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
     locations_result = await db.execute(
         select(VLocation).where(VLocation.game_session_id == session_id, VLocation.listed == True)
     )
@@ -86,7 +118,7 @@ async def get_world_data(
     )
     companies = companies_result.scalars().all()
 
-    return {
+    return FastJSONResponse({
         "locations": [
             {"ip": loc.ip, "x": loc.x, "y": loc.y}
             for loc in locations
@@ -95,13 +127,52 @@ async def get_world_data(
             {"name": c.name, "size": c.size}
             for c in companies
         ],
-    }
+    }, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+@router.get("/{session_id}/map")
+async def get_world_map(
+    session_id: str,
+    zoom: int = Query(0, ge=0, le=world_map.MAX_ZOOM),
+    since: int | None = Query(None, ge=0),
+    if_none_match: str | None = Header(None),
+    user: UserAccount = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session_db),
+):
+    """Clustered world map at ``zoom``, or the links added after ``since``."""
+    session = await db.get(GameSession, session_id)
+    if not session or session.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    version = session.world_version or 0
+    part = f"z{zoom}" if since is None else f"s{since}"
+    etag = world_map.make_etag(session_id, version, part)
+    if world_map.etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    if since is not None:
+        content = {
+            "version": version,
+            "since": since,
+            "added": await world_map.locations_since(db, session_id, since),
+        }
+    else:
+        wm = await world_map.get_map(db, session_id, version)
+        content = {
+            "version": version,
+            "zoom": zoom,
+            "tile_size": world_map.tile_size(zoom),
+            "location_count": wm.location_count,
+            "clusters": wm.levels[zoom],
+        }
+    return FastJSONResponse(
+        content, headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+    )
 
 @router.get("/{session_id}/player")
 async def get_player(
     session_id: str,
     user: UserAccount = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_session_db),
 ):
     session = await db.get(GameSession, session_id)
     if not session or session.user_id != user.id:
@@ -125,30 +196,97 @@ async def get_player(
     }
 
 
+@router.post("/{session_id}/route")
+async def plan_route(
+    session_id: str,
+    req: RouteRequest,
+    user: UserAccount = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session_db),
+):
+    """Plan a bounce chain to ``target_ip``; optionally apply it."""
+    session = await db.get(GameSession, session_id)
+    if not session or session.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Game not found")
+    player = (await db.execute(
+        select(Player).where(Player.game_session_id == session_id)
+    )).scalar_one_or_none()
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    try:
+        route = await route_planner.plan_route(
+            db, session_id, player.id, req.target_ip,
+            hops=req.hops,
+            avoid_high_trace=req.avoid_high_trace,
+            min_spread=req.min_spread,
+        )
+        nodes = None
+        if req.apply:
+            nodes = await cm.set_bounce_chain(db, session_id, player.id, route)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"route": route, "nodes": nodes}
+
+
+def _snapshot_path(session_id: str) -> Path:
+    """Saved snapshot file for *session_id* (404 for non-UUID ids)."""
+    try:
+        canonical = str(uuid.UUID(session_id))
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return Path(settings.SNAPSHOT_DIR) / f"{canonical}.ulsnap"
+
+
+async def _restored(db: AsyncSession, session: GameSession) -> NewGameResponse:
+    async with session_db(session.id, db) as world_db:
+        player_id = (await world_db.execute(
+            select(Player.id).where(Player.game_session_id == session.id)
+        )).scalar_one()
+    return NewGameResponse(
+        session=GameSessionResponse.model_validate(session),
+        player_id=player_id,
+    )
+
+
 @router.post("/{session_id}/save")
 async def save_game(
     session_id: str,
     user: UserAccount = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_session_db),
 ):
-    """Save current game state. Since we use DB-backed state, this just
-    updates the timestamp and marks the session as saved."""
+    """Write a snapshot of the session to ``SNAPSHOT_DIR``.
+
+    The live state is already in the database; the snapshot is a portable
+    copy that can be downloaded, imported elsewhere or cloned.
+    """
     session = await db.get(GameSession, session_id)
     if not session or session.user_id != user.id:
         raise HTTPException(status_code=404, detail="Game not found")
-    # Just update the timestamp (state is already in DB)
+    path = _snapshot_path(session_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as out:
+        stats = await snapshot.export_session(db, session_id, out)
+    os.replace(tmp, path)
     session.updated_at = func.now()
     await db.flush()
-    return {"status": "saved", "game_time_ticks": session.game_time_ticks}
+    return {
+        "status": "saved",
+        "game_time_ticks": session.game_time_ticks,
+        "snapshot": {
+            "bytes": path.stat().st_size,
+            "rows": sum(stats["tables"].values()),
+        },
+    }
 
 
 @router.get("/{session_id}/load")
 async def load_game(
     session_id: str,
     user: UserAccount = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_session_db),
 ):
-    """Load game session data for resuming."""
+    """Load game session data for resuming, plus the last saved snapshot."""
     session = await db.get(GameSession, session_id)
     if not session or session.user_id != user.id:
         raise HTTPException(status_code=404, detail="Game not found")
@@ -157,12 +295,92 @@ async def load_game(
     )).scalar_one_or_none()
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
+    saved = None
+    path = _snapshot_path(session_id)
+    if path.is_file():
+        with open(path, "rb") as f:
+            header = snapshot.read_header(f)
+        saved = {
+            "version": header["version"],
+            "bytes": path.stat().st_size,
+            "game_time_ticks": header["session"]["game_time_ticks"],
+        }
     return {
         "session": GameSessionResponse.model_validate(session),
         "player_id": player.id,
+        "snapshot": saved,
     }
 
 
+@router.get("/{session_id}/snapshot")
+async def download_snapshot(
+    session_id: str,
+    user: UserAccount = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Download the snapshot written by the last save."""
+    session = await db.get(GameSession, session_id)
+    if not session or session.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Game not found")
+    path = _snapshot_path(session_id)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="No saved snapshot")
+    return FileResponse(
+        path, media_type="application/octet-stream", filename=path.name
+    )
+
+
+@router.post("/import", response_model=NewGameResponse)
+async def import_game(
+    request: Request,
+    user: UserAccount = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Restore a snapshot (the raw request body) as a new game session."""
+    limit = settings.SNAPSHOT_MAX_BYTES
+    too_large = HTTPException(status_code=413, detail=f"Snapshot exceeds {limit} bytes")
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > limit:
+        raise too_large
+    with tempfile.SpooledTemporaryFile(max_size=settings.SNAPSHOT_SPOOL_BYTES) as buf:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > limit:
+                raise too_large
+            buf.write(chunk)
+        buf.seek(0)
+        try:
+            session = await snapshot.import_session(db, buf, user.id, max_bytes=limit)
+        except snapshot.SnapshotTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return await _restored(db, session)
+
+
+@router.post("/{session_id}/clone", response_model=NewGameResponse)
+async def clone_game(
+    session_id: str,
+    user: UserAccount = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session_db),
+):
+    """Copy the session's current state into a new game session."""
+    session = await db.get(GameSession, session_id)
+    if not session or session.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Game not found")
+    with tempfile.SpooledTemporaryFile(max_size=settings.SNAPSHOT_SPOOL_BYTES) as buf:
+        await snapshot.export_session(db, session_id, buf)
+        # End the export's read transaction: on SQLite, upgrading it to a
+        # write while another import holds the write lock fails at once.
+        await db.commit()
+        buf.seek(0)
+        clone = await snapshot.import_session(
+            db, buf, user.id, name=f"{session.name} (copy)"
+        )
+    return await _restored(db, clone)
+
+
 @router.delete("/{session_id}")
 async def delete_game(
     session_id: str,
@@ -174,5 +392,10 @@ async def delete_game(
     if not session or session.user_id != user.id:
         raise HTTPException(status_code=404, detail="Game not found")
     session.is_active = False
-    await db.flush()
+    await db.commit()
+    await drop_session_storage(session_id)
+    route_planner.invalidate(session_id)
+    world_map.invalidate(session_id)
+    mission_engine.invalidate_pool(session_id)
+    mission_board.invalidate(session_id)
     return {"status": "deleted"}
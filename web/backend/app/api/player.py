@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
-from app.database import get_db
+from app.session_store import get_session_db
 from app.auth.deps import get_current_user
 from app.models.user_account import UserAccount
 from app.models.game_session import GameSession
@@ -68,7 +68,7 @@ async def _get_gateway_computer_id(
 async def get_messages(
     session_id: str,
     user: UserAccount = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_session_db),
 ):
     """Return all messages for the player, ordered by created_at_tick desc."""
     player = await _get_player(db, session_id, user)
@@ -102,7 +102,7 @@ async def mark_message_read(
     session_id: str,
     message_id: int,
     user: UserAccount = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_session_db),
 ):
     """Mark a message as read."""
     player = await _get_player(db, session_id, user)
@@ -132,7 +132,7 @@ async def mark_message_read(
 async def get_accepted_missions(
     session_id: str,
     user: UserAccount = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_session_db),
 ):
     """Return accepted (but not completed) missions for the player."""
     player = await _get_player(db, session_id, user)
@@ -171,7 +171,7 @@ async def accept_mission(
     session_id: str,
     mission_id: int,
     user: UserAccount = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_session_db),
 ):
     """Accept a mission from the BBS."""
     player = await _get_player(db, session_id, user)
@@ -191,7 +191,7 @@ async def complete_mission(
     session_id: str,
     mission_id: int,
     user: UserAccount = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_session_db),
 ):
     """Check and complete a mission, crediting payment and updating ratings."""
     player = await _get_player(db, session_id, user)
@@ -230,7 +230,7 @@ async def complete_mission(
 async def get_gateway(
     session_id: str,
     user: UserAccount = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_session_db),
 ):
     """Return the player's gateway info, files on it, and memory usage."""
     player = await _get_player(db, session_id, user)
@@ -289,7 +289,7 @@ async def delete_gateway_file(
     session_id: str,
     file_id: int,
     user: UserAccount = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_session_db),
 ):
     """Delete a file from the player's gateway."""
     player = await _get_player(db, session_id, user)
@@ -318,7 +318,7 @@ async def delete_gateway_file(
 async def get_software_list(
     session_id: str,
     user: UserAccount = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_session_db),
 ):
     """Return installed software on the player's gateway."""
     player = await _get_player(db, session_id, user)
@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
 from app.database import get_db
+from app.session_store import session_db
 from app.auth.deps import get_current_user
 from app.models.player import Player
 from app.models.gateway import Gateway
@@ -37,6 +38,16 @@ async def _resolve_gateway_computer_id(
 
 @router.post("/buy-software")
 async def buy_software(req: BuyRequest, user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    try:
+        async with session_db(req.session_id, db) as sdb:
+            result = await _buy_software(req, sdb)
+            await sdb.commit()
+    except ValueError:
+        raise HTTPException(404, "Game not found")
+    return result
+
+
+async def _buy_software(req: BuyRequest, db: AsyncSession) -> dict:
     # Validate item index
     if req.item_index < 0 or req.item_index >= len(C.SOFTWARE_UPGRADES):
         raise HTTPException(400, "Invalid software index")
@@ -92,6 +103,16 @@ async def buy_software(req: BuyRequest, user=Depends(get_current_user), db: Asyn
 
 @router.post("/buy-hardware")
 async def buy_hardware(req: BuyRequest, user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    try:
+        async with session_db(req.session_id, db) as sdb:
+            result = await _buy_hardware(req, sdb)
+            await sdb.commit()
+    except ValueError:
+        raise HTTPException(404, "Game not found")
+    return result
+
+
+async def _buy_hardware(req: BuyRequest, db: AsyncSession) -> dict:
     if req.item_index < 0 or req.item_index >= len(C.HARDWARE_UPGRADES):
         raise HTTPException(400, "Invalid hardware index")
 
@@ -26,6 +26,39 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     CORS_ORIGINS: list[str] = ["http://localhost:5173"]
+    # "shared" keeps every game session in DATABASE_URL; "per_session" stores
+    # each session's world in its own SQLite file under SESSION_DB_DIR and
+    # keeps only users and the session catalogue in DATABASE_URL.
+    STORAGE_MODE: str = "shared"
+    SESSION_DB_DIR: str = "./sessions"
+    SESSION_DB_CACHE_SIZE: int = 64
+    # Seconds without any inbound WebSocket message (the client heartbeats
+    # every 10s) before the socket is considered dead and reaped.
+    WS_HEARTBEAT_TIMEOUT: float = 30.0
+    # Group commit for WebSocket actions: number of DB workers, how long a
+    # worker waits for more actions before committing, and the batch cap.
+    WS_DB_WORKERS: int = 2
+    WS_BATCH_WINDOW: float = 0.005
+    WS_BATCH_MAX: int = 64
+    # Where save_game writes session snapshots, how much of an uploaded
+    # snapshot is buffered in memory before spilling to a temp file, and the
+    # largest upload accepted (applied to the body and to its decompressed
+    # stream alike).
+    SNAPSHOT_DIR: str = "./snapshots"
+    SNAPSHOT_SPOOL_BYTES: int = 8 * 1024 * 1024
+    SNAPSHOT_MAX_BYTES: int = 256 * 1024 * 1024
+    # Background purge of deleted sessions: seconds between passes, rows
+    # deleted per short transaction, and the pause between batches.
+    # COMPACTION_ABANDONED_DAYS > 0 also retires sessions untouched for that
+    # many days.  A full SQLite VACUUM locks the database, so it only runs
+    # when COMPACTION_FULL_VACUUM is set.
+    COMPACTION_INTERVAL: float = 300.0
+    COMPACTION_BATCH: int = 500
+    COMPACTION_BATCH_PAUSE: float = 0.05
+    COMPACTION_ABANDONED_DAYS: int = 0
+    COMPACTION_FULL_VACUUM: bool = False
+    # Processes generating new worlds off the event loop (0 = in-process).
+    WORLDGEN_WORKERS: int = 2
 
     model_config = {"env_prefix": "UPLINK_"}
 
@@ -1,8 +1,33 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+
+def enable_sqlite_savepoints(engine: AsyncEngine) -> AsyncEngine:
+    """Let SQLAlchemy own transaction boundaries on a SQLite engine.
+
+    The sqlite3 driver only emits BEGIN lazily before DML, so a SAVEPOINT
+    issued first would start (and its RELEASE commit) a transaction of its
+    own.  This is the recipe from the SQLAlchemy SQLite dialect docs; it is
+    a no-op for other backends.
+    """
+    if engine.dialect.name != "sqlite":
+        return engine
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _no_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        if conn.get_execution_options().get("isolation_level") != "AUTOCOMMIT":
+            conn.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+engine = enable_sqlite_savepoints(create_async_engine(settings.DATABASE_URL, echo=False))
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -27,5 +52,8 @@ async def init_db():
         databank, logbank, person, player, connection, gateway,
         company, mission, message, running_task, scheduled_event,
     )
+    from app.session_store import per_session_enabled, shared_tables
+    # In per-session mode the world tables live in per-session files instead
+    tables = shared_tables() if per_session_enabled() else None
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
@@ -0,0 +1,258 @@
+"""Background compaction -- purges the rows of deleted game sessions.
+
+``delete_game`` only flips ``GameSession.is_active``; the session's world
+stays in the database until this job removes it.  Every
+``COMPACTION_INTERVAL`` seconds the compactor:
+
+1. Optionally retires *abandoned* sessions (no update for
+   ``COMPACTION_ABANDONED_DAYS`` days and no live WebSocket).
+2. For each inactive session, deletes its rows table by table (children
+   first) in batches of ``COMPACTION_BATCH`` ids, each batch in its own
+   short transaction followed by a ``COMPACTION_BATCH_PAUSE`` sleep, so
+   the game loop never waits long for the write lock.
+3. Records a checkpoint (table, last id deleted, rows reclaimed) on the
+   ``GameSession`` row after every batch.  Batches walk the primary key
+   from the checkpoint, so a restarted job neither rescans what it already
+   deleted nor needs an index on ``game_session_id``.
+4. Deletes the ``GameSession`` row itself once its world is gone.
+5. Refreshes planner statistics for the purged tables (``ANALYZE`` with a
+   bounded ``analysis_limit`` on SQLite, ``VACUUM (ANALYZE)`` on
+   PostgreSQL).  A full SQLite ``VACUUM`` rewrites and locks the whole
+   file, so it only runs when ``COMPACTION_FULL_VACUUM`` is set; databases
+   created with ``auto_vacuum=INCREMENTAL`` get an incremental vacuum
+   instead.
+
+In per-session storage mode the world already went away with the session
+file, so only the catalogue row is purged.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.database import async_session, engine as shared_engine
+from app.game import mission_board, mission_engine, route_planner, world_map
+from app.models.game_session import GameSession
+from app.session_store import (
+    drop_session_storage, per_session_enabled, session_models, session_scope,
+    session_tables,
+)
+
+log = logging.getLogger(__name__)
+
+# Pages released per incremental vacuum step (SQLite auto_vacuum=INCREMENTAL).
+INCREMENTAL_VACUUM_PAGES = 2000
+# Rows sampled per index by SQLite's ANALYZE; keeps the statement short.
+ANALYSIS_LIMIT = 1000
+
+
+class Compactor:
+    """Background job that reclaims the storage of inactive sessions."""
+
+    def __init__(
+        self,
+        session_factory=async_session,
+        engine: AsyncEngine | None = None,
+        batch: int | None = None,
+        pause: float | None = None,
+        interval: float | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._engine = engine if engine is not None else shared_engine
+        self.batch = max(1, batch if batch is not None else settings.COMPACTION_BATCH)
+        self.pause = settings.COMPACTION_BATCH_PAUSE if pause is None else pause
+        self.interval = settings.COMPACTION_INTERVAL if interval is None else interval
+        self._running = False
+        self._task: asyncio.Task | None = None
+        # Metrics
+        self.passes = 0
+        self.batches = 0
+        self.sessions_purged = 0
+        self.sessions_retired = 0
+        self.reclaimed: Counter = Counter()
+        self.last_run: float | None = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._loop())
+        log.info("Compaction started (every %.0fs)", self.interval)
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while self._running:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Unhandled error in compaction pass")
+
+    def metrics(self) -> dict:
+        return {
+            "passes": self.passes,
+            "batches": self.batches,
+            "sessions_purged": self.sessions_purged,
+            "sessions_retired": self.sessions_retired,
+            "rows_reclaimed": sum(self.reclaimed.values()),
+            "rows_reclaimed_by_table": dict(self.reclaimed),
+            "last_run": self.last_run,
+        }
+
+    # ------------------------------------------------------------------
+    # Passes
+    # ------------------------------------------------------------------
+
+    async def run_once(self) -> dict:
+        """Run one compaction pass; returns what it reclaimed."""
+        retired = await self._retire_abandoned()
+        async with self._session_factory() as db:
+            session_ids = (await db.execute(
+                select(GameSession.id)
+                .where(GameSession.is_active == False)  # noqa: E712
+                .order_by(GameSession.updated_at)
+            )).scalars().all()
+
+        before = Counter(self.reclaimed)
+        for session_id in session_ids:
+            await self.purge_session(session_id)
+        reclaimed = self.reclaimed - before
+
+        if reclaimed:
+            await self._maintain(list(reclaimed))
+        self.passes += 1
+        self.last_run = time.time()
+        return {
+            "sessions": len(session_ids),
+            "retired": retired,
+            "rows": sum(reclaimed.values()),
+        }
+
+    async def _retire_abandoned(self) -> int:
+        """Mark sessions untouched for COMPACTION_ABANDONED_DAYS as inactive."""
+        days = settings.COMPACTION_ABANDONED_DAYS
+        if days <= 0:
+            return 0
+        from app.ws.handler import manager
+
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
+        async with self._session_factory() as db:
+            stale = (await db.execute(
+                select(GameSession).where(
+                    GameSession.is_active == True,  # noqa: E712
+                    GameSession.updated_at < cutoff,
+                )
+            )).scalars().all()
+            stale = [s for s in stale if s.id not in manager.active_connections]
+            for session in stale:
+                session.is_active = False
+            await db.commit()
+        for session in stale:
+            await drop_session_storage(session.id)
+        self.sessions_retired += len(stale)
+        return len(stale)
+
+    async def purge_session(self, session_id: str) -> int:
+        """Delete every row of *session_id*, resuming from its checkpoint."""
+        async with self._session_factory() as db:
+            session = await db.get(GameSession, session_id)
+            if session is None or session.is_active:
+                return 0
+            checkpoint, last_id = session.purge_table, session.purge_last_id or 0
+
+        order = [] if per_session_enabled() else list(reversed(session_tables()))
+        names = [t.name for t in order]
+        if checkpoint in names:
+            order = order[names.index(checkpoint):]
+        else:
+            last_id = 0
+
+        models = session_models()
+        total = 0
+        for table in order:
+            model = models[table.name]
+            where = session_scope(table, session_id)
+            if table.name != checkpoint:
+                last_id = 0
+            while True:
+                async with self._session_factory() as db:
+                    ids = (await db.execute(
+                        select(model.id)
+                        .where(where, model.id > last_id)
+                        .order_by(model.id)
+                        .limit(self.batch)
+                    )).scalars().all()
+                    if not ids:
+                        break
+                    await db.execute(
+                        delete(model).where(model.id.in_(ids))
+                        .execution_options(synchronize_session=False)
+                    )
+                    session = await db.get(GameSession, session_id)
+                    session.purge_table = table.name
+                    session.purge_last_id = ids[-1]
+                    session.rows_purged = (session.rows_purged or 0) + len(ids)
+                    await db.commit()
+                last_id = ids[-1]
+                total += len(ids)
+                self.batches += 1
+                self.reclaimed[table.name] += len(ids)
+                await asyncio.sleep(self.pause)
+
+        async with self._session_factory() as db:
+            await db.execute(
+                delete(GameSession).where(GameSession.id == session_id)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        await drop_session_storage(session_id)
+        route_planner.invalidate(session_id)
+        world_map.invalidate(session_id)
+        mission_engine.invalidate_pool(session_id)
+        mission_board.invalidate(session_id)
+        self.sessions_purged += 1
+        log.info("Purged session %s (%d rows)", session_id, total)
+        return total
+
+    async def _maintain(self, tables: list[str]) -> None:
+        """Refresh statistics (and optionally vacuum) after a purge."""
+        async with self._engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            dialect = conn.dialect.name
+            if dialect == "sqlite":
+                await conn.exec_driver_sql(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+                for name in tables:
+                    await conn.exec_driver_sql(f'ANALYZE "{name}"')
+                if settings.COMPACTION_FULL_VACUUM:
+                    await conn.exec_driver_sql("VACUUM")
+                elif (await conn.exec_driver_sql("PRAGMA auto_vacuum")).scalar() == 2:
+                    await conn.exec_driver_sql(
+                        f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES})"
+                    )
+            elif dialect == "postgresql":
+                for name in tables:
+                    await conn.execute(text(f'VACUUM (ANALYZE) "{name}"'))
+
+
+# Module-level singleton started by the FastAPI lifespan.
+compactor = Compactor()
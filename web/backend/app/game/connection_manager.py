@@ -8,10 +8,10 @@ from app.models.connection import Connection, ConnectionNode
 from app.models.computer import Computer, ComputerScreenDef
 from app.models.databank import DataFile
 from app.models.logbank import AccessLog
-from app.models.mission import Mission
 from app.models.vlocation import VLocation
 from app.models.player import Player
 from app.game import constants as C
+from app.game import mission_engine
 
 
 # ---------------------------------------------------------------------------
@@ -99,19 +99,8 @@ async def build_screen_data(
         ]
 
     elif screen.screen_type == C.SCREEN_BBSSCREEN:
-        missions = (await db.execute(
-            select(Mission).where(
-                Mission.game_session_id == game_session_id,
-                Mission.min_rating <= player_rating,
-                Mission.is_accepted == False,
-                Mission.is_completed == False,
-            ).order_by(Mission.payment.desc())
-        )).scalars().all()
-        data["missions"] = [
-            {"id": m.id, "description": m.description, "employer": m.employer_name,
-             "payment": m.payment, "difficulty": m.difficulty, "min_rating": m.min_rating}
-            for m in missions
-        ]
+        board = await mission_engine.get_mission_board(db, game_session_id)
+        data["missions"] = board.view(player_rating)
 
     elif screen.screen_type == C.SCREEN_FILESERVERSCREEN:
         files = (await db.execute(
@@ -242,7 +231,56 @@ async def add_bounce(
     db.add(node)
     await db.flush()
 
-    return await get_bounce_chain(db, connection.id)
+    chain.append({"position": next_position, "ip": ip})
+    return chain
+
+
+async def set_bounce_chain(
+    db: AsyncSession,
+    game_session_id: str,
+    player_id: int,
+    ips: list[str],
+) -> list[dict]:
+    """Replace the whole bounce chain with *ips* in one batched write.
+
+    All IPs are validated with a single query.  Rejects unknown IPs,
+    duplicates, and changes while already connected.
+    """
+    if len(set(ips)) != len(ips):
+        raise ValueError("Bounce chain contains duplicate IPs")
+
+    if ips:
+        known = set(
+            (
+                await db.execute(
+                    select(VLocation.ip).where(
+                        VLocation.game_session_id == game_session_id,
+                        VLocation.ip.in_(ips),
+                    )
+                )
+            ).scalars().all()
+        )
+        for ip in ips:
+            if ip not in known:
+                raise ValueError(f"Unknown IP address: {ip}")
+
+    connection = await get_or_create_connection(db, game_session_id, player_id)
+
+    if connection.is_active:
+        raise ValueError("Cannot modify bounce chain while connected")
+
+    await db.execute(
+        delete(ConnectionNode).where(
+            ConnectionNode.connection_id == connection.id,
+        )
+    )
+    db.add_all([
+        ConnectionNode(connection_id=connection.id, position=pos, ip=ip)
+        for pos, ip in enumerate(ips)
+    ])
+    await db.flush()
+
+    return [{"position": pos, "ip": ip} for pos, ip in enumerate(ips)]
 
 
 async def remove_bounce(
@@ -349,6 +349,7 @@ IP_PROTOVISION = "284.345.42.283"
 IP_OCP = "265.125.767.1"
 IP_SJGAMES = "849.23.459.24"
 IP_INTROVERSION = "128.128.128.128"
+IP_GLOBALINTELLIGENCEAGENCY = "362.52.696.742"
 
 IP_UPLINKPUBLICACCESSSERVER = "234.773.0.666"
 IP_UPLINKCREDITSMACHINE = "128.185.0.2"
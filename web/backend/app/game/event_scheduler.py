@@ -302,17 +302,27 @@ async def _process_mission_generate(
     data: dict,
     current_tick: int,
 ) -> dict | None:
-    """Generate new missions for the BBS."""
-    from app.game import mission_engine
+    """Expire stale BBS missions and generate new ones.
+
+    Returns a ``bbs_delta`` frame describing the board change.
+    """
+    from app.game import mission_board, mission_engine
 
     player_rating = player.uplink_rating if player else 0
     count = data.get("count", 3)
 
-    await mission_engine.generate_missions(
+    expired = await mission_engine.expire_missions(db, session_id, current_tick)
+    missions = await mission_engine.generate_missions(
         db, session_id, count,
         player_rating=player_rating,
         current_tick=current_tick,
     )
 
     log.info("Generated %d new missions for session %s", count, session_id)
-    return None  # No broadcast message needed for mission generation
+    frame = mission_board.delta_frame(
+        [mission_engine._mission_to_dict(m) for m in missions],
+        expired,
+        max_rating=player_rating,
+    )
+    frame["session_id"] = session_id
+    return frame
@@ -3,7 +3,8 @@
 The loop is started/stopped by the FastAPI lifespan handler and runs as a
 background ``asyncio.Task``.  Each tick it:
 
-1. Loads every active ``RunningTask`` from the database.
+1. Loads the active ``RunningTask`` rows of every session that has a live
+   WebSocket (sessions nobody is watching are not ticked at all).
 2. Calls ``task_engine.tick_task()`` for each one, applying the per-session
    speed multiplier (paused=0, normal=1, fast=3, megafast=8).
 3. Advances trace progress for any active traces.
@@ -13,6 +14,7 @@ background ``asyncio.Task``.  Each tick it:
 7. Increments game_time_ticks for each active session.
 8. Broadcasts ``task_update`` / ``task_complete`` / ``trace_update`` /
    ``trace_complete`` / ``game_over`` messages to connected WebSocket clients.
+9. Periodically reaps WebSockets that missed their heartbeat deadline.
 """
 import asyncio
 import logging
@@ -30,6 +32,10 @@ TICK_INTERVAL = 1.0 / TICK_RATE
 # 40 ticks at 5 Hz = every 8 seconds of real time.
 SECURITY_CHECK_INTERVAL = 40
 
+# How often (in ticks) to reap WebSockets past their heartbeat deadline.
+# 25 ticks at 5 Hz = every 5 seconds of real time.
+REAP_INTERVAL = 25
+
 
 class GameLoop:
     """Singleton game loop that drives hacking tool progress."""
@@ -83,19 +89,14 @@ class GameLoop:
 
     async def _tick(self) -> None:
         """Process one tick for tasks, traces, security checks, and events."""
-        from app.game import task_engine
-        from app.game import trace_engine
-        from app.game import security_engine
-        from app.game import event_scheduler
-        from app.models.running_task import RunningTask
-        from app.models.connection import Connection
-        from app.models.game_session import GameSession
-        from app.models.computer import Computer
-        from app.models.vlocation import VLocation
+        from app.session_store import per_session_enabled, session_db
         from app.ws.handler import manager
 
         self._tick_count += 1
 
+        if self._tick_count % REAP_INTERVAL == 0:
+            await manager.reap()
+
         # Accumulate all messages to broadcast *after* the DB commit.
         task_completed: list[dict] = []
         task_updates: list[dict] = []
@@ -103,132 +104,45 @@ class GameLoop:
         trace_completions: list[dict] = []
         security_events: list[dict] = []
         event_messages: list[dict] = []
+        out = (
+            task_completed, task_updates, trace_updates,
+            trace_completions, security_events, event_messages,
+        )
+
+        # Collect all session IDs with active WebSocket connections; only
+        # these sessions are ticked.
+        ws_session_ids = set(manager.active_connections.keys())
+        if not ws_session_ids:
+            return
 
-        async with async_session() as db:
-            # ==============================================================
-            # 1. Tick all running tasks (existing behaviour)
-            # ==============================================================
-            tasks = (
-                await db.execute(
-                    select(RunningTask).where(RunningTask.is_active == True)  # noqa: E712
-                )
-            ).scalars().all()
-
-            for task in tasks:
-                speed = self.speed_multiplier.get(task.game_session_id, 1)
-                if speed <= 0:
-                    # Session is paused -- skip this task entirely.
-                    continue
-                result = await task_engine.tick_task(db, task, speed)
-                if result.get("completed"):
-                    task_completed.append(result)
-                else:
-                    task_updates.append(result)
-
-            # ==============================================================
-            # 2. Tick traces for all sessions with active connections
-            # ==============================================================
-            active_connections = (
-                await db.execute(
-                    select(Connection.game_session_id)
-                    .where(Connection.is_active == True)  # noqa: E712
-                    .distinct()
-                )
-            ).scalars().all()
-
-            active_session_ids = set(active_connections)
-
-            for sid in active_session_ids:
-                speed = self.speed_multiplier.get(sid, 1)
-                if speed <= 0:
-                    continue
-
-                # Advance trace progress
-                updates = await trace_engine.tick_traces(db, speed, sid)
-                trace_updates.extend(updates)
-
-                # Check for completed traces (game over)
-                completions = await trace_engine.check_completed_traces(db, sid)
-                trace_completions.extend(completions)
-
-            # ==============================================================
-            # 2b. Schedule trace consequences for completed traces
-            # ==============================================================
-            for comp in trace_completions:
-                sid = comp["session_id"]
-                conn_id = comp.get("connection_id")
-                computer_name = "Unknown System"
-                hack_diff = 0.0
-
-                # Try to resolve the computer name from the connection
-                if conn_id is not None:
-                    conn = (await db.execute(
-                        select(Connection).where(Connection.id == conn_id)
-                    )).scalar_one_or_none()
-                    if conn and conn.target_ip:
-                        loc = (await db.execute(
-                            select(VLocation).where(
-                                VLocation.game_session_id == sid,
-                                VLocation.ip == conn.target_ip,
-                            )
-                        )).scalar_one_or_none()
-                        if loc and loc.computer_id:
-                            computer = (await db.execute(
-                                select(Computer).where(Computer.id == loc.computer_id)
-                            )).scalar_one_or_none()
-                            if computer:
-                                computer_name = computer.name
-                                hack_diff = computer.hack_difficulty
-
-                # Get current game_time_ticks for this session
-                session = await db.get(GameSession, sid)
-                current_tick = session.game_time_ticks if session else 0
-
-                await event_scheduler.schedule_trace_consequences(
-                    db, sid, computer_name,
-                    current_tick=current_tick,
-                    hack_difficulty=hack_diff,
-                )
-
-            # ==============================================================
-            # 3. Periodically check for security breaches
-            # ==============================================================
-            if self._tick_count % SECURITY_CHECK_INTERVAL == 0:
-                for sid in active_session_ids:
-                    events = await security_engine.check_security_breaches(
-                        db, sid
-                    )
-                    security_events.extend(events)
-
-            # ==============================================================
-            # 3b. Advance game_time_ticks and process events for all
-            #     active sessions that have a connected WebSocket
-            # ==============================================================
-            # Collect all session IDs with active WebSocket connections
-            ws_session_ids = set(manager.active_connections.keys())
-
+        if per_session_enabled():
+            # Every session lives in its own database file, so tick each
+            # connected session in its own transaction.  A failing session
+            # is skipped (and its uncommitted results not broadcast) without
+            # stopping the others.
             for sid in ws_session_ids:
-                speed = self.speed_multiplier.get(sid, 1)
-                if speed <= 0:
-                    continue
-
-                session = await db.get(GameSession, sid)
-                if session is None or not session.is_active:
+                session_out = tuple([] for _ in out)
+                opened = False
+                try:
+                    async with session_db(sid) as db:
+                        opened = True
+                        await self._tick_db(db, session_out, {sid})
+                        await db.commit()
+                except Exception as e:
+                    if not opened and isinstance(e, ValueError):
+                        log.debug("No database for session %s; skipping tick", sid)
+                    else:
+                        log.exception("Tick failed for session %s", sid)
                     continue
-
-                # Increment game_time_ticks by speed
-                session.game_time_ticks += speed
-
-                # Process due events
-                msgs = await event_scheduler.process_events(
-                    db, sid, session.game_time_ticks
-                )
-                event_messages.extend(msgs)
-
-            # ==============================================================
-            # 4. Commit all changes in one shot
-            # ==============================================================
-            await db.commit()
+                for results, new in zip(out, session_out):
+                    results.extend(new)
+        else:
+            async with async_session() as db:
+                await self._tick_db(db, out, ws_session_ids)
+                # ==========================================================
+                # 4. Commit all changes in one shot
+                # ==========================================================
+                await db.commit()
 
         # ==================================================================
         # 5. Broadcast messages outside the DB session
@@ -329,6 +243,154 @@ class GameLoop:
                     sid,
                 )
 
+    async def _tick_db(
+        self,
+        db,
+        out: tuple[list[dict], ...],
+        ws_session_ids: set[str],
+    ) -> None:
+        """Run the DB phase of a tick, appending broadcast payloads to *out*.
+
+        Only rows belonging to *ws_session_ids* are processed (a single
+        session when each session has its own database).
+        """
+        from app.game import task_engine
+        from app.game import trace_engine
+        from app.game import security_engine
+        from app.game import event_scheduler
+        from app.models.running_task import RunningTask
+        from app.models.connection import Connection
+        from app.models.game_session import GameSession
+        from app.models.computer import Computer
+        from app.models.vlocation import VLocation
+
+        (
+            task_completed, task_updates, trace_updates,
+            trace_completions, security_events, event_messages,
+        ) = out
+        # *out* is shared across per-session calls; only handle our own
+        # trace completions below.
+        first_completion = len(trace_completions)
+
+        # ==============================================================
+        # 1. Tick all running tasks (existing behaviour)
+        # ==============================================================
+        task_query = select(RunningTask).where(
+            RunningTask.is_active == True,  # noqa: E712
+            RunningTask.game_session_id.in_(ws_session_ids),
+        )
+        tasks = (await db.execute(task_query)).scalars().all()
+
+        for task in tasks:
+            speed = self.speed_multiplier.get(task.game_session_id, 1)
+            if speed <= 0:
+                # Session is paused -- skip this task entirely.
+                continue
+            result = await task_engine.tick_task(db, task, speed)
+            if result.get("completed"):
+                task_completed.append(result)
+            else:
+                task_updates.append(result)
+
+        # ==============================================================
+        # 2. Tick traces for all sessions with active connections
+        # ==============================================================
+        conn_query = (
+            select(Connection.game_session_id)
+            .where(
+                Connection.is_active == True,  # noqa: E712
+                Connection.game_session_id.in_(ws_session_ids),
+            )
+            .distinct()
+        )
+        active_connections = (await db.execute(conn_query)).scalars().all()
+
+        active_session_ids = set(active_connections)
+
+        for sid in active_session_ids:
+            speed = self.speed_multiplier.get(sid, 1)
+            if speed <= 0:
+                continue
+
+            # Advance trace progress
+            updates = await trace_engine.tick_traces(db, speed, sid)
+            trace_updates.extend(updates)
+
+            # Check for completed traces (game over)
+            completions = await trace_engine.check_completed_traces(db, sid)
+            trace_completions.extend(completions)
+
+        # ==============================================================
+        # 2b. Schedule trace consequences for completed traces
+        # ==============================================================
+        for comp in trace_completions[first_completion:]:
+            sid = comp["session_id"]
+            conn_id = comp.get("connection_id")
+            computer_name = "Unknown System"
+            hack_diff = 0.0
+
+            # Try to resolve the computer name from the connection
+            if conn_id is not None:
+                conn = (await db.execute(
+                    select(Connection).where(Connection.id == conn_id)
+                )).scalar_one_or_none()
+                if conn and conn.target_ip:
+                    loc = (await db.execute(
+                        select(VLocation).where(
+                            VLocation.game_session_id == sid,
+                            VLocation.ip == conn.target_ip,
+                        )
+                    )).scalar_one_or_none()
+                    if loc and loc.computer_id:
+                        computer = (await db.execute(
+                            select(Computer).where(Computer.id == loc.computer_id)
+                        )).scalar_one_or_none()
+                        if computer:
+                            computer_name = computer.name
+                            hack_diff = computer.hack_difficulty
+
+            # Get current game_time_ticks for this session
+            session = await db.get(GameSession, sid)
+            current_tick = session.game_time_ticks if session else 0
+
+            await event_scheduler.schedule_trace_consequences(
+                db, sid, computer_name,
+                current_tick=current_tick,
+                hack_difficulty=hack_diff,
+            )
+
+        # ==============================================================
+        # 3. Periodically check for security breaches
+        # ==============================================================
+        if self._tick_count % SECURITY_CHECK_INTERVAL == 0:
+            for sid in active_session_ids:
+                events = await security_engine.check_security_breaches(
+                    db, sid
+                )
+                security_events.extend(events)
+
+        # ==============================================================
+        # 3b. Advance game_time_ticks and process events for all
+        #     active sessions that have a connected WebSocket
+        # ==============================================================
+        for sid in ws_session_ids:
+            speed = self.speed_multiplier.get(sid, 1)
+            if speed <= 0:
+                continue
+
+            session = await db.get(GameSession, sid)
+            if session is None or not session.is_active:
+                continue
+
+            # Increment game_time_ticks by speed
+            session.game_time_ticks += speed
+
+            # Process due events
+            msgs = await event_scheduler.process_events(
+                db, sid, session.game_time_ticks
+            )
+            event_messages.extend(msgs)
+
 
 # Module-level singleton used by the lifespan and WS handlers.
 game_loop = GameLoop()
@@ -0,0 +1,96 @@
+"""Collision-free IP allocation for generated worlds.
+
+Game IPs have the shape ``name_generator.generate_ip`` produces: the first
+octet in 100-999, the rest in 1-999, about 9e11 addresses.  ``IPAllocator``
+walks that space in a seeded pseudo-random order: address *i* is the
+*i*-th element of a permutation built from a small Feistel network over
+40 bits (cycle-walking past the values above the space).  A permutation
+never repeats, so allocation is O(1) per address with no "already used?"
+set to grow.  This keeps worlds with 100k+ systems linear.
+
+Reserved addresses (the fixed IPs in ``constants`` plus any the caller
+passes in) are skipped so they are never handed out twice.
+"""
+from app.game import constants as C
+
+FIRST_LO, FIRST_HI = 100, 999
+REST_LO, REST_HI = 1, 999
+
+_FIRST_SPAN = FIRST_HI - FIRST_LO + 1
+_REST_SPAN = REST_HI - REST_LO + 1
+SPACE = _FIRST_SPAN * _REST_SPAN ** 3
+
+_HALF_BITS = 20
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_ROUNDS = 4
+assert SPACE <= 1 << (2 * _HALF_BITS)
+
+
+def reserved_ips() -> frozenset[str]:
+    """Every fixed IP defined in ``constants``."""
+    return frozenset(
+        v for k, v in vars(C).items() if k.startswith("IP_") and isinstance(v, str)
+    )
+
+
+def index_to_ip(index: int) -> str:
+    """Map 0 <= *index* < SPACE to a dotted quad."""
+    index, d = divmod(index, _REST_SPAN)
+    index, c = divmod(index, _REST_SPAN)
+    a, b = divmod(index, _REST_SPAN)
+    return f"{a + FIRST_LO}.{b + REST_LO}.{c + REST_LO}.{d + REST_LO}"
+
+
+def ip_to_index(ip: str) -> int | None:
+    """Inverse of ``index_to_ip``; None for addresses outside the space."""
+    try:
+        a, b, c, d = (int(p) for p in ip.split("."))
+    except ValueError:
+        return None
+    if not (FIRST_LO <= a <= FIRST_HI and all(REST_LO <= p <= REST_HI for p in (b, c, d))):
+        return None
+    return (((a - FIRST_LO) * _REST_SPAN + b - REST_LO) * _REST_SPAN + c - REST_LO) * _REST_SPAN + d - REST_LO
+
+
+class IPAllocator:
+    """Hands out distinct IPs in a seeded pseudo-random order."""
+
+    def __init__(self, seed: int, reserved: frozenset[str] | set[str] = frozenset()) -> None:
+        keys = []
+        state = seed & 0xFFFFFFFFFFFFFFFF
+        for _ in range(_ROUNDS):
+            # splitmix64 step per round key
+            state = (state + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+            z = state
+            z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+            z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+            keys.append((z ^ (z >> 31)) & _HALF_MASK)
+        self._keys = keys
+        self._reserved = reserved_ips() | frozenset(reserved)
+        self._next = 0
+        self.issued = 0
+
+    def _permute(self, x: int) -> int:
+        left, right = x >> _HALF_BITS, x & _HALF_MASK
+        for key in self._keys:
+            f = ((right * 0x2545F491) ^ key) & _HALF_MASK
+            f ^= f >> 11
+            left, right = right, left ^ f
+        return (left << _HALF_BITS) | right
+
+    def _index(self, i: int) -> int:
+        x = self._permute(i)
+        while x >= SPACE:  # cycle-walk back into the address space
+            x = self._permute(x)
+        return x
+
+    def allocate(self) -> str:
+        """Return the next unused address."""
+        while True:
+            if self._next >= SPACE:
+                raise ValueError("IP address space exhausted")
+            ip = index_to_ip(self._index(self._next))
+            self._next += 1
+            if ip not in self._reserved:
+                self.issued += 1
+                return ip
@@ -0,0 +1,132 @@
+"""Mission board -- in-memory view of each session's available BBS missions.
+
+Available (unaccepted, uncompleted) missions are kept per session, bucketed
+by ``min_rating`` with each bucket sorted by payment (highest first).  The
+visible board for a player is the merge of every bucket at or below their
+rating, cached per rating until the board next changes, so opening the BBS
+does not touch the database.
+
+``mission_engine`` owns the board: it loads it on first use and updates it
+when a transaction that generated, accepted, completed or expired missions
+commits (a rollback reloads it instead).  Changes are
+pushed to clients as ``bbs_delta`` frames (see ``delta_frame``).
+"""
+import bisect
+import heapq
+from collections import OrderedDict
+
+MAX_RATING = 16
+
+# Number of per-session boards kept in memory.
+MAX_CACHED_BOARDS = 512
+
+
+def bbs_entry(mission: dict) -> dict:
+    """The compact form of a mission dict shown on the BBS screen."""
+    return {
+        "id": mission["id"],
+        "description": mission["description"],
+        "employer": mission["employer_name"],
+        "payment": mission["payment"],
+        "difficulty": mission["difficulty"],
+        "min_rating": mission["min_rating"],
+    }
+
+
+def _clamp(rating: int) -> int:
+    return max(0, min(MAX_RATING, rating))
+
+
+class MissionBoard:
+    """Available missions of one session, bucketed by ``min_rating``."""
+
+    def __init__(self) -> None:
+        # min_rating -> sorted [(-payment, mission_id)]
+        self._buckets: list[list[tuple[int, int]]] = [[] for _ in range(MAX_RATING + 1)]
+        self._missions: dict[int, dict] = {}
+        self._entries: dict[int, dict] = {}
+        self._views: dict[int, list[dict]] = {}
+
+    def __len__(self) -> int:
+        return len(self._missions)
+
+    def __contains__(self, mission_id: int) -> bool:
+        return mission_id in self._missions
+
+    def add(self, mission: dict) -> None:
+        """Add (or replace) a mission given as ``_mission_to_dict`` output."""
+        mission_id = mission["id"]
+        if mission_id in self._missions:
+            self.remove(mission_id)
+        self._missions[mission_id] = mission
+        self._entries[mission_id] = bbs_entry(mission)
+        bisect.insort(
+            self._buckets[_clamp(mission["min_rating"])],
+            (-mission["payment"], mission_id),
+        )
+        self._views.clear()
+
+    def remove(self, mission_id: int) -> dict | None:
+        """Remove a mission; returns its dict, or None if it was not listed."""
+        mission = self._missions.pop(mission_id, None)
+        if mission is None:
+            return None
+        del self._entries[mission_id]
+        bucket = self._buckets[_clamp(mission["min_rating"])]
+        idx = bisect.bisect_left(bucket, (-mission["payment"], mission_id))
+        del bucket[idx]
+        self._views.clear()
+        return mission
+
+    def _ids(self, max_rating: int) -> list[int]:
+        buckets = self._buckets[: _clamp(max_rating) + 1] if max_rating >= 0 else []
+        return [mission_id for _, mission_id in heapq.merge(*buckets)]
+
+    def view(self, max_rating: int) -> list[dict]:
+        """BBS entries with ``min_rating <= max_rating``, highest payment first."""
+        key = _clamp(max_rating) if max_rating >= 0 else -1
+        cached = self._views.get(key)
+        if cached is None:
+            cached = [self._entries[i] for i in self._ids(max_rating)]
+            self._views[key] = cached
+        return list(cached)
+
+    def available(self, max_rating: int) -> list[dict]:
+        """Full mission dicts with ``min_rating <= max_rating``, highest payment first."""
+        return [self._missions[i] for i in self._ids(max_rating)]
+
+
+def delta_frame(
+    added: list[dict], removed: list[int], max_rating: int | None = None
+) -> dict:
+    """A ``bbs_delta`` frame; *added* is filtered to what *max_rating* can see."""
+    if max_rating is not None:
+        added = [m for m in added if m["min_rating"] <= max_rating]
+    return {
+        "type": "bbs_delta",
+        "added": [bbs_entry(m) for m in added],
+        "removed": removed,
+    }
+
+
+_boards: "OrderedDict[str, MissionBoard]" = OrderedDict()
+
+
+def cached(session_id: str) -> MissionBoard | None:
+    """The loaded board for *session_id*, or None."""
+    board = _boards.get(session_id)
+    if board is not None:
+        _boards.move_to_end(session_id)
+    return board
+
+
+def store(session_id: str, board: MissionBoard) -> None:
+    _boards[session_id] = board
+    _boards.move_to_end(session_id)
+    while len(_boards) > MAX_CACHED_BOARDS:
+        _boards.popitem(last=False)
+
+
+def invalidate(session_id: str) -> None:
+    """Drop the board for *session_id*; it is reloaded on next use."""
+    _boards.pop(session_id, None)
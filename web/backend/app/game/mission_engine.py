@@ -2,12 +2,16 @@
 
 Ported from uplink/src/world/generator/missiongenerator.cpp.
 """
+import bisect
 import json
 import logging
 import random
+from collections import OrderedDict
+from typing import NamedTuple
 
-from sqlalchemy import select
+from sqlalchemy import delete, event, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from app.models.mission import Mission
 from app.models.message import Message
@@ -18,6 +22,8 @@ from app.models.databank import DataFile
 from app.models.person import Person
 from app.models.vlocation import VLocation
 from app.game import constants as C
+from app.game import mission_board, world_map
+from app.game.mission_board import MissionBoard
 from app.game.name_generator import generate_name
 
 log = logging.getLogger(__name__)
@@ -75,21 +81,42 @@ _FIND_DATA_TYPES = [
 ]
 
 
+# Cumulative weight tables per rating level (0-16), built once from
+# _PROB_TABLES so each draw is one random() and a bisect.
+_TYPE_ORDER = tuple(_PROB_TABLES.keys())
+
+
+def _build_type_tables() -> list[tuple[list[int], int]]:
+    tables = []
+    for rating_index in range(17):
+        cumulative = []
+        total = 0
+        for mission_type in _TYPE_ORDER:
+            total += _PROB_TABLES[mission_type][rating_index]
+            cumulative.append(total)
+        tables.append((cumulative, total))
+    return tables
+
+
+_TYPE_TABLES = _build_type_tables()
+
+# Companies that never post missions.
+_NON_EMPLOYERS = ("Government", "Uplink Corporation")
+
+# Number of per-session candidate pools kept in memory.
+MAX_CACHED_POOLS = 512
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
 def _select_mission_type(rng: random.Random, player_rating: int) -> int:
     """Choose a mission type using weighted random selection."""
-    rating_index = max(0, min(16, player_rating))
-    weights = [table[rating_index] for table in _PROB_TABLES.values()]
-    types = list(_PROB_TABLES.keys())
-
-    total = sum(weights)
+    cumulative, total = _TYPE_TABLES[max(0, min(16, player_rating))]
     if total == 0:
-        return rng.choice(types)
-
-    return rng.choices(types, weights=weights, k=1)[0]
+        return rng.choice(_TYPE_ORDER)
+    return _TYPE_ORDER[bisect.bisect_right(cumulative, rng.random() * total)]
 
 
 def _get_rating_level(score: int) -> int:
@@ -101,6 +128,85 @@ def _get_rating_level(score: int) -> int:
     return level
 
 
+# ---------------------------------------------------------------------------
+# Candidate pools
+# ---------------------------------------------------------------------------
+
+class MissionTarget(NamedTuple):
+    id: int
+    ip: str
+    company_name: str
+
+
+class CandidatePool:
+    """Employers, target machines and people a session's missions draw from."""
+
+    def __init__(self) -> None:
+        self.employers: list[str] = []
+        self.targets: list[MissionTarget] = []
+        self.people: list[str] = []
+
+
+_pools: "OrderedDict[str, CandidatePool]" = OrderedDict()
+
+
+async def get_candidate_pool(db: AsyncSession, session_id: str) -> CandidatePool:
+    """Return the cached candidate pool for *session_id*, loading it if needed."""
+    pool = _pools.get(session_id)
+    if pool is not None:
+        _pools.move_to_end(session_id)
+        return pool
+
+    pool = CandidatePool()
+    pool.employers = list(
+        (
+            await db.execute(
+                select(Company.name).where(
+                    Company.game_session_id == session_id,
+                    Company.name.notin_(_NON_EMPLOYERS),
+                )
+            )
+        ).scalars().all()
+    )
+    pool.targets = [
+        MissionTarget(*row)
+        for row in (
+            await db.execute(
+                select(Computer.id, Computer.ip, Computer.company_name).where(
+                    Computer.game_session_id == session_id,
+                    Computer.computer_type == 1,  # internal services
+                )
+            )
+        ).all()
+    ]
+    pool.people = list(
+        (
+            await db.execute(
+                select(Person.name).where(
+                    Person.game_session_id == session_id,
+                    Person.is_agent == False,
+                )
+            )
+        ).scalars().all()
+    )
+
+    # Don't cache an empty pool: the world may still be being generated.
+    if pool.employers and pool.targets:
+        _pools[session_id] = pool
+        while len(_pools) > MAX_CACHED_POOLS:
+            _pools.popitem(last=False)
+    return pool
+
+
+def invalidate_pool(session_id: str) -> None:
+    """Drop the cached candidate pool for *session_id*.
+
+    Call whenever the session's companies, internal services machines or
+    people change (world generation does); the pool is reloaded on next use.
+    """
+    _pools.pop(session_id, None)
+
+
 # ---------------------------------------------------------------------------
 # generate_missions
 # ---------------------------------------------------------------------------
@@ -111,58 +217,32 @@ async def generate_missions(
     count: int,
     player_rating: int = 0,
     current_tick: int = 0,
+    rng: random.Random | None = None,
 ) -> list[Mission]:
     """Generate *count* random missions for the given game session.
 
     Uses the probability tables from constants to select mission types
-    based on the player's Uplink rating level.
+    based on the player's Uplink rating level.  Candidates come from the
+    session's cached pool, and the missions and their target files are
+    written with one bulk INSERT each.
     """
-    rng = random.Random()
+    rng = rng or random.Random()
 
-    # Load companies eligible to be employers (not Government, not Uplink Corporation)
-    companies = (
-        await db.execute(
-            select(Company).where(
-                Company.game_session_id == session_id,
-                Company.name.notin_(["Government", "Uplink Corporation"]),
-            )
-        )
-    ).scalars().all()
-
-    if not companies:
+    pool = await get_candidate_pool(db, session_id)
+    if not pool.employers:
         log.warning("No eligible employer companies found for session %s", session_id)
         return []
-
-    # Load internal services machines (computer_type=1) as potential targets
-    target_computers = (
-        await db.execute(
-            select(Computer).where(
-                Computer.game_session_id == session_id,
-                Computer.computer_type == 1,  # internal services
-            )
-        )
-    ).scalars().all()
-
-    if not target_computers:
+    if not pool.targets:
         log.warning("No target computers found for session %s", session_id)
         return []
 
-    # Load people for find/change data missions
-    people = (
-        await db.execute(
-            select(Person).where(
-                Person.game_session_id == session_id,
-                Person.is_agent == False,
-            )
-        )
-    ).scalars().all()
-
-    missions: list[Mission] = []
+    mission_rows: list[dict] = []
+    file_rows: list[dict] = []
 
     for _ in range(count):
         mission_type = _select_mission_type(rng, player_rating)
-        employer = rng.choice(companies)
-        target_computer = rng.choice(target_computers)
+        employer_name = rng.choice(pool.employers)
+        target_computer = rng.choice(pool.targets)
 
         # Payment: base * (1 + random variance)
         base_payment = _BASE_PAYMENT[mission_type]
@@ -192,6 +272,15 @@ async def generate_missions(
                 "target_computer_id": target_computer.id,
             }
 
+            # Ensure the target file exists so it can be copied
+            file_rows.append({
+                "computer_id": target_computer.id,
+                "filename": filename,
+                "size": rng.randint(1, 4),
+                "file_type": 2,  # data file
+                "data": f"Confidential: {filename}",
+            })
+
         elif mission_type == TYPE_DESTROYFILE:
             filename = rng.choice(_DESTROY_FILENAMES)
             description = (
@@ -205,17 +294,16 @@ async def generate_missions(
             }
 
             # Create the target file on the target computer so it can be deleted
-            target_file = DataFile(
-                computer_id=target_computer.id,
-                filename=filename,
-                size=rng.randint(1, 4),
-                file_type=2,  # data file
-                data=f"Confidential data from {target_computer.company_name}",
-            )
-            db.add(target_file)
+            file_rows.append({
+                "computer_id": target_computer.id,
+                "filename": filename,
+                "size": rng.randint(1, 4),
+                "file_type": 2,  # data file
+                "data": f"Confidential data from {target_computer.company_name}",
+            })
 
         elif mission_type == TYPE_FINDDATA:
-            person_name = generate_name(rng) if not people else rng.choice(people).name
+            person_name = rng.choice(pool.people) if pool.people else generate_name(rng)
             data_type = rng.choice(_FIND_DATA_TYPES)
             description = (
                 f"Find {data_type} for {person_name} - "
@@ -229,7 +317,7 @@ async def generate_missions(
             }
 
         elif mission_type == TYPE_CHANGEDATA:
-            person_name = generate_name(rng) if not people else rng.choice(people).name
+            person_name = rng.choice(pool.people) if pool.people else generate_name(rng)
             description = (
                 f"Change academic record for {person_name} "
                 f"at International Academic Database"
@@ -243,37 +331,133 @@ async def generate_missions(
         else:
             continue
 
-        # Also ensure a target file exists for steal missions
-        if mission_type == TYPE_STEALFILE:
-            target_file = DataFile(
-                computer_id=target_computer.id,
-                filename=target_data["target_filename"],
-                size=rng.randint(1, 4),
-                file_type=2,
-                data=f"Confidential: {target_data['target_filename']}",
+        mission_rows.append({
+            "game_session_id": session_id,
+            "mission_type": mission_type,
+            "description": description,
+            "employer_name": employer_name,
+            "payment": payment,
+            "difficulty": difficulty,
+            "min_rating": min_rating,
+            "target_computer_ip": target_computer.ip,
+            "target_data": json.dumps(target_data),
+            "is_accepted": False,
+            "is_completed": False,
+            "created_at_tick": current_tick,
+            "due_at_tick": current_tick + C.TIME_TOEXPIREMISSIONS,
+        })
+
+    if file_rows:
+        await db.execute(insert(DataFile), file_rows)
+    if not mission_rows:
+        return []
+    missions = (
+        await db.scalars(insert(Mission).returning(Mission), mission_rows)
+    ).all()
+
+    for m in missions:
+        _board_change(db, session_id, _mission_to_dict(m))
+    return list(missions)
+
+
+# ---------------------------------------------------------------------------
+# Mission board
+# ---------------------------------------------------------------------------
+
+async def get_mission_board(db: AsyncSession, session_id: str) -> MissionBoard:
+    """Return the session's in-memory mission board, loading it if needed."""
+    board = mission_board.cached(session_id)
+    if board is not None:
+        return board
+
+    board = MissionBoard()
+    missions = (
+        await db.execute(
+            select(Mission).where(
+                Mission.game_session_id == session_id,
+                Mission.is_accepted == False,
+                Mission.is_completed == False,
             )
-            db.add(target_file)
-
-        mission = Mission(
-            game_session_id=session_id,
-            mission_type=mission_type,
-            description=description,
-            employer_name=employer.name,
-            payment=payment,
-            difficulty=difficulty,
-            min_rating=min_rating,
-            target_computer_ip=target_computer.ip,
-            target_data=json.dumps(target_data),
-            is_accepted=False,
-            is_completed=False,
-            created_at_tick=current_tick,
-            due_at_tick=current_tick + C.TIME_TOEXPIREMISSIONS,
         )
-        db.add(mission)
-        missions.append(mission)
+    ).scalars().all()
+    for m in missions:
+        board.add(_mission_to_dict(m))
+    mission_board.store(session_id, board)
+    return board
 
-    await db.flush()
-    return missions
+
+# Board changes are queued on the ORM session and applied once its
+# transaction commits, so a rollback (or a rolled-back action SAVEPOINT)
+# never leaves the shared board out of step with the database.
+_BOARD_CHANGES = "mission_board_changes"
+
+
+def _board_change(db: AsyncSession, session_id: str, added: dict | None = None,
+                  removed: int | None = None) -> None:
+    pending = db.sync_session.info.setdefault(_BOARD_CHANGES, {"changes": [], "stale": set()})
+    pending["changes"].append((session_id, added, removed))
+
+
+def _unlist(db: AsyncSession, session_id: str, mission_id: int) -> None:
+    _board_change(db, session_id, removed=mission_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_board_changes(session: Session) -> None:
+    if session.in_nested_transaction():
+        return  # a SAVEPOINT release; wait for the real commit
+    pending = session.info.pop(_BOARD_CHANGES, None)
+    if pending is None:
+        return
+    for session_id, added, removed in pending["changes"]:
+        board = mission_board.cached(session_id)
+        if board is None:
+            continue
+        if added is not None:
+            board.add(added)
+        else:
+            board.remove(removed)
+    for session_id in pending["stale"]:
+        mission_board.invalidate(session_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_board_changes(session: Session, previous_transaction) -> None:
+    pending = session.info.get(_BOARD_CHANGES)
+    if pending is None:
+        return
+    # Which queued changes the rolled-back SAVEPOINT covered is not
+    # tracked: reload every touched board, now and after the commit (a
+    # board loaded inside the transaction may have seen rolled-back rows).
+    pending["stale"].update(session_id for session_id, _, _ in pending["changes"])
+    pending["changes"].clear()
+    for session_id in pending["stale"]:
+        mission_board.invalidate(session_id)
+    if not previous_transaction.nested:
+        session.info.pop(_BOARD_CHANGES, None)
+
+
+async def expire_missions(
+    db: AsyncSession, session_id: str, current_tick: int
+) -> list[int]:
+    """Delete unaccepted missions past their due tick; returns their ids."""
+    expired = (
+        await db.execute(
+            select(Mission.id).where(
+                Mission.game_session_id == session_id,
+                Mission.is_accepted == False,
+                Mission.is_completed == False,
+                Mission.due_at_tick <= current_tick,
+            )
+        )
+    ).scalars().all()
+    if not expired:
+        return []
+
+    await db.execute(delete(Mission).where(Mission.id.in_(expired)))
+    for mission_id in expired:
+        _unlist(db, session_id, mission_id)
+    return list(expired)
 
 
 # ---------------------------------------------------------------------------
@@ -301,6 +485,10 @@ async def accept_mission(
     ).scalar_one_or_none()
 
     if mission is None:
+        # Already gone from the database: drop the stale board entry now.
+        board = mission_board.cached(session_id)
+        if board is not None:
+            board.remove(mission_id)
         raise ValueError(f"Mission {mission_id} not found")
     if mission.is_accepted:
         raise ValueError(f"Mission {mission_id} is already accepted")
@@ -309,6 +497,7 @@ async def accept_mission(
 
     mission.is_accepted = True
     mission.accepted_by = str(player_id)
+    _unlist(db, session_id, mission_id)
 
     # Send confirmation message to the player
     msg = Message(
@@ -328,6 +517,11 @@ async def accept_mission(
     db.add(msg)
     await db.flush()
 
+    # The briefing gives the agent a link to the target, which may be an
+    # unlisted system (internal services, mainframes).
+    if mission.target_computer_ip:
+        await world_map.publish_locations(db, session_id, [mission.target_computer_ip])
+
     return _mission_to_dict(mission)
 
 
@@ -484,6 +678,7 @@ async def complete_mission(
         raise ValueError(f"Mission {mission_id} is already completed")
 
     mission.is_completed = True
+    _unlist(db, session_id, mission_id)
 
     # Credit the player
     player = (
@@ -543,22 +738,11 @@ async def get_available_missions(
     """Return available (unaccepted, uncompleted) missions the player can see.
 
     Only includes missions where min_rating <= player_rating.
-    Ordered by payment descending.
+    Ordered by payment descending.  Served from the mission board.
     """
     rating_level = _get_rating_level(player_rating)
-
-    missions = (
-        await db.execute(
-            select(Mission).where(
-                Mission.game_session_id == session_id,
-                Mission.is_accepted == False,
-                Mission.is_completed == False,
-                Mission.min_rating <= rating_level,
-            ).order_by(Mission.payment.desc())
-        )
-    ).scalars().all()
-
-    return [_mission_to_dict(m) for m in missions]
+    board = await get_mission_board(db, session_id)
+    return board.available(rating_level)
 
 
 # ---------------------------------------------------------------------------
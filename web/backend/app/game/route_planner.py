@@ -0,0 +1,292 @@
+"""Route planner -- builds bounce chains server-side.
+
+Given a target IP and a few constraints (hop count, whether to avoid
+fast-tracing systems, minimum geographic spread between hops) the planner
+picks intermediate bounce nodes and returns a complete chain ending at the
+target, ready to be applied with ``connection_manager.set_bounce_chain``.
+
+Each game session gets a ``SpatialGrid`` over the ``VLocation.x/y``
+coordinates of its listed systems, together with a precomputed trace-risk
+weight per node, so planning a chain costs a handful of grid-cell lookups
+instead of a scan over the whole world.
+
+Hops are chosen one at a time: waypoints are spaced evenly along the line
+from the player's gateway to the target, and for each waypoint the nearest
+low-risk candidates are looked up in the grid and the cheapest one (risk
+first, then distance to the waypoint) that respects the spread constraint
+is taken.
+"""
+import logging
+import math
+from collections import OrderedDict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.computer import Computer
+from app.models.player import Player
+from app.models.vlocation import VLocation
+
+log = logging.getLogger(__name__)
+
+DEFAULT_HOPS = 4
+MAX_HOPS = 16
+
+# Computers that trace one link in this many seconds or less count as
+# "high-trace" and are skipped when ``avoid_high_trace`` is set.
+HIGH_TRACE_SPEED = 10.0
+
+# Grid cell size in map units (the world map is roughly 600 x 300).
+GRID_CELL_SIZE = 25
+
+# How many candidates to look at around each waypoint.
+CANDIDATES_PER_HOP = 8
+
+# Number of per-session indexes kept in memory.
+MAX_CACHED_INDEXES = 256
+
+
+# ---------------------------------------------------------------------------
+# Spatial index
+# ---------------------------------------------------------------------------
+
+
+class SpatialGrid:
+    """Uniform grid over 2-D points supporting k-nearest-neighbour queries."""
+
+    def __init__(self, cell_size: int = GRID_CELL_SIZE) -> None:
+        self.cell_size = cell_size
+        self._cells: dict[tuple[int, int], list[int]] = {}
+        self._points: list[tuple[float, float]] = []
+        self._min_cell = (0, 0)
+        self._max_cell = (0, 0)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def point(self, idx: int) -> tuple[float, float]:
+        return self._points[idx]
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, x: float, y: float) -> int:
+        """Add a point and return its index."""
+        idx = len(self._points)
+        self._points.append((x, y))
+        cell = self._cell(x, y)
+        self._cells.setdefault(cell, []).append(idx)
+        if idx == 0:
+            self._min_cell = self._max_cell = cell
+        else:
+            self._min_cell = (min(self._min_cell[0], cell[0]), min(self._min_cell[1], cell[1]))
+            self._max_cell = (max(self._max_cell[0], cell[0]), max(self._max_cell[1], cell[1]))
+        return idx
+
+    def nearest(
+        self, x: float, y: float, k: int, accept=None
+    ) -> list[tuple[float, int]]:
+        """Return up to *k* ``(distance, index)`` pairs nearest to (x, y).
+
+        *accept* is an optional predicate on the point index used to skip
+        points (already used, too risky, ...).  Cells are visited in rings
+        of increasing radius and the search stops once no unvisited cell can
+        contain a closer point than the current k-th best.
+        """
+        if not self._points or k <= 0:
+            return []
+        cx, cy = self._cell(x, y)
+        max_ring = max(
+            abs(cx - self._min_cell[0]), abs(cx - self._max_cell[0]),
+            abs(cy - self._min_cell[1]), abs(cy - self._max_cell[1]),
+        )
+        found: list[tuple[float, int]] = []
+        for ring in range(max_ring + 1):
+            for cell in _ring_cells(cx, cy, ring):
+                for idx in self._cells.get(cell, ()):
+                    if accept is not None and not accept(idx):
+                        continue
+                    px, py = self._points[idx]
+                    found.append((math.hypot(px - x, py - y), idx))
+            if len(found) >= k:
+                found.sort()
+                # Any point in ring r+1 or beyond is at least r * cell_size away.
+                if found[k - 1][0] <= ring * self.cell_size:
+                    break
+        found.sort()
+        return found[:k]
+
+
+def _ring_cells(cx: int, cy: int, ring: int):
+    """Yield the cells on the square ring at Chebyshev distance *ring*."""
+    if ring == 0:
+        yield (cx, cy)
+        return
+    for dx in range(-ring, ring + 1):
+        yield (cx + dx, cy - ring)
+        yield (cx + dx, cy + ring)
+    for dy in range(-ring + 1, ring):
+        yield (cx - ring, cy + dy)
+        yield (cx + ring, cy + dy)
+
+
+# ---------------------------------------------------------------------------
+# Per-session index
+# ---------------------------------------------------------------------------
+
+
+class SessionRouteIndex:
+    """Listed bounce candidates for one session with their trace-risk weights."""
+
+    def __init__(self) -> None:
+        self.grid = SpatialGrid()
+        self.ips: list[str] = []
+        self.risk: list[float] = []
+        self.by_ip: dict[str, int] = {}
+
+    def add(self, ip: str, x: int, y: int, trace_speed: float | None) -> None:
+        idx = self.grid.insert(x, y)
+        self.ips.append(ip)
+        self.risk.append(trace_risk(trace_speed))
+        self.by_ip[ip] = idx
+
+    def position(self, idx: int) -> tuple[float, float]:
+        return self.grid.point(idx)
+
+
+def trace_risk(trace_speed: float | None) -> float:
+    """Weight of routing through a node: 0 for systems that never trace,
+    otherwise the inverse of its trace speed (faster tracers cost more)."""
+    if trace_speed is None or trace_speed <= 0:
+        return 0.0
+    return 1.0 / trace_speed
+
+
+_indexes: "OrderedDict[str, SessionRouteIndex]" = OrderedDict()
+
+
+async def get_index(db: AsyncSession, session_id: str) -> SessionRouteIndex:
+    """Return the cached route index for *session_id*, building it if needed."""
+    index = _indexes.get(session_id)
+    if index is not None:
+        _indexes.move_to_end(session_id)
+        return index
+
+    rows = (
+        await db.execute(
+            select(VLocation.ip, VLocation.x, VLocation.y, Computer.trace_speed)
+            .outerjoin(Computer, Computer.id == VLocation.computer_id)
+            .where(
+                VLocation.game_session_id == session_id,
+                VLocation.listed == True,  # noqa: E712
+            )
+        )
+    ).all()
+
+    index = SessionRouteIndex()
+    for ip, x, y, trace_speed in rows:
+        if ip not in index.by_ip:
+            index.add(ip, x, y, trace_speed)
+
+    _indexes[session_id] = index
+    while len(_indexes) > MAX_CACHED_INDEXES:
+        _indexes.popitem(last=False)
+    return index
+
+
+def invalidate(session_id: str) -> None:
+    """Drop the cached index for *session_id* (e.g. after its links change)."""
+    _indexes.pop(session_id, None)
+
+
+# ---------------------------------------------------------------------------
+# Planning
+# ---------------------------------------------------------------------------
+
+
+async def plan_route(
+    db: AsyncSession,
+    session_id: str,
+    player_id: int,
+    target_ip: str,
+    *,
+    hops: int = DEFAULT_HOPS,
+    avoid_high_trace: bool = True,
+    min_spread: float = 0.0,
+) -> list[str]:
+    """Return a bounce chain of up to *hops* intermediate IPs ending at *target_ip*.
+
+    Raises ValueError if the target is unknown or the constraints are invalid.
+    Fewer hops are returned when not enough candidates satisfy the
+    constraints.
+    """
+    if hops < 0 or hops > MAX_HOPS:
+        raise ValueError(f"hops must be between 0 and {MAX_HOPS}")
+    if min_spread < 0:
+        raise ValueError("min_spread must be non-negative")
+
+    target = (
+        await db.execute(
+            select(VLocation).where(
+                VLocation.game_session_id == session_id,
+                VLocation.ip == target_ip,
+            )
+        )
+    ).scalars().first()
+    if target is None:
+        raise ValueError(f"Unknown IP address: {target_ip}")
+
+    player = (
+        await db.execute(select(Player).where(Player.id == player_id))
+    ).scalar_one_or_none()
+    origin = (target.x, target.y)
+    if player is not None and player.localhost_ip:
+        home = (
+            await db.execute(
+                select(VLocation.x, VLocation.y).where(
+                    VLocation.game_session_id == session_id,
+                    VLocation.ip == player.localhost_ip,
+                )
+            )
+        ).first()
+        if home is not None:
+            origin = (home.x, home.y)
+
+    index = await get_index(db, session_id)
+    excluded = {target_ip}
+    if player is not None and player.localhost_ip:
+        excluded.add(player.localhost_ip)
+
+    def usable(idx: int) -> bool:
+        if index.ips[idx] in excluded:
+            return False
+        if avoid_high_trace and index.risk[idx] >= 1.0 / HIGH_TRACE_SPEED:
+            return False
+        return True
+
+    chain: list[str] = []
+    last_pos: tuple[float, float] | None = None
+    for i in range(hops):
+        t = (i + 1) / (hops + 1)
+        wx = origin[0] + (target.x - origin[0]) * t
+        wy = origin[1] + (target.y - origin[1]) * t
+
+        def accept(idx: int) -> bool:
+            if not usable(idx):
+                return False
+            if last_pos is not None and min_spread > 0:
+                px, py = index.position(idx)
+                if math.hypot(px - last_pos[0], py - last_pos[1]) < min_spread:
+                    return False
+            return True
+
+        candidates = index.grid.nearest(wx, wy, CANDIDATES_PER_HOP, accept)
+        if not candidates:
+            break
+        _, best = min(candidates, key=lambda c: (index.risk[c[1]], c[0]))
+        chain.append(index.ips[best])
+        excluded.add(index.ips[best])
+        last_pos = index.position(best)
+
+    chain.append(target_ip)
+    return chain
@@ -0,0 +1,441 @@
+"""Portable game session snapshots.
+
+A snapshot is one gzip-compressed stream holding everything scoped to a
+game session, so a world can be backed up, moved between nodes or cloned.
+
+Layout (inside the gzip stream)::
+
+    MAGIC  FORMAT_VERSION(1 byte)
+    frame*                      # each: 4-byte big-endian length + JSON
+
+Frames, in order:
+
+* ``header`` -- format version and the ``game_sessions`` fields worth keeping;
+* per table, a ``table`` frame (name, column names, id range) followed by
+  ``rows`` frames of at most ``CHUNK_ROWS`` rows each, stored column-major;
+* ``end``.
+
+String columns are dictionary-encoded: each ``rows`` frame lists the
+strings it introduces and the columns hold indexes into the running
+dictionary.  The dictionary is reset (``"reset": true``) once it reaches
+``MAX_STRINGS`` entries, so both sides use bounded memory.
+
+Export streams rows through a server-side cursor and import inserts each
+chunk with one executemany, so neither side holds a whole table in
+memory.  Imports create a new session and shift every table's ids by a
+per-table offset into a range reserved past every id in use (foreign keys
+and the few ids stored in plain columns are shifted with them), so no
+old-to-new id map has to be kept.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import struct
+import uuid
+from typing import Any, BinaryIO
+
+from sqlalchemy import String, func, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.json_codec import dumps_bytes, loads
+from app.models.game_session import GameSession
+from app.session_store import (
+    drop_session_storage, session_db, session_models, session_scope, session_tables,
+)
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"ULSNAP"
+FORMAT_VERSION = 1
+
+CHUNK_ROWS = 2000
+MAX_STRINGS = 65536
+COMPRESS_LEVEL = 6
+
+# GameSession fields carried over to the restored session.
+_SESSION_FIELDS = ("name", "game_time_ticks", "world_version")
+
+_LEN = struct.Struct(">I")
+
+# Imports in this process run one at a time (see ``_reserve_ids``).
+_import_lock = asyncio.Lock()
+
+
+class SnapshotTooLarge(ValueError):
+    """The snapshot decompresses to more than the caller allows."""
+
+
+class _Bounded:
+    """Read-only view of *src* that refuses to return more than *limit* bytes."""
+
+    def __init__(self, src: BinaryIO, limit: int) -> None:
+        self.src = src
+        self.limit = limit
+        self.consumed = 0
+
+    def read(self, size: int) -> bytes:
+        if self.consumed + size > self.limit:
+            raise SnapshotTooLarge(f"Snapshot exceeds {self.limit} bytes")
+        data = self.src.read(size)
+        self.consumed += len(data)
+        return data
+
+
+# ---------------------------------------------------------------------------
+# Framing
+# ---------------------------------------------------------------------------
+
+
+def _write_frame(out: BinaryIO, frame: dict) -> None:
+    payload = dumps_bytes(frame)
+    out.write(_LEN.pack(len(payload)))
+    out.write(payload)
+
+
+def _read_frame(src: BinaryIO) -> dict:
+    head = src.read(_LEN.size)
+    if len(head) < _LEN.size:
+        raise ValueError("Truncated snapshot")
+    (size,) = _LEN.unpack(head)
+    payload = src.read(size)
+    if len(payload) < size:
+        raise ValueError("Truncated snapshot")
+    return loads(payload)
+
+
+class _StringTable:
+    """Encoder side of the shared string dictionary."""
+
+    def __init__(self) -> None:
+        self._index: dict[str, int] = {}
+
+    def encode(self, columns: list[list], string_cols: list[int]) -> dict:
+        """Replace strings in *string_cols* by indexes; return the frame extras."""
+        extras: dict[str, Any] = {}
+        needed = {
+            v for ci in string_cols for v in columns[ci]
+            if v is not None and v not in self._index
+        }
+        if len(self._index) + len(needed) > MAX_STRINGS:
+            self._index.clear()
+            extras["reset"] = True
+        new: list[str] = []
+        for ci in string_cols:
+            col = columns[ci]
+            for i, v in enumerate(col):
+                if v is None:
+                    continue
+                idx = self._index.get(v)
+                if idx is None:
+                    idx = self._index[v] = len(self._index)
+                    new.append(v)
+                col[i] = idx
+        extras["strings"] = new
+        return extras
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+
+async def export_session(db: AsyncSession, session_id: str, out: BinaryIO) -> dict:
+    """Write a snapshot of *session_id* to the binary file *out*.
+
+    *db* must be able to see the session's world (see ``session_db``).
+    Returns ``{"tables": {name: row_count}}``.
+    """
+    session = await db.get(GameSession, session_id)
+    if session is None:
+        raise ValueError("Game session not found")
+
+    models = session_models()
+    tables = session_tables()
+    counts: dict[str, int] = {}
+    strings = _StringTable()
+
+    with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=COMPRESS_LEVEL) as gz:
+        gz.write(MAGIC + bytes([FORMAT_VERSION]))
+        _write_frame(gz, {
+            "kind": "header",
+            "version": FORMAT_VERSION,
+            "session": {f: getattr(session, f) for f in _SESSION_FIELDS},
+            "tables": [t.name for t in tables],
+        })
+
+        for table in tables:
+            model = models[table.name]
+            names = [c.name for c in table.c]
+            string_cols = [
+                i for i, c in enumerate(table.c) if isinstance(c.type, String)
+                and c.name != "game_session_id"
+            ]
+            where = session_scope(table, session_id)
+            lo, hi = (await db.execute(
+                select(func.min(model.id), func.max(model.id)).where(where)
+            )).one()
+            _write_frame(gz, {
+                "kind": "table", "name": table.name, "columns": names,
+                "min_id": lo, "max_id": hi,
+            })
+            counts[table.name] = 0
+            if lo is None:
+                continue
+
+            stmt = (
+                select(*[getattr(model, n) for n in names])
+                .where(where)
+                .order_by(model.id)
+                .execution_options(yield_per=CHUNK_ROWS)
+            )
+            result = await db.stream(stmt)
+            async for rows in result.partitions():
+                columns = [list(col) for col in zip(*rows)]
+                frame = {"kind": "rows", "n": len(rows)}
+                frame.update(strings.encode(columns, string_cols))
+                frame["data"] = columns
+                _write_frame(gz, frame)
+                counts[table.name] += len(rows)
+
+        _write_frame(gz, {"kind": "end"})
+
+    return {"tables": counts}
+
+
+def read_header(src: BinaryIO) -> dict:
+    """Return the header frame of the snapshot in *src* (cheap: no rows read)."""
+    with gzip.GzipFile(fileobj=src, mode="rb") as gz:
+        return _open(gz)
+
+
+def _open(gz: BinaryIO) -> dict:
+    magic = gz.read(len(MAGIC) + 1)
+    if magic[: len(MAGIC)] != MAGIC:
+        raise ValueError("Not a game snapshot")
+    if magic[-1] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {magic[-1]}")
+    header = _read_frame(gz)
+    if header.get("kind") != "header":
+        raise ValueError("Corrupt snapshot header")
+    return header
+
+
+# ---------------------------------------------------------------------------
+# Import
+# ---------------------------------------------------------------------------
+
+
+def _soft_refs() -> dict[str, dict[str, str]]:
+    """Ids kept in plain (non-FK) columns: table -> {column: referenced table}."""
+    return {
+        "running_tasks": {"file_id": "data_files", "log_id": "access_logs"},
+        "missions": {"target_data": "computers", "accepted_by": "players"},
+    }
+
+
+def _shift_ref(column: str, value, offset: int):
+    if value is None or not offset:
+        return value
+    if column in ("log_id", "accepted_by"):
+        return str(int(value) + offset) if str(value).isdigit() else value
+    if column == "target_data":
+        data = json.loads(value)
+        if data.get("target_computer_id") is not None:
+            data["target_computer_id"] = int(data["target_computer_id"]) + offset
+        return json.dumps(data)
+    return value + offset
+
+
+async def import_session(
+    db: AsyncSession,
+    src: BinaryIO,
+    user_id: int,
+    *,
+    name: str | None = None,
+    max_bytes: int | None = None,
+) -> GameSession:
+    """Restore the snapshot in *src* as a new game session owned by *user_id*.
+
+    *db* is a shared-database session; the world is written through
+    ``session_db`` exactly like ``new_game`` does.  Both are committed on
+    success.  Raises ``ValueError`` for unreadable or unsupported snapshots,
+    and ``SnapshotTooLarge`` once more than *max_bytes* have been
+    decompressed.
+    """
+    async with _import_lock:
+        return await _import(db, src, user_id, name, max_bytes)
+
+
+async def _import(
+    db: AsyncSession, src: BinaryIO, user_id: int, name: str | None, max_bytes: int | None,
+) -> GameSession:
+    with gzip.GzipFile(fileobj=src, mode="rb") as raw:
+        gz = raw if max_bytes is None else _Bounded(raw, max_bytes)
+        try:
+            header = _open(gz)
+        except (OSError, EOFError) as e:
+            raise ValueError(f"Unreadable snapshot: {e}")
+
+        fields = header.get("session", {})
+        session = GameSession(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            name=name or fields.get("name") or "Restored Game",
+            game_time_ticks=fields.get("game_time_ticks", 0),
+            world_version=fields.get("world_version", 0),
+        )
+        db.add(session)
+        await db.flush()
+        try:
+            total = await _restore_rows(db, gz, session)
+        except Exception:
+            await drop_session_storage(session.id)
+            raise
+
+    log.info("Imported snapshot into session %s (%d rows)", session.id, total)
+    return session
+
+
+async def _restore_rows(db: AsyncSession, gz: BinaryIO, session: GameSession) -> int:
+    """Insert every table of the snapshot stream *gz* into *session*."""
+    models = session_models()
+    known = {t.name: t for t in session_tables()}
+    soft_refs = _soft_refs()
+
+    async with session_db(session.id, db, create=True) as world_db:
+        offsets: dict[str, int] = {}
+        strings: list[str] = []
+        table = model = None
+        names: list[str] = []
+        string_cols: set[int] = set()
+        fk_targets: dict[int, str] = {}
+        keep: list[int] = []
+        deferred: set[tuple[str, str, str]] = set()
+        total = 0
+
+        while True:
+            try:
+                frame = _read_frame(gz)
+            except (OSError, EOFError) as e:
+                raise ValueError(f"Unreadable snapshot: {e}")
+            kind = frame.get("kind")
+
+            if kind == "end":
+                break
+
+            if kind == "table":
+                table = known.get(frame["name"])
+                if table is None:
+                    log.warning("Snapshot table %s no longer exists; skipped", frame["name"])
+                    model = None
+                    continue
+                model = models[table.name]
+                names = frame["columns"]
+                string_cols = {
+                    i for i, n in enumerate(names)
+                    if n in table.c and isinstance(table.c[n].type, String)
+                    and n != "game_session_id"
+                }
+                keep = [i for i, n in enumerate(names) if n in table.c]
+                fk_targets = {}
+                for i, n in enumerate(names):
+                    if n in table.c:
+                        for fk in table.c[n].foreign_keys:
+                            fk_targets[i] = fk.column.table.name
+                offset = 0
+                if frame.get("min_id") is not None:
+                    offset = await _reserve_ids(world_db, model, frame["min_id"], frame["max_id"])
+                offsets[table.name] = offset
+                continue
+
+            if kind != "rows":
+                raise ValueError(f"Unexpected snapshot frame {kind!r}")
+
+            if frame.get("reset"):
+                strings.clear()
+            strings.extend(frame.get("strings", ()))
+            if model is None:
+                continue
+
+            data = frame["data"]
+            for ci in string_cols:
+                data[ci] = [None if v is None else strings[v] for v in data[ci]]
+            for ci, target in fk_targets.items():
+                if target == GameSession.__tablename__:
+                    data[ci] = [session.id] * len(data[ci])
+                else:
+                    shift = offsets.get(target, 0)
+                    data[ci] = [None if v is None else v + shift for v in data[ci]]
+            for column, target in soft_refs.get(table.name, {}).items():
+                if column not in names:
+                    continue
+                if target not in offsets:
+                    # The referenced table comes later in the stream
+                    deferred.add((table.name, column, target))
+                    continue
+                ci = names.index(column)
+                data[ci] = [_shift_ref(column, v, offsets[target]) for v in data[ci]]
+            id_col = names.index("id")
+            shift = offsets[table.name]
+            data[id_col] = [v + shift for v in data[id_col]]
+
+            rows = [
+                {names[i]: data[i][r] for i in keep}
+                for r in range(frame["n"])
+            ]
+            await world_db.execute(insert(model), rows)
+            total += len(rows)
+
+        for name, column, target in deferred:
+            await _shift_deferred(world_db, models[name], column, offsets.get(target, 0), session.id)
+        await world_db.commit()
+    await db.commit()
+    return total
+
+
+async def _shift_deferred(db: AsyncSession, model, column: str, offset: int, session_id: str) -> None:
+    """Shift soft references of restored *model* rows whose target was restored after them."""
+    if not offset:
+        return
+    col = getattr(model, column)
+    rows = (await db.execute(
+        select(model.id, col).where(model.game_session_id == session_id, col.is_not(None))
+    )).all()
+    if rows:
+        await db.execute(
+            update(model),
+            [{"id": row_id, column: _shift_ref(column, value, offset)} for row_id, value in rows],
+        )
+
+
+async def _reserve_ids(db: AsyncSession, model, lo: int, hi: int) -> int:
+    """Offset moving snapshot ids [*lo*, *hi*] of *model* into a range no one else uses.
+
+    On PostgreSQL the id sequence is advanced past the range before any row
+    is inserted, in its own short transaction holding a lock that excludes
+    concurrent inserts, so other imports and ``new_game`` draw ids above it.
+    On SQLite *db* already holds the database write lock (the import has
+    inserted its session row), so ``MAX(id)`` cannot move until it commits;
+    ``_import_lock`` keeps the process's other imports from failing on that
+    lock instead of waiting for it.
+    """
+    if db.get_bind(model).dialect.name != "postgresql":
+        current = (await db.execute(select(func.max(model.id)))).scalar()
+        return (current or 0) + 1 - lo
+
+    from app.database import engine
+
+    name = model.__tablename__
+    span = hi - lo + 1
+    async with engine.begin() as conn:
+        await conn.execute(text(f"LOCK TABLE {name} IN SHARE ROW EXCLUSIVE MODE"))
+        top = (await conn.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), GREATEST("
+                f"(SELECT COALESCE(MAX(id), 0) FROM {name}), COALESCE(pg_sequence_last_value("
+                f"pg_get_serial_sequence('{name}', 'id')::regclass), 0)) + :span)"
+            ),
+            {"span": span},
+        )).scalar()
+    return top - span + 1 - lo
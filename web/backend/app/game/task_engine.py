@@ -4,8 +4,11 @@ Each tool type has different tick behaviour that mirrors the original
 Uplink C++ implementation.  Progress is reported as a 0.0-1.0 float and
 tool-specific *extra* data (e.g. partially revealed password characters)
 is included so the frontend can render live feedback.
+
+Per-tool working state lives in typed ``RunningTask`` columns (``password``,
+``char_index``, ``file_id``, ...) so the per-tick path never parses or
+re-serialises JSON.
 """
-import json
 import logging
 
 from sqlalchemy import select, delete, update
@@ -30,6 +33,16 @@ log = logging.getLogger(__name__)
 
 BASE_CPU_SPEED = 60  # default starting CPU speed
 
+# Initial values of the typed working-state columns on a new RunningTask.
+_EMPTY_STATE = {
+    "password": None,
+    "char_index": 0,
+    "ticks_per_char": 0.0,
+    "ticks_into_char": 0.0,
+    "file_id": None,
+    "log_id": None,
+}
+
 
 async def _get_player_cpu_speed(db: AsyncSession, player_id: int) -> int:
     """Load the player's gateway CPU speed, defaulting to 60."""
@@ -97,6 +110,7 @@ async def start_task(
     """Create a new RunningTask and return its initial state dict."""
     target_data = target_data or {}
     ticks_remaining: float = 0.0
+    state = dict(_EMPTY_STATE)
 
     # Fetch the player's CPU speed for the modifier
     cpu_speed = await _get_player_cpu_speed(db, player_id)
@@ -112,14 +126,7 @@ async def start_task(
             raise ValueError("Password_Breaker requires target_data.password")
         ticks_remaining = computer.hack_difficulty * len(password) * cpu_modifier
         ticks_per_char = computer.hack_difficulty * cpu_modifier
-        # Store working state inside target_data
-        target_data = {
-            "password": password,
-            "revealed": "",
-            "char_index": 0,
-            "ticks_per_char": ticks_per_char,
-            "ticks_into_char": 0.0,
-        }
+        state.update(password=password, ticks_per_char=ticks_per_char)
 
     # --- File Copier ---------------------------------------------------------
     elif tool_name == "File_Copier":
@@ -132,7 +139,7 @@ async def start_task(
         if data_file is None:
             raise ValueError(f"DataFile {file_id} not found")
         ticks_remaining = C.TICKSREQUIRED_COPY * data_file.size * cpu_modifier
-        target_data = {"file_id": data_file.id}
+        state["file_id"] = data_file.id
 
     # --- File Deleter --------------------------------------------------------
     elif tool_name == "File_Deleter":
@@ -145,18 +152,17 @@ async def start_task(
         if data_file is None:
             raise ValueError(f"DataFile {file_id} not found")
         ticks_remaining = C.TICKSREQUIRED_DELETE * data_file.size * cpu_modifier
-        target_data = {"file_id": data_file.id}
+        state["file_id"] = data_file.id
 
     # --- Log Deleter ---------------------------------------------------------
     elif tool_name == "Log_Deleter":
         log_id = target_data.get("log_id")  # may be int or "all"
         ticks_remaining = C.TICKSREQUIRED_LOGDELETER * cpu_modifier
-        target_data = {"log_id": log_id}
+        state["log_id"] = None if log_id is None else str(log_id)
 
     # --- Trace Tracker -------------------------------------------------------
     elif tool_name == "Trace_Tracker":
         ticks_remaining = -1  # runs indefinitely until stopped
-        target_data = {}
 
     else:
         raise ValueError(f"Unknown tool: {tool_name}")
@@ -167,15 +173,16 @@ async def start_task(
         tool_name=tool_name,
         tool_version=tool_version,
         target_ip=target_ip,
-        target_data=json.dumps(target_data),
         progress=0.0,
         ticks_remaining=ticks_remaining,
+        total_ticks=max(0.0, ticks_remaining),
         is_active=True,
+        **state,
     )
     db.add(task)
     await db.flush()
 
-    extra = _build_extra(task, target_data)
+    extra = _build_extra(task)
     return _task_dict(task, completed=False, extra=extra)["data"]
 
 
@@ -185,17 +192,15 @@ async def start_task(
 
 async def tick_task(db: AsyncSession, task: RunningTask, speed: int) -> dict:
     """Advance *task* by *speed* ticks and return an update dict."""
-    td = json.loads(task.target_data or "{}")
-
     # --- Trace Tracker (never completes) -------------------------------------
     if task.tool_name == "Trace_Tracker":
-        return await _tick_trace_tracker(db, task, td)
+        return await _tick_trace_tracker(db, task)
 
     # --- Decrement ticks_remaining -------------------------------------------
     task.ticks_remaining = max(0.0, task.ticks_remaining - speed)
 
     # Compute overall progress (0.0 .. 1.0)
-    total_ticks = _initial_ticks(task, td)
+    total_ticks = _initial_ticks(task)
     if total_ticks > 0:
         task.progress = round(min(1.0, 1.0 - task.ticks_remaining / total_ticks), 4)
     else:
@@ -205,25 +210,24 @@ async def tick_task(db: AsyncSession, task: RunningTask, speed: int) -> dict:
 
     # --- Tool-specific per-tick behaviour ------------------------------------
     if task.tool_name == "Password_Breaker":
-        td, is_complete = _tick_password_breaker(td, speed, is_complete)
-        task.target_data = json.dumps(td)
+        is_complete = _tick_password_breaker(task, speed)
 
     # --- Completion logic ----------------------------------------------------
     if is_complete:
         if task.tool_name == "Password_Breaker":
             pass  # already handled above
         elif task.tool_name == "File_Copier":
-            await _complete_file_copier(db, task, td)
+            await _complete_file_copier(db, task)
         elif task.tool_name == "File_Deleter":
-            await _complete_file_deleter(db, task, td)
+            await _complete_file_deleter(db, task)
         elif task.tool_name == "Log_Deleter":
-            await _complete_log_deleter(db, task, td)
+            await _complete_log_deleter(db, task)
 
         task.is_active = False
         task.progress = 1.0
         task.ticks_remaining = 0
 
-    extra = _build_extra(task, td)
+    extra = _build_extra(task)
     return _task_dict(task, completed=is_complete, extra=extra)
 
 
@@ -239,8 +243,7 @@ async def stop_task(db: AsyncSession, task_id: int) -> dict:
     if task is None:
         raise ValueError(f"RunningTask {task_id} not found")
     task.is_active = False
-    td = json.loads(task.target_data or "{}")
-    extra = _build_extra(task, td)
+    extra = _build_extra(task)
     return _task_dict(task, completed=False, extra=extra)["data"]
 
 
@@ -264,8 +267,7 @@ async def get_active_tasks(
 
     results = []
     for task in tasks:
-        td = json.loads(task.target_data or "{}")
-        extra = _build_extra(task, td)
+        extra = _build_extra(task)
         results.append(_task_dict(task, completed=False, extra=extra)["data"])
     return results
 
@@ -275,50 +277,41 @@ async def get_active_tasks(
 # ---------------------------------------------------------------------------
 
 
-def _initial_ticks(task: RunningTask, td: dict) -> float:
-    """Reconstruct total ticks from target_data so we can compute progress."""
+def _initial_ticks(task: RunningTask) -> float:
+    """Return the task's total ticks so we can compute progress."""
+    if task.total_ticks:
+        return task.total_ticks
     if task.tool_name == "Password_Breaker":
-        password = td.get("password", "")
-        ticks_per_char = td.get("ticks_per_char", 1)
-        return ticks_per_char * len(password)
-    # For other tools the initial count can be derived from progress and remaining
-    # but a simpler approach: store nothing extra and use the progress formula.
+        return (task.ticks_per_char or 1) * len(task.password or "")
+    # Rows created before total_ticks existed: derive it from progress and
+    # remaining ticks.
     if task.progress < 1.0 and task.progress > 0.0:
         # total = remaining / (1 - progress)
         return task.ticks_remaining / (1.0 - task.progress)
     return task.ticks_remaining  # fallback for progress == 0
 
 
-def _tick_password_breaker(td: dict, speed: int, would_complete: bool) -> tuple[dict, bool]:
+def _tick_password_breaker(task: RunningTask, speed: int) -> bool:
     """Reveal characters one at a time based on ticks elapsed.
 
-    Each character takes ``ticks_per_char`` ticks to reveal.
+    Each character takes ``ticks_per_char`` ticks to reveal.  Returns True
+    once the whole password has been revealed.
     """
-    password = td.get("password", "")
-    ticks_per_char = td.get("ticks_per_char", 1)
-    char_index = td.get("char_index", 0)
-    ticks_into_char = td.get("ticks_into_char", 0.0)
+    password = task.password or ""
+    ticks_per_char = task.ticks_per_char or 1
+    char_index = task.char_index or 0
+    ticks_into_char = (task.ticks_into_char or 0.0) + speed
 
-    ticks_into_char += speed
     while ticks_into_char >= ticks_per_char and char_index < len(password):
         ticks_into_char -= ticks_per_char
         char_index += 1
 
-    revealed = password[:char_index]
-    td["revealed"] = revealed
-    td["char_index"] = char_index
-    td["ticks_into_char"] = ticks_into_char
+    task.char_index = char_index
+    task.ticks_into_char = ticks_into_char
+    return char_index >= len(password)
 
-    is_complete = char_index >= len(password)
-    if is_complete:
-        td["revealed"] = password  # ensure fully revealed
-
-    return td, is_complete
 
-
-async def _tick_trace_tracker(
-    db: AsyncSession, task: RunningTask, td: dict
-) -> dict:
+async def _tick_trace_tracker(db: AsyncSession, task: RunningTask) -> dict:
     """Read current trace_progress from the Connection and return it."""
     conn = (
         await db.execute(
@@ -342,11 +335,9 @@ async def _tick_trace_tracker(
     return _task_dict(task, completed=False, extra=extra)
 
 
-async def _complete_file_copier(
-    db: AsyncSession, task: RunningTask, td: dict
-) -> None:
+async def _complete_file_copier(db: AsyncSession, task: RunningTask) -> None:
     """On completion, copy the DataFile to the player's gateway computer."""
-    file_id = td.get("file_id")
+    file_id = task.file_id
     if file_id is None:
         return
     source_file = (
@@ -389,20 +380,16 @@ async def _complete_file_copier(
     await db.flush()
 
 
-async def _complete_file_deleter(
-    db: AsyncSession, task: RunningTask, td: dict
-) -> None:
+async def _complete_file_deleter(db: AsyncSession, task: RunningTask) -> None:
     """On completion, delete the target DataFile record."""
-    file_id = td.get("file_id")
+    file_id = task.file_id
     if file_id is None:
         return
     await db.execute(delete(DataFile).where(DataFile.id == int(file_id)))
     await db.flush()
 
 
-async def _complete_log_deleter(
-    db: AsyncSession, task: RunningTask, td: dict
-) -> None:
+async def _complete_log_deleter(db: AsyncSession, task: RunningTask) -> None:
     """On completion, delete logs based on tool version.
 
     v1: deletes the oldest visible log on the target computer.
@@ -417,7 +404,7 @@ async def _complete_log_deleter(
         return
 
     version = task.tool_version
-    log_id = td.get("log_id")
+    log_id = task.log_id
 
     if version == 1:
         # Delete oldest visible log
@@ -477,17 +464,17 @@ async def _complete_log_deleter(
 # ---------------------------------------------------------------------------
 
 
-def _build_extra(task: RunningTask, td: dict) -> dict:
+def _build_extra(task: RunningTask) -> dict:
     """Build the tool-specific *extra* dict for WebSocket updates."""
     if task.tool_name == "Password_Breaker":
-        password = td.get("password", "")
-        revealed = td.get("revealed", "")
+        password = task.password or ""
+        revealed = task.revealed
         # Show revealed chars and underscores for remaining
         display = revealed + "_" * (len(password) - len(revealed))
         return {"revealed": display}
     if task.tool_name == "Trace_Tracker":
         return {
-            "trace_progress": td.get("trace_progress", 0.0),
-            "trace_active": td.get("trace_active", False),
+            "trace_progress": 0.0,
+            "trace_active": False,
         }
     return {}
@@ -0,0 +1,359 @@
+"""
+Pure world generation -- builds the rows of a starting world without a DB.
+
+``build_world`` runs the whole random generation (names, IPs, passwords,
+screens, security) and returns compact row batches: tuples in the column
+order of the ``*_COLS`` constants.  Rows refer to computers by their index
+in ``rows["computers"]``; ``world_generator`` resolves those to real ids
+when it bulk-inserts the batches.
+
+The module only depends on ``constants`` and ``name_generator`` so it is
+cheap to import in a process-pool worker.  The same seed always builds the
+same world, and every generated IP comes from one ``IPAllocator`` so no
+two systems (nor any fixed IP in ``constants``) share an address.
+"""
+import random
+import string
+
+from app.game import constants as C
+from app.game.ip_allocator import IPAllocator
+from app.game.name_generator import generate_name, generate_company_name
+
+COMPANY_COLS = ("name", "size", "growth", "alignment", "boss_name")
+COMPUTER_COLS = (
+    "name", "company_name", "ip", "computer_type", "trace_speed", "hack_difficulty",
+)
+# computer_ref is an index into rows["computers"].
+LOCATION_COLS = ("ip", "x", "y", "listed", "computer_ref")
+SCREEN_COLS = ("computer_ref", "screen_type", "next_page", "sub_page", "data1")
+SECURITY_COLS = ("computer_ref", "security_type", "level")
+PERSON_COLS = (
+    "name", "age", "is_agent", "uplink_rating", "photo_index", "voice_index",
+    "has_criminal_record",
+)
+FILE_COLS = ("computer_ref", "filename", "size", "file_type", "softwaretype", "data")
+
+# (filename, size, file_type, softwaretype, tool_name, version)
+STARTER_SOFTWARE = [
+    ("Password Breaker v1.0", 2, 1, 4, "Password_Breaker", 1),
+    ("File Copier v1.0", 1, 1, 1, "File_Copier", 1),
+    ("File Deleter v1.0", 1, 1, 1, "File_Deleter", 1),
+    ("Log Deleter v1.0", 1, 1, 3, "Log_Deleter", 1),
+    ("Trace Tracker v1.0", 1, 1, 3, "Trace_Tracker", 1),
+]
+
+
+class _Builder:
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+        self.rows: dict[str, list] = {
+            "companies": [], "computers": [], "locations": [], "screens": [],
+            "security": [], "people": [], "files": [],
+        }
+
+    def company(self, name, size, growth, alignment, boss_name=None) -> None:
+        self.rows["companies"].append((name, size, growth, alignment, boss_name))
+
+    def system(
+        self,
+        *,
+        name: str,
+        company_name: str,
+        ip: str,
+        computer_type: int,
+        trace_speed: float,
+        hack_difficulty: float,
+        x: int,
+        y: int,
+        screens: list[tuple[int, int | None]],
+        security: list[tuple[int, int]] | None = None,
+        listed: bool = True,
+    ) -> int:
+        """Add a computer with its location, screens and security; return its ref."""
+        ref = len(self.rows["computers"])
+        self.rows["computers"].append(
+            (name, company_name, ip, computer_type, trace_speed, hack_difficulty)
+        )
+        self.rows["locations"].append((ip, x, y, listed, ref))
+
+        rng = self.rng
+        for idx, (screen_type, next_page) in enumerate(screens):
+            data1 = None
+            if screen_type in (C.SCREEN_PASSWORDSCREEN, C.SCREEN_HIGHSECURITYSCREEN):
+                data1 = ''.join(
+                    rng.choices(
+                        string.ascii_lowercase + string.digits,
+                        k=rng.randint(6, 10),
+                    )
+                )
+                if next_page is None:
+                    next_page = idx + 1  # advance to the next screen
+            self.rows["screens"].append((ref, screen_type, next_page, idx, data1))
+
+        for sec_type, level in security or ():
+            self.rows["security"].append((ref, sec_type, max(1, level)))
+        return ref
+
+
+def build_world(seed: int, companies: int = C.NUM_STARTING_COMPANIES) -> dict:
+    """Generate the rows of a complete starting world from *seed*.
+
+    *companies* scales the world (each company runs one to three systems).
+    Returns ``{"companies": [...], "computers": [...], "locations": [...],
+    "screens": [...], "security": [...], "people": [...], "files": [...],
+    "gateway_ref": int, "player_ip": str}``.
+    """
+    rng = random.Random(seed)
+    ips = IPAllocator(rng.getrandbits(64))
+    b = _Builder(rng)
+
+    # Uplink company and its systems
+    b.company("Uplink Corporation", 40, 10, 0, "Agent Leader")
+
+    b.system(
+        name="Uplink Public Access Server",
+        company_name="Uplink Corporation",
+        ip=C.IP_UPLINKPUBLICACCESSSERVER,
+        computer_type=0,  # public access
+        trace_speed=C.TRACESPEED_UPLINK_PUBLICACCESSSERVER,
+        hack_difficulty=C.HACKDIFFICULTY_UPLINK_PUBLICACCESSSERVER,
+        x=282, y=69,  # London
+        screens=[
+            (C.SCREEN_MESSAGESCREEN, None),
+            (C.SCREEN_BBSSCREEN, None),
+            (C.SCREEN_LINKSSCREEN, None),
+            (C.SCREEN_SWSALESSCREEN, None),
+            (C.SCREEN_HWSALESSCREEN, None),
+        ],
+    )
+
+    b.system(
+        name=C.NAME_UPLINKINTERNALSERVICES,
+        company_name="Uplink Corporation",
+        ip=C.IP_UPLINKINTERNALSERVICES,
+        computer_type=1,  # internal
+        trace_speed=C.TRACESPEED_UPLINK_INTERNALSERVICESMACHINE,
+        hack_difficulty=C.HACKDIFFICULTY_UPLINK_INTERNALSERVICESMACHINE,
+        x=284, y=71,
+        screens=[
+            (C.SCREEN_PASSWORDSCREEN, None),
+            (C.SCREEN_MENUSCREEN, None),
+            (C.SCREEN_FILESERVERSCREEN, None),
+            (C.SCREEN_LOGSCREEN, None),
+        ],
+        security=[(3, 1)],  # monitor level 1
+    )
+
+    b.system(
+        name="Uplink Test Machine",
+        company_name="Uplink Corporation",
+        ip=C.IP_UPLINKTESTMACHINE,
+        computer_type=1,
+        trace_speed=C.TRACESPEED_UPLINK_TESTMACHINE,
+        hack_difficulty=C.HACKDIFFICULTY_UPLINK_TESTMACHINE,
+        x=280, y=67,
+        screens=[
+            (C.SCREEN_PASSWORDSCREEN, None),
+            (C.SCREEN_MENUSCREEN, None),
+            (C.SCREEN_FILESERVERSCREEN, None),
+            (C.SCREEN_LOGSCREEN, None),
+        ],
+    )
+
+    b.system(
+        name="InterNIC",
+        company_name="InterNIC",
+        ip=C.IP_INTERNIC,
+        computer_type=0,
+        trace_speed=C.TRACESPEED_INTERNIC,
+        hack_difficulty=C.HACKDIFFICULTY_INTERNIC,
+        x=140, y=90,
+        screens=[
+            (C.SCREEN_LINKSSCREEN, None),
+        ],
+    )
+    b.company("InterNIC", 30, 5, 0)
+
+    # Government / Special databases
+    gov_systems = [
+        ("International Academic Database", C.IP_ACADEMICDATABASE,
+         C.TRACESPEED_INTERNATIONALACADEMICDATABASE, C.HACKDIFFICULTY_INTERNATIONALACADEMICDATABASE,
+         440, 100, [(C.SCREEN_PASSWORDSCREEN, None), (C.SCREEN_ACADEMICSCREEN, None), (C.SCREEN_LOGSCREEN, None)]),
+        ("Global Criminal Database", C.IP_GLOBALCRIMINALDATABASE,
+         C.TRACESPEED_GLOBALCRIMINALDATABASE, C.HACKDIFFICULTY_GLOBALCRIMINALDATABASE,
+         170, 95, [(C.SCREEN_PASSWORDSCREEN, None), (C.SCREEN_CRIMINALSCREEN, None), (C.SCREEN_LOGSCREEN, None)]),
+        ("International Social Security Database", C.IP_SOCIALSECURITYDATABASE,
+         C.TRACESPEED_INTERNATIONALSOCIALSECURITYDATABASE, C.HACKDIFFICULTY_INTERNATIONALSOCIALSECURITYDATABASE,
+         160, 100, [(C.SCREEN_PASSWORDSCREEN, None), (C.SCREEN_SOCSECSCREEN, None), (C.SCREEN_LOGSCREEN, None)]),
+        ("Central Medical Database", C.IP_CENTRALMEDICALDATABASE,
+         C.TRACESPEED_CENTRALMEDICALDATABASE, C.HACKDIFFICULTY_CENTRALMEDICALDATABASE,
+         150, 105, [(C.SCREEN_PASSWORDSCREEN, None), (C.SCREEN_RECORDSCREEN, None), (C.SCREEN_LOGSCREEN, None)]),
+        ("Stock Market", C.IP_STOCKMARKETSYSTEM,
+         C.TRACESPEED_STOCKMARKET, C.HACKDIFFICULTY_STOCKMARKET,
+         290, 75, [(C.SCREEN_PASSWORDSCREEN, None), (C.SCREEN_SHARESLISTSCREEN, None), (C.SCREEN_LOGSCREEN, None)]),
+        ("Global Intelligence Agency", C.IP_GLOBALINTELLIGENCEAGENCY,
+         C.TRACESPEED_GLOBALINTELLIGENCEAGENCY, C.HACKDIFFICULTY_GLOBALINTELLIGENCEAGENCY,
+         168, 92, [(C.SCREEN_HIGHSECURITYSCREEN, None), (C.SCREEN_MENUSCREEN, None), (C.SCREEN_LOGSCREEN, None)]),
+    ]
+
+    for name, ip, tspeed, hdiff, x, y, screens in gov_systems:
+        security = [(3, 2)]  # monitor level 2
+        if hdiff >= 180:
+            security.append((2, 1))  # firewall
+        b.system(
+            name=name, company_name="Government",
+            ip=ip, computer_type=2, trace_speed=tspeed,
+            hack_difficulty=hdiff, x=x, y=y,
+            screens=screens, security=security,
+        )
+    b.company("Government", 50, 0, 0)
+
+    # Random companies and their computers
+    for i in range(companies):
+        comp_name = generate_company_name(rng)
+        comp_size = max(1, C.COMPANYSIZE_AVERAGE + rng.randint(-C.COMPANYSIZE_RANGE, C.COMPANYSIZE_RANGE))
+        comp_growth = C.COMPANYGROWTH_AVERAGE + rng.randint(-C.COMPANYGROWTH_RANGE, C.COMPANYGROWTH_RANGE)
+        comp_alignment = C.COMPANYALIGNMENT_AVERAGE + rng.randint(-C.COMPANYALIGNMENT_RANGE, C.COMPANYALIGNMENT_RANGE)
+        b.company(comp_name, comp_size, comp_growth, comp_alignment, generate_name(rng))
+
+        # Public access server
+        pub_ip = ips.allocate()
+        loc = C.PHYSICALGATEWAYLOCATIONS[rng.randint(0, len(C.PHYSICALGATEWAYLOCATIONS) - 1)]
+        x = loc["x"] + rng.randint(-30, 30)
+        y = loc["y"] + rng.randint(-30, 30)
+        x = max(10, min(590, x))
+        y = max(10, min(290, y))
+
+        b.system(
+            name=f"{comp_name} Public Access Server",
+            company_name=comp_name,
+            ip=pub_ip, computer_type=0,
+            trace_speed=C.TRACESPEED_PUBLICACCESSSERVER,
+            hack_difficulty=C.HACKDIFFICULTY_PUBLICACCESSSERVER,
+            x=x, y=y,
+            screens=[
+                (C.SCREEN_MESSAGESCREEN, None),
+                (C.SCREEN_PASSWORDSCREEN, None),
+                (C.SCREEN_MENUSCREEN, None),
+            ],
+        )
+
+        # Internal services machine
+        if comp_size >= 5:
+            int_ip = ips.allocate()
+            security = []
+            if comp_size >= C.MINCOMPANYSIZE_MONITOR:
+                security.append((3, min(5, comp_size // 8 + 1)))
+            if comp_size >= C.MINCOMPANYSIZE_PROXY:
+                security.append((1, min(5, comp_size // 10 + 1)))
+            if comp_size >= C.MINCOMPANYSIZE_FIREWALL:
+                security.append((2, min(5, comp_size // 12 + 1)))
+
+            b.system(
+                name=f"{comp_name} Internal Services Machine",
+                company_name=comp_name,
+                ip=int_ip, computer_type=1,
+                trace_speed=C.TRACESPEED_INTERNALSERVICESMACHINE * (1 + rng.uniform(-C.TRACESPEED_VARIANCE, C.TRACESPEED_VARIANCE)),
+                hack_difficulty=C.HACKDIFFICULTY_INTERNALSERVICESMACHINE * (1 + rng.uniform(-C.HACKDIFFICULTY_VARIANCE, C.HACKDIFFICULTY_VARIANCE)),
+                x=x + rng.randint(-5, 5), y=y + rng.randint(-5, 5),
+                screens=[
+                    (C.SCREEN_PASSWORDSCREEN, None),
+                    (C.SCREEN_MENUSCREEN, None),
+                    (C.SCREEN_FILESERVERSCREEN, None),
+                    (C.SCREEN_LOGSCREEN, None),
+                ],
+                security=security, listed=False,
+            )
+
+        # Central mainframe for big companies
+        if comp_size >= 15:
+            main_ip = ips.allocate()
+            b.system(
+                name=f"{comp_name} Central Mainframe",
+                company_name=comp_name,
+                ip=main_ip, computer_type=2,
+                trace_speed=C.TRACESPEED_CENTRALMAINFRAME * (1 + rng.uniform(-C.TRACESPEED_VARIANCE, C.TRACESPEED_VARIANCE)),
+                hack_difficulty=C.HACKDIFFICULTY_CENTRALMAINFRAME * (1 + rng.uniform(-C.HACKDIFFICULTY_VARIANCE, C.HACKDIFFICULTY_VARIANCE)),
+                x=x + rng.randint(-5, 5), y=y + rng.randint(-5, 5),
+                screens=[
+                    (C.SCREEN_HIGHSECURITYSCREEN, None),
+                    (C.SCREEN_MENUSCREEN, None),
+                    (C.SCREEN_FILESERVERSCREEN, None),
+                    (C.SCREEN_LOGSCREEN, None),
+                ],
+                security=[(3, min(5, comp_size // 6)), (2, min(5, comp_size // 8))],
+                listed=False,
+            )
+
+    # Banks
+    for i in range(C.NUM_STARTING_BANKS):
+        bank_name = f"{generate_company_name(rng)} Bank"
+        bank_ip = ips.allocate()
+        loc = C.PHYSICALGATEWAYLOCATIONS[rng.randint(0, len(C.PHYSICALGATEWAYLOCATIONS) - 1)]
+        x = loc["x"] + rng.randint(-20, 20)
+        y = loc["y"] + rng.randint(-20, 20)
+        b.company(
+            bank_name, rng.randint(20, 40), rng.randint(5, 15), 0, generate_name(rng)
+        )
+        b.system(
+            name=f"{bank_name} Public Server",
+            company_name=bank_name,
+            ip=bank_ip, computer_type=3,
+            trace_speed=C.TRACESPEED_PUBLICBANKSERVER,
+            hack_difficulty=C.HACKDIFFICULTY_PUBLICBANKSERVER,
+            x=x, y=y,
+            screens=[
+                (C.SCREEN_PASSWORDSCREEN, None),
+                (C.SCREEN_MENUSCREEN, None),
+                (C.SCREEN_ACCOUNTSCREEN, None),
+                (C.SCREEN_LOGSCREEN, None),
+            ],
+            security=[(3, 3), (2, 2)],
+        )
+
+    # People
+    people = b.rows["people"]
+    for i in range(C.NUM_STARTING_PEOPLE):
+        people.append((
+            generate_name(rng),
+            rng.randint(20, 65),
+            False,
+            0,
+            rng.randint(0, C.NUM_STARTING_PHOTOS - 1),
+            rng.randint(0, C.NUM_STARTING_VOICES - 1),
+            rng.random() < C.PERCENTAGE_PEOPLEWITHCONVICTIONS / 100,
+        ))
+
+    # NPC agents
+    for i in range(C.NUM_STARTING_AGENTS):
+        agent_rating = max(0, min(16, int(rng.gauss(C.AGENT_UPLINKRATINGAVERAGE, C.AGENT_UPLINKRATINGVARIANCE))))
+        people.append((
+            generate_name(rng),
+            rng.randint(18, 55),
+            True,
+            agent_rating,
+            rng.randint(0, C.NUM_STARTING_PHOTOS - 1),
+            rng.randint(0, C.NUM_STARTING_VOICES - 1),
+            rng.random() < C.PERCENTAGE_AGENTSWITHCONVICTIONS / 100,
+        ))
+
+    # Player gateway: a computer record so DataFiles can be stored on it.
+    # It has no screens and its location is unlisted.
+    player_ip = ips.allocate()
+    gateway_loc = C.PHYSICALGATEWAYLOCATIONS[0]  # Default: London
+    gateway_ref = len(b.rows["computers"])
+    b.rows["computers"].append((
+        C.PLAYER_START_GATEWAYNAME, "Player", player_ip,
+        4,   # gateway type
+        -1,  # can't trace player
+        0,
+    ))
+    b.rows["locations"].append(
+        (player_ip, gateway_loc["x"], gateway_loc["y"], False, gateway_ref)
+    )
+    for fname, fsize, ftype, swtype, tool_name, version in STARTER_SOFTWARE:
+        b.rows["files"].append((gateway_ref, fname, fsize, ftype, swtype, str(version)))
+
+    b.rows["gateway_ref"] = gateway_ref
+    b.rows["player_ip"] = player_ip
+    return b.rows
@@ -0,0 +1,197 @@
+"""World map -- level-of-detail clusters, versioning and link deltas.
+
+The listed ``VLocation`` rows of a session are bucketed into square tiles at
+each zoom level.  Zoom 0 uses ``BASE_TILE_SIZE`` map units per tile and each
+further level halves the tile size; at ``MAX_ZOOM`` every location is
+returned individually.  Clusters for all levels are computed once per
+session *world version* and kept in a small LRU, so repeated map requests
+cost a dict lookup.
+
+``GameSession.world_version`` is bumped by ``publish_locations`` whenever a
+location becomes listed (``accept_mission`` publishes the target's link),
+and the location records the version it was added at.  Clients send
+``If-None-Match`` to revalidate, or ``since=N`` to fetch only the links
+added after version N.
+"""
+import logging
+from collections import OrderedDict
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.game import route_planner
+from app.models.game_session import GameSession
+from app.models.vlocation import VLocation
+
+log = logging.getLogger(__name__)
+
+MAX_ZOOM = 5
+BASE_TILE_SIZE = 128
+
+# Number of (session, version) cluster sets kept in memory.
+MAX_CACHED_MAPS = 256
+
+
+def tile_size(zoom: int) -> int:
+    """Map units per tile edge at *zoom*."""
+    return max(1, BASE_TILE_SIZE >> zoom)
+
+
+def cluster_locations(points: list[tuple[str, int, int]], zoom: int) -> list[dict]:
+    """Group ``(ip, x, y)`` points into per-tile clusters for *zoom*.
+
+    Each cluster carries its tile coordinates, the centroid of its members
+    and a member count; single-member clusters also carry the IP so the
+    client can draw them as ordinary links.
+    """
+    if zoom >= MAX_ZOOM:
+        return [{"ip": ip, "x": x, "y": y, "count": 1} for ip, x, y in points]
+
+    size = tile_size(zoom)
+    tiles: dict[tuple[int, int], list] = {}
+    for ip, x, y in points:
+        key = (x // size, y // size)
+        acc = tiles.get(key)
+        if acc is None:
+            tiles[key] = [x, y, 1, ip]
+        else:
+            acc[0] += x
+            acc[1] += y
+            acc[2] += 1
+
+    clusters = []
+    for (tx, ty), (sx, sy, n, first_ip) in sorted(tiles.items()):
+        cluster = {
+            "tile": [tx, ty],
+            "x": round(sx / n, 1),
+            "y": round(sy / n, 1),
+            "count": n,
+        }
+        if n == 1:
+            cluster["ip"] = first_ip
+        clusters.append(cluster)
+    return clusters
+
+
+class WorldMap:
+    """Precomputed clusters for every zoom level of one world version."""
+
+    def __init__(self, version: int, points: list[tuple[str, int, int]]) -> None:
+        self.version = version
+        self.location_count = len(points)
+        self.levels = [cluster_locations(points, z) for z in range(MAX_ZOOM + 1)]
+
+
+_maps: "OrderedDict[tuple[str, int], WorldMap]" = OrderedDict()
+
+
+async def get_world_version(db: AsyncSession, session_id: str) -> int:
+    version = (
+        await db.execute(
+            select(GameSession.world_version).where(GameSession.id == session_id)
+        )
+    ).scalar_one_or_none()
+    return version or 0
+
+
+async def get_map(db: AsyncSession, session_id: str, version: int) -> WorldMap:
+    """Return the cluster set for *session_id* at *version*, building it if needed."""
+    key = (session_id, version)
+    world_map = _maps.get(key)
+    if world_map is not None:
+        _maps.move_to_end(key)
+        return world_map
+
+    rows = (
+        await db.execute(
+            select(VLocation.ip, VLocation.x, VLocation.y).where(
+                VLocation.game_session_id == session_id,
+                VLocation.listed == True,  # noqa: E712
+            )
+        )
+    ).all()
+    world_map = WorldMap(version, [tuple(r) for r in rows])
+
+    _maps[key] = world_map
+    while len(_maps) > MAX_CACHED_MAPS:
+        _maps.popitem(last=False)
+    return world_map
+
+
+async def locations_since(
+    db: AsyncSession, session_id: str, since: int
+) -> list[dict]:
+    """Listed locations added after world version *since*."""
+    rows = (
+        await db.execute(
+            select(VLocation.ip, VLocation.x, VLocation.y, VLocation.world_version)
+            .where(
+                VLocation.game_session_id == session_id,
+                VLocation.listed == True,  # noqa: E712
+                VLocation.world_version > since,
+            )
+            .order_by(VLocation.world_version, VLocation.id)
+        )
+    ).all()
+    return [
+        {"ip": ip, "x": x, "y": y, "version": v} for ip, x, y, v in rows
+    ]
+
+
+def make_etag(session_id: str, version: int, *parts) -> str:
+    """Weak ETag for a map response at *version*."""
+    suffix = "".join(f"-{p}" for p in parts)
+    return f'W/"{session_id}-v{version}{suffix}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {t.strip() for t in if_none_match.split(",")}
+    # Weak comparison: ignore the W/ prefix on either side.
+    bare = etag.removeprefix("W/")
+    return etag in tags or bare in tags or f"W/{bare}" in tags
+
+
+async def publish_locations(
+    db: AsyncSession, session_id: str, ips: list[str]
+) -> int:
+    """Mark *ips* as listed under a new world version and return it.
+
+    Locations that are already listed keep their original version.  The
+    version is only bumped when at least one location actually changes.
+    """
+    if not ips:
+        return await get_world_version(db, session_id)
+
+    session = await db.get(GameSession, session_id)
+    if session is None:
+        raise ValueError("Game session not found")
+
+    new_version = (session.world_version or 0) + 1
+    result = await db.execute(
+        update(VLocation)
+        .where(
+            VLocation.game_session_id == session_id,
+            VLocation.ip.in_(ips),
+            VLocation.listed == False,  # noqa: E712
+        )
+        .values(listed=True, world_version=new_version)
+    )
+    if not result.rowcount:
+        return session.world_version or 0
+
+    session.world_version = new_version
+    await db.flush()
+
+    route_planner.invalidate(session_id)
+    log.debug("session %s world version -> %d", session_id, new_version)
+    return new_version
+
+
+def invalidate(session_id: str) -> None:
+    """Drop every cached cluster set for *session_id*."""
+    for key in [k for k in _maps if k[0] == session_id]:
+        del _maps[key]
@@ -0,0 +1,55 @@
+"""JSON encoding for REST responses and WebSocket frames.
+
+Uses ``orjson`` when it is installed (``pip install .[fast]``) and falls
+back to the stdlib ``json`` module otherwise.  Both paths produce compact
+UTF-8 output equivalent to what Starlette's ``JSONResponse`` and
+``WebSocket.send_json`` emit.
+"""
+import json
+from typing import Any
+
+from fastapi import WebSocket
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialise *obj* to compact UTF-8 JSON bytes."""
+        return orjson.dumps(obj, option=_ORJSON_OPTS)
+
+    def dumps(obj: Any) -> str:
+        """Serialise *obj* to a compact JSON string."""
+        return orjson.dumps(obj, option=_ORJSON_OPTS).decode("utf-8")
+
+    loads = orjson.loads
+
+else:
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialise *obj* to compact UTF-8 JSON bytes."""
+        return dumps(obj).encode("utf-8")
+
+    def dumps(obj: Any) -> str:
+        """Serialise *obj* to a compact JSON string."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+    loads = json.loads
+
+
+async def send_json(websocket: WebSocket, message: dict) -> None:
+    """Send *message* as a text frame using the fast encoder."""
+    await websocket.send_text(dumps(message))
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` rendered with the fast encoder (app default)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
@@ -2,12 +2,14 @@ import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI, WebSocket
+from fastapi import Depends, FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
+from app.auth.deps import get_current_user
 from app.config import settings
 from app.database import init_db
+from app.json_codec import FastJSONResponse
+from app.static_files import PrecompressedStaticFiles
 
 # Resolve frontend build directory (web/frontend/dist relative to this file)
 _FRONTEND_DIST = Path(__file__).resolve().parent.parent.parent / "frontend" / "dist"
@@ -18,13 +20,28 @@ STATIC_DIR = Path(os.environ.get("UPLINK_STATIC_DIR", str(_FRONTEND_DIST)))
 async def lifespan(app: FastAPI):
     await init_db()
     from app.game.game_loop import game_loop
+    from app.game.compaction import compactor
+    from app.ws.action_queue import action_queue
     await game_loop.start()
+    action_queue.start()
+    await compactor.start()
     yield
+    await compactor.stop()
     await game_loop.stop()
+    await action_queue.stop()
+    from app.game.world_generator import shutdown_executor
+    shutdown_executor()
+    from app.session_store import engine_cache
+    await engine_cache.close_all()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Uplink Web", version="0.1.0", lifespan=lifespan)
+    app = FastAPI(
+        title="Uplink Web",
+        version="0.1.0",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
+    )
 
     # CORS middleware
     app.add_middleware(
@@ -50,14 +67,32 @@ def create_app() -> FastAPI:
     async def root():
         return {"status": "ok", "game": "Uplink"}
 
+    @app.get("/api/metrics", dependencies=[Depends(get_current_user)])
+    async def metrics():
+        from app.game.compaction import compactor
+        from app.ws import rate_limit
+        from app.ws.action_queue import action_queue
+        from app.ws.handler import manager
+        return {
+            "connections": manager.metrics(),
+            "rate_limit": rate_limit.metrics(),
+            "actions": action_queue.metrics(),
+            "compaction": compactor.metrics(),
+        }
+
     @app.websocket("/ws")
     async def websocket_endpoint(websocket: WebSocket):
         from app.ws.handler import websocket_handler
         await websocket_handler(websocket)
 
-    # Serve built frontend as static files (must be mounted after API routes)
+    # Serve built frontend as static files (must be mounted after API routes).
+    # Pre-built .br/.gz siblings are served when present; see app.static_files.
     if STATIC_DIR.is_dir():
-        app.mount("/", StaticFiles(directory=str(STATIC_DIR), html=True), name="static")
+        app.mount(
+            "/",
+            PrecompressedStaticFiles(directory=str(STATIC_DIR), html=True),
+            name="static",
+        )
 
     return app
 
@@ -1,5 +1,6 @@
 import uuid
 from datetime import datetime
+from typing import Optional
 
 from sqlalchemy import Boolean, ForeignKey, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column
@@ -21,3 +22,10 @@ class GameSession(Base):
     )
     game_time_ticks: Mapped[int] = mapped_column(Integer, default=0)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    # Bumped whenever the set of listed locations changes (see world_map).
+    world_version: Mapped[int] = mapped_column(Integer, default=0)
+    # Compaction checkpoint for deleted sessions (see game.compaction): the
+    # table being purged, the last id deleted from it, and rows reclaimed.
+    purge_table: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    purge_last_id: Mapped[int] = mapped_column(Integer, default=0)
+    rows_purged: Mapped[int] = mapped_column(Integer, default=0)
@@ -17,7 +17,26 @@ class RunningTask(Base):
     tool_name: Mapped[str] = mapped_column(String(64))
     tool_version: Mapped[int] = mapped_column(Integer, default=1)
     target_ip: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    # Legacy JSON working state; superseded by the typed columns below and
+    # only read by the migration that converts in-flight tasks.
     target_data: Mapped[Optional[str]] = mapped_column(String(4096), nullable=True)
     progress: Mapped[float] = mapped_column(Float, default=0.0)
     ticks_remaining: Mapped[float] = mapped_column(Float, default=0.0)
+    total_ticks: Mapped[float] = mapped_column(Float, default=0.0)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+
+    # --- Tool working state ---------------------------------------------
+    # Password_Breaker
+    password: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    char_index: Mapped[int] = mapped_column(Integer, default=0)
+    ticks_per_char: Mapped[float] = mapped_column(Float, default=0.0)
+    ticks_into_char: Mapped[float] = mapped_column(Float, default=0.0)
+    # File_Copier / File_Deleter
+    file_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # Log_Deleter (a log id, or "all")
+    log_id: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
+
+    @property
+    def revealed(self) -> str:
+        """Password characters revealed so far by a Password_Breaker."""
+        return (self.password or "")[: self.char_index or 0]
@@ -17,6 +17,8 @@ class VLocation(Base):
     x: Mapped[int] = mapped_column(Integer)
     y: Mapped[int] = mapped_column(Integer)
     listed: Mapped[bool] = mapped_column(Boolean, default=True)
+    # GameSession.world_version at which this location became listed.
+    world_version: Mapped[int] = mapped_column(Integer, default=0)
     computer_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("computers.id"), nullable=True
     )
@@ -0,0 +1,314 @@
+"""Per-session storage backend -- one SQLite file per game session.
+
+When ``settings.STORAGE_MODE == "per_session"`` every game session's world
+(computers, files, logs, missions, tasks, ...) lives in its own SQLite file
+under ``settings.SESSION_DB_DIR``.  The shared database at
+``settings.DATABASE_URL`` only keeps the tables in ``SHARED_TABLES``: user
+accounts and the game session catalogue.
+
+Sessions opened through :func:`session_db` are bound to *both* engines, so
+callers keep issuing ordinary ORM queries: ``UserAccount`` and
+``GameSession`` statements go to the shared database, everything else goes
+to the session file.
+
+Open engines are kept in an LRU cache (``SessionEngineCache``).  Engines
+with no checked-out sessions are disposed once more than
+``SESSION_DB_CACHE_SIZE`` files are open.  Deleting a game unlinks its
+file once the last checked-out session (a live socket, a tick) is released.
+
+In the default ``"shared"`` mode :func:`session_db` hands back the shared
+session unchanged, so the rest of the code base behaves exactly as before.
+"""
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app.config import settings
+from app.database import (
+    async_session, enable_sqlite_savepoints, engine as shared_engine, get_db,
+)
+from app.models.base import Base
+from app.models.game_session import GameSession
+from app.models.user_account import UserAccount
+
+log = logging.getLogger(__name__)
+
+STORAGE_SHARED = "shared"
+STORAGE_PER_SESSION = "per_session"
+
+# Tables that always live in the shared database.
+SHARED_TABLES = frozenset({UserAccount.__tablename__, GameSession.__tablename__})
+
+# SQLite side files that belong to a session database.
+_SIDE_SUFFIXES = ("-wal", "-shm", "-journal")
+
+
+def per_session_enabled() -> bool:
+    """Return True when game sessions are stored in their own database files."""
+    return settings.STORAGE_MODE == STORAGE_PER_SESSION
+
+
+def session_tables() -> list:
+    """Return the tables that are stored in each per-session database."""
+    # Import all models so they register with Base.metadata
+    from app.models import (  # noqa: F401
+        user_account, game_session, vlocation, computer, security,
+        databank, logbank, person, player, connection, gateway,
+        company, mission, message, running_task, scheduled_event,
+    )
+    return [t for t in Base.metadata.sorted_tables if t.name not in SHARED_TABLES]
+
+
+def session_models() -> dict[str, type]:
+    """Return the mapped class of every table, keyed by table name."""
+    session_tables()  # imports every model module
+    return {m.local_table.name: m.class_ for m in Base.registry.mappers}
+
+
+def session_scope(table, session_id: str):
+    """Return a WHERE clause selecting *table*'s rows owned by *session_id*.
+
+    Tables without a ``game_session_id`` column are matched through their
+    foreign key to one that has it (e.g. ``access_logs`` via ``computers``).
+    """
+    models = session_models()
+    model = models[table.name]
+    if "game_session_id" in table.c:
+        return model.game_session_id == session_id
+    for fk in table.foreign_keys:
+        parent = fk.column.table
+        if "game_session_id" in parent.c:
+            parent_model = models[parent.name]
+            return getattr(model, fk.parent.name).in_(
+                select(parent_model.id).where(parent_model.game_session_id == session_id)
+            )
+    raise ValueError(f"Table {table.name} is not scoped to a game session")
+
+
+def shared_tables() -> list:
+    """Return the tables that are stored in the shared database."""
+    return [Base.metadata.tables[name] for name in sorted(SHARED_TABLES)]
+
+
+class SessionEngineCache:
+    """LRU cache of per-session ``AsyncEngine`` objects.
+
+    Each engine is reference-counted while sessions are checked out; only
+    idle engines are evicted (and disposed) when the cache is over capacity.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_open: int,
+        shared: AsyncEngine | None = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_open = max(1, max_open)
+        self.shared = shared if shared is not None else shared_engine
+        self._engines: OrderedDict[str, AsyncEngine] = OrderedDict()
+        self._in_use: dict[str, int] = {}
+        # Dropped while checked out: disposed and unlinked on last release.
+        self._dropping: dict[str, AsyncEngine | None] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+        self.evictions: int = 0
+
+    # ------------------------------------------------------------------
+    # Paths
+    # ------------------------------------------------------------------
+
+    def path_for(self, session_id: str) -> Path:
+        """Return the database file for *session_id*.
+
+        Raises ``ValueError`` for anything that is not a UUID so client-supplied
+        ids can never escape ``directory``.
+        """
+        try:
+            canonical = str(uuid.UUID(session_id))
+        except (ValueError, TypeError, AttributeError):
+            raise ValueError(f"Invalid game session id: {session_id!r}")
+        return self.directory / f"{canonical}.db"
+
+    def exists(self, session_id: str) -> bool:
+        path = self.path_for(session_id)
+        return session_id not in self._dropping and path.is_file()
+
+    def open_count(self) -> int:
+        return len(self._engines)
+
+    # ------------------------------------------------------------------
+    # Acquire / release
+    # ------------------------------------------------------------------
+
+    async def acquire(self, session_id: str, *, create: bool = False) -> AsyncEngine:
+        """Return the engine for *session_id*, opening the file if needed.
+
+        With ``create=False`` a missing file raises ``ValueError`` instead of
+        silently creating an empty database.
+        """
+        path = self.path_for(session_id)
+        async with self._lock:
+            if session_id in self._dropping:
+                raise ValueError(f"Game session {session_id} not found")
+            eng = self._engines.get(session_id)
+            if eng is None:
+                if not path.is_file() and not create:
+                    raise ValueError(f"Game session {session_id} not found")
+                path.parent.mkdir(parents=True, exist_ok=True)
+                eng = enable_sqlite_savepoints(
+                    create_async_engine(f"sqlite+aiosqlite:///{path}", echo=False)
+                )
+                async with eng.begin() as conn:
+                    await conn.run_sync(
+                        Base.metadata.create_all, tables=session_tables()
+                    )
+                self._engines[session_id] = eng
+            self._engines.move_to_end(session_id)
+            self._in_use[session_id] = self._in_use.get(session_id, 0) + 1
+            await self._evict_idle()
+            return eng
+
+    def release(self, session_id: str) -> None:
+        """Return a checked-out engine to the cache."""
+        count = self._in_use.get(session_id, 0) - 1
+        if count > 0:
+            self._in_use[session_id] = count
+            return
+        self._in_use.pop(session_id, None)
+        if session_id in self._dropping:
+            task = asyncio.get_running_loop().create_task(self._finish_drop(session_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _evict_idle(self) -> None:
+        """Dispose least-recently-used idle engines until within capacity."""
+        if len(self._engines) <= self.max_open:
+            return
+        for sid in list(self._engines):
+            if len(self._engines) <= self.max_open:
+                break
+            if self._in_use.get(sid):
+                continue
+            eng = self._engines.pop(sid)
+            await eng.dispose()
+            self.evictions += 1
+            log.debug("Evicted idle session database %s", sid)
+
+    # ------------------------------------------------------------------
+    # Drop / shutdown
+    # ------------------------------------------------------------------
+
+    async def drop(self, session_id: str) -> None:
+        """Close and unlink the database file for *session_id*.
+
+        An engine that is still checked out keeps working until its last
+        ``release``; only then is it disposed and the file unlinked.  New
+        ``acquire`` calls fail straight away.
+        """
+        self.path_for(session_id)
+        async with self._lock:
+            self._dropping[session_id] = self._engines.pop(session_id, None)
+            if self._in_use.get(session_id):
+                log.info("Session database %s dropped while in use; deferring", session_id)
+                return
+        await self._finish_drop(session_id)
+
+    async def _finish_drop(self, session_id: str) -> None:
+        path = self.path_for(session_id)
+        async with self._lock:
+            if session_id not in self._dropping or self._in_use.get(session_id):
+                return
+            eng = self._dropping.pop(session_id)
+            if eng is not None:
+                await eng.dispose()
+            for p in [path] + [path.with_name(path.name + s) for s in _SIDE_SUFFIXES]:
+                p.unlink(missing_ok=True)
+        log.info("Dropped session database %s", session_id)
+
+    async def close_all(self) -> None:
+        """Dispose every open engine (used on application shutdown)."""
+        async with self._lock:
+            while self._engines:
+                _, eng = self._engines.popitem(last=False)
+                await eng.dispose()
+            for eng in self._dropping.values():
+                if eng is not None:
+                    await eng.dispose()
+            self._dropping.clear()
+            self._in_use.clear()
+
+
+# Module-level cache used by the app; tests may replace it.
+engine_cache = SessionEngineCache(settings.SESSION_DB_DIR, settings.SESSION_DB_CACHE_SIZE)
+
+
+# ---------------------------------------------------------------------------
+# Session helpers
+# ---------------------------------------------------------------------------
+
+
+@asynccontextmanager
+async def session_db(
+    session_id: str,
+    db: AsyncSession | None = None,
+    *,
+    create: bool = False,
+) -> AsyncIterator[AsyncSession]:
+    """Yield an ``AsyncSession`` that can see *session_id*'s world.
+
+    In shared mode this is *db* itself (or a fresh shared session when *db*
+    is None).  In per-session mode a new session bound to both the shared
+    engine and the session file is opened; the caller is responsible for
+    committing it, exactly as with ``async_session()``.
+    """
+    if not per_session_enabled():
+        if db is not None:
+            yield db
+        else:
+            async with async_session() as shared:
+                yield shared
+        return
+
+    cache = engine_cache
+    eng = await cache.acquire(session_id, create=create)
+    try:
+        binds = {Base: eng, UserAccount: cache.shared, GameSession: cache.shared}
+        async with AsyncSession(binds=binds, expire_on_commit=False) as session:
+            yield session
+    finally:
+        cache.release(session_id)
+
+
+async def get_session_db(session_id: str, db: AsyncSession = Depends(get_db)):
+    """FastAPI dependency yielding a session scoped to the ``session_id`` path param."""
+    if not per_session_enabled():
+        yield db
+        return
+    try:
+        found = engine_cache.exists(session_id)
+    except ValueError:
+        found = False
+    if not found:
+        raise HTTPException(status_code=404, detail="Game not found")
+    async with session_db(session_id) as sdb:
+        try:
+            yield sdb
+            await sdb.commit()
+        except Exception:
+            await sdb.rollback()
+            raise
+
+
+async def drop_session_storage(session_id: str) -> None:
+    """Reclaim the storage of a deleted session (per-session mode only)."""
+    if per_session_enabled():
+        await engine_cache.drop(session_id)
@@ -0,0 +1,191 @@
+"""Static serving for the built frontend.
+
+``PrecompressedStaticFiles`` is a drop-in ``StaticFiles`` replacement that
+
+* serves a pre-built ``.br`` or ``.gz`` sibling of the requested file when
+  the client's ``Accept-Encoding`` allows it, so nothing is compressed on
+  the game server at request time;
+* marks Vite's content-hashed assets (``assets/name-<hash>.js``) as
+  ``immutable`` for a year, and gives ``index.html`` a short
+  ``max-age`` so new deploys are picked up quickly;
+* keeps Starlette's ``ETag`` / ``Last-Modified`` / 304 and ``Range``
+  handling (range offsets refer to the representation actually sent).
+
+The siblings are produced once per build::
+
+    python -m app.static_files ../frontend/dist
+
+which writes ``.gz`` files (and ``.br`` files when the optional ``brotli``
+package is installed) next to every compressible asset.  ``npm run build``
+runs this as its ``postbuild`` step.
+"""
+import gzip
+import mimetypes
+import os
+import re
+import sys
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised when brotli is absent
+    brotli = None
+
+# Encodings we look for, in server preference order, with their suffixes.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+HTML_CACHE = "public, max-age=60, must-revalidate"
+DEFAULT_CACHE = "public, max-age=3600"
+
+# Vite output: assets/<name>-<8+ char hash>.<ext>
+_HASHED = re.compile(r"(^|/)assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+
+COMPRESSIBLE = frozenset({
+    ".html", ".js", ".mjs", ".css", ".json", ".map", ".svg", ".txt",
+    ".xml", ".wasm", ".ico", ".webmanifest",
+})
+MIN_COMPRESS_SIZE = 1024
+
+
+def cache_control(relative_path: str) -> str:
+    """``Cache-Control`` value for a file path relative to the static root."""
+    if _HASHED.search(relative_path):
+        return IMMUTABLE
+    if relative_path.endswith(".html"):
+        return HTML_CACHE
+    return DEFAULT_CACHE
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Content codings with a non-zero q-value in an ``Accept-Encoding`` header."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(coding)
+    if "*" in accepted:
+        accepted.update(name for name, _ in ENCODINGS)
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """``StaticFiles`` that prefers pre-built compressed siblings."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # full path -> (source mtime, [(encoding, path, stat), ...])
+        self._variants: dict[str, tuple[float, list]] = {}
+
+    def _variants_for(self, full_path: str, stat_result: os.stat_result) -> list:
+        cached = self._variants.get(full_path)
+        if cached is not None and cached[0] == stat_result.st_mtime:
+            return cached[1]
+        found = []
+        for encoding, suffix in ENCODINGS:
+            candidate = full_path + suffix
+            try:
+                st = os.stat(candidate)
+            except OSError:
+                continue
+            if st.st_mtime >= stat_result.st_mtime:  # stale siblings are ignored
+                found.append((encoding, candidate, st))
+        self._variants[full_path] = (stat_result.st_mtime, found)
+        return found
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        relative = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+        headers = {"Cache-Control": cache_control(relative)}
+
+        variants = self._variants_for(full_path, stat_result)
+        if variants:
+            headers["Vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for encoding, path, st in variants:
+                if encoding in accepted:
+                    headers["Content-Encoding"] = encoding
+                    full_path, stat_result = path, st
+                    break
+
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            headers=headers,
+            media_type=media_type,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+# ---------------------------------------------------------------------------
+# Build step
+# ---------------------------------------------------------------------------
+
+
+def precompress(directory: str | Path) -> list[Path]:
+    """Write ``.gz`` (and ``.br``) siblings for compressible files under *directory*.
+
+    Up-to-date siblings are left alone and siblings that would not be
+    smaller than the original are not written.  Returns the files written.
+    """
+    written = []
+    for path in sorted(Path(directory).rglob("*")):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE:
+            continue
+        st = path.stat()
+        if st.st_size < MIN_COMPRESS_SIZE:
+            continue
+        data = None
+        for encoding, suffix in ENCODINGS:
+            if encoding == "br" and brotli is None:
+                continue
+            target = path.with_name(path.name + suffix)
+            if target.exists() and target.stat().st_mtime >= st.st_mtime:
+                continue
+            if data is None:
+                data = path.read_bytes()
+            if encoding == "br":
+                packed = brotli.compress(data, quality=11)
+            else:
+                packed = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(packed) >= len(data):
+                continue
+            target.write_bytes(packed)
+            written.append(target)
+    return written
+
+
+if __name__ == "__main__":
+    from app.main import STATIC_DIR
+
+    root = Path(sys.argv[1]) if len(sys.argv) > 1 else STATIC_DIR
+    files = precompress(root)
+    print(f"Precompressed {len(files)} files under {root}")
+    if brotli is None:
+        print("brotli is not installed; only .gz files were written")
@@ -0,0 +1,189 @@
+"""Group-commit pipeline for WebSocket actions.
+
+Instead of every inbound action opening its own session and committing,
+handlers call ``action_queue.run(session_id, fn)``.  The action is queued
+onto one of a few DB workers (chosen by session id, so one session's
+actions stay in order); each worker drains whatever has queued up, waits
+at most ``WS_BATCH_WINDOW`` seconds for more, and applies the batch in a
+single transaction.
+
+Every action runs inside its own SAVEPOINT: an action that raises is
+rolled back and its exception is delivered to its caller, while the rest
+of the batch still commits.  Results are handed back only after the
+commit, so a caller never sees state that could still be rolled back.
+
+In per-session storage mode each session has its own database, so a batch
+is split into one transaction per session.
+"""
+import asyncio
+import logging
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from app.config import settings
+from app.session_store import per_session_enabled, session_db
+
+log = logging.getLogger(__name__)
+
+Action = Callable[[Any], Awaitable[Any]]
+
+
+@dataclass
+class _Job:
+    session_id: str
+    fn: Action
+    future: asyncio.Future = field(repr=False)
+
+
+class ActionQueue:
+    """A small pool of DB workers applying queued actions in batches."""
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        batch_window: float | None = None,
+        max_batch: int | None = None,
+        session_factory: Callable = session_db,
+    ) -> None:
+        self.workers = max(1, workers if workers is not None else settings.WS_DB_WORKERS)
+        self.batch_window = (
+            settings.WS_BATCH_WINDOW if batch_window is None else batch_window
+        )
+        self.max_batch = max(1, max_batch if max_batch is not None else settings.WS_BATCH_MAX)
+        self._session_factory = session_factory
+        self._queues: list[asyncio.Queue] = []
+        self._tasks: list[asyncio.Task] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Metrics
+        self.actions = 0
+        self.batches = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._tasks and self._loop is loop:
+            return
+        self._loop = loop
+        self._queues = [asyncio.Queue() for _ in range(self.workers)]
+        self._tasks = [
+            asyncio.create_task(self._worker(q)) for q in self._queues
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for queue in self._queues:
+            while not queue.empty():
+                job = queue.get_nowait()
+                if not job.future.done():
+                    job.future.set_exception(RuntimeError("Action queue stopped"))
+        self._tasks = []
+        self._queues = []
+        self._loop = None
+
+    # ------------------------------------------------------------------
+    # Submitting work
+    # ------------------------------------------------------------------
+
+    async def run(self, session_id: str, fn: Action) -> Any:
+        """Run ``await fn(db)`` in the next batch and return its result.
+
+        Exceptions raised by *fn* are re-raised here; only *fn*'s own
+        changes are rolled back.
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        shard = zlib.crc32(session_id.encode()) % len(self._queues)
+        self._queues[shard].put_nowait(_Job(session_id, fn, future))
+        return await future
+
+    def metrics(self) -> dict:
+        return {
+            "workers": self.workers,
+            "actions": self.actions,
+            "batches": self.batches,
+            "commits": self.commits,
+            "rollbacks": self.rollbacks,
+        }
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._apply(batch)
+            except Exception:
+                log.exception("Unhandled error applying action batch")
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(RuntimeError("Action batch failed"))
+
+    async def _apply(self, batch: list[_Job]) -> None:
+        self.batches += 1
+        if per_session_enabled():
+            groups: dict[str, list[_Job]] = {}
+            for job in batch:
+                groups.setdefault(job.session_id, []).append(job)
+            for session_id, jobs in groups.items():
+                await self._apply_group(session_id, jobs)
+        else:
+            await self._apply_group(batch[0].session_id, batch)
+
+    async def _apply_group(self, session_id: str, jobs: list[_Job]) -> None:
+        done: list[tuple[_Job, Any]] = []
+        try:
+            async with self._session_factory(session_id) as db:
+                for job in jobs:
+                    if job.future.done():  # caller went away
+                        continue
+                    self.actions += 1
+                    try:
+                        async with db.begin_nested():
+                            result = await job.fn(db)
+                    except Exception as exc:
+                        self.rollbacks += 1
+                        job.future.set_exception(exc)
+                        continue
+                    done.append((job, result))
+                await db.commit()
+                self.commits += 1
+        except Exception as exc:
+            for job in jobs:
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            return
+
+        for job, result in done:
+            if not job.future.done():
+                job.future.set_result(result)
+
+
+# Module-level singleton used by the WS handler and the lifespan.
+action_queue = ActionQueue()
@@ -1,14 +1,29 @@
-import json
+import asyncio
+import logging
+import time
+
 from fastapi import WebSocket, WebSocketDisconnect
 from sqlalchemy import select
 
 from app.auth.jwt import decode_access_token
-from app.database import async_session
+from app.config import settings
+from app.json_codec import loads, send_json
+from app.session_store import session_db
 from app.models.player import Player
 from app.game import connection_manager as cm
 from app.game import task_engine
+from app.game import mission_board
 from app.game import mission_engine
+from app.game import route_planner
+from app.game import world_map
 from app.ws import protocol as P
+from app.ws.action_queue import action_queue
+from app.ws.rate_limit import Inbox, RateLimiter, throttle_frame
+
+log = logging.getLogger(__name__)
+
+# Close code sent to sockets that missed their heartbeat deadline.
+CLOSE_HEARTBEAT_TIMEOUT = 4008
 
 
 class SessionState:
@@ -20,6 +35,8 @@ class SessionState:
         self.player_id = player_id
         self.computer_id: int | None = None
         self.current_sub_page: int = 0
+        # time.monotonic() of the last inbound message on this socket.
+        self.last_seen: float = time.monotonic()
 
     def as_dict(self) -> dict:
         """Return the mutable portion of state used by handle_screen_action."""
@@ -37,35 +54,151 @@ class SessionState:
 
 
 class ConnectionManager:
-    """Manages active WebSocket connections and their session states."""
+    """Manages active WebSocket connections and their session states.
 
-    def __init__(self):
+    Every inbound message refreshes the socket's heartbeat deadline.
+    ``reap`` (run periodically by the game loop) closes and evicts sockets
+    that have been silent for longer than ``heartbeat_timeout``; a failed
+    send evicts the socket immediately.
+    """
+
+    def __init__(self, heartbeat_timeout: float | None = None):
         self.active_connections: dict[str, WebSocket] = {}
         self.session_states: dict[str, SessionState] = {}
+        self.heartbeat_timeout = (
+            settings.WS_HEARTBEAT_TIMEOUT if heartbeat_timeout is None
+            else heartbeat_timeout
+        )
+        self.opened = 0
+        self.closed = 0
+        self.reaped = 0
 
     async def connect(
         self, websocket: WebSocket, session_id: str, state: SessionState
     ):
         await websocket.accept()
+        previous = self.active_connections.get(session_id)
+        if previous is not None and previous is not websocket:
+            # A reconnect replaces the old socket; close it so its
+            # handler exits instead of lingering.
+            await self._close(previous, 1000, "Replaced by a new connection")
         self.active_connections[session_id] = websocket
         self.session_states[session_id] = state
+        self.opened += 1
 
-    def disconnect(self, session_id: str):
+    def disconnect(self, session_id: str, websocket: WebSocket | None = None):
+        """Forget *session_id*'s socket (only if it is still *websocket*)."""
+        current = self.active_connections.get(session_id)
+        if current is None:
+            return
+        if websocket is not None and current is not websocket:
+            return
         self.active_connections.pop(session_id, None)
         self.session_states.pop(session_id, None)
+        self.closed += 1
+        _release_session_caches(session_id)
+
+    def touch(self, session_id: str) -> None:
+        """Record inbound traffic for *session_id*, extending its deadline."""
+        state = self.session_states.get(session_id)
+        if state is not None:
+            state.last_seen = time.monotonic()
 
     async def send_message(self, session_id: str, message: dict):
         ws = self.active_connections.get(session_id)
         if ws:
-            await ws.send_json(message)
+            try:
+                await send_json(ws, message)
+            except Exception:
+                self._evict(session_id, ws, "send failed")
+                raise
 
     def get_state(self, session_id: str) -> SessionState | None:
         return self.session_states.get(session_id)
 
+    async def reap(self, now: float | None = None) -> list[str]:
+        """Close and evict sockets whose heartbeat deadline has passed."""
+        now = time.monotonic() if now is None else now
+        stale = [
+            sid for sid, state in self.session_states.items()
+            if now - state.last_seen > self.heartbeat_timeout
+        ]
+        for sid in stale:
+            ws = self.active_connections.get(sid)
+            self._evict(sid, ws, "heartbeat timeout")
+            if ws is not None:
+                await self._close(ws, CLOSE_HEARTBEAT_TIMEOUT, "Heartbeat timeout")
+        return stale
+
+    def metrics(self) -> dict:
+        return {
+            "live": len(self.active_connections),
+            "opened": self.opened,
+            "closed": self.closed,
+            "reaped": self.reaped,
+        }
+
+    def _evict(self, session_id: str, websocket: WebSocket | None, reason: str):
+        if self.active_connections.get(session_id) is not websocket:
+            return
+        self.active_connections.pop(session_id, None)
+        self.session_states.pop(session_id, None)
+        self.reaped += 1
+        _release_session_caches(session_id)
+        log.info("Reaped WebSocket for session %s (%s)", session_id, reason)
+
+    @staticmethod
+    async def _close(websocket: WebSocket, code: int, reason: str) -> None:
+        try:
+            await websocket.close(code=code, reason=reason)
+        except Exception:
+            pass  # already gone
+
+
+def _release_session_caches(session_id: str) -> None:
+    """Drop per-session in-memory caches once nobody is watching the session."""
+    mission_board.invalidate(session_id)
+    mission_engine.invalidate_pool(session_id)
+    route_planner.invalidate(session_id)
+    world_map.invalidate(session_id)
+
 
 manager = ConnectionManager()
 
 
+async def _read_messages(
+    websocket: WebSocket, session_id: str, inbox: Inbox, limiter: RateLimiter
+) -> None:
+    """Receive frames, apply the rate limiter, and queue them on *inbox*.
+
+    A navigation that would replace one still queued is coalesced without
+    spending a token.  Puts ``None`` on the inbox when the socket closes.
+    """
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            manager.touch(session_id)
+            message = loads(raw)
+            if not isinstance(message, dict):
+                continue
+            msg_type = message.get("type")
+            if not isinstance(msg_type, str):
+                await send_json(
+                    websocket, {"type": P.MSG_ERROR, "detail": "type must be a string"}
+                )
+                continue
+            if not inbox.would_coalesce(message):
+                retry_after = limiter.check(msg_type)
+                if retry_after:
+                    await send_json(websocket, throttle_frame(msg_type, retry_after))
+                    continue
+            inbox.put(message)
+    except (WebSocketDisconnect, RuntimeError, ValueError):
+        pass
+    finally:
+        inbox.put(None)
+
+
 async def websocket_handler(websocket: WebSocket):
     # ---- authenticate ----
     token = websocket.query_params.get("token")
@@ -85,15 +218,18 @@ async def websocket_handler(websocket: WebSocket):
         return
 
     # ---- look up player_id from the game session ----
-    async with async_session() as db:
-        result = await db.execute(
-            select(Player).where(Player.game_session_id == session_id)
-        )
-        player = result.scalar_one_or_none()
-        if player is None:
-            await websocket.close(code=4003, reason="No player for this session")
-            return
-        player_id = player.id
+    try:
+        async with session_db(session_id) as db:
+            result = await db.execute(
+                select(Player).where(Player.game_session_id == session_id)
+            )
+            player = result.scalar_one_or_none()
+    except ValueError:
+        player = None
+    if player is None:
+        await websocket.close(code=4003, reason="No player for this session")
+        return
+    player_id = player.id
 
     state = SessionState(
         user_id=user_id,
@@ -102,59 +238,94 @@ async def websocket_handler(websocket: WebSocket):
     )
     await manager.connect(websocket, session_id, state)
 
+    inbox = Inbox()
+    reader = asyncio.create_task(
+        _read_messages(websocket, session_id, inbox, RateLimiter())
+    )
     try:
         while True:
-            raw = await websocket.receive_text()
-            message = json.loads(raw)
+            message = await inbox.get()
+            if message is None:
+                break
             msg_type = message.get("type")
 
             try:
                 if msg_type == P.MSG_HEARTBEAT:
-                    await websocket.send_json({"type": P.MSG_HEARTBEAT_ACK})
+                    await send_json(websocket, {"type": P.MSG_HEARTBEAT_ACK})
 
                 elif msg_type == P.MSG_BOUNCE_ADD:
                     ip = message.get("ip")
                     if not ip:
-                        await websocket.send_json(
-                            {"type": P.MSG_ERROR, "detail": "ip is required"}
+                        await send_json(
+                            websocket, {"type": P.MSG_ERROR, "detail": "ip is required"}
                         )
                         continue
-                    async with async_session() as db:
-                        chain = await cm.add_bounce(
-                            db, session_id, player_id, ip
-                        )
-                        await db.commit()
-                    await websocket.send_json(
-                        {"type": P.MSG_BOUNCE_CHAIN_UPDATED, "nodes": chain}
+                    chain = await action_queue.run(
+                        session_id,
+                        lambda db: cm.add_bounce(db, session_id, player_id, ip),
+                    )
+                    await send_json(
+                        websocket, {"type": P.MSG_BOUNCE_CHAIN_UPDATED, "nodes": chain}
                     )
 
                 elif msg_type == P.MSG_BOUNCE_REMOVE:
                     position = message.get("position")
                     if position is None:
-                        await websocket.send_json(
-                            {"type": P.MSG_ERROR, "detail": "position is required"}
+                        await send_json(
+                            websocket, {"type": P.MSG_ERROR, "detail": "position is required"}
                         )
                         continue
-                    async with async_session() as db:
-                        chain = await cm.remove_bounce(
+                    chain = await action_queue.run(
+                        session_id,
+                        lambda db: cm.remove_bounce(
                             db, session_id, player_id, int(position)
+                        ),
+                    )
+                    await send_json(
+                        websocket, {"type": P.MSG_BOUNCE_CHAIN_UPDATED, "nodes": chain}
+                    )
+
+                elif msg_type == P.MSG_PLAN_ROUTE:
+                    target_ip = message.get("target_ip")
+                    if not target_ip:
+                        await send_json(
+                            websocket, {"type": P.MSG_ERROR, "detail": "target_ip is required"}
                         )
-                        await db.commit()
-                    await websocket.send_json(
-                        {"type": P.MSG_BOUNCE_CHAIN_UPDATED, "nodes": chain}
+                        continue
+
+                    async def _plan(db):
+                        route = await route_planner.plan_route(
+                            db, session_id, player_id, target_ip,
+                            hops=int(message.get("hops", route_planner.DEFAULT_HOPS)),
+                            avoid_high_trace=bool(message.get("avoid_high_trace", True)),
+                            min_spread=float(message.get("min_spread", 0.0)),
+                        )
+                        chain = None
+                        if message.get("apply"):
+                            chain = await cm.set_bounce_chain(
+                                db, session_id, player_id, route
+                            )
+                        return route, chain
+
+                    route, chain = await action_queue.run(session_id, _plan)
+                    await send_json(
+                        websocket, {"type": P.MSG_ROUTE_PLANNED, "route": route}
                     )
+                    if chain is not None:
+                        await send_json(
+                            websocket, {"type": P.MSG_BOUNCE_CHAIN_UPDATED, "nodes": chain}
+                        )
 
                 elif msg_type == P.MSG_CONNECT:
-                    async with async_session() as db:
-                        result = await cm.connect(
-                            db, session_id, player_id
-                        )
-                        await db.commit()
+                    result = await action_queue.run(
+                        session_id,
+                        lambda db: cm.connect(db, session_id, player_id),
+                    )
                     # Update local session state with connection info
                     state.computer_id = result["computer_id"]
                     state.current_sub_page = result["screen"]["screen_index"]
-                    await websocket.send_json(
-                        {
+                    await send_json(
+                        websocket, {
                             "type": P.MSG_CONNECTED,
                             "target_ip": result["target_ip"],
                             "screen": result["screen"],
@@ -162,12 +333,13 @@ async def websocket_handler(websocket: WebSocket):
                     )
 
                 elif msg_type == P.MSG_DISCONNECT:
-                    async with async_session() as db:
-                        await cm.disconnect(db, session_id, player_id)
-                        await db.commit()
+                    await action_queue.run(
+                        session_id,
+                        lambda db: cm.disconnect(db, session_id, player_id),
+                    )
                     state.computer_id = None
                     state.current_sub_page = 0
-                    await websocket.send_json({"type": P.MSG_DISCONNECTED})
+                    await send_json(websocket, {"type": P.MSG_DISCONNECTED})
 
                 elif msg_type == P.MSG_SCREEN_ACTION:
                     action = message.get("action")
@@ -177,15 +349,16 @@ async def websocket_handler(websocket: WebSocket):
                         if k not in ("type", "action")
                     }
                     state_dict = state.as_dict()
-                    async with async_session() as db:
-                        screen = await cm.handle_screen_action(
+                    screen = await action_queue.run(
+                        session_id,
+                        lambda db: cm.handle_screen_action(
                             db, session_id, player_id,
                             action, action_data, state_dict,
-                        )
-                        await db.commit()
+                        ),
+                    )
                     state.update_from(state_dict)
-                    await websocket.send_json(
-                        {"type": P.MSG_SCREEN_UPDATE, "screen": screen}
+                    await send_json(
+                        websocket, {"type": P.MSG_SCREEN_UPDATE, "screen": screen}
                     )
 
                 elif msg_type == P.MSG_RUN_TOOL:
@@ -193,117 +366,117 @@ async def websocket_handler(websocket: WebSocket):
                     tool_version = message.get("tool_version", 1)
                     target_ip = message.get("target_ip")
                     target_data = message.get("target_data", {})
-                    async with async_session() as db:
-                        result = await task_engine.start_task(
+                    result = await action_queue.run(
+                        session_id,
+                        lambda db: task_engine.start_task(
                             db, session_id, player_id,
                             tool_name, tool_version, target_ip, target_data,
-                        )
-                        await db.commit()
-                    await websocket.send_json(
-                        {"type": P.MSG_TASK_UPDATE, "tasks": [result]}
+                        ),
+                    )
+                    await send_json(
+                        websocket, {"type": P.MSG_TASK_UPDATE, "tasks": [result]}
                     )
 
                 elif msg_type == P.MSG_STOP_TOOL:
                     task_id = message.get("task_id")
-                    async with async_session() as db:
-                        result = await task_engine.stop_task(db, task_id)
-                        await db.commit()
-                    await websocket.send_json(
-                        {"type": P.MSG_TASK_UPDATE, "tasks": [result]}
+                    result = await action_queue.run(
+                        session_id, lambda db: task_engine.stop_task(db, task_id)
+                    )
+                    await send_json(
+                        websocket, {"type": P.MSG_TASK_UPDATE, "tasks": [result]}
                     )
 
                 elif msg_type == P.MSG_SET_SPEED:
                     speed = message.get("speed", 1)
                     from app.game.game_loop import game_loop
                     game_loop.speed_multiplier[session_id] = speed
-                    await websocket.send_json(
-                        {"type": P.MSG_SPEED_CHANGED, "speed": speed}
+                    await send_json(
+                        websocket, {"type": P.MSG_SPEED_CHANGED, "speed": speed}
                     )
 
                 elif msg_type == P.MSG_ACCEPT_MISSION:
                     mid = message.get("mission_id")
                     if mid is None:
-                        await websocket.send_json(
-                            {"type": P.MSG_ERROR, "detail": "mission_id is required"}
+                        await send_json(
+                            websocket, {"type": P.MSG_ERROR, "detail": "mission_id is required"}
                         )
                         continue
-                    async with async_session() as db:
-                        mission_data = await mission_engine.accept_mission(
+                    mission_data = await action_queue.run(
+                        session_id,
+                        lambda db: mission_engine.accept_mission(
                             db, session_id, player_id, int(mid)
-                        )
-                        # Fetch updated available missions
-                        player = (await db.execute(
-                            select(Player).where(Player.id == player_id)
-                        )).scalar_one()
-                        available = await mission_engine.get_available_missions(
-                            db, session_id, player.uplink_rating
-                        )
-                        await db.commit()
-                    await websocket.send_json(
-                        {"type": P.MSG_SCREEN_UPDATE, "screen": {
-                            "screen_type": 4,  # BBS
-                            "missions": available,
-                        }}
+                        ),
+                    )
+                    await manager.send_message(
+                        session_id, mission_board.delta_frame([], [int(mid)])
                     )
-                    await websocket.send_json(
-                        {"type": "mission_accepted", "mission": mission_data}
+                    await send_json(
+                        websocket, {"type": "mission_accepted", "mission": mission_data}
                     )
 
                 elif msg_type == P.MSG_COMPLETE_MISSION:
                     mid = message.get("mission_id")
                     if mid is None:
-                        await websocket.send_json(
-                            {"type": P.MSG_ERROR, "detail": "mission_id is required"}
+                        await send_json(
+                            websocket, {"type": P.MSG_ERROR, "detail": "mission_id is required"}
                         )
                         continue
-                    async with async_session() as db:
+
+                    async def _complete(db):
                         check = await mission_engine.check_mission_completion(
                             db, session_id, player_id, int(mid)
                         )
-                        if check["completed"]:
-                            result = await mission_engine.complete_mission(
-                                db, session_id, player_id, int(mid)
-                            )
-                            await db.commit()
-                            await websocket.send_json(
-                                {"type": P.MSG_BALANCE_CHANGED,
-                                 "balance": result["balance"],
-                                 "payment": result["mission_payment"]}
-                            )
-                            await websocket.send_json(
-                                {"type": P.MSG_RATING_CHANGED,
-                                 "uplink_rating": result["uplink_rating"],
-                                 "uplink_rating_level": result["uplink_rating_level"],
-                                 "uplink_rating_name": result["uplink_rating_name"],
-                                 "neuromancer_rating": result["neuromancer_rating"]}
-                            )
-                            await websocket.send_json(
-                                {"type": "mission_completed",
-                                 "mission_id": int(mid)}
-                            )
-                        else:
-                            await db.commit()
-                            await websocket.send_json(
-                                {"type": P.MSG_ERROR,
-                                 "detail": check["reason"]}
-                            )
+                        if not check["completed"]:
+                            return check, None
+                        result = await mission_engine.complete_mission(
+                            db, session_id, player_id, int(mid)
+                        )
+                        return check, result
+
+                    check, result = await action_queue.run(session_id, _complete)
+                    if result is not None:
+                        await send_json(
+                            websocket, {"type": P.MSG_BALANCE_CHANGED,
+                             "balance": result["balance"],
+                             "payment": result["mission_payment"]}
+                        )
+                        await send_json(
+                            websocket, {"type": P.MSG_RATING_CHANGED,
+                             "uplink_rating": result["uplink_rating"],
+                             "uplink_rating_level": result["uplink_rating_level"],
+                             "uplink_rating_name": result["uplink_rating_name"],
+                             "neuromancer_rating": result["neuromancer_rating"]}
+                        )
+                        await send_json(
+                            websocket, {"type": "mission_completed",
+                             "mission_id": int(mid)}
+                        )
+                    else:
+                        await send_json(
+                            websocket, {"type": P.MSG_ERROR,
+                             "detail": check["reason"]}
+                        )
 
                 else:
-                    await websocket.send_json(
-                        {
+                    await send_json(
+                        websocket, {
                             "type": P.MSG_ERROR,
                             "detail": f"Unknown message type: {msg_type}",
                         }
                     )
 
             except ValueError as exc:
-                await websocket.send_json(
-                    {"type": P.MSG_ERROR, "detail": str(exc)}
+                await send_json(
+                    websocket, {"type": P.MSG_ERROR, "detail": str(exc)}
                 )
             except Exception as exc:
-                await websocket.send_json(
-                    {"type": P.MSG_ERROR, "detail": f"Internal error: {exc}"}
+                await send_json(
+                    websocket, {"type": P.MSG_ERROR, "detail": f"Internal error: {exc}"}
                 )
 
-    except WebSocketDisconnect:
-        manager.disconnect(session_id)
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the reaper (or a reconnect) closed this socket.
+        pass
+    finally:
+        reader.cancel()
+        manager.disconnect(session_id, websocket)
@@ -13,10 +13,14 @@ MSG_STOP_TOOL = "stop_tool"
 MSG_SET_SPEED = "set_speed"
 MSG_ACCEPT_MISSION = "accept_mission"
 MSG_COMPLETE_MISSION = "complete_mission"
+MSG_PLAN_ROUTE = "plan_route"
 
 # Server -> Client messages
 MSG_HEARTBEAT_ACK = "heartbeat_ack"
 MSG_BOUNCE_CHAIN_UPDATED = "bounce_chain_updated"
+MSG_ROUTE_PLANNED = "route_planned"
+MSG_BBS_DELTA = "bbs_delta"
+MSG_THROTTLED = "throttled"
 MSG_CONNECTED = "connected"
 MSG_DISCONNECTED = "disconnected"
 MSG_SCREEN_UPDATE = "screen_update"
@@ -0,0 +1,152 @@
+"""Inbound WebSocket rate limiting and message coalescing.
+
+Each connection gets a ``RateLimiter`` holding one token bucket per
+message type (budgets in ``BUDGETS``); every type without a budget shares
+the ``OTHER`` bucket, so clients cannot grow the buckets or the counters
+by inventing types.  A message that finds its bucket
+empty is dropped and answered with a ``throttled`` frame carrying a
+``retry_after`` hint.
+
+Accepted messages go through an ``Inbox``.  Navigation-style messages
+(``menu_select`` / ``go_back`` screen actions, ``set_speed``) only depend
+on their latest value, so when one arrives while an equivalent message is
+still queued it replaces the queued one instead of being appended.
+"""
+import asyncio
+import time
+from collections import Counter, deque
+
+from app.ws import protocol as P
+
+# (tokens per second, burst) per inbound message type.
+BUDGETS: dict[str, tuple[float, float]] = {
+    P.MSG_HEARTBEAT: (2.0, 5.0),
+    P.MSG_SCREEN_ACTION: (8.0, 16.0),
+    P.MSG_BOUNCE_ADD: (5.0, 10.0),
+    P.MSG_BOUNCE_REMOVE: (5.0, 10.0),
+    P.MSG_CONNECT: (1.0, 3.0),
+    P.MSG_DISCONNECT: (1.0, 3.0),
+    P.MSG_RUN_TOOL: (4.0, 8.0),
+    P.MSG_STOP_TOOL: (4.0, 8.0),
+    P.MSG_SET_SPEED: (2.0, 5.0),
+    P.MSG_ACCEPT_MISSION: (2.0, 5.0),
+    P.MSG_COMPLETE_MISSION: (2.0, 5.0),
+    P.MSG_PLAN_ROUTE: (1.0, 3.0),
+}
+DEFAULT_BUDGET = (4.0, 8.0)
+
+# Bucket and counter key for message types not in the budgets.
+OTHER = "other"
+
+# Screen actions that navigate to an absolute screen and can be coalesced.
+_NAVIGATION_ACTIONS = frozenset({"menu_select", "go_back"})
+
+# Process-wide counters, keyed by message type.
+throttled = Counter()
+coalesced = Counter()
+
+
+def metrics() -> dict:
+    return {
+        "throttled": dict(throttled),
+        "coalesced": dict(coalesced),
+    }
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at *rate* tokens/second."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Consume one token; return 0 on success or seconds until one is free."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Per-connection limiter with one bucket per message type."""
+
+    def __init__(self, budgets: dict[str, tuple[float, float]] | None = None) -> None:
+        self.budgets = BUDGETS if budgets is None else budgets
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def check(self, msg_type: str, now: float | None = None) -> float:
+        """Return 0 if *msg_type* may proceed, else the retry-after delay."""
+        now = time.monotonic() if now is None else now
+        key = msg_type if msg_type in self.budgets else OTHER
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate, burst = self.budgets.get(key, DEFAULT_BUDGET)
+            bucket = self._buckets[key] = TokenBucket(rate, burst, now)
+        retry_after = bucket.take(now)
+        if retry_after:
+            throttled[key] += 1
+        return retry_after
+
+
+def throttle_frame(msg_type: str, retry_after: float) -> dict:
+    return {
+        "type": P.MSG_THROTTLED,
+        "message_type": msg_type,
+        "retry_after": round(retry_after, 3),
+    }
+
+
+def coalesce_key(message: dict) -> tuple | None:
+    """Key under which *message* may replace an earlier queued one, or None."""
+    msg_type = message.get("type")
+    if msg_type == P.MSG_SCREEN_ACTION and message.get("action") in _NAVIGATION_ACTIONS:
+        return (msg_type,)
+    if msg_type == P.MSG_SET_SPEED:
+        return (msg_type,)
+    return None
+
+
+class Inbox:
+    """FIFO of accepted messages that coalesces repeated navigations."""
+
+    def __init__(self) -> None:
+        self._items: deque = deque()
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, message: dict | None) -> bool:
+        """Queue *message* (None marks end of stream).
+
+        Returns False if it replaced an equivalent message still waiting at
+        the back of the queue.
+        """
+        if message is not None and self.would_coalesce(message):
+            self._items[-1] = message
+            coalesced[message.get("type")] += 1
+            return False
+        self._items.append(message)
+        self._ready.set()
+        return True
+
+    def would_coalesce(self, message: dict) -> bool:
+        """True if ``put(message)`` would replace the queued tail."""
+        if not self._items:
+            return False
+        key = coalesce_key(message)
+        tail = self._items[-1]
+        return key is not None and tail is not None and coalesce_key(tail) == key
+
+    async def get(self) -> dict | None:
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()
@@ -0,0 +1,84 @@
+"""Micro-benchmark: JSON encoding of real WebSocket / REST payload shapes.
+
+Compares the stdlib encoder (what Starlette's ``send_json`` uses) with
+``app.json_codec.dumps`` on payloads shaped like the output of
+``connection_manager.build_screen_data``, ``task_engine._task_dict`` and
+``trace_engine.tick_traces``.
+
+Run from ``web/backend``::
+
+    python -m benchmarks.bench_json
+"""
+import json
+import timeit
+
+from app import json_codec
+from app.game import task_engine
+from app.models.running_task import RunningTask
+
+
+def _screen_payload() -> dict:
+    """A log screen + BBS-sized screen_update frame."""
+    logs = [
+        {"id": i, "log_time": "Day 1 00:00", "from_ip": "458.615.48.651",
+         "from_name": "Unknown", "subject": f"Opened connection from 234.{i}.12.77",
+         "log_type": 2}
+        for i in range(200)
+    ]
+    missions = [
+        {"id": i, "description": "Steal file 'accounts.dat' from Global Systems "
+         "Internal Services Machine", "employer": "Pacific Networks",
+         "payment": 1200 + i, "difficulty": 3, "min_rating": 1}
+        for i in range(20)
+    ]
+    return {"type": "screen_update", "screen": {
+        "screen_type": 6, "screen_index": 3,
+        "computer_name": "Global Systems Internal Services Machine",
+        "computer_ip": "458.615.48.651", "logs": logs, "missions": missions,
+    }}
+
+
+def _task_payload() -> dict:
+    """A task_update frame for a player running several tools."""
+    tasks = []
+    for i in range(8):
+        task = RunningTask(
+            id=i, game_session_id="0c7f7d8e-2a41-4bb2-9d55-2b9b3f0a8e11",
+            player_id=1, tool_name="Password_Breaker", tool_version=1,
+            target_ip="458.615.48.651", progress=0.4123, ticks_remaining=182.5,
+        )
+        tasks.append(task_engine._task_dict(task, extra={"revealed": "ab3k______"})["data"])
+    return {"type": "task_update", "tasks": tasks}
+
+
+def _trace_payload() -> dict:
+    """A trace_update frame for a six-hop bounce chain."""
+    return {
+        "type": "trace_update", "progress": 0.5312, "active": True,
+        "traced_nodes": [f"{100 + i}.{i * 7}.{i * 13}.{i * 17}" for i in range(6)],
+    }
+
+
+def _stdlib(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def main(number: int = 2000) -> None:
+    payloads = {
+        "build_screen_data": _screen_payload(),
+        "_task_dict": _task_payload(),
+        "tick_traces": _trace_payload(),
+    }
+    backend = "orjson" if json_codec.HAS_ORJSON else "stdlib fallback"
+    print(f"json_codec backend: {backend}  ({number} iterations)")
+    print(f"{'payload':<20}{'bytes':>8}{'stdlib us':>12}{'codec us':>12}{'speedup':>10}")
+    for name, payload in payloads.items():
+        assert json.loads(json_codec.dumps(payload)) == json.loads(_stdlib(payload))
+        std = timeit.timeit(lambda: _stdlib(payload), number=number) / number * 1e6
+        fast = timeit.timeit(lambda: json_codec.dumps(payload), number=number) / number * 1e6
+        size = len(json_codec.dumps_bytes(payload))
+        print(f"{name:<20}{size:>8}{std:>12.2f}{fast:>12.2f}{std / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
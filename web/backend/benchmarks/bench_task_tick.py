@@ -0,0 +1,111 @@
+"""Benchmark: ticking 1,000 concurrent Password_Breaker tasks.
+
+Measures ``task_engine.tick_task`` over typed ``RunningTask`` columns, and
+for comparison the previous approach that kept working state in the
+``target_data`` JSON blob (parsed and re-serialised on every tick).
+
+Run from ``web/backend``::
+
+    python -m benchmarks.bench_task_tick
+"""
+import asyncio
+import json
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.game import task_engine
+from app.models.base import Base
+from app.models import (  # noqa: F401
+    user_account, game_session, vlocation, computer, security,
+    databank, logbank, person, player, connection, gateway,
+    company, mission, message, running_task, scheduled_event,
+)
+from app.models.running_task import RunningTask
+
+NUM_TASKS = 1000
+NUM_TICKS = 50
+PASSWORD = "k3v8x2qp"
+TICKS_PER_CHAR = 45.0
+
+
+def _legacy_tick(task: RunningTask, speed: int) -> dict:
+    """The pre-typed-columns per-tick path, kept here for comparison."""
+    td = json.loads(task.target_data or "{}")
+    task.ticks_remaining = max(0.0, task.ticks_remaining - speed)
+    total = td["ticks_per_char"] * len(td["password"])
+    task.progress = round(min(1.0, 1.0 - task.ticks_remaining / total), 4)
+    ticks_into_char = td["ticks_into_char"] + speed
+    char_index = td["char_index"]
+    while ticks_into_char >= td["ticks_per_char"] and char_index < len(td["password"]):
+        ticks_into_char -= td["ticks_per_char"]
+        char_index += 1
+    td["revealed"] = td["password"][:char_index]
+    td["char_index"] = char_index
+    td["ticks_into_char"] = ticks_into_char
+    task.target_data = json.dumps(td)
+    display = td["revealed"] + "_" * (len(td["password"]) - len(td["revealed"]))
+    return task_engine._task_dict(task, extra={"revealed": display})
+
+
+def _make_tasks(legacy: bool) -> list[RunningTask]:
+    tasks = []
+    for i in range(NUM_TASKS):
+        task = RunningTask(
+            game_session_id=f"session-{i % 100}", player_id=i + 1,
+            tool_name="Password_Breaker", tool_version=1, target_ip="1.2.3.4",
+            progress=0.0, ticks_remaining=TICKS_PER_CHAR * len(PASSWORD),
+            total_ticks=TICKS_PER_CHAR * len(PASSWORD), is_active=True,
+        )
+        if legacy:
+            task.target_data = json.dumps({
+                "password": PASSWORD, "revealed": "", "char_index": 0,
+                "ticks_per_char": TICKS_PER_CHAR, "ticks_into_char": 0.0,
+            })
+        else:
+            task.password = PASSWORD
+            task.char_index = 0
+            task.ticks_per_char = TICKS_PER_CHAR
+            task.ticks_into_char = 0.0
+        tasks.append(task)
+    return tasks
+
+
+async def _run(legacy: bool) -> tuple[float, float]:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with factory() as db:
+        tasks = _make_tasks(legacy)
+        db.add_all(tasks)
+        await db.commit()
+
+        cpu = 0.0
+        start = time.perf_counter()
+        for _ in range(NUM_TICKS):
+            t0 = time.perf_counter()
+            for task in tasks:
+                if legacy:
+                    _legacy_tick(task, 1)
+                else:
+                    await task_engine.tick_task(db, task, 1)
+            cpu += time.perf_counter() - t0
+            await db.commit()
+        total = time.perf_counter() - start
+
+    await engine.dispose()
+    return cpu / NUM_TICKS * 1e3, total / NUM_TICKS * 1e3
+
+
+def main() -> None:
+    print(f"{NUM_TASKS} Password_Breaker tasks, {NUM_TICKS} ticks")
+    print(f"{'state':<14}{'tick ms':>10}{'tick+commit ms':>18}")
+    for label, legacy in (("json blob", True), ("typed columns", False)):
+        cpu, total = asyncio.run(_run(legacy))
+        print(f"{label:<14}{cpu:>10.2f}{total:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark: world generation scaling at 1k, 10k and 100k computers.
+
+Times ``world_builder.build_world`` (pure generation, including IP
+allocation) and ``world_generator.insert_world`` (bulk insert into an
+in-memory SQLite database) for worlds of increasing size, and checks that
+every generated IP is unique.  Per-computer cost should stay flat.
+
+Run from ``web/backend``::
+
+    python -m benchmarks.bench_worldgen
+"""
+import asyncio
+import time
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.game import world_builder, world_generator
+from app.models.base import Base
+from app.models import (  # noqa: F401
+    user_account, game_session, vlocation, computer, security,
+    databank, logbank, person, player, connection, gateway,
+    company, mission, message, running_task, scheduled_event,
+)
+from app.models.game_session import GameSession
+from app.models.user_account import UserAccount
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def _companies_for(computers: int) -> int:
+    sample = world_builder.build_world(0, companies=2000)
+    per_company = (len(sample["computers"]) - 20) / 2000
+    return max(1, round(computers / per_company))
+
+
+async def _insert(rows: dict) -> float:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    session_id = str(uuid.uuid4())
+    async with factory() as db:
+        db.add(UserAccount(id=1, username="bench", password_hash="x"))
+        db.add(GameSession(id=session_id, user_id=1, name="bench"))
+        await db.flush()
+        start = time.perf_counter()
+        await world_generator.insert_world(db, session_id, rows, "Bench", "bench")
+        await db.commit()
+        elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return elapsed
+
+
+async def main() -> None:
+    print(f"{'computers':>10} {'build s':>9} {'us/comp':>8} {'insert s':>9} {'us/comp':>8} unique")
+    for size in SIZES:
+        companies = _companies_for(size)
+        start = time.perf_counter()
+        rows = world_builder.build_world(42, companies=companies)
+        build = time.perf_counter() - start
+
+        n = len(rows["computers"])
+        ip_col = world_builder.COMPUTER_COLS.index("ip")
+        unique = len({c[ip_col] for c in rows["computers"]}) == n
+
+        insert = await _insert(rows)
+        print(
+            f"{n:>10} {build:>9.3f} {build / n * 1e6:>8.1f} "
+            f"{insert:>9.3f} {insert / n * 1e6:>8.1f} {unique}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
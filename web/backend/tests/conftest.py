@@ -9,12 +9,19 @@ from app.models import (  # noqa: F401
     databank, logbank, person, player, connection, gateway,
     company, mission, message, running_task, scheduled_event,
 )
+from app.config import settings
 from app.database import get_db
 from app.main import create_app
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 
+@pytest.fixture(autouse=True)
+def snapshot_dir(tmp_path, monkeypatch):
+    """Keep snapshots written by save_game out of the working tree."""
+    monkeypatch.setattr(settings, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+
+
 @pytest_asyncio.fixture
 async def db_engine():
     engine = create_async_engine(TEST_DATABASE_URL, echo=False)
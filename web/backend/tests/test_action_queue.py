@@ -0,0 +1,92 @@
+"""Tests for the group-commit WebSocket action queue."""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import enable_sqlite_savepoints
+from app.ws.action_queue import ActionQueue
+
+
+@asynccontextmanager
+async def _queue(**kwargs):
+    engine = enable_sqlite_savepoints(
+        create_async_engine("sqlite+aiosqlite:///:memory:")
+    )
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE kv (k TEXT PRIMARY KEY, v INTEGER)"))
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def session_factory(session_id):
+        async with factory() as db:
+            yield db
+
+    queue = ActionQueue(session_factory=session_factory, **kwargs)
+    try:
+        yield queue, factory
+    finally:
+        await queue.stop()
+        await engine.dispose()
+
+
+def _put(key, value):
+    async def fn(db):
+        await db.execute(
+            text("INSERT INTO kv (k, v) VALUES (:k, :v)"), {"k": key, "v": value}
+        )
+        return value
+    return fn
+
+
+async def _rows(factory):
+    async with factory() as db:
+        return dict((await db.execute(text("SELECT k, v FROM kv"))).all())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_actions_share_commits():
+    async with _queue(workers=1, batch_window=0.05, max_batch=64) as (queue, factory):
+        results = await asyncio.gather(
+            *(queue.run("s1", _put(f"k{i}", i)) for i in range(40))
+        )
+        assert results == list(range(40))
+        assert queue.actions == 40
+        assert queue.commits < 5
+        assert len(await _rows(factory)) == 40
+
+
+@pytest.mark.asyncio
+async def test_failed_action_rolls_back_alone():
+    async with _queue(workers=1, batch_window=0.05) as (queue, factory):
+        async def boom(db):
+            await db.execute(text("INSERT INTO kv (k, v) VALUES ('bad', 0)"))
+            raise ValueError("not allowed")
+
+        results = await asyncio.gather(
+            queue.run("s1", _put("a", 1)),
+            queue.run("s1", boom),
+            queue.run("s1", _put("b", 2)),
+            return_exceptions=True,
+        )
+        assert results[0] == 1 and results[2] == 2
+        assert isinstance(results[1], ValueError)
+        assert queue.rollbacks == 1
+        assert await _rows(factory) == {"a": 1, "b": 2}
+
+
+@pytest.mark.asyncio
+async def test_actions_of_one_session_stay_ordered():
+    async with _queue(workers=3, batch_window=0.01) as (queue, factory):
+        seen = []
+
+        def step(i):
+            async def fn(db):
+                seen.append(i)
+                return i
+            return fn
+
+        await asyncio.gather(*(queue.run("s1", step(i)) for i in range(20)))
+        assert seen == list(range(20))
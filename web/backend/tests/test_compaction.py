@@ -0,0 +1,91 @@
+"""Tests for the background compaction of deleted sessions."""
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.game.compaction import Compactor
+from app.models.game_session import GameSession
+from app.session_store import session_models, session_scope, session_tables
+
+
+async def _register(client, username):
+    reg = await client.post("/api/auth/register", json={
+        "username": username,
+        "password": "pass123",
+    })
+    return {"Authorization": f"Bearer {reg.json()['access_token']}"}
+
+
+async def _new_game(client, headers):
+    game = await client.post("/api/game/new", json={
+        "player_name": "Test Player",
+        "handle": "Compactor",
+    }, headers=headers)
+    return game.json()["session"]["id"]
+
+
+async def _counts(db, session_id) -> dict[str, int]:
+    models = session_models()
+    counts = {}
+    for table in session_tables():
+        model = models[table.name]
+        counts[table.name] = (await db.execute(
+            select(func.count(model.id)).where(session_scope(table, session_id))
+        )).scalar()
+    return counts
+
+
+@pytest.mark.asyncio
+async def test_purges_deleted_session_only(client, db_engine, monkeypatch):
+    monkeypatch.setattr(settings, "COMPACTION_FULL_VACUUM", True)
+    headers = await _register(client, "compactplayer")
+    doomed = await _new_game(client, headers)
+    kept = await _new_game(client, headers)
+    await client.delete(f"/api/game/{doomed}", headers=headers)
+
+    factory = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        doomed_rows = await _counts(db, doomed)
+        kept_rows = await _counts(db, kept)
+    assert sum(doomed_rows.values()) > 0
+
+    compactor = Compactor(session_factory=factory, engine=db_engine, batch=25, pause=0)
+    result = await compactor.run_once()
+    assert result["sessions"] == 1
+    assert result["rows"] == sum(doomed_rows.values())
+    assert compactor.metrics()["sessions_purged"] == 1
+    assert compactor.batches > len([n for n in doomed_rows.values() if n])
+
+    async with factory() as db:
+        assert sum((await _counts(db, doomed)).values()) == 0
+        assert await _counts(db, kept) == kept_rows
+        assert await db.get(GameSession, doomed) is None
+        assert await db.get(GameSession, kept) is not None
+
+    # Nothing left to do on the next pass.
+    assert (await compactor.run_once())["rows"] == 0
+
+
+@pytest.mark.asyncio
+async def test_resumes_from_checkpoint(client, db_engine):
+    headers = await _register(client, "resumeplayer")
+    session_id = await _new_game(client, headers)
+    await client.delete(f"/api/game/{session_id}", headers=headers)
+
+    order = [t.name for t in reversed(session_tables())]
+    resume_at = order.index("computers")
+
+    factory = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        before = await _counts(db, session_id)
+        session = await db.get(GameSession, session_id)
+        # Pretend an earlier pass already finished everything before computers.
+        session.purge_table = "computers"
+        session.purge_last_id = 0
+        await db.commit()
+
+    compactor = Compactor(session_factory=factory, engine=db_engine, batch=50, pause=0)
+    reclaimed = await compactor.purge_session(session_id)
+    assert reclaimed == sum(before[name] for name in order[resume_at:])
+    assert set(compactor.reclaimed) <= set(order[resume_at:])
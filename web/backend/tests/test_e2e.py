@@ -596,5 +596,4 @@ async def test_password_breaker_progressive_reveal(client, db_engine):
         await db.commit()
 
         assert task_obj.is_active is False
-        td = json.loads(task_obj.target_data)
-        assert td["revealed"] == password, "Should fully reveal the password"
+        assert task_obj.revealed == password, "Should fully reveal the password"
@@ -0,0 +1,27 @@
+"""Tests for the fast JSON codec used by REST and WebSocket payloads."""
+import json
+
+import pytest
+
+from app import json_codec
+
+
+def test_dumps_matches_stdlib():
+    payload = {"type": "trace_update", "progress": 0.25, "active": True,
+               "traced_nodes": ["1.2.3.4"], "name": "Café", "none": None}
+    encoded = json_codec.dumps(payload)
+    assert json.loads(encoded) == payload
+    assert json_codec.dumps_bytes(payload) == encoded.encode("utf-8")
+    assert json_codec.loads(encoded) == payload
+
+
+def test_dumps_allows_int_keys():
+    assert json.loads(json_codec.dumps({1: "a"})) == {"1": "a"}
+
+
+@pytest.mark.asyncio
+async def test_default_response_class(client):
+    resp = await client.get("/")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    assert resp.json() == {"status": "ok", "game": "Uplink"}
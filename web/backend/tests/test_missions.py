@@ -503,3 +503,144 @@ async def test_rating_progression(client, db_engine):
         if completed_count >= 2:
             assert player.uplink_rating >= 4
             assert final_level >= 2  # At least "Beginner"
+
+
+# ── 9. Type tables and candidate pools ──────────────────────────────────────
+
+def test_select_mission_type_follows_prob_tables():
+    """Draws follow the per-rating probability tables."""
+    import random
+    rng = random.Random(1)
+    for rating in (0, 3, 8):
+        counts = {t: 0 for t in mission_engine._PROB_TABLES}
+        for _ in range(4000):
+            counts[mission_engine._select_mission_type(rng, rating)] += 1
+        total = sum(t[rating] for t in mission_engine._PROB_TABLES.values())
+        for mission_type, table in mission_engine._PROB_TABLES.items():
+            expected = table[rating] / total
+            assert abs(counts[mission_type] / 4000 - expected) < 0.04
+            if table[rating] == 0:
+                assert counts[mission_type] == 0
+
+
+@pytest.mark.asyncio
+async def test_candidate_pool_cached_and_tracked(client, db_engine):
+    """The pool is loaded once and reloads new target machines after invalidation."""
+    headers, session_id, player_id = await _register_and_create_game_unique(client, "pool")
+
+    async_sess = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_sess() as db:
+        pool = await mission_engine.get_candidate_pool(db, session_id)
+        assert pool.employers
+        assert "Government" not in pool.employers
+        assert pool.targets
+        assert await mission_engine.get_candidate_pool(db, session_id) is pool
+
+        computer = Computer(
+            game_session_id=session_id, name="New Co ISM", company_name="New Co",
+            ip="999.1.2.3", computer_type=1, trace_speed=-1, hack_difficulty=10,
+        )
+        db.add(computer)
+        await db.flush()
+        assert await mission_engine.get_candidate_pool(db, session_id) is pool
+        mission_engine.invalidate_pool(session_id)
+        pool = await mission_engine.get_candidate_pool(db, session_id)
+        assert "999.1.2.3" in {t.ip for t in pool.targets}
+
+        missions = await mission_engine.generate_missions(db, session_id, 25)
+        await db.commit()
+        assert len(missions) == 25
+        assert all(m.id is not None for m in missions)
+        assert {m.employer_name for m in missions} <= set(pool.employers)
+
+    mission_engine.invalidate_pool(session_id)
+
+
+# ── 10. Mission board ───────────────────────────────────────────────────────
+
+def _board_mission(mid, payment, min_rating):
+    return {
+        "id": mid, "description": f"m{mid}", "employer_name": "Acme",
+        "payment": payment, "difficulty": 2, "min_rating": min_rating,
+    }
+
+
+def test_mission_board_buckets_and_order():
+    from app.game.mission_board import MissionBoard
+
+    board = MissionBoard()
+    board.add(_board_mission(1, 500, 0))
+    board.add(_board_mission(2, 900, 3))
+    board.add(_board_mission(3, 700, 1))
+    board.add(_board_mission(4, 700, 0))
+
+    assert [m["id"] for m in board.view(0)] == [4, 1]
+    assert [m["id"] for m in board.view(1)] == [3, 4, 1]
+    assert [m["id"] for m in board.view(99)] == [2, 3, 4, 1]
+    assert board.view(1)[0]["employer"] == "Acme"
+
+    assert board.remove(3)["id"] == 3
+    assert board.remove(3) is None
+    assert [m["id"] for m in board.view(16)] == [2, 4, 1]
+    assert len(board) == 3
+
+
+@pytest.mark.asyncio
+async def test_board_tracks_accept_and_expire(client, db_engine):
+    """Accepting and expiring missions updates the cached board."""
+    headers, session_id, player_id = await _register_and_create_game_unique(client, "board")
+
+    async_sess = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_sess() as db:
+        board = await mission_engine.get_mission_board(db, session_id)
+        db_count = len((await db.execute(
+            select(Mission).where(
+                Mission.game_session_id == session_id,
+                Mission.is_accepted == False,
+            )
+        )).scalars().all())
+        assert len(board) == db_count
+
+        top = board.view(16)[0]
+        await mission_engine.accept_mission(db, session_id, player_id, top["id"])
+        assert top["id"] in board  # not until the commit
+        await db.commit()
+        assert top["id"] not in board
+
+        new = await mission_engine.generate_missions(db, session_id, 3, current_tick=0)
+        await db.commit()
+        assert all(m.id in board for m in new)
+
+        expired = await mission_engine.expire_missions(
+            db, session_id, C.TIME_TOEXPIREMISSIONS
+        )
+        await db.commit()
+        assert set(expired) >= {m.id for m in new}
+        assert len(board) == 0
+        assert await mission_engine.get_available_missions(db, session_id, 10**6) == []
+
+
+@pytest.mark.asyncio
+async def test_board_ignores_rolled_back_changes(client, db_engine):
+    """A rolled-back accept or SAVEPOINT leaves the board matching the database."""
+    headers, session_id, player_id = await _register_and_create_game_unique(client, "rollback")
+
+    async_sess = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_sess() as db:
+        board = await mission_engine.get_mission_board(db, session_id)
+        first, second = [m["id"] for m in board.view(16)[:2]]
+
+        await mission_engine.accept_mission(db, session_id, player_id, first)
+        await db.rollback()
+        assert first in board
+
+        await mission_engine.accept_mission(db, session_id, player_id, first)
+        with pytest.raises(RuntimeError):
+            async with db.begin_nested():
+                await mission_engine.accept_mission(db, session_id, player_id, second)
+                raise RuntimeError("action failed")
+        await db.commit()
+
+        board = await mission_engine.get_mission_board(db, session_id)
+        assert first not in board
+        assert second in board
@@ -0,0 +1,104 @@
+"""Tests for inbound WebSocket rate limiting and coalescing."""
+import json
+
+import pytest
+from fastapi import WebSocketDisconnect
+
+from app.ws import protocol as P
+from app.ws import rate_limit
+from app.ws.handler import _read_messages
+from app.ws.rate_limit import Inbox, RateLimiter, TokenBucket
+
+
+def test_token_bucket_refills():
+    bucket = TokenBucket(rate=2.0, burst=2.0, now=0.0)
+    assert bucket.take(0.0) == 0
+    assert bucket.take(0.0) == 0
+    assert bucket.take(0.0) == pytest.approx(0.5)
+    assert bucket.take(0.5) == 0
+
+
+def test_limiter_budgets_are_per_type():
+    limiter = RateLimiter({P.MSG_BOUNCE_ADD: (1.0, 2.0)})
+    before = rate_limit.throttled[P.MSG_BOUNCE_ADD]
+    assert limiter.check(P.MSG_BOUNCE_ADD, now=0.0) == 0
+    assert limiter.check(P.MSG_BOUNCE_ADD, now=0.0) == 0
+    assert limiter.check(P.MSG_BOUNCE_ADD, now=0.0) > 0
+    # Other types have their own (default) bucket.
+    assert limiter.check(P.MSG_CONNECT, now=0.0) == 0
+    assert rate_limit.throttled[P.MSG_BOUNCE_ADD] == before + 1
+
+
+def test_limiter_shares_one_bucket_for_unknown_types():
+    limiter = RateLimiter({P.MSG_BOUNCE_ADD: (1.0, 2.0)})
+    before = rate_limit.throttled[rate_limit.OTHER]
+    for i in range(100):
+        limiter.check(f"junk-{i}", now=0.0)
+    assert set(limiter._buckets) == {rate_limit.OTHER}
+    assert rate_limit.throttled[rate_limit.OTHER] > before
+    assert not any(k.startswith("junk-") for k in rate_limit.throttled)
+
+
+def test_inbox_coalesces_navigation_only():
+    inbox = Inbox()
+    nav = {"type": P.MSG_SCREEN_ACTION, "action": "menu_select"}
+    inbox.put({**nav, "screen_index": 1})
+    assert inbox.put({**nav, "screen_index": 2}) is False
+    assert inbox.put({"type": P.MSG_SCREEN_ACTION, "action": "password_submit"})
+    assert inbox.put({**nav, "screen_index": 3})
+    assert len(inbox) == 3
+    assert inbox._items[0]["screen_index"] == 2
+
+
+class ScriptedWebSocket:
+    def __init__(self, frames: list[dict]):
+        self.frames = [json.dumps(f) for f in frames]
+        self.sent: list[dict] = []
+
+    async def receive_text(self) -> str:
+        if not self.frames:
+            raise WebSocketDisconnect()
+        return self.frames.pop(0)
+
+    async def send_text(self, text: str):
+        self.sent.append(json.loads(text))
+
+
+@pytest.mark.asyncio
+async def test_reader_throttles_and_coalesces():
+    frames = [{"type": P.MSG_BOUNCE_ADD, "ip": f"1.1.1.{i}"} for i in range(5)]
+    frames += [
+        {"type": P.MSG_SCREEN_ACTION, "action": "menu_select", "screen_index": i}
+        for i in range(10)
+    ]
+    ws = ScriptedWebSocket(frames)
+    inbox = Inbox()
+    limiter = RateLimiter({P.MSG_BOUNCE_ADD: (0.001, 3.0)})
+
+    await _read_messages(ws, "no-such-session", inbox, limiter)
+
+    queued = []
+    while (msg := await inbox.get()) is not None:
+        queued.append(msg)
+
+    assert [m["type"] for m in queued].count(P.MSG_BOUNCE_ADD) == 3
+    navigations = [m for m in queued if m["type"] == P.MSG_SCREEN_ACTION]
+    assert len(navigations) == 1
+    assert navigations[0]["screen_index"] == 9
+
+    assert len(ws.sent) == 2
+    assert ws.sent[0]["type"] == P.MSG_THROTTLED
+    assert ws.sent[0]["message_type"] == P.MSG_BOUNCE_ADD
+    assert ws.sent[0]["retry_after"] > 0
+
+
+@pytest.mark.asyncio
+async def test_reader_rejects_non_string_type():
+    ws = ScriptedWebSocket([{"type": ["x"]}, {"type": {"a": 1}}, {"type": P.MSG_HEARTBEAT}])
+    inbox = Inbox()
+
+    await _read_messages(ws, "no-such-session", inbox, RateLimiter())
+
+    assert await inbox.get() == {"type": P.MSG_HEARTBEAT}
+    assert await inbox.get() is None
+    assert [m["type"] for m in ws.sent] == [P.MSG_ERROR, P.MSG_ERROR]
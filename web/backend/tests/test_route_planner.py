@@ -0,0 +1,122 @@
+"""Tests for the server-side bounce route planner."""
+import math
+import random
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.game import connection_manager as cm
+from app.game import route_planner
+from app.game.route_planner import SpatialGrid
+
+
+async def _register_and_create_game(client):
+    """Register a user, create a game, and return (headers, session_id, player_id)."""
+    reg = await client.post("/api/auth/register", json={
+        "username": "routeplayer",
+        "password": "pass123",
+    })
+    token = reg.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    game = await client.post("/api/game/new", json={
+        "player_name": "Test Player",
+        "handle": "Router",
+    }, headers=headers)
+    data = game.json()
+    return headers, data["session"]["id"], data["player_id"]
+
+
+async def _pick_target(client, headers, session_id):
+    resp = await client.get(f"/api/game/{session_id}/world", headers=headers)
+    return resp.json()["locations"][-1]["ip"]
+
+
+def test_spatial_grid_matches_brute_force():
+    rng = random.Random(7)
+    points = [(rng.uniform(0, 600), rng.uniform(0, 300)) for _ in range(500)]
+    grid = SpatialGrid(cell_size=25)
+    for x, y in points:
+        grid.insert(x, y)
+
+    for _ in range(50):
+        qx, qy = rng.uniform(-50, 650), rng.uniform(-50, 350)
+        expected = sorted(
+            (math.hypot(px - qx, py - qy), i) for i, (px, py) in enumerate(points)
+        )[:5]
+        assert grid.nearest(qx, qy, 5) == expected
+
+
+def test_spatial_grid_accept_filter():
+    grid = SpatialGrid(cell_size=10)
+    for i in range(20):
+        grid.insert(i * 5, 0)
+    result = grid.nearest(0, 0, 3, accept=lambda idx: idx % 2 == 1)
+    assert [idx for _, idx in result] == [1, 3, 5]
+
+
+@pytest.mark.asyncio
+async def test_plan_route_constraints(client, db_engine):
+    headers, session_id, player_id = await _register_and_create_game(client)
+    target_ip = await _pick_target(client, headers, session_id)
+
+    async_sess = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_sess() as db:
+        route = await route_planner.plan_route(
+            db, session_id, player_id, target_ip, hops=4, min_spread=20,
+        )
+        index = await route_planner.get_index(db, session_id)
+
+    assert route[-1] == target_ip
+    assert 1 < len(route) <= 5
+    assert len(set(route)) == len(route)
+
+    hops = [index.by_ip[ip] for ip in route[:-1]]
+    for idx in hops:
+        assert index.risk[idx] < 1.0 / route_planner.HIGH_TRACE_SPEED
+    for a, b in zip(hops, hops[1:]):
+        (ax, ay), (bx, by) = index.position(a), index.position(b)
+        assert math.hypot(ax - bx, ay - by) >= 20
+
+    route_planner.invalidate(session_id)
+
+
+@pytest.mark.asyncio
+async def test_plan_route_rejects_unknown_target(client, db_engine):
+    headers, session_id, player_id = await _register_and_create_game(client)
+
+    async_sess = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_sess() as db:
+        with pytest.raises(ValueError):
+            await route_planner.plan_route(db, session_id, player_id, "0.0.0.0")
+        with pytest.raises(ValueError):
+            await route_planner.plan_route(
+                db, session_id, player_id, "0.0.0.0", hops=route_planner.MAX_HOPS + 1,
+            )
+
+
+@pytest.mark.asyncio
+async def test_route_endpoint_applies_chain(client, db_engine):
+    headers, session_id, player_id = await _register_and_create_game(client)
+    target_ip = await _pick_target(client, headers, session_id)
+
+    resp = await client.post(f"/api/game/{session_id}/route", json={
+        "target_ip": target_ip, "hops": 3, "apply": True,
+    }, headers=headers)
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["route"][-1] == target_ip
+    assert [n["ip"] for n in data["nodes"]] == data["route"]
+
+    async_sess = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_sess() as db:
+        conn = await cm.get_or_create_connection(db, session_id, player_id)
+        chain = await cm.get_bounce_chain(db, conn.id)
+    assert [n["ip"] for n in chain] == data["route"]
+
+    resp = await client.post(f"/api/game/{session_id}/route", json={
+        "target_ip": "0.0.0.0",
+    }, headers=headers)
+    assert resp.status_code == 400
+
+    route_planner.invalidate(session_id)
@@ -0,0 +1,160 @@
+"""Tests for the per-session storage backend (one SQLite file per game)."""
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app import session_store
+from app.config import settings
+from app.models.player import Player
+from app.session_store import SessionEngineCache, session_db
+
+
+@pytest.fixture
+def per_session(monkeypatch, tmp_path, db_engine):
+    """Switch the app into per-session mode with files under tmp_path."""
+    cache = SessionEngineCache(tmp_path, max_open=2, shared=db_engine)
+    monkeypatch.setattr(settings, "STORAGE_MODE", session_store.STORAGE_PER_SESSION)
+    monkeypatch.setattr(session_store, "engine_cache", cache)
+    yield cache
+
+
+async def _register(client, username):
+    reg = await client.post("/api/auth/register", json={
+        "username": username,
+        "password": "pass123",
+    })
+    return {"Authorization": f"Bearer {reg.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_new_game_uses_own_file(client, per_session):
+    """A new game's world is written to its own database file."""
+    headers = await _register(client, "fileplayer")
+    resp = await client.post("/api/game/new", json={
+        "player_name": "Test", "handle": "Filer",
+    }, headers=headers)
+    assert resp.status_code == 200
+    session_id = resp.json()["session"]["id"]
+
+    assert per_session.exists(session_id)
+
+    resp = await client.get(f"/api/game/{session_id}/world", headers=headers)
+    assert resp.status_code == 200
+    assert len(resp.json()["locations"]) > 0
+
+    resp = await client.get(f"/api/player/{session_id}/gateway", headers=headers)
+    assert resp.status_code == 200
+
+    async with session_db(session_id) as db:
+        player = (await db.execute(
+            select(Player).where(Player.game_session_id == session_id)
+        )).scalar_one()
+        assert player.handle == "Filer"
+
+
+@pytest.mark.asyncio
+async def test_delete_game_unlinks_file(client, per_session):
+    """Deleting a game removes its database file."""
+    headers = await _register(client, "deleteplayer")
+    resp = await client.post("/api/game/new", json={
+        "player_name": "Test", "handle": "Deleter",
+    }, headers=headers)
+    session_id = resp.json()["session"]["id"]
+    path = per_session.path_for(session_id)
+    assert path.is_file()
+
+    resp = await client.delete(f"/api/game/{session_id}", headers=headers)
+    assert resp.status_code == 200
+    assert not path.exists()
+
+    resp = await client.get(f"/api/game/{session_id}/world", headers=headers)
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_failed_new_game_leaves_no_file(client, per_session, monkeypatch):
+    """A new game that fails before its catalogue commit removes its file."""
+    from app.game import world_generator
+
+    real = world_generator.generate_world
+
+    async def broken(*args):
+        await real(*args)
+        raise RuntimeError("boom")
+
+    headers = await _register(client, "brokenplayer")
+    monkeypatch.setattr(world_generator, "generate_world", broken)
+    with pytest.raises(RuntimeError):
+        await client.post("/api/game/new", json={
+            "player_name": "Test", "handle": "Broken",
+        }, headers=headers)
+    assert list(per_session.directory.glob("*.db")) == []
+
+
+@pytest.mark.asyncio
+async def test_drop_waits_for_checked_out_engine(tmp_path, db_engine):
+    """Dropping a file in use keeps its engine alive until the last release."""
+    cache = SessionEngineCache(tmp_path, max_open=2, shared=db_engine)
+    sid = "44444444-4444-4444-4444-444444444444"
+    eng = await cache.acquire(sid, create=True)
+
+    await cache.drop(sid)
+    assert not cache.exists(sid)
+    assert cache.path_for(sid).is_file()
+    with pytest.raises(ValueError):
+        await cache.acquire(sid)
+    async with eng.connect() as conn:  # still usable by its holder
+        await conn.exec_driver_sql("SELECT 1")
+
+    cache.release(sid)
+    await asyncio.gather(*cache._tasks)
+    assert not cache.path_for(sid).exists()
+
+
+@pytest.mark.asyncio
+async def test_unknown_session_is_404(client, per_session):
+    headers = await _register(client, "ghostplayer")
+    resp = await client.get("/api/game/not-a-uuid/world", headers=headers)
+    assert resp.status_code == 404
+    resp = await client.get(
+        "/api/game/00000000-0000-0000-0000-000000000000/player", headers=headers
+    )
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_engine_cache_evicts_idle_lru(tmp_path, db_engine):
+    """Only idle engines are evicted, least recently used first."""
+    cache = SessionEngineCache(tmp_path, max_open=2, shared=db_engine)
+    ids = [
+        "11111111-1111-1111-1111-111111111111",
+        "22222222-2222-2222-2222-222222222222",
+        "33333333-3333-3333-3333-333333333333",
+    ]
+
+    await cache.acquire(ids[0], create=True)  # stays checked out
+    await cache.acquire(ids[1], create=True)
+    cache.release(ids[1])
+    await cache.acquire(ids[2], create=True)
+    cache.release(ids[2])
+
+    assert cache.open_count() == 2
+    assert cache.evictions == 1
+    assert ids[0] in cache._engines
+    assert ids[1] not in cache._engines
+
+    # Evicted files are still on disk and reopen transparently.
+    assert cache.exists(ids[1])
+    await cache.acquire(ids[1])
+    cache.release(ids[1])
+
+    cache.release(ids[0])
+    await cache.close_all()
+    assert cache.open_count() == 0
+
+
+def test_path_for_rejects_non_uuid(tmp_path):
+    cache = SessionEngineCache(tmp_path, max_open=1)
+    with pytest.raises(ValueError):
+        cache.path_for("../../etc/passwd")
@@ -0,0 +1,178 @@
+"""Tests for session snapshot export / import."""
+import gzip
+import io
+import json
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.game import snapshot
+from app.models.computer import Computer
+from app.models.mission import Mission
+
+
+async def _register_and_create_game(client):
+    """Register a user, create a game, and return (headers, session_id)."""
+    reg = await client.post("/api/auth/register", json={
+        "username": "snapplayer",
+        "password": "pass123",
+    })
+    token = reg.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    game = await client.post("/api/game/new", json={
+        "player_name": "Test Player",
+        "handle": "Snapper",
+    }, headers=headers)
+    return headers, game.json()["session"]["id"]
+
+
+async def _export(db, session_id) -> tuple[bytes, dict]:
+    out = io.BytesIO()
+    stats = await snapshot.export_session(db, session_id, out)
+    return out.getvalue(), stats["tables"]
+
+
+@pytest.mark.asyncio
+async def test_save_download_and_import(client, db_engine):
+    headers, session_id = await _register_and_create_game(client)
+
+    resp = await client.get(f"/api/game/{session_id}/snapshot", headers=headers)
+    assert resp.status_code == 404
+
+    resp = await client.post(f"/api/game/{session_id}/save", headers=headers)
+    assert resp.status_code == 200
+    assert resp.json()["snapshot"]["rows"] > 0
+
+    resp = await client.get(f"/api/game/{session_id}/load", headers=headers)
+    assert resp.json()["snapshot"]["version"] == snapshot.FORMAT_VERSION
+
+    blob = (await client.get(f"/api/game/{session_id}/snapshot", headers=headers)).content
+    resp = await client.post("/api/game/import", content=blob, headers=headers)
+    assert resp.status_code == 200
+    new_id = resp.json()["session"]["id"]
+    assert new_id != session_id
+
+    async_sess = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_sess() as db:
+        _, original = await _export(db, session_id)
+        _, restored = await _export(db, new_id)
+        assert restored == original
+
+        # Mission targets point at the restored session's computers.
+        computer_ids = set((await db.execute(
+            select(Computer.id).where(Computer.game_session_id == new_id)
+        )).scalars())
+        targets = (await db.execute(
+            select(Mission.target_data).where(Mission.game_session_id == new_id)
+        )).scalars().all()
+        assert targets
+        for data in targets:
+            assert json.loads(data)["target_computer_id"] in computer_ids
+
+    player = (await client.get(f"/api/game/{new_id}/player", headers=headers)).json()
+    assert player["id"] == resp.json()["player_id"]
+    assert player["handle"] == "Snapper"
+
+
+@pytest.mark.asyncio
+async def test_clone_matches_original(client, db_engine, monkeypatch):
+    # Tiny chunks and dictionary force multi-frame tables and resets.
+    monkeypatch.setattr(snapshot, "CHUNK_ROWS", 7)
+    monkeypatch.setattr(snapshot, "MAX_STRINGS", 50)
+    headers, session_id = await _register_and_create_game(client)
+
+    resp = await client.post(f"/api/game/{session_id}/clone", headers=headers)
+    assert resp.status_code == 200
+    clone_id = resp.json()["session"]["id"]
+
+    world = (await client.get(f"/api/game/{session_id}/world", headers=headers)).json()
+    copy = (await client.get(f"/api/game/{clone_id}/world", headers=headers)).json()
+    assert copy == world
+
+    async_sess = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_sess() as db:
+        _, original = await _export(db, session_id)
+        _, cloned = await _export(db, clone_id)
+    assert cloned == original
+
+
+@pytest.mark.asyncio
+async def test_import_rejects_garbage(client):
+    headers, _ = await _register_and_create_game(client)
+    resp = await client.post("/api/game/import", content=b"not a snapshot", headers=headers)
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_import_enforces_size_limit(client, monkeypatch):
+    from app.config import settings
+
+    headers, session_id = await _register_and_create_game(client)
+    await client.post(f"/api/game/{session_id}/save", headers=headers)
+    blob = (await client.get(f"/api/game/{session_id}/snapshot", headers=headers)).content
+    inflated = len(gzip.decompress(blob))
+    assert inflated > len(blob)
+
+    monkeypatch.setattr(settings, "SNAPSHOT_MAX_BYTES", len(blob) - 1)
+    resp = await client.post("/api/game/import", content=blob, headers=headers)
+    assert resp.status_code == 413
+
+    # The body fits but its decompressed stream does not.
+    monkeypatch.setattr(settings, "SNAPSHOT_MAX_BYTES", len(blob))
+    resp = await client.post("/api/game/import", content=blob, headers=headers)
+    assert resp.status_code == 413
+
+    monkeypatch.setattr(settings, "SNAPSHOT_MAX_BYTES", inflated)
+    resp = await client.post("/api/game/import", content=blob, headers=headers)
+    assert resp.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_clone_keeps_accepted_missions_completable(client, db_engine):
+    from app.game import mission_engine
+    from app.models.databank import DataFile
+    from app.models.player import Player
+
+    headers, session_id = await _register_and_create_game(client)
+    player_id = (await client.get(f"/api/game/{session_id}/player", headers=headers)).json()["id"]
+
+    async_sess = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_sess() as db:
+        missions = await mission_engine.generate_missions(db, session_id, 20, player_rating=0)
+        steal = next(
+            (m for m in missions if m.mission_type == mission_engine.TYPE_STEALFILE), None
+        )
+        if steal is None:
+            pytest.skip("No steal mission was generated (randomness)")
+        await mission_engine.accept_mission(db, session_id, player_id, steal.id)
+        await db.commit()
+
+    resp = await client.post(f"/api/game/{session_id}/clone", headers=headers)
+    assert resp.status_code == 200
+    clone_id = resp.json()["session"]["id"]
+    clone_player_id = resp.json()["player_id"]
+    assert clone_player_id != player_id
+
+    async with async_sess() as db:
+        mission = (await db.execute(
+            select(Mission).where(
+                Mission.game_session_id == clone_id,
+                Mission.is_accepted == True,
+                Mission.description == steal.description,
+            )
+        )).scalar_one()
+        assert mission.accepted_by == str(clone_player_id)
+
+        player = await db.get(Player, clone_player_id)
+        balance = player.balance
+        gateway_id = await mission_engine._get_gateway_computer_id(db, clone_id, player)
+        assert gateway_id is not None
+        filename = json.loads(mission.target_data)["target_filename"]
+        db.add(DataFile(computer_id=gateway_id, filename=filename, size=2, file_type=2))
+        await db.flush()
+
+        result = await mission_engine.complete_mission(db, clone_id, clone_player_id, mission.id)
+        await db.commit()
+    assert result["balance"] == balance + mission.payment
@@ -0,0 +1,88 @@
+"""Tests for precompressed, cache-busted static frontend serving."""
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.static_files import (
+    HTML_CACHE, IMMUTABLE, PrecompressedStaticFiles, accepted_encodings, precompress,
+)
+
+BUNDLE = b"console.log('uplink');\n" * 200
+ASSET = "assets/index-Bx3kQ9aZ.js"
+
+
+@pytest.fixture
+def dist(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_bytes(b"<!doctype html><title>Uplink</title>")
+    (tmp_path / ASSET).write_bytes(BUNDLE)
+    (tmp_path / "favicon.svg").write_bytes(b"<svg/>")
+    written = precompress(tmp_path)
+    assert tmp_path / f"{ASSET}.gz" in written
+    # Too small to be worth compressing.
+    assert not (tmp_path / "index.html.gz").exists()
+    # Stand-in for a brotli build (the encoder is an optional dependency).
+    (tmp_path / f"{ASSET}.br").write_bytes(b"brotli-bytes")
+    return tmp_path
+
+
+async def _client(directory):
+    app = FastAPI()
+    app.mount("/", PrecompressedStaticFiles(directory=str(directory), html=True))
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+def test_accept_encoding_parsing():
+    assert accepted_encodings("gzip, br;q=0") == {"gzip"}
+    assert accepted_encodings("br;q=0.5, identity") == {"br", "identity"}
+    assert {"br", "gzip"} <= accepted_encodings("*")
+    assert accepted_encodings("") == set()
+
+
+@pytest.mark.asyncio
+async def test_serves_best_precompressed_variant(dist):
+    async with await _client(dist) as client:
+        resp = await client.get(f"/{ASSET}", headers={"Accept-Encoding": "gzip, br"})
+        assert resp.headers["content-encoding"] == "br"
+        assert resp.headers["cache-control"] == IMMUTABLE
+        assert resp.headers["vary"] == "Accept-Encoding"
+        assert resp.headers["content-type"].startswith("text/javascript")
+
+        resp = await client.get(f"/{ASSET}", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.content == BUNDLE  # httpx decodes gzip
+        gz_etag = resp.headers["etag"]
+
+        resp = await client.get(f"/{ASSET}", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in resp.headers
+        assert resp.content == BUNDLE
+        assert resp.headers["etag"] != gz_etag
+
+        resp = await client.get(
+            f"/{ASSET}",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": gz_etag},
+        )
+        assert resp.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_index_is_short_cached_and_ranges_work(dist):
+    async with await _client(dist) as client:
+        resp = await client.get("/")
+        assert resp.status_code == 200
+        assert resp.headers["cache-control"] == HTML_CACHE
+        assert "vary" not in resp.headers
+
+        resp = await client.get(
+            f"/{ASSET}", headers={"Accept-Encoding": "identity", "Range": "bytes=0-6"}
+        )
+        assert resp.status_code == 206
+        assert resp.content == BUNDLE[:7]
+
+
+def test_precompress_skips_up_to_date_files(dist):
+    assert precompress(dist) == []
+    gz = (dist / f"{ASSET}.gz").read_bytes()
+    assert gzip.decompress(gz) == BUNDLE
@@ -0,0 +1,70 @@
+"""Tests for off-loop world generation."""
+import pytest
+
+from app.config import settings
+from app.game import ip_allocator, world_builder, world_generator
+from app.game.ip_allocator import IPAllocator
+
+
+def test_build_world_is_deterministic():
+    rows = world_builder.build_world(1234)
+    assert rows == world_builder.build_world(1234)
+    assert rows != world_builder.build_world(4321)
+
+
+def test_rows_reference_their_computers():
+    rows = world_builder.build_world(7)
+    n = len(rows["computers"])
+    assert len(rows["locations"]) == n
+    for key in ("locations", "screens", "security", "files"):
+        cols = {
+            "locations": world_builder.LOCATION_COLS,
+            "screens": world_builder.SCREEN_COLS,
+            "security": world_builder.SECURITY_COLS,
+            "files": world_builder.FILE_COLS,
+        }[key]
+        ref = cols.index("computer_ref")
+        assert all(0 <= row[ref] < n for row in rows[key])
+
+    gateway = rows["computers"][rows["gateway_ref"]]
+    assert gateway[world_builder.COMPUTER_COLS.index("computer_type")] == 4
+    assert gateway[world_builder.COMPUTER_COLS.index("ip")] == rows["player_ip"]
+
+
+def test_allocator_never_repeats_or_reissues_reserved():
+    alloc = IPAllocator(5)
+    ips = [alloc.allocate() for _ in range(50_000)]
+    assert len(set(ips)) == len(ips)
+    assert not set(ips) & ip_allocator.reserved_ips()
+    assert all(ip_allocator.ip_to_index(ip) is not None for ip in ips[:100])
+
+    # The same seed replays the same sequence; extra reservations are skipped.
+    replay = IPAllocator(5, reserved={ips[0]})
+    assert replay.allocate() == ips[1]
+
+
+def test_index_round_trip():
+    for index in (0, 1, 998, 999, ip_allocator.SPACE - 1):
+        assert ip_allocator.ip_to_index(ip_allocator.index_to_ip(index)) == index
+    assert ip_allocator.ip_to_index("127.0.0.1") is None
+
+
+def test_large_world_has_unique_ips():
+    rows = world_builder.build_world(3, companies=2000)
+    ip = world_builder.COMPUTER_COLS.index("ip")
+    ips = [c[ip] for c in rows["computers"]]
+    assert len(set(ips)) == len(ips)
+
+
+@pytest.mark.asyncio
+async def test_process_pool_matches_in_process(monkeypatch):
+    monkeypatch.setattr(settings, "WORLDGEN_WORKERS", 1)
+    world_generator.shutdown_executor()
+    try:
+        assert await world_generator.build_world_rows(99) == world_builder.build_world(99)
+    finally:
+        world_generator.shutdown_executor()
+
+    monkeypatch.setattr(settings, "WORLDGEN_WORKERS", 0)
+    assert world_generator._get_executor() is None
+    assert await world_generator.build_world_rows(99) == world_builder.build_world(99)
@@ -0,0 +1,137 @@
+"""Tests for the level-of-detail world map endpoint."""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.game import world_map
+from app.models.vlocation import VLocation
+
+
+async def _register_and_create_game(client):
+    """Register a user, create a game, and return (headers, session_id)."""
+    reg = await client.post("/api/auth/register", json={
+        "username": "mapplayer",
+        "password": "pass123",
+    })
+    token = reg.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    game = await client.post("/api/game/new", json={
+        "player_name": "Test Player",
+        "handle": "Mapper",
+    }, headers=headers)
+    return headers, game.json()["session"]["id"]
+
+
+def test_cluster_counts_cover_all_points():
+    points = [(f"1.2.3.{i}", i * 7 % 600, i * 13 % 300) for i in range(200)]
+    for zoom in range(world_map.MAX_ZOOM + 1):
+        clusters = world_map.cluster_locations(points, zoom)
+        assert sum(c["count"] for c in clusters) == len(points)
+    assert len(world_map.cluster_locations(points, 0)) < len(points)
+    assert len(world_map.cluster_locations(points, world_map.MAX_ZOOM)) == len(points)
+
+
+@pytest.mark.asyncio
+async def test_map_levels_and_etag(client):
+    headers, session_id = await _register_and_create_game(client)
+    world = (await client.get(f"/api/game/{session_id}/world", headers=headers)).json()
+    total = len(world["locations"])
+
+    resp = await client.get(f"/api/game/{session_id}/map?zoom=0", headers=headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["version"] == 0
+    assert data["location_count"] == total
+    assert sum(c["count"] for c in data["clusters"]) == total
+    assert len(data["clusters"]) < total
+
+    etag = resp.headers["etag"]
+    resp = await client.get(
+        f"/api/game/{session_id}/map?zoom=0",
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert resp.status_code == 304
+
+    # A different zoom level has its own ETag.
+    resp = await client.get(
+        f"/api/game/{session_id}/map?zoom={world_map.MAX_ZOOM}",
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert resp.status_code == 200
+    assert len(resp.json()["clusters"]) == total
+
+    resp = await client.get(f"/api/game/{session_id}/map?zoom=99", headers=headers)
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_publish_bumps_version_and_deltas(client, db_engine):
+    headers, session_id = await _register_and_create_game(client)
+
+    resp = await client.get(f"/api/game/{session_id}/world", headers=headers)
+    world_etag = resp.headers["etag"]
+    resp = await client.get(f"/api/game/{session_id}/map?since=0", headers=headers)
+    assert resp.json()["added"] == []
+
+    async_sess = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_sess() as db:
+        hidden = (await db.execute(
+            select(VLocation.ip).where(
+                VLocation.game_session_id == session_id,
+                VLocation.listed == False,  # noqa: E712
+            ).limit(2)
+        )).scalars().all()
+        assert hidden
+        version = await world_map.publish_locations(db, session_id, hidden)
+        await db.commit()
+        assert version == 1
+        # Publishing the same links again is a no-op.
+        assert await world_map.publish_locations(db, session_id, hidden) == 1
+
+    resp = await client.get(
+        f"/api/game/{session_id}/world",
+        headers={**headers, "If-None-Match": world_etag},
+    )
+    assert resp.status_code == 200
+    assert {loc["ip"] for loc in resp.json()["locations"]} >= set(hidden)
+
+    resp = await client.get(f"/api/game/{session_id}/map?since=0", headers=headers)
+    data = resp.json()
+    assert data["version"] == 1
+    assert {a["ip"] for a in data["added"]} == set(hidden)
+
+    resp = await client.get(f"/api/game/{session_id}/map?since=1", headers=headers)
+    assert resp.json()["added"] == []
+
+
+@pytest.mark.asyncio
+async def test_accept_mission_publishes_target(client, db_engine):
+    """Accepting a mission lists its target and shows up in ?since deltas."""
+    from app.game import mission_engine
+    from app.models.mission import Mission
+
+    headers, session_id = await _register_and_create_game(client)
+    player = (await client.get(f"/api/game/{session_id}/player", headers=headers)).json()
+
+    async_sess = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_sess() as db:
+        mission = (await db.execute(
+            select(Mission).where(Mission.game_session_id == session_id).limit(1)
+        )).scalar_one()
+        target = (await db.execute(
+            select(VLocation).where(
+                VLocation.game_session_id == session_id,
+                VLocation.ip == mission.target_computer_ip,
+            )
+        )).scalar_one()
+        target.listed = False
+        await db.commit()
+
+        await mission_engine.accept_mission(db, session_id, player["id"], mission.id)
+        await db.commit()
+
+    resp = await client.get(f"/api/game/{session_id}/map?since=0", headers=headers)
+    data = resp.json()
+    assert data["version"] == 1
+    assert [a["ip"] for a in data["added"]] == [mission.target_computer_ip]
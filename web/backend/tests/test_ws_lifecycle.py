@@ -0,0 +1,99 @@
+"""Tests for WebSocket heartbeat deadlines and the dead-socket reaper."""
+import time
+
+import pytest
+
+from app.ws.handler import CLOSE_HEARTBEAT_TIMEOUT, ConnectionManager, SessionState
+
+
+class FakeWebSocket:
+    def __init__(self, fail_send: bool = False):
+        self.fail_send = fail_send
+        self.sent: list[str] = []
+        self.closed_with: int | None = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.fail_send:
+            raise RuntimeError("socket is gone")
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.closed_with = code
+
+
+def _state(session_id: str) -> SessionState:
+    return SessionState(user_id=1, game_session_id=session_id, player_id=1)
+
+
+@pytest.mark.asyncio
+async def test_reap_evicts_silent_sockets():
+    mgr = ConnectionManager(heartbeat_timeout=30)
+    quiet, chatty = FakeWebSocket(), FakeWebSocket()
+    await mgr.connect(quiet, "s-quiet", _state("s-quiet"))
+    await mgr.connect(chatty, "s-chatty", _state("s-chatty"))
+
+    mgr.session_states["s-quiet"].last_seen -= 60
+    mgr.touch("s-chatty")
+
+    reaped = await mgr.reap()
+    assert reaped == ["s-quiet"]
+    assert quiet.closed_with == CLOSE_HEARTBEAT_TIMEOUT
+    assert "s-quiet" not in mgr.active_connections
+    assert "s-quiet" not in mgr.session_states
+    assert "s-chatty" in mgr.active_connections
+
+    # The handler's own cleanup after the close is a no-op.
+    mgr.disconnect("s-quiet", quiet)
+    assert mgr.metrics() == {"live": 1, "opened": 2, "closed": 0, "reaped": 1}
+
+    assert await mgr.reap(now=time.monotonic() + 31) == ["s-chatty"]
+    assert mgr.metrics()["live"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_send_evicts_socket():
+    mgr = ConnectionManager(heartbeat_timeout=30)
+    ws = FakeWebSocket(fail_send=True)
+    await mgr.connect(ws, "s1", _state("s1"))
+
+    with pytest.raises(RuntimeError):
+        await mgr.send_message("s1", {"type": "task_update", "tasks": []})
+    assert "s1" not in mgr.active_connections
+    assert mgr.reaped == 1
+
+    # Nothing left to send to.
+    await mgr.send_message("s1", {"type": "task_update", "tasks": []})
+
+
+@pytest.mark.asyncio
+async def test_reconnect_replaces_old_socket():
+    mgr = ConnectionManager(heartbeat_timeout=30)
+    old, new = FakeWebSocket(), FakeWebSocket()
+    await mgr.connect(old, "s1", _state("s1"))
+    await mgr.connect(new, "s1", _state("s1"))
+    assert old.closed_with == 1000
+
+    # The old handler exiting must not drop the new socket.
+    mgr.disconnect("s1", old)
+    assert mgr.active_connections["s1"] is new
+
+    mgr.disconnect("s1", new)
+    assert mgr.metrics() == {"live": 0, "opened": 2, "closed": 1, "reaped": 0}
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client):
+    resp = await client.get("/api/metrics")
+    assert resp.status_code in (401, 403)
+
+    reg = await client.post("/api/auth/register", json={
+        "username": "metrics",
+        "password": "pass123",
+    })
+    headers = {"Authorization": f"Bearer {reg.json()['access_token']}"}
+    resp = await client.get("/api/metrics", headers=headers)
+    assert resp.status_code == 200
+    assert set(resp.json()["connections"]) == {"live", "opened", "closed", "reaped"}
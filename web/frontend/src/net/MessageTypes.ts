@@ -23,6 +23,8 @@ export const MSG_TRACE_COMPLETE = 'trace_complete';
 export const MSG_BALANCE_CHANGED = 'balance_changed';
 export const MSG_RATING_CHANGED = 'rating_changed';
 export const MSG_MESSAGE_RECEIVED = 'message_received';
+export const MSG_BBS_DELTA = 'bbs_delta';
+export const MSG_THROTTLED = 'throttled';
 export const MSG_GAME_OVER = 'game_over';
 export const MSG_ERROR = 'error';
 
@@ -162,6 +162,12 @@ export class MainGameScene extends Phaser.Scene {
       gameState.addAcceptedMission(mission);
     });
 
+    wsClient.on('throttled', (data) => {
+      console.warn(
+        `[WS] ${data.message_type} throttled, retry after ${data.retry_after}s`
+      );
+    });
+
     wsClient.on('mission_completed', (data) => {
       gameState.removeMission(data.mission_id as number);
       this.hud.getMissionPanel().showCompletionFlash();
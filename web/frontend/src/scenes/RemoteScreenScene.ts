@@ -3,6 +3,16 @@ import { CONFIG } from '../config';
 import { wsClient } from '../net/WebSocketClient';
 import { ScreenFactory } from '../ui/screens/ScreenFactory';
 
+/** Screen type of the Bulletin Board (matches SCREEN_BBSSCREEN on the server). */
+const SCREEN_BBS = 4;
+
+interface BBSMission {
+  id: number;
+  payment: number;
+  min_rating: number;
+  [key: string]: unknown;
+}
+
 interface ScreenData {
   screen_type: number;
   screen_index: number;
@@ -11,10 +21,12 @@ interface ScreenData {
   prompt?: string;
   error?: string;
   menu_options?: Array<{ label: string; screen_index: number }>;
+  missions?: BBSMission[];
 }
 
 export class RemoteScreenScene extends Phaser.Scene {
   private currentScreen: { destroy?: () => void } | null = null;
+  private lastScreen: ScreenData | null = null;
   private screenContainer!: Phaser.GameObjects.Container;
   private headerText!: Phaser.GameObjects.Text;
   private background!: Phaser.GameObjects.Graphics;
@@ -71,6 +83,7 @@ export class RemoteScreenScene extends Phaser.Scene {
 
     // Register WebSocket listeners
     wsClient.on('screen_update', this.onScreenUpdate);
+    wsClient.on('bbs_delta', this.onBbsDelta);
     wsClient.on('disconnected', this.onDisconnected);
 
     // Render the initial screen if provided
@@ -86,12 +99,28 @@ export class RemoteScreenScene extends Phaser.Scene {
     }
   };
 
+  /** Patch the open BBS screen with added / removed missions. */
+  private onBbsDelta = (data: Record<string, unknown>) => {
+    const screen = this.lastScreen;
+    if (!screen || screen.screen_type !== SCREEN_BBS) {
+      return;
+    }
+    const removed = new Set((data.removed as number[] | undefined) || []);
+    const added = (data.added as BBSMission[] | undefined) || [];
+    const missions = (screen.missions || []).filter(m => !removed.has(m.id));
+    missions.push(...added);
+    missions.sort((a, b) => b.payment - a.payment || a.id - b.id);
+    this.renderScreen({ ...screen, missions });
+  };
+
   private onDisconnected = () => {
     this.cleanup();
     this.scene.stop();
   };
 
   private renderScreen(screenData: ScreenData) {
+    this.lastScreen = screenData;
+
     // Destroy the previous screen renderer if it has a cleanup method
     if (this.currentScreen && this.currentScreen.destroy) {
       this.currentScreen.destroy();
@@ -115,6 +144,7 @@ export class RemoteScreenScene extends Phaser.Scene {
       this.currentScreen = null;
     }
     wsClient.off('screen_update', this.onScreenUpdate);
+    wsClient.off('bbs_delta', this.onBbsDelta);
     wsClient.off('disconnected', this.onDisconnected);
   }
 